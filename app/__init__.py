@@ -1,25 +1,100 @@
 # app paketi başlatma dosyası
-from flask import Flask, render_template, request, jsonify, session
+from dotenv import load_dotenv
+
+# .env dosyasını yükle; app.utils modülleri ayarlarını içe aktarılırken okuduğundan önce yüklenir
+load_dotenv()
+
+from flask import Flask, Response, render_template, request, jsonify, session, make_response, abort
 import os
 import json
+import shutil
 import logging
+import tempfile
 import traceback
-from app.utils.transcript_processor import TranscriptProcessor
-from app.utils.ai_analyzer import AIAnalyzer
-from app.utils.test_generator import TestGenerator
-from dotenv import load_dotenv
+from datetime import datetime, timezone
+from app.utils.job_queue import JobQueue, AsyncJobQueue, QueueFullError
+from app.utils.job_store import get_job_store
+from app.utils.pipeline import (run_pipeline, run_pipeline_async, run_live_analysis, run_live_pipeline,
+                                pipeline_stages, render_result, result_payload, LIVE_PIPELINE_STAGES)
+from app.utils.live_lesson import get_live_lessons, parse_segment
+from app.utils.result_store import get_result_store
+from app.utils.llm_backend import get_llm_backend
+from app.utils.metrics import get_metrics
+from app.utils.compression import compress_response
+from app.utils.static_assets import StaticAssets
 
-# .env dosyasını yükle
-load_dotenv()
-
-# Loglama yapılandırması
-logging.basicConfig(level=logging.DEBUG)
+# Loglama yapılandırması (ayrıntılı istek ve yanıt günlükleri için LOG_LEVEL=DEBUG)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
 # Flask uygulamasını oluştur
 app = Flask(__name__)
 app.secret_key = os.getenv("SECRET_KEY", "default_secret_key")
 
+# Yüklenebilecek en büyük dosya boyutu; aşılırsa 413 döndürülür
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv("MAX_UPLOAD_MB", "16")) * 1024 * 1024
+
+# Bu boyuta kadar yüklemeler bellekte, daha büyükleri geçici dosyada tutulur
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_KB", "1024")) * 1024
+
+# Analiz ve test oluşturmanın kipi: 'two_step' (iki istek) veya 'fused' (tek istek)
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "two_step")
+
+# Sorular oluşturuldukça sonuç sayfasına aktarılsın mı (yalnızca 'two_step' kipinde)
+STREAM_TESTS = os.getenv("STREAM_TESTS", "0") == "1" and PIPELINE_MODE != 'fused'
+
+# Canlı derslerde bu sayıda yeni konuşma birikince analiz arka planda güncellenir
+LIVE_ANALYZE_SEGMENTS = int(os.getenv("LIVE_ANALYZE_SEGMENTS", "100"))
+
+# Olay akışı boştayken bağlantıyı canlı tutmak için gönderilen yorumların aralığı (saniye)
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+# İşlerin çalıştırılma biçimi: 'thread' (her iş yapay zeka yanıtlarını bekleyen bir iş parçacığında)
+# veya 'async' (işler tek bir olay döngüsünde eşyordam olarak çalışır; JOB_WORKERS iş parçacığı
+# yalnızca ayrıştırma ve test işleme gibi işlemci ağırlıklı adımlar için kullanılır)
+JOB_RUNNER = os.getenv("JOB_RUNNER", "thread")
+
+# Yükleme işlerini çalıştıran sınırlı iş havuzu; işlerin durumu ve olayları tüm işçilerin
+# okuyabildiği iş deposuna da yazılır (JOB_STORE=memory ile yalnızca bu süreçte tutulur)
+if JOB_RUNNER == 'async':
+    job_queue = AsyncJobQueue(
+        max_workers=int(os.getenv("JOB_WORKERS", "2")),
+        max_pending=int(os.getenv("JOB_QUEUE_LIMIT", "200")),
+        store=get_job_store()
+    )
+    upload_pipeline = run_pipeline_async
+else:
+    job_queue = JobQueue(
+        max_workers=int(os.getenv("JOB_WORKERS", "2")),
+        max_pending=int(os.getenv("JOB_QUEUE_LIMIT", "20")),
+        store=get_job_store()
+    )
+    upload_pipeline = run_pipeline
+
+# CSS ve JavaScript dosyaları parmak izli adreslerle, önceden sıkıştırılmış olarak sunulur
+static_assets = StaticAssets(app.static_folder)
+
+@app.template_global()
+def asset_url(filename):
+    """Statik dosyanın parmak izli adresini döndür (hata ayıklama kipinde değişiklikler izlenir)."""
+    return static_assets.url(filename, reload=app.debug)
+
+@app.after_request
+def compress(response):
+    """Sayfa ve JSON yanıtlarını istemcinin kabul ettiği kodlamayla (br/gzip) sıkıştır."""
+    return compress_response(response, request.headers.get('Accept-Encoding'))
+
+@app.route('/assets/<path:filename>')
+def assets(filename):
+    """Parmak izli statik dosyayı uzun süreli önbellek başlıklarıyla sun."""
+    served = static_assets.serve(filename, request.headers.get('Accept-Encoding'), reload=app.debug)
+    if served is None:
+        abort(404)
+    
+    data, headers = served
+    response = Response(data, headers=headers)
+    return response.make_conditional(request)
+
 @app.route('/')
 def index():
     """Ana sayfa."""
@@ -27,7 +102,7 @@ def index():
 
 @app.route('/upload', methods=['POST'])
 def upload_transcript():
-    """Transkript dosyasını yükle ve işle."""
+    """Transkript dosyasını yükle ve işlenmek üzere kuyruğa ekle."""
     try:
         if 'transcript_file' not in request.files:
             return jsonify({'success': False, 'error': 'Dosya bulunamadı.'}), 400
@@ -36,46 +111,40 @@ def upload_transcript():
         if file.filename == '':
             return jsonify({'success': False, 'error': 'Dosya seçilmedi.'}), 400
         
-        # Dosyayı geçici olarak kaydet
-        temp_file_path = os.path.join('temp', file.filename)
-        os.makedirs('temp', exist_ok=True)
-        file.save(temp_file_path)
-        
-        # Transkripti işle
-        processor = TranscriptProcessor(temp_file_path)
-        if not processor.load_transcript():
-            return jsonify({'success': False, 'error': 'Transkript yüklenemedi.'}), 400
-        
-        processed_data = processor.process_transcript()
+        # Yüklemeyi iş tamamlanana kadar saklamak için biriktir; kapatıldığında silinir
+        upload = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+        shutil.copyfileobj(file.stream, upload, 64 * 1024)
+        upload.seek(0)
         
-        # Yapay zeka analizi
-        analyzer = AIAnalyzer()
-        analysis_result = analyzer.analyze_transcript(processed_data)
+        # Kullanıcı önceki sonucu istemiyorsa analizi yeniden yap
+        force_regenerate = request.form.get('force_regenerate', '').lower() in ('1', 'true', 'on')
         
-        if not analysis_result.get('success', False):
-            return jsonify({'success': False, 'error': 'Analiz başarısız oldu.'}), 500
+        # İşi kuyruğa ekle
+        try:
+            job = job_queue.submit(upload_pipeline, upload, file.filename, force_regenerate, PIPELINE_MODE,
+                                   STREAM_TESTS, stages=pipeline_stages(PIPELINE_MODE))
+        except QueueFullError:
+            upload.close()
+            return jsonify({
+                'success': False,
+                'error': 'Sunucu şu anda çok yoğun. Lütfen biraz sonra tekrar deneyin.'
+            }), 503
         
-        # Test oluştur
-        logger.debug("Testler oluşturuluyor...")
-        tests_result = analyzer.generate_tests(analysis_result, processed_data)
-        logger.debug(f"Test sonucu: {tests_result}")
+        session['job_id'] = job.id
         
-        if not tests_result.get('success', False):
-            return jsonify({'success': False, 'error': 'Test oluşturma başarısız oldu.'}), 500
-        
-        # Sonuçları oturumda sakla
-        session['analysis_result'] = analysis_result
-        session['tests_result'] = tests_result
-        
-        # Özet bilgileri döndür
-        return jsonify({
+        response = {
             'success': True,
-            'message': 'Transkript başarıyla analiz edildi ve testler oluşturuldu.',
-            'redirect': '/results'
-        })
+            'job_id': job.id,
+            'status_url': f'/jobs/{job.id}',
+            'result_url': f'/jobs/{job.id}/result'
+        }
+        if STREAM_TESTS:
+            # Sonuç sayfası soruları oluşturuldukça gösterir
+            response['live_url'] = f'/jobs/{job.id}/live'
+        return jsonify(response), 202
     except Exception as e:
         # Hata detaylarını logla
-        logger.error(f"Upload işlemi sırasında hata: {str(e)}")
+        logger.error("Upload işlemi sırasında hata: %s", e)
         logger.error(traceback.format_exc())
         
         # Hata mesajını JSON olarak döndür
@@ -84,35 +153,228 @@ def upload_transcript():
             'error': f'İşlem sırasında bir hata oluştu: {str(e)}'
         }), 500
 
+@app.route('/live', methods=['POST'])
+def live_create():
+    """Ders sürerken transkript bölümleri eklenecek canlı bir ders oluştur."""
+    lesson = get_live_lessons().create(analyze_every=LIVE_ANALYZE_SEGMENTS)
+    return jsonify({
+        'success': True,
+        'lesson_id': lesson.id,
+        'segments_url': f'/live/{lesson.id}/segments',
+        'finish_url': f'/live/{lesson.id}/finish'
+    }), 201
+
+@app.route('/live/<lesson_id>')
+def live_status(lesson_id):
+    """Canlı dersin konuşma ve analiz durumunu döndür."""
+    lesson = get_live_lessons().get(lesson_id)
+    if lesson is None:
+        return jsonify({'success': False, 'error': 'Canlı ders bulunamadı.'}), 404
+    
+    return jsonify(dict(lesson.to_dict(), success=True))
+
+@app.route('/live/<lesson_id>/segments', methods=['POST'])
+def live_segments(lesson_id):
+    """Canlı derse yeni transkript bölümleri (WEBVTT metni veya JSON kayıtları) ekle."""
+    lesson = get_live_lessons().get(lesson_id)
+    if lesson is None:
+        return jsonify({'success': False, 'error': 'Canlı ders bulunamadı.'}), 404
+    
+    try:
+        if request.is_json:
+            payload = request.get_json(silent=True)
+            segments = payload.get('segments') if isinstance(payload, dict) else None
+            if not isinstance(segments, list):
+                return jsonify({'success': False, 'error': 'Geçersiz transkript bölümleri.'}), 400
+            try:
+                segments = [parse_segment(segment) for segment in segments]
+            except ValueError as e:
+                return jsonify({'success': False, 'error': f'Geçersiz transkript bölümleri: {e}'}), 400
+            added = lesson.append(segments)
+        else:
+            added = lesson.feed(request.get_data(as_text=True))
+    except LookupError:
+        # Ders bu arada başka bir işçide tamamlanıp silinmiş
+        return jsonify({'success': False, 'error': 'Canlı ders bulunamadı.'}), 404
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+    
+    # Yeterince yeni konuşma biriktiyse analizi arka planda yalnızca bu konuşmalarla güncelle
+    if lesson.should_analyze():
+        try:
+            job_queue.submit(run_live_analysis, lesson, stages=['analyze'])
+        except QueueFullError:
+            # Kuyruk boşalınca sonraki bölümlerle birlikte analiz edilir
+            lesson.unschedule()
+    
+    return jsonify(dict(lesson.to_dict(), success=True, added=added))
+
+@app.route('/live/<lesson_id>/finish', methods=['POST'])
+def live_finish(lesson_id):
+    """Canlı dersi kapat ve kalan bölümün analizi ile test oluşturmayı kuyruğa ekle."""
+    lesson = get_live_lessons().get(lesson_id)
+    if lesson is None:
+        return jsonify({'success': False, 'error': 'Canlı ders bulunamadı.'}), 404
+    
+    if not lesson.finish():
+        return jsonify({'success': False, 'error': 'Ders zaten tamamlandı.'}), 409
+    
+    try:
+        job = job_queue.submit(run_live_pipeline, lesson, STREAM_TESTS, stages=LIVE_PIPELINE_STAGES)
+    except QueueFullError:
+        return jsonify({
+            'success': False,
+            'error': 'Sunucu şu anda çok yoğun. Lütfen biraz sonra tekrar deneyin.'
+        }), 503
+    
+    session['job_id'] = job.id
+    
+    response = {
+        'success': True,
+        'job_id': job.id,
+        'status_url': f'/jobs/{job.id}',
+        'result_url': f'/jobs/{job.id}/result'
+    }
+    if STREAM_TESTS:
+        response['live_url'] = f'/jobs/{job.id}/live'
+    return jsonify(response), 202
+
+@app.errorhandler(413)
+def upload_too_large(error):
+    """Boyut sınırını aşan yüklemeler için JSON hata döndür."""
+    return jsonify({'success': False, 'error': 'Dosya boyutu sınırı aşıldı.'}), 413
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """İşin durumunu ve aşama ilerlemesini döndür."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'İş bulunamadı.'}), 404
+    
+    return jsonify(dict(job.to_dict(), success=True))
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    """Tamamlanan işin sonuç kimliğini oturuma aktar ve sonuç sayfasına yönlendir."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'İş bulunamadı.'}), 404
+    
+    if job.status == 'failed':
+        return jsonify({'success': False, 'error': job.error}), 500
+    
+    if not job.finished:
+        return jsonify(dict(job.to_dict(), success=True)), 202
+    
+    # Oturumda yalnızca sonuç kimliğini sakla
+    session['result_id'] = job.result['result_id']
+    
+    return jsonify({
+        'success': True,
+        'message': 'Transkript başarıyla analiz edildi ve testler oluşturuldu.',
+        'redirect': '/results',
+        'api_url': f"/api/results/{job.result['result_id']}"
+    })
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """İşin olaylarını (analiz, oluşturulan sorular, sonuç) Server-Sent Events olarak aktar."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'İş bulunamadı.'}), 404
+    
+    # Bağlantı koparsa tarayıcı son aldığı olayın kimliğiyle yeniden bağlanır
+    last_event_id = request.headers.get('Last-Event-ID', '0')
+    after = int(last_event_id) if last_event_id.isdigit() else 0
+    
+    def generate(after):
+        while True:
+            events = job.wait_events(after, timeout=SSE_HEARTBEAT_SECONDS)
+            if not events:
+                yield ": keep-alive\n\n"
+                continue
+            for event in events:
+                after = event['id']
+                data = json.dumps(event['data'], ensure_ascii=False)
+                yield f"id: {event['id']}\nevent: {event['event']}\ndata: {data}\n\n"
+                if event['event'] in ('completed', 'failed'):
+                    return
+    
+    return Response(generate(after), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/jobs/<job_id>/live')
+def job_live(job_id):
+    """Sonuç sayfasını, sorular oluşturuldukça doldurulmak üzere boş olarak göster."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return render_template('error.html', error='İş bulunamadı. Lütfen transkript yükleyin.')
+    
+    return render_template(
+        'results.html',
+        stream_url=f'/jobs/{job.id}/events',
+        result_url=f'/jobs/{job.id}/result'
+    )
+
+@app.route('/metrics')
+def metrics():
+    """Tüm işçilerin aşama süresi, yapay zeka ve önbellek ölçümlerini Prometheus biçiminde döndür."""
+    return Response(get_metrics().render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/health/llm')
+def llm_health():
+    """Bu işçi sürecindeki yapay zeka arka ucunun sağlık ve gecikme bilgilerini döndür."""
+    stats = get_llm_backend().stats()
+    return jsonify(dict(stats, success=True)), 200 if stats['healthy'] else 503
+
 @app.route('/results')
 def results():
-    """Analiz sonuçlarını ve testleri göster."""
+    """Sonuç sayfasını göster; analiz ve testler sayfada /api/results adresinden alınır."""
     try:
-        # Oturumdan sonuçları al
-        analysis_result = session.get('analysis_result', {})
-        tests_result = session.get('tests_result', {})
-        
-        logger.debug(f"Analiz sonucu: {analysis_result}")
-        logger.debug(f"Test sonucu: {tests_result}")
+        # Oturumdaki kimlikle sonucun varlığını denetle
+        result_id = session.get('result_id')
+        stored_result = (get_result_store().get(result_id) if result_id else None) or {}
         
-        if not analysis_result or not tests_result:
+        if not stored_result.get('analysis_result') or not stored_result.get('tests_result'):
             return render_template('error.html', error='Sonuçlar bulunamadı. Lütfen transkript yükleyin.')
         
-        # Test verilerini işle
-        test_generator = TestGenerator(tests_result.get('raw_tests', ''))
-        processed_tests = test_generator.process_tests()
-        logger.debug(f"İşlenmiş testler: {processed_tests}")
-        tests_html = test_generator.get_tests_as_html()
-        
-        return render_template(
-            'results.html',
-            analysis=analysis_result.get('raw_analysis', ''),
-            tests_html=tests_html
-        )
+        return render_template('results.html', api_url=f'/api/results/{result_id}')
     except Exception as e:
         # Hata detaylarını logla
-        logger.error(f"Results sayfası gösterilirken hata: {str(e)}")
+        logger.error("Results sayfası gösterilirken hata: %s", e)
         logger.error(traceback.format_exc())
         
         # Hata sayfasını göster
-        return render_template('error.html', error=f'Sonuçlar gösterilirken bir hata oluştu: {str(e)}') 
\ No newline at end of file
+        return render_template('error.html', error=f'Sonuçlar gösterilirken bir hata oluştu: {str(e)}')
+
+@app.route('/api/results/<result_id>')
+def api_result(result_id):
+    """Sonucun analizini ve sorularını istemcide gösterilmek üzere yalın JSON olarak döndür."""
+    store = get_result_store()
+    stored_result = store.get(result_id) or {}
+    analysis_result = stored_result.get('analysis_result', {})
+    tests_result = stored_result.get('tests_result', {})
+    
+    if not analysis_result or not tests_result:
+        return jsonify({'success': False, 'error': 'Sonuç bulunamadı.'}), 404
+    
+    # Test oluşturulurken hazırlanan soruları kullan; eski kayıtlar için bir kez hazırlayıp sakla
+    if 'rendered_tests' not in stored_result:
+        stored_result.update(render_result(analysis_result, tests_result))
+        store.put(stored_result, result_id=result_id)
+    
+    # Sonuç değişmediyse yanıtı yeniden oluşturmadan 304 döndür
+    response = make_response()
+    response.set_etag(stored_result['etag'])
+    response.last_modified = datetime.fromtimestamp(int(stored_result['rendered_at']), timezone.utc)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.make_conditional(request)
+    if response.status_code == 304:
+        return response
+    
+    # Boşluksuz JSON; Türkçe karakterler kaçış dizisine çevrilmeden UTF-8 olarak yazılır
+    response.set_data(json.dumps(dict(result_payload(stored_result), success=True),
+                                 ensure_ascii=False, separators=(',', ':')))
+    response.mimetype = 'application/json'
+    return response
@@ -0,0 +1,366 @@
+"""
+Geçmiş derslerin transkriptlerini toplu olarak işleyen komut satırı aracı.
+
+Kullanım:
+    python -m app.batch dersler/ [--workers 4] [--concurrency 4] [--chunk-size 100]
+    python -m app.batch flai_reports.csv [--checkpoint cache/batch_checkpoint.jsonl] [--force]
+
+Girdi, transkript dosyalarını içeren bir dizin ya da dosya olabilir. Ders kimliği sütunu
+('lesson_id', 'meeting_id' vb.) olan CSV dışa aktarımları ders sırasına göre gruplanmış
+kabul edilir ve parça parça okunarak her ders ayrı işlenir.
+
+Transkriptler bir süreç havuzunda ayrıştırılır, yapay zeka çağrıları sınırlı sayıda iş
+parçacığıyla yapılır ve sonuçlar sonuç deposuna yazılır. Her dersin ilerlemesi kontrol
+noktası dosyasına eklenir; yarıda kesilen bir çalışma aynı komutla yeniden başlatıldığında
+tamamlanan dersler atlanır, analizi bitmiş dersler için analiz yeniden istenmez.
+"""
+import io
+import os
+import csv
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Dict, List, Any, Callable, Iterable, Iterator, Optional, Tuple
+from app.utils.job_queue import Job
+from app.utils.pipeline import BATCH_PIPELINE_STAGES, compress_transcript, run_batch_lesson
+from app.utils.result_store import get_result_store
+from app.utils.transcript_formats import TableParser, field_name, supported_extensions
+from app.utils.transcript_processor import TranscriptProcessor
+
+# Loglama yapılandırması
+logger = logging.getLogger(__name__)
+
+# Çok dersli dışa aktarımlarda dersi belirten sütunlar
+LESSON_FIELDS = ('lesson_id', 'lesson', 'meeting_id', 'session_id', 'report_id', 'class_id', 'ders')
+
+# Bir ders: (kontrol noktası anahtarı, dosya adı, içerik; içerik None ise dosya diskten okunur)
+LessonSource = Tuple[str, str, Optional[bytes]]
+
+
+class BatchCheckpoint:
+    """
+    Toplu çalışmanın ilerlemesini her satırı bir JSON kaydı olan dosyaya ekler.
+
+    Bir dersin son kaydı durumunu belirler: 'analyzed' (analiz sonucu saklanır), 'done'
+    (sonuç deposundaki kaydın kimliği) ya da 'failed' (analizden sonra başarısız olduysa
+    analiz sonucu da saklanır). Kayıtlar eklendikçe diske yazıldığından çalışma herhangi
+    bir anda kesilebilir; yarım kalan son satır yok sayılır.
+    """
+
+    def __init__(self, path: str):
+        """
+        BatchCheckpoint sınıfını başlatır ve varsa önceki kayıtları okur.
+
+        Args:
+            path (str): Kontrol noktası dosyasının yolu.
+        """
+        self.path = path
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        logger.warning("Kontrol noktasındaki yarım kayıt yok sayıldı: %s", path)
+                        continue
+                    self._entries[entry['key']] = entry
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Dersin son kaydını döndürür.
+        """
+        with self._lock:
+            return self._entries.get(key)
+
+    def is_done(self, key: str) -> bool:
+        """
+        Dersin tamamlanıp tamamlanmadığını döndürür.
+        """
+        entry = self.get(key)
+        return entry is not None and entry['status'] == 'done'
+
+    def record(self, key: str, status: str, **data: Any) -> None:
+        """
+        Dersin yeni durumunu dosyaya ekler ve diske yazılmasını bekler.
+
+        Args:
+            key (str): Dersin anahtarı.
+            status (str): 'analyzed', 'done' ya da 'failed'.
+            **data: Kayda eklenecek alanlar.
+        """
+        entry = dict(data, key=key, status=status, updated_at=time.time())
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.write(line)
+                file.flush()
+                os.fsync(file.fileno())
+            self._entries[key] = entry
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Durumlara göre ders sayılarını döndürür.
+        """
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for entry in self._entries.values():
+                counts[entry['status']] = counts.get(entry['status'], 0) + 1
+        return counts
+
+
+def iter_sources(paths: Iterable[str]) -> Iterator[LessonSource]:
+    """
+    Dizinlerdeki transkript dosyalarını ve dışa aktarımlardaki dersleri sırayla döndürür.
+
+    Args:
+        paths (Iterable[str]): Dizin ya da dosya yolları.
+
+    Yields:
+        LessonSource: Ders anahtarı, dosya adı ve (dışa aktarımdan ayrıldıysa) içeriği.
+    """
+    extensions = tuple(supported_extensions())
+    for path in paths:
+        if not os.path.isdir(path):
+            yield from _iter_export(os.path.abspath(path))
+            continue
+        for directory, dirnames, filenames in os.walk(os.path.abspath(path)):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if not name.startswith('.') and name.lower().endswith(extensions):
+                    yield from _iter_export(os.path.join(directory, name))
+
+
+def _iter_export(path: str) -> Iterator[LessonSource]:
+    """
+    Ders kimliği sütunu olan tabloyu derslere ayırır; diğer dosyaları tek ders olarak döndürür.
+
+    Tablo satır satır okunur; bellekte yalnızca o an ayrılan dersin satırları tutulur.
+    """
+    with open(path, 'r', encoding='utf-8-sig', errors='replace', newline='') as file:
+        header = file.readline()
+        delimiter = TableParser.dialect(header)
+        names = [field_name(name) for name in next(csv.reader([header], delimiter=delimiter))] if delimiter else []
+        column = next((names.index(name) for name in LESSON_FIELDS if name in names), None)
+        if column is None:
+            yield path, path, None
+            return
+
+        seen = set()
+        lesson, rows = None, []
+        for row in csv.reader(file, delimiter=delimiter):
+            value = row[column].strip() if column < len(row) else ''
+            if value != lesson and rows:
+                yield _export_lesson(path, lesson, header, rows, delimiter, seen)
+                rows = []
+            lesson = value
+            rows.append(row)
+        if rows:
+            yield _export_lesson(path, lesson, header, rows, delimiter, seen)
+
+
+def _export_lesson(path: str, lesson: str, header: str, rows: List[List[str]], delimiter: str,
+                   seen: set) -> LessonSource:
+    """
+    Dışa aktarımdan ayrılan bir dersin satırlarını başlıkla birlikte CSV içeriğine çevirir.
+    """
+    key = f"{path}#{lesson}"
+    if lesson in seen:
+        # Dışa aktarım derse göre sıralı değil; dersin sonraki bölümü ayrı işlenir
+        logger.warning("Ders dışa aktarımda bölünmüş: %s", lesson)
+        key = f"{key}@{len(seen)}"
+    seen.add(lesson)
+    output = io.StringIO()
+    output.write(header)
+    csv.writer(output, delimiter=delimiter, lineterminator='\n').writerows(rows)
+    return key, f"{lesson}.csv", output.getvalue().encode('utf-8')
+
+
+def parse_lesson(source: LessonSource) -> Dict[str, Any]:
+    """
+    Bir dersi ayrıştırır, parmak izini hesaplar ve sıkıştırır (süreç havuzunda çalışır).
+
+    Args:
+        source (LessonSource): Ders anahtarı, dosya adı ve içeriği.
+
+    Returns:
+        Dict[str, Any]: 'key', 'fingerprint', 'transcript' ve 'compression' alanları;
+            ayrıştırma başarısızsa 'key' ve 'error'.
+    """
+    key, filename, content = source
+    try:
+        processor = TranscriptProcessor(filename)
+        loaded = processor.load_transcript(stream=io.BytesIO(content) if content is not None else None)
+        if not loaded or processor.frame is None or processor.frame.entry_count == 0:
+            return {'key': key, 'error': 'Transkript yüklenemedi.'}
+        transcript, compression = compress_transcript(processor.process_transcript())
+        return {'key': key, 'fingerprint': processor.get_fingerprint(), 'transcript': transcript,
+                'compression': compression}
+    except Exception as e:
+        return {'key': key, 'error': str(e)}
+
+
+def _chunks(sources: Iterable[LessonSource], size: int) -> Iterator[List[LessonSource]]:
+    """
+    Dersleri en fazla size uzunluğunda listeler halinde döndürür.
+    """
+    chunk = []
+    for source in sources:
+        chunk.append(source)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_batch(sources: Iterable[LessonSource], checkpoint: BatchCheckpoint, workers: Optional[int] = None,
+              concurrency: int = 4, chunk_size: int = 100, force_regenerate: bool = False,
+              analyzer_factory: Optional[Callable[[], Any]] = None) -> Dict[str, int]:
+    """
+    Dersleri işler ve sonuçlarını sonuç deposuna yazar.
+
+    Dersler chunk_size'lık parçalar halinde okunur ve süreç havuzunda ayrıştırılır; bir
+    parçanın yapay zeka çağrıları sürerken sonraki parça ayrıştırılır. Yapay zeka
+    aşamasını bekleyen ders sayısı chunk_size ile sınırlıdır.
+
+    Args:
+        sources (Iterable[LessonSource]): İşlenecek dersler.
+        checkpoint (BatchCheckpoint): İlerlemenin kaydedileceği kontrol noktası.
+        workers (Optional[int]): Ayrıştırma süreçlerinin sayısı (varsayılan: işlemci sayısı).
+        concurrency (int): Aynı anda işlenen en fazla ders (yapay zeka çağrısı) sayısı.
+        chunk_size (int): Bir seferde okunup ayrıştırılan ders sayısı.
+        force_regenerate (bool): Kontrol noktasını ve kayıtlı sonuçları yok sayar.
+        analyzer_factory (Optional[Callable]): Her ders için analizci oluşturan işlev
+            (varsayılan: AIAnalyzer).
+
+    Returns:
+        Dict[str, int]: 'processed', 'resumed', 'reused', 'skipped' ve 'failed' ders sayıları.
+    """
+    counts = {'processed': 0, 'resumed': 0, 'reused': 0, 'skipped': 0, 'failed': 0}
+    counts_lock = threading.Lock()
+    store = get_result_store()
+
+    def count(name: str) -> None:
+        with counts_lock:
+            counts[name] += 1
+
+    def process(parsed: Dict[str, Any]) -> None:
+        key = parsed['key']
+        if 'error' in parsed:
+            logger.error("Ders ayrıştırılamadı (%s): %s", key, parsed['error'])
+            checkpoint.record(key, 'failed', stage='parse', error=parsed['error'])
+            count('failed')
+            return
+
+        fingerprint = parsed['fingerprint']
+        entry = checkpoint.get(key)
+        analysis_result = None
+        if not force_regenerate and entry is not None and entry.get('fingerprint') == fingerprint:
+            # Test oluşturma aşamasında kesilen ya da başarısız olan dersin analizi yeniden istenmez
+            analysis_result = entry.get('analysis_result')
+        analyzed = {'analysis_result': analysis_result} if analysis_result is not None else {}
+
+        def on_analyzed(result: Dict[str, Any]) -> None:
+            analyzed['analysis_result'] = result
+            checkpoint.record(key, 'analyzed', fingerprint=fingerprint, analysis_result=result)
+
+        try:
+            result = run_batch_lesson(
+                Job(BATCH_PIPELINE_STAGES), parsed['transcript'], fingerprint, analysis_result, on_analyzed,
+                compression=parsed['compression'], force_regenerate=force_regenerate,
+                analyzer=analyzer_factory() if analyzer_factory is not None else None)
+            # Kontrol noktası yalnızca diske yazılmış sonuçları göstersin
+            store.flush()
+        except Exception as e:
+            logger.error("Ders işlenemedi (%s): %s", key, e)
+            checkpoint.record(key, 'failed', stage='generate' if analyzed else 'analyze', fingerprint=fingerprint,
+                              error=str(e), **analyzed)
+            count('failed')
+            return
+        checkpoint.record(key, 'done', fingerprint=fingerprint, result_id=result['result_id'],
+                          reused=result['reused'])
+        count('reused' if result['reused'] else 'resumed' if analysis_result is not None else 'processed')
+
+    def collect(futures: set) -> None:
+        for future in futures:
+            future.result()
+
+    # İşçi süreçleri yapay zeka iş parçacıkları çalışırken de başlatılabildiğinden fork yerine spawn kullanılır
+    parsers = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    callers = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='batch')
+    pending = set()
+    try:
+        for chunk in _chunks(sources, chunk_size):
+            todo = []
+            for source in chunk:
+                if not force_regenerate and checkpoint.is_done(source[0]):
+                    count('skipped')
+                else:
+                    todo.append(source)
+            for parsed in parsers.map(parse_lesson, todo):
+                pending.add(callers.submit(process, parsed))
+                if len(pending) >= chunk_size:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+        done, pending = wait(pending)
+        collect(done)
+    finally:
+        # Kesintide başlamamış dersler iptal edilir; süren yapay zeka çağrıları tamamlanıp kaydedilir
+        parsers.shutdown(wait=True, cancel_futures=True)
+        callers.shutdown(wait=True, cancel_futures=True)
+        store.flush()
+    return counts
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Komut satırı argümanlarını ayrıştırır.
+    """
+    parser = argparse.ArgumentParser(description="Geçmiş ders transkriptlerini toplu olarak işler")
+    parser.add_argument('paths', nargs='+', help="Transkript dizinleri ya da dosyaları (çok dersli CSV dahil)")
+    parser.add_argument('--workers', type=int, default=None, help="Ayrıştırma süreçlerinin sayısı")
+    parser.add_argument('--concurrency', type=int, default=int(os.getenv("BATCH_CONCURRENCY", "4")),
+                        help="Aynı anda yapay zekaya gönderilen en fazla ders sayısı")
+    parser.add_argument('--chunk-size', type=int, default=100, help="Bir seferde okunan ders sayısı")
+    parser.add_argument('--checkpoint', default=os.path.join('cache', 'batch_checkpoint.jsonl'),
+                        help="Kontrol noktası dosyası")
+    parser.add_argument('--force', action='store_true',
+                        help="Tamamlanan dersleri ve kayıtlı sonuçları yok sayıp yeniden işler")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Toplu çalışmayı başlatır ve özetini yazdırır.
+
+    Returns:
+        int: Çıkış kodu (tüm dersler işlendiyse 0, başarısız ders varsa 1, kesildiyse 130).
+    """
+    args = parse_args(argv)
+    checkpoint = BatchCheckpoint(args.checkpoint)
+    started = time.time()
+    try:
+        counts = run_batch(iter_sources(args.paths), checkpoint, workers=args.workers,
+                           concurrency=args.concurrency, chunk_size=args.chunk_size,
+                           force_regenerate=args.force)
+    except KeyboardInterrupt:
+        print(f"Çalışma kesildi; aynı komutla kaldığı yerden devam eder ({args.checkpoint}).")
+        return 130
+    print(f"{sum(counts.values())} ders, {time.time() - started:.1f} sn: " +
+          ", ".join(f"{name}={value}" for name, value in counts.items()))
+    return 1 if counts['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -102,3 +102,276 @@ document.addEventListener("DOMContentLoaded", function () {
     });
   });
 });
+
+/**
+ * İşin olay akışını dinler ve analiz ile soruları geldikçe işleyicilere iletir.
+ * İş tamamlandığında sonuç kimliği oturuma aktarılır ve sayfa adresi sonuç sayfası olur.
+ *
+ * @param {string} streamUrl Olay akışının adresi.
+ * @param {string} resultUrl İşin sonuç adresi.
+ * @param {Object} handlers analysis, question, completed ve failed işleyicileri.
+ */
+function streamQuestions(streamUrl, resultUrl, handlers) {
+  const source = new EventSource(streamUrl);
+
+  source.addEventListener("analysis", function (e) {
+    handlers.analysis(JSON.parse(e.data));
+  });
+
+  source.addEventListener("question", function (e) {
+    handlers.question(JSON.parse(e.data));
+  });
+
+  source.addEventListener("completed", function () {
+    source.close();
+    fetch(resultUrl)
+      .then((response) => response.json())
+      .then((data) => {
+        if (!data.success) {
+          throw new Error(data.error || "Sonuçlar alınamadı.");
+        }
+        // Sayfa yenilendiğinde kayıtlı sonuç gösterilsin
+        history.replaceState(null, "", data.redirect);
+        handlers.completed(data);
+      })
+      .catch((error) => handlers.failed(error.message));
+  });
+
+  source.addEventListener("failed", function (e) {
+    source.close();
+    handlers.failed(JSON.parse(e.data).error || "İşlem başarısız oldu.");
+  });
+}
+
+/**
+ * Sonuç API'sinden analiz ve soruları alır ve sayfada gösterir.
+ *
+ * @param {string} apiUrl Sonucun JSON adresi (/api/results/<id>).
+ * @param {Object} page renderResults için sayfa öğeleri.
+ * @returns {Promise} Sonuç gösterildiğinde tamamlanır.
+ */
+function loadResults(apiUrl, page) {
+  return fetch(apiUrl)
+    .then((response) => response.json())
+    .then((data) => {
+      if (!data.success) {
+        throw new Error(data.error || "Sonuçlar alınamadı.");
+      }
+      renderAnalysis(page.analysis, data.analysis);
+      page.tests.textContent = "";
+      data.questions.forEach((question, index) => {
+        page.tests.appendChild(renderQuestion(index + 1, question));
+      });
+      return data;
+    });
+}
+
+/**
+ * Analizi gösterir. Analiz bir nesneyse her alanı başlık ve liste olarak, düz metinse
+ * olduğu gibi yazılır.
+ *
+ * @param {HTMLElement} container Analiz kutusu.
+ * @param {Object|string} analysis API'nin döndürdüğü analiz.
+ */
+function renderAnalysis(container, analysis) {
+  container.textContent = "";
+  if (analysis === null || typeof analysis !== "object") {
+    container.textContent = analysis || "";
+    return;
+  }
+  container.appendChild(renderAnalysisValue(analysis));
+}
+
+/**
+ * Analiz değerini (nesne, liste veya metin) DOM öğesine dönüştürür.
+ *
+ * @param {*} value Analiz değeri.
+ * @returns {Node} Öğe.
+ */
+function renderAnalysisValue(value) {
+  if (Array.isArray(value)) {
+    const list = document.createElement("ul");
+    value.forEach((item) => {
+      const entry = document.createElement("li");
+      entry.appendChild(renderAnalysisValue(item));
+      list.appendChild(entry);
+    });
+    return list;
+  }
+  if (value !== null && typeof value === "object") {
+    const fragment = document.createDocumentFragment();
+    Object.keys(value).forEach((key) => {
+      const title = document.createElement("h5");
+      title.textContent = key.replace(/_/g, " ");
+      fragment.appendChild(title);
+      fragment.appendChild(renderAnalysisValue(value[key]));
+    });
+    return fragment;
+  }
+  const text = document.createElement("div");
+  text.textContent = value === null ? "" : String(value);
+  return text;
+}
+
+/**
+ * Bir soruyu seçenekleri, açıklaması ve kontrol düğmesiyle oluşturur. Metinler
+ * textContent ile yazıldığından yapay zekanın ürettiği içerik HTML olarak yorumlanmaz.
+ *
+ * @param {number} number Sorunun sıra numarası (1'den başlar).
+ * @param {Object} question question, options, answer ve explanation alanları.
+ * @returns {HTMLElement} Soru öğesi.
+ */
+function renderQuestion(number, question) {
+  const name = "test-" + number;
+  const item = document.createElement("div");
+  item.className = "test-item";
+  item.id = name;
+
+  const title = document.createElement("h3");
+  title.className = "question";
+  title.textContent = number + ". " + question.question;
+  item.appendChild(title);
+
+  const options = document.createElement("div");
+  options.className = "options";
+  question.options.forEach((text, index) => {
+    // Seçenek harfleri sıradan üretilir
+    const letter = String.fromCharCode(65 + index);
+    const option = document.createElement("div");
+    option.className = "option";
+
+    const input = document.createElement("input");
+    input.type = "radio";
+    input.name = name;
+    input.id = name + "-" + letter;
+    input.value = letter;
+
+    const label = document.createElement("label");
+    label.htmlFor = input.id;
+    label.textContent = letter + ") " + text;
+
+    option.appendChild(input);
+    option.appendChild(label);
+    options.appendChild(option);
+  });
+  item.appendChild(options);
+
+  const explanation = document.createElement("div");
+  explanation.className = "explanation";
+  explanation.style.display = "none";
+  explanation.textContent = question.explanation;
+  item.appendChild(explanation);
+
+  const answer = document.createElement("div");
+  answer.className = "correct-answer";
+  answer.dataset.answer = question.answer >= 0 ? String.fromCharCode(65 + question.answer) : "";
+  item.appendChild(answer);
+
+  const button = document.createElement("button");
+  button.className = "check-answer-btn";
+  button.textContent = "Cevabı Kontrol Et";
+  item.appendChild(button);
+
+  return item;
+}
+
+/**
+ * Sonuç sayfasındaki cevap kontrolü, tüm cevapları kontrol etme ve sıfırlama
+ * düğmelerini bağlar. Sonradan eklenen sorular da kontrol edilir.
+ *
+ * @param {Object} page tests, checkAll, resetAll, results, correctCount, totalCount ve progressBar öğeleri.
+ */
+function initQuiz(page) {
+  // "Cevabı Kontrol Et" düğmelerine tıklamayı dinle
+  page.tests.addEventListener("click", function (e) {
+    const button = e.target.closest(".check-answer-btn");
+    if (button) {
+      checkAnswer(button.closest(".test-item"));
+    }
+  });
+
+  // Tüm cevapları kontrol et ve sonucu göster
+  page.checkAll.addEventListener("click", function () {
+    const testItems = page.tests.querySelectorAll(".test-item");
+    let correctAnswers = 0;
+
+    testItems.forEach((testItem) => {
+      if (checkAnswer(testItem)) {
+        correctAnswers++;
+      }
+    });
+
+    const total = testItems.length;
+    page.correctCount.textContent = correctAnswers;
+    page.totalCount.textContent = total;
+
+    const percentage = total ? (correctAnswers / total) * 100 : 0;
+    page.progressBar.style.width = percentage + "%";
+    page.progressBar.textContent = Math.round(percentage) + "%";
+
+    // Yüzdeye göre renk değiştir
+    if (percentage < 50) {
+      page.progressBar.className = "progress-bar bg-danger";
+    } else if (percentage < 80) {
+      page.progressBar.className = "progress-bar bg-warning";
+    } else {
+      page.progressBar.className = "progress-bar bg-success";
+    }
+
+    page.results.style.display = "block";
+  });
+
+  // Seçimleri, işaretleri ve açıklamaları temizle
+  page.resetAll.addEventListener("click", function () {
+    page.tests.querySelectorAll(".test-item").forEach((testItem) => {
+      testItem.querySelectorAll('input[type="radio"]').forEach((input) => {
+        input.checked = false;
+      });
+      testItem.querySelectorAll(".option").forEach((option) => {
+        option.classList.remove("correct", "incorrect");
+      });
+      testItem.querySelector(".explanation").style.display = "none";
+    });
+
+    page.results.style.display = "none";
+  });
+}
+
+/**
+ * Seçilen cevabı kontrol eder, doğru/yanlış olarak işaretler ve açıklamayı gösterir.
+ *
+ * @param {HTMLElement} testItem Soru öğesi.
+ * @returns {boolean} Cevap doğruysa true.
+ */
+function checkAnswer(testItem) {
+  const selectedInput = testItem.querySelector('input[type="radio"]:checked');
+
+  if (!selectedInput) {
+    alert("Lütfen bir cevap seçin.");
+    return false;
+  }
+
+  const correctAnswer = testItem.querySelector(".correct-answer").dataset.answer;
+
+  // Tüm seçenekleri temizle
+  testItem.querySelectorAll(".option").forEach((option) => {
+    option.classList.remove("correct", "incorrect");
+  });
+
+  testItem.querySelector(".explanation").style.display = "block";
+
+  const selectedOption = selectedInput.closest(".option");
+  if (selectedInput.value === correctAnswer) {
+    selectedOption.classList.add("correct");
+    return true;
+  }
+
+  selectedOption.classList.add("incorrect");
+
+  // Doğru cevabı göster
+  const correctInput = testItem.querySelector('input[value="' + correctAnswer + '"]');
+  if (correctInput) {
+    correctInput.closest(".option").classList.add("correct");
+  }
+  return false;
+}
@@ -1,11 +1,17 @@
 import os
+import json
+import asyncio
 import logging
-import google.generativeai as genai
-from typing import Dict, List, Any
-from dotenv import load_dotenv
-
-# .env dosyasından API anahtarını yükle
-load_dotenv()
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Callable, Optional, Tuple
+from app.utils.prompt_cache import PromptCache, get_prompt_cache
+from app.utils.request_coalescer import RequestCoalescer, get_request_coalescer, uses_default_model
+from app.utils.call_policy import get_call_policy
+from app.utils.llm_backend import get_llm_backend
+from app.utils.prompt_budget import PromptBudget
+from app.utils.question_bank import get_question_bank, parse_analysis
+from app.utils.stream_parser import JsonArrayStreamParser
+from app.utils.metrics import get_metrics
 
 # Loglama yapılandırması
 logger = logging.getLogger(__name__)
@@ -15,22 +21,169 @@ class AIAnalyzer:
     Transkriptleri analiz etmek ve testler oluşturmak için yapay zeka kullanır.
     """
     
-    def __init__(self):
+    MODEL_NAME = 'gemini-1.5-flash'
+    
+    def __init__(self, cache: Optional[PromptCache] = None, analysis_mode: Optional[str] = None,
+                 chunk_chars: Optional[int] = None, max_parallel_chunks: Optional[int] = None,
+                 prompt_budget: Optional[PromptBudget] = None, bypass_cache: bool = False):
         """
         AIAnalyzer sınıfını başlatır ve Gemini API'yi yapılandırır.
+        
+        Args:
+            cache (Optional[PromptCache]): Yanıt önbelleği. Verilmezse paylaşılan önbellek kullanılır.
+            analysis_mode (Optional[str]): 'budget' (en değerli konuşmaları token bütçesine
+                sığdırır), 'truncate' (metnin başını kullanır) veya 'map_reduce' (uzun metni
+                bölümler halinde analiz edip birleştirir). Varsayılan: ANALYSIS_MODE.
+            chunk_chars (Optional[int]): Bir istekte gönderilecek en fazla transkript karakteri.
+                Varsayılan: ANALYSIS_CHUNK_CHARS.
+            max_parallel_chunks (Optional[int]): Aynı anda analiz edilecek en fazla bölüm sayısı.
+                Varsayılan: ANALYSIS_MAX_PARALLEL.
+            prompt_budget (Optional[PromptBudget]): 'budget' kipinde konuşmaları seçen bütçe.
+                Varsayılan: PROMPT_TOKEN_BUDGET token.
+            bypass_cache (bool): Önbellekteki yanıtları kullanmaz; yeni yanıtlar önbellektekilerin
+                yerine yazılır (yeniden oluşturma istendiğinde).
+        """
+        # Süreç genelinde bir kez yapılandırılan yapay zeka arka ucu (Gemini, kayıt veya yeniden oynatma)
+        self.backend = get_llm_backend(self.MODEL_NAME)
+        self.backend.configure()
+        
+        # Yanıt önbelleği
+        self.cache = cache if cache is not None else get_prompt_cache()
+        self.bypass_cache = bypass_cache
+        
+        # Hız sınırı, süre sınırı, yeniden deneme ve yedek istek kuralları
+        self.call_policy = get_call_policy()
+        
+        # Yoğun zamanlarda aynı türdeki istekleri birleştiren katman (isteğe bağlı)
+        self.coalescer = get_request_coalescer()
+        
+        # Uzun transkriptlerin işlenme biçimi
+        self.analysis_mode = analysis_mode or os.getenv("ANALYSIS_MODE", "budget")
+        self.chunk_chars = chunk_chars or int(os.getenv("ANALYSIS_CHUNK_CHARS", "8000"))
+        self.max_parallel_chunks = max_parallel_chunks or int(os.getenv("ANALYSIS_MAX_PARALLEL", "4"))
+        self.prompt_budget = prompt_budget or PromptBudget()
+        
+        # Yapay zeka kullanılamadığında örnek sorular yerine seviyeye uygun sorular veren banka
+        self.question_bank = get_question_bank()
+    
+    def _prompt_text(self, transcript_data: Dict[str, Any]) -> str:
+        """
+        İsteğe eklenecek transkript metnini hazırlar.
+        
+        'budget' kipinde en değerli konuşmalar token bütçesine sığdırılır; diğer kiplerde
+        metnin ilk chunk_chars karakteri kullanılır.
+        
+        Args:
+            transcript_data (Dict[str, Any]): İşlenmiş transkript verileri.
+            
+        Returns:
+            str: Transkript metni.
+        """
+        if self.analysis_mode == 'budget':
+            text = self.prompt_budget.select_text(transcript_data)
+            # Sıkıştırılmış transkriptte kısaltılmış konuşmacı etiketlerinin açıklaması
+            legend = getattr(transcript_data, 'legend', None)
+            return f"{legend}\n{text}" if legend else text
+        
+        all_text = transcript_data.get('all_text', '')
+        # Metin çok uzunsa, ilk 8000 karakteri al (Gemini API sınırlamaları nedeniyle)
+        if len(all_text) > self.chunk_chars:
+            all_text = all_text[:self.chunk_chars]
+            logger.debug("Metin çok uzun, ilk %d karakter alındı.", self.chunk_chars)
+        return all_text
+    
+    def _call_model(self, prompt: str, kind: str = 'default') -> str:
+        """
+        İsteği çağrı politikası kurallarıyla doğrudan modele gönderir.
+        
+        Args:
+            prompt (str): Yapay zekaya gönderilecek istek.
+            kind (str): İstek türü (kayıt ve yeniden oynatma için).
+            
+        Returns:
+            str: Yapay zeka yanıtı.
+        """
+        return self.call_policy.call(lambda: self.backend.generate(prompt, kind))
+    
+    def _active_coalescer(self) -> Optional[RequestCoalescer]:
+        """
+        İsteklerin geçeceği birleştiriciyi döndürür.
+        
+        Birleştirici süreç genelindeki arka uç ve çağrı politikasıyla gönderir; bunlar yerine
+        başka bir arka uç ya da politika verilmiş analizcilerin (toplu işlem, testler) istekleri
+        birleştirilmeden kendi arka uçlarına gönderilir.
+        
+        Returns:
+            Optional[RequestCoalescer]: Birleştirme kullanılmayacaksa None.
+        """
+        if self.coalescer is None or not uses_default_model(self.backend, self.call_policy):
+            return None
+        return self.coalescer
+    
+    def _generate(self, prompt: str, cacheable: Optional[Callable[[str], bool]] = None,
+                  kind: str = 'default') -> str:
+        """
+        İsteği yapay zekaya gönderir; aynı model ve istek için önbellekteki yanıtı kullanır
+        (bypass_cache verilmişse önbellek okunmaz, yeni yanıt önbelleğe yazılır).
+        
+        Args:
+            prompt (str): Yapay zekaya gönderilecek istek.
+            cacheable (Optional[Callable[[str], bool]]): Yanıtın önbelleğe yazılıp yazılmayacağına
+                (ve birleşik yanıttan ayrılan parçanın kullanılabilir olup olmadığına) karar verir.
+            kind (str): İstek türü; birleştirme açıksa yalnızca aynı türdeki istekler birleştirilir.
+            
+        Returns:
+            str: Yapay zeka yanıtı.
+        """
+        key = PromptCache.make_key(self.backend.model_name, prompt)
+        if self.cache is not None and not self.bypass_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.debug("Yanıt önbellekten alındı: %s", key[:12])
+                return cached
+        
+        coalescer = self._active_coalescer()
+        if coalescer is not None:
+            text = coalescer.submit(kind, prompt, validate=cacheable)
+        else:
+            text = self._call_model(prompt, kind)
+        
+        if self.cache is not None and text and (cacheable is None or cacheable(text)):
+            self.cache.set(key, text)
+        return text
+    
+    async def _generate_async(self, prompt: str, cacheable: Optional[Callable[[str], bool]] = None,
+                              kind: str = 'default') -> str:
+        """
+        _generate'in eşzamansız karşılığı; yapay zeka yanıtı beklenirken iş parçacığı tutulmaz.
+        
+        Önbellek (SQLite) erişimleri iş parçacığı havuzunda yapılır. Birleştirme açıksa istek
+        birleştiricinin kuyruğuna eklenir ve yanıtı taşıyan Future beklenir.
+        
+        Args:
+            prompt (str): Yapay zekaya gönderilecek istek.
+            cacheable (Optional[Callable[[str], bool]]): Yanıtın önbelleğe yazılıp yazılmayacağına karar verir.
+            kind (str): İstek türü.
+            
+        Returns:
+            str: Yapay zeka yanıtı.
         """
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            logger.error("GEMINI_API_KEY bulunamadı. Lütfen .env dosyasını kontrol edin.")
-            raise ValueError("GEMINI_API_KEY bulunamadı. Lütfen .env dosyasını kontrol edin.")
+        key = PromptCache.make_key(self.backend.model_name, prompt)
+        if self.cache is not None and not self.bypass_cache:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                logger.debug("Yanıt önbellekten alındı: %s", key[:12])
+                return cached
         
-        # Gemini API'yi yapılandır
-        logger.debug(f"Gemini API yapılandırılıyor. API anahtarı: {api_key[:5]}...")
-        genai.configure(api_key=api_key)
+        coalescer = self._active_coalescer()
+        if coalescer is not None:
+            text = await asyncio.wrap_future(coalescer.submit_future(kind, prompt, validate=cacheable))
+        else:
+            text = await self.call_policy.call_async(lambda: self.backend.generate_async(prompt, kind))
         
-        # Gemini modeli
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
-        logger.debug("Gemini modeli oluşturuldu: gemini-1.5-flash")
+        if self.cache is not None and text and (cacheable is None or cacheable(text)):
+            await asyncio.to_thread(self.cache.set, key, text)
+        return text
     
     def analyze_transcript(self, transcript_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -44,15 +197,82 @@ class AIAnalyzer:
         """
         # Tüm konuşma metinlerini al
         all_text = transcript_data.get('all_text', '')
-        logger.debug(f"Analiz edilecek metin uzunluğu: {len(all_text)} karakter")
+        logger.debug("Analiz edilecek metin uzunluğu: %d karakter", len(all_text))
         
-        # Metin çok uzunsa, ilk 8000 karakteri al (Gemini API sınırlamaları nedeniyle)
-        if len(all_text) > 8000:
-            all_text = all_text[:8000]
-            logger.debug("Metin çok uzun, ilk 8000 karakter alındı.")
+        # Uzun metni bölümlere ayırıp tamamını analiz et
+        if self.analysis_mode == 'map_reduce' and len(all_text) > self.chunk_chars:
+            return self._analyze_map_reduce(transcript_data)
+        
+        prompt = self._analysis_prompt(transcript_data)
+        
+        try:
+            # Yapay zekadan yanıt al
+            logger.debug("Yapay zekadan analiz yanıtı isteniyor...")
+            analysis_text = self._generate(prompt, kind='analysis')
+            
+            # Yanıtı işle
+            logger.debug("Yapay zeka analiz yanıtı alındı. Uzunluk: %d karakter", len(analysis_text))
+            
+            # Basit bir analiz sonucu oluştur
+            analysis_result = {
+                'raw_analysis': analysis_text,
+                'success': True
+            }
+            
+            return analysis_result
+        except Exception as e:
+            logger.error("Yapay zeka analizi sırasında hata oluştu: %s", e)
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    async def analyze_transcript_async(self, transcript_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        analyze_transcript'in eşzamansız karşılığı; yapay zeka yanıtı beklenirken iş parçacığı tutulmaz.
+        
+        İsteğin hazırlanması (token bütçesi) iş parçacığı havuzunda yapılır. 'map_reduce' kipinde
+        uzun transkriptler bölümlerini eşzamanlı analiz eden analyze_transcript ile havuzda işlenir.
+        
+        Args:
+            transcript_data (Dict[str, Any]): İşlenmiş transkript verileri.
+            
+        Returns:
+            Dict[str, Any]: Analiz sonuçları.
+        """
+        if self.analysis_mode == 'map_reduce' and len(transcript_data.get('all_text', '')) > self.chunk_chars:
+            return await asyncio.to_thread(self._analyze_map_reduce, transcript_data)
+        
+        prompt = await asyncio.to_thread(self._analysis_prompt, transcript_data)
+        try:
+            analysis_text = await self._generate_async(prompt, kind='analysis')
+            logger.debug("Yapay zeka analiz yanıtı alındı. Uzunluk: %d karakter", len(analysis_text))
+            return {
+                'raw_analysis': analysis_text,
+                'success': True
+            }
+        except Exception as e:
+            logger.error("Yapay zeka analizi sırasında hata oluştu: %s", e)
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def _analysis_prompt(self, transcript_data: Dict[str, Any]) -> str:
+        """
+        Transkriptin analiz isteğini hazırlar.
+        
+        Args:
+            transcript_data (Dict[str, Any]): İşlenmiş transkript verileri.
+            
+        Returns:
+            str: Yapay zekaya gönderilecek istek.
+        """
+        # Metni bütçeye sığdır ya da kısalt
+        all_text = self._prompt_text(transcript_data)
         
         # Yapay zekaya gönderilecek istek
-        prompt = f"""
+        return f"""
         Aşağıdaki İngilizce ders transkriptini analiz et ve şu bilgileri çıkar:
         
         1. Öğrencinin İngilizce seviyesi (A1, A2, B1, B2, C1, C2)
@@ -66,63 +286,186 @@ class AIAnalyzer:
         
         Lütfen analiz sonuçlarını JSON formatında döndür.
         """
+    
+    def analyze_increment(self, summary: Optional[str], delta_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Devam eden bir dersin analizini yalnızca yeni konuşmalarla günceller.
         
-        try:
-            # Yapay zekadan yanıt al
-            logger.debug("Yapay zekadan analiz yanıtı isteniyor...")
-            response = self.model.generate_content(prompt)
-            
-            # Yanıtı işle
-            analysis_text = response.text
-            logger.debug(f"Yapay zeka analiz yanıtı alındı. Uzunluk: {len(analysis_text)} karakter")
+        İstekte tüm transkript yerine önceki analiz ve son analizden sonra gelen
+        konuşmalar bulunur; böylece istek boyutu dersin uzunluğundan bağımsız kalır.
+        
+        Args:
+            summary (Optional[str]): Önceki analiz (ilk bölümde None).
+            delta_data (Dict[str, Any]): Yeni konuşmaların 'transcript_data' ve 'all_text' alanları.
             
-            # Basit bir analiz sonucu oluştur
-            analysis_result = {
+        Returns:
+            Dict[str, Any]: Tüm dersi kapsayan güncellenmiş analiz sonuçları.
+        """
+        delta_text = self._prompt_text(delta_data)
+        prompt = f"""
+        Aşağıda devam eden bir İngilizce dersinin şimdiye kadarki analizi ve dersin yeni bölümü var.
+        Önceki analizi yeni bölümle güncelleyerek tüm dersi kapsayan tek bir analiz oluştur ve şu bilgileri çıkar:
+        
+        1. Öğrencinin İngilizce seviyesi (A1, A2, B1, B2, C1, C2)
+        2. Öğrencinin güçlü yönleri
+        3. Öğrencinin geliştirmesi gereken alanlar
+        4. Derste öğrenilen yeni kelimeler ve deyimler
+        5. Derste tartışılan ana konular
+        
+        Önceki analiz:
+        {summary or 'Henüz analiz yok; bu dersin ilk bölümü.'}
+        
+        Yeni transkript bölümü:
+        {delta_text}
+        
+        Lütfen güncellenmiş analizi kısa ve JSON formatında döndür.
+        """
+        
+        try:
+            logger.debug("Canlı ders analizi güncelleniyor (%d karakter yeni metin).", len(delta_text))
+            analysis_text = self._generate(prompt, kind='analysis')
+            return {
                 'raw_analysis': analysis_text,
                 'success': True
             }
-            
-            return analysis_result
         except Exception as e:
-            logger.error(f"Yapay zeka analizi sırasında hata oluştu: {str(e)}")
+            logger.error("Canlı ders analizi güncellenirken hata oluştu: %s", e)
             return {
                 'success': False,
                 'error': str(e)
             }
     
-    def generate_tests(self, analysis_result: Dict[str, Any], transcript_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _split_chunks(self, transcript_data: Dict[str, Any]) -> List[str]:
         """
-        Analiz sonuçlarına göre kişiselleştirilmiş testler oluşturur.
+        Transkripti konuşma sınırlarından bölerek her biri chunk_chars karakteri
+        aşmayan metin bölümleri oluşturur.
         
         Args:
-            analysis_result (Dict[str, Any]): Analiz sonuçları.
             transcript_data (Dict[str, Any]): İşlenmiş transkript verileri.
             
         Returns:
-            Dict[str, Any]: Oluşturulan testler.
+            List[str]: Metin bölümleri.
         """
-        if not analysis_result.get('success', False):
-            logger.error("Analiz sonuçları bulunamadı.")
+        chunks = []
+        current = []
+        current_length = 0
+        for entry in transcript_data.get('transcript_data') or []:
+            text = entry['text'][:self.chunk_chars]
+            if current and current_length + len(text) + 1 > self.chunk_chars:
+                chunks.append(' '.join(current))
+                current = []
+                current_length = 0
+            current.append(text)
+            current_length += len(text) + 1
+        if current:
+            chunks.append(' '.join(current))
+        return chunks
+    
+    def _analyze_map_reduce(self, transcript_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Uzun transkripti bölümler halinde eşzamanlı olarak analiz eder ve bölüm
+        analizlerini tek bir analizde birleştirir.
+        
+        Args:
+            transcript_data (Dict[str, Any]): İşlenmiş transkript verileri.
+            
+        Returns:
+            Dict[str, Any]: Analiz sonuçları (bölüm analizleri dahil).
+        """
+        chunks = self._split_chunks(transcript_data)
+        logger.debug("Transkript %d bölüme ayrıldı.", len(chunks))
+        
+        def analyze_chunk(numbered_chunk):
+            number, chunk = numbered_chunk
+            prompt = f"""
+        Aşağıda bir İngilizce ders transkriptinin {number}/{len(chunks)} numaralı bölümü var.
+        Yalnızca bu bölümü analiz et ve şu bilgileri çıkar:
+        
+        1. Öğrencinin bu bölümde gösterdiği İngilizce seviyesi (A1, A2, B1, B2, C1, C2)
+        2. Öğrencinin güçlü yönleri
+        3. Öğrencinin yaptığı hatalar ve geliştirmesi gereken alanlar
+        4. Bu bölümde öğrenilen yeni kelimeler ve deyimler
+        5. Bu bölümde tartışılan konular
+        
+        Transkript bölümü:
+        {chunk}
+        
+        Lütfen analiz sonuçlarını kısa ve JSON formatında döndür.
+        """
+            return self._generate(prompt, kind='chunk_analysis')
+        
+        try:
+            # Bölümleri sınırlı sayıda iş parçacığında eşzamanlı analiz et (map)
+            with ThreadPoolExecutor(max_workers=min(self.max_parallel_chunks, len(chunks))) as executor:
+                partial_analyses = list(executor.map(analyze_chunk, enumerate(chunks, 1)))
+            
+            # Bölüm analizlerini birleştir (reduce)
+            sections = "\n\n".join(
+                f"Bölüm {i}:\n{partial}" for i, partial in enumerate(partial_analyses, 1)
+            )
+            prompt = f"""
+        Aşağıda aynı İngilizce dersinin ardışık bölümlerine ait ayrı analizler var.
+        Bunları tüm dersi kapsayan tek bir analizde birleştir ve şu bilgileri çıkar:
+        
+        1. Öğrencinin İngilizce seviyesi (A1, A2, B1, B2, C1, C2)
+        2. Öğrencinin güçlü yönleri
+        3. Öğrencinin geliştirmesi gereken alanlar
+        4. Derste öğrenilen yeni kelimeler ve deyimler
+        5. Derste tartışılan ana konular
+        
+        Bölüm analizleri:
+        {sections}
+        
+        Lütfen analiz sonuçlarını JSON formatında döndür.
+        """
+            analysis_text = self._generate(prompt, kind='analysis')
+            logger.debug("Birleştirilmiş analiz alındı. Uzunluk: %d karakter", len(analysis_text))
+            
+            return {
+                'raw_analysis': analysis_text,
+                'partial_analyses': partial_analyses,
+                'chunk_count': len(chunks),
+                'success': True
+            }
+        except Exception as e:
+            logger.error("Bölümlü yapay zeka analizi sırasında hata oluştu: %s", e)
             return {
                 'success': False,
-                'error': 'Analiz sonuçları bulunamadı.'
+                'error': str(e)
             }
+    
+    def _build_tests_prompt(self, analysis_result: Dict[str, Any], transcript_data: Dict[str, Any]) -> str:
+        """
+        Test oluşturma isteğini hazırlar.
         
+        Args:
+            analysis_result (Dict[str, Any]): Analiz sonuçları.
+            transcript_data (Dict[str, Any]): İşlenmiş transkript verileri.
+            
+        Returns:
+            str: Yapay zekaya gönderilecek istek.
+        """
         # Analiz sonuçlarını al
         raw_analysis = analysis_result.get('raw_analysis', '')
-        logger.debug(f"Test oluşturmak için analiz sonucu uzunluğu: {len(raw_analysis)} karakter")
+        logger.debug("Test oluşturmak için analiz sonucu uzunluğu: %d karakter", len(raw_analysis))
         
         # Tüm konuşma metinlerini al
         all_text = transcript_data.get('all_text', '')
-        logger.debug(f"Test oluşturmak için metin uzunluğu: {len(all_text)} karakter")
+        logger.debug("Test oluşturmak için metin uzunluğu: %d karakter", len(all_text))
         
-        # Metin çok uzunsa, ilk 8000 karakteri al
-        if len(all_text) > 8000:
-            all_text = all_text[:8000]
-            logger.debug("Metin çok uzun, ilk 8000 karakter alındı.")
+        # Analiz bölümler halinde yapıldıysa, kesilmiş metin yerine bölüm analizlerini kullan
+        partial_analyses = analysis_result.get('partial_analyses')
+        transcript_label = "Transkript"
+        if partial_analyses:
+            transcript_label = "Transkript bölümlerinin analizleri"
+            all_text = "\n\n".join(
+                f"Bölüm {i}:\n{partial}" for i, partial in enumerate(partial_analyses, 1)
+            )
+        else:
+            all_text = self._prompt_text(transcript_data)
         
         # Yapay zekaya gönderilecek istek
-        prompt = f"""
+        return f"""
         Aşağıdaki İngilizce ders transkriptini ve analiz sonuçlarını kullanarak, 
         öğrencinin seviyesine uygun 5 adet kısa, interaktif ve eğlenceli test sorusu oluştur.
         Sorular öğrencinin eksiklerine yönelik olsun. Soruları atanmış seviyesine göre yap. örneğin B2 seviyesinde örnek sorular. 
@@ -141,7 +484,7 @@ class AIAnalyzer:
         - Okuma anlama
         - Deyimler ve kalıplar
         
-        Transkript:
+        {transcript_label}:
         {all_text}
         
         Analiz Sonuçları:
@@ -165,44 +508,323 @@ class AIAnalyzer:
         ]
         ```
         """
+    
+    def generate_tests(self, analysis_result: Dict[str, Any], transcript_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Analiz sonuçlarına göre kişiselleştirilmiş testler oluşturur.
+        
+        Args:
+            analysis_result (Dict[str, Any]): Analiz sonuçları.
+            transcript_data (Dict[str, Any]): İşlenmiş transkript verileri.
+            
+        Returns:
+            Dict[str, Any]: Oluşturulan testler.
+        """
+        if not analysis_result.get('success', False):
+            logger.error("Analiz sonuçları bulunamadı.")
+            return {
+                'success': False,
+                'error': 'Analiz sonuçları bulunamadı.'
+            }
+        
+        prompt = self._build_tests_prompt(analysis_result, transcript_data)
         
         try:
             # Yapay zekadan yanıt al
             logger.debug("Yapay zekadan test yanıtı isteniyor...")
-            response = self.model.generate_content(prompt)
-            
-            # Yanıtı işle
-            tests_text = response.text
-            logger.debug(f"Yapay zeka test yanıtı alındı. Uzunluk: {len(tests_text)} karakter")
-            logger.debug(f"Test yanıtı: {tests_text[:200]}...")
-            
-            # API yanıtı boş veya geçersizse örnek test verileri kullan
-            if not tests_text or "```" not in tests_text:
-                logger.warning("Geçerli test yanıtı alınamadı, örnek test verileri kullanılıyor.")
-                tests_text = self._get_sample_tests()
+            # Yalnızca kod bloğu içeren (kullanılabilir) yanıtları önbelleğe al
+            tests_text = self._generate(prompt, cacheable=lambda text: "```" in text, kind='tests')
+        except Exception as e:
+            logger.error("Test oluşturma sırasında hata oluştu: %s", e)
+            tests_text = None
+        return self._tests_result(analysis_result, tests_text)
+    
+    async def generate_tests_async(self, analysis_result: Dict[str, Any],
+                                   transcript_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        generate_tests'in eşzamansız karşılığı; yapay zeka yanıtı beklenirken iş parçacığı tutulmaz.
+        
+        Args:
+            analysis_result (Dict[str, Any]): Analiz sonuçları.
+            transcript_data (Dict[str, Any]): İşlenmiş transkript verileri.
             
-            # Test sonuçlarını döndür
+        Returns:
+            Dict[str, Any]: Oluşturulan testler.
+        """
+        if not analysis_result.get('success', False):
+            logger.error("Analiz sonuçları bulunamadı.")
             return {
-                'raw_tests': tests_text,
-                'success': True
+                'success': False,
+                'error': 'Analiz sonuçları bulunamadı.'
             }
+        
+        prompt = await asyncio.to_thread(self._build_tests_prompt, analysis_result, transcript_data)
+        try:
+            tests_text = await self._generate_async(prompt, cacheable=lambda text: "```" in text, kind='tests')
         except Exception as e:
-            logger.error(f"Test oluşturma sırasında hata oluştu: {str(e)}")
+            logger.error("Test oluşturma sırasında hata oluştu: %s", e)
+            tests_text = None
+        return self._tests_result(analysis_result, tests_text)
+    
+    def _tests_result(self, analysis_result: Dict[str, Any], tests_text: Optional[str]) -> Dict[str, Any]:
+        """
+        Test yanıtını generate_tests sonucuna dönüştürür; yanıt yoksa ya da geçersizse örnek testleri kullanır.
+        
+        Args:
+            analysis_result (Dict[str, Any]): Analiz sonuçları (örnek testlerin seviyesi için).
+            tests_text (Optional[str]): Yapay zeka yanıtı; istek başarısız olduysa None.
+            
+        Returns:
+            Dict[str, Any]: Oluşturulan testler.
+        """
+        if tests_text is None:
             # Hata durumunda örnek test verileri kullan
             logger.warning("Hata nedeniyle örnek test verileri kullanılıyor.")
             return {
-                'raw_tests': self._get_sample_tests(),
+                'raw_tests': self._get_sample_tests(analysis_result),
+                'source': 'sample',
                 'success': True
             }
+        
+        # Yanıtı işle
+        logger.debug("Yapay zeka test yanıtı alındı. Uzunluk: %d karakter", len(tests_text))
+        logger.debug("Test yanıtı: %s...", tests_text[:200])
+        
+        # API yanıtı boş veya geçersizse örnek test verileri kullan
+        source = 'model'
+        if not tests_text or "```" not in tests_text:
+            logger.warning("Geçerli test yanıtı alınamadı, örnek test verileri kullanılıyor.")
+            tests_text = self._get_sample_tests(analysis_result)
+            source = 'sample'
+        
+        # Test sonuçlarını döndür
+        return {
+            'raw_tests': tests_text,
+            'source': source,
+            'success': True
+        }
 
-    def _get_sample_tests(self) -> str:
+    def generate_tests_stream(self, analysis_result: Dict[str, Any], transcript_data: Dict[str, Any],
+                              on_question: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+        """
+        Testleri akış kipinde oluşturur ve her soruyu yanıtın geri kalanı beklenmeden iletir.
+        
+        Yanıt parça parça geldikçe tamamlanan her soru nesnesi on_question ile bildirilir.
+        Çağrı politikasının süre sınırı akışın tamamına uygulanır; akış hiç soru üretmeden
+        başarısız olursa ya da süresi dolarsa generate_tests ile tek seferlik isteğe geri
+        dönülür. Dönüş değeri generate_tests ile aynı biçimdedir.
+        
+        Args:
+            analysis_result (Dict[str, Any]): Analiz sonuçları.
+            transcript_data (Dict[str, Any]): İşlenmiş transkript verileri.
+            on_question (Callable[[Dict[str, Any]], None]): Tamamlanan her soru için çağrılır.
+            
+        Returns:
+            Dict[str, Any]: Oluşturulan testler.
+        """
+        if not analysis_result.get('success', False):
+            logger.error("Analiz sonuçları bulunamadı.")
+            return {
+                'success': False,
+                'error': 'Analiz sonuçları bulunamadı.'
+            }
+        
+        prompt = self._build_tests_prompt(analysis_result, transcript_data)
+        key = PromptCache.make_key(self.backend.model_name, prompt)
+        parser = JsonArrayStreamParser()
+        questions = []
+        
+        def feed(text: str) -> None:
+            for question in parser.feed(text):
+                questions.append(question)
+                on_question(question)
+        
+        cached = self.cache.get(key) if self.cache is not None and not self.bypass_cache else None
+        if cached is not None:
+            logger.debug("Yanıt önbellekten alındı: %s", key[:12])
+            feed(cached)
+            return {
+                'raw_tests': cached,
+                'source': 'model',
+                'success': True
+            }
+        
+        parts = []
+        try:
+            logger.debug("Yapay zekadan test yanıtı akış kipinde isteniyor...")
+            # Süre sınırı akışın tamamına uygulanır; süre dolması da akış hatası sayılır
+            for chunk in self.call_policy.stream(lambda: self.backend.generate_stream(prompt, 'tests')):
+                parts.append(chunk)
+                feed(chunk)
+        except Exception as e:
+            logger.error("Akış kipinde test oluşturma sırasında hata oluştu: %s", e)
+            if not questions:
+                # Henüz soru gönderilmediyse tek seferlik isteğe geri dön (çağrı politikasıyla,
+                # yeniden deneme ve yedek istek dahil)
+                get_metrics().inc('flai_fallbacks_total', kind='stream_to_single')
+                tests_result = self.generate_tests(analysis_result, transcript_data)
+                parser = JsonArrayStreamParser()
+                feed(tests_result.get('raw_tests', ''))
+                return tests_result
+        
+        tests_text = ''.join(parts)
+        source = 'model'
+        if parser.finished and "```" in tests_text:
+            if self.cache is not None:
+                self.cache.set(key, tests_text)
+        elif questions:
+            # Yanıt yarıda kaldıysa yalnızca tamamlanan soruları sakla
+            tests_text = "```\n" + json.dumps(questions, ensure_ascii=False, indent=2) + "\n```"
+        else:
+            logger.warning("Geçerli test yanıtı alınamadı, örnek test verileri kullanılıyor.")
+            tests_text = self._get_sample_tests(analysis_result)
+            source = 'sample'
+            parser = JsonArrayStreamParser()
+            feed(tests_text)
+        
+        logger.debug("Akış kipinde %d soru oluşturuldu.", len(questions))
+        return {
+            'raw_tests': tests_text,
+            'source': source,
+            'success': True
+        }
+
+    def analyze_and_generate(self, transcript_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Analizi ve test sorularını tek bir yapay zeka isteğiyle oluşturur.
+        
+        Yanıt, analiz ve soru listesini içeren tek bir JSON nesnesidir. Sonuçlar
+        analyze_transcript ve generate_tests ile aynı biçimde döndürülür.
+        
+        Args:
+            transcript_data (Dict[str, Any]): İşlenmiş transkript verileri.
+            
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any]]: Analiz sonuçları ve oluşturulan testler.
+        """
+        all_text = self._prompt_text(transcript_data)
+        
+        prompt = f"""
+        Aşağıdaki İngilizce ders transkriptini analiz et ve ardından analizine dayanarak
+        öğrencinin seviyesine uygun 5 adet kısa, interaktif ve eğlenceli test sorusu oluştur.
+        
+        Analizde şunlar olmalı:
+        1. Öğrencinin İngilizce seviyesi (A1, A2, B1, B2, C1, C2)
+        2. Öğrencinin güçlü yönleri
+        3. Öğrencinin geliştirmesi gereken alanlar
+        4. Derste öğrenilen yeni kelimeler ve deyimler
+        5. Derste tartışılan ana konular
+        
+        Sorular öğrencinin eksiklerine yönelik olsun. Soruları atanmış seviyesine göre yap. 
+        yüklenmiş belgedeki kişisel bilgilerden soru türetme bunun yerine seviyesine ve yeni öğrendiği kelimeler ve hatalarına yönelik sorular üret. Öğrenci için sıfat olarak "Öğrenci" kelimesini kullan "konuşmacı" kelimesini kullanma lütfen
+        Sorular kelime bilgisi, dilbilgisi, dinleme anlama, okuma anlama veya deyimler ve kalıplar türünde olabilir.
+        
+        Transkript:
+        {all_text}
+        
+        Yanıtı yalnızca aşağıdaki biçimde tek bir JSON nesnesi olarak döndür:
+        
+        {{
+          "analysis": {{
+            "level": "B1",
+            "strengths": ["..."],
+            "areas_to_improve": ["..."],
+            "new_vocabulary": ["..."],
+            "topics": ["..."]
+          }},
+          "questions": [
+            {{
+              "question": "Soru metni",
+              "options": [
+                {{"letter": "A", "text": "Seçenek A"}},
+                {{"letter": "B", "text": "Seçenek B"}},
+                {{"letter": "C", "text": "Seçenek C"}},
+                {{"letter": "D", "text": "Seçenek D"}}
+              ],
+              "correct_answer": "A",
+              "explanation": "Açıklama"
+            }}
+          ]
+        }}
+        """
+        
+        try:
+            logger.debug("Yapay zekadan birleşik analiz ve test yanıtı isteniyor...")
+            # Yalnızca ayrıştırılabilen yanıtları önbelleğe al
+            response_text = self._generate(prompt, cacheable=lambda text: self._parse_fused_response(text) is not None,
+                                           kind='fused')
+            parsed = self._parse_fused_response(response_text)
+            if parsed is None:
+                raise ValueError("Birleşik yanıt ayrıştırılamadı.")
+            
+            analysis, questions = parsed
+            analysis_result = {
+                'raw_analysis': json.dumps(analysis, ensure_ascii=False, indent=2),
+                'success': True
+            }
+            tests_result = {
+                'raw_tests': "```\n" + json.dumps(questions, ensure_ascii=False, indent=2) + "\n```",
+                'source': 'model',
+                'success': True
+            }
+            return analysis_result, tests_result
+        except Exception as e:
+            logger.error("Birleşik analiz ve test oluşturma sırasında hata oluştu: %s", e)
+            error_result = {
+                'success': False,
+                'error': str(e)
+            }
+            return error_result, error_result
+    
+    def _parse_fused_response(self, text: str) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """
+        Birleşik yanıttaki JSON nesnesinden analiz ve soru listesini çıkarır.
+        
+        Args:
+            text (str): Yapay zeka yanıtı (kod bloğu içinde olabilir).
+            
+        Returns:
+            Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]: Yanıt geçersizse None.
+        """
+        start = text.find('{') if text else -1
+        end = text.rfind('}') if text else -1
+        if start == -1 or end <= start:
+            return None
+        try:
+            data = json.loads(text[start:end + 1])
+        except json.JSONDecodeError:
+            return None
+        
+        analysis = data.get('analysis') if isinstance(data, dict) else None
+        questions = data.get('questions') if isinstance(data, dict) else None
+        if not isinstance(analysis, dict) or not isinstance(questions, list) or not questions:
+            return None
+        return analysis, questions
+    
+    def _get_sample_tests(self, analysis_result: Optional[Dict[str, Any]] = None, count: int = 5) -> str:
         """
         Örnek test verileri döndürür.
         
+        Soru bankasında öğrencinin seviyesinde yeterli soru varsa en az kullanılmış olanlar,
+        yoksa sabit örnek sorular döndürülür.
+        
+        Args:
+            analysis_result (Optional[Dict[str, Any]]): Seviyenin alınacağı analiz sonuçları.
+            count (int): Soru sayısı.
+            
         Returns:
             str: Örnek test verileri.
         """
+        if self.question_bank is not None and analysis_result:
+            level, _ = parse_analysis(analysis_result.get('raw_analysis', ''))
+            questions = self.question_bank.sample(level, count)
+            if len(questions) == count:
+                logger.info("Örnek sorular soru bankasından alındı (%s).", level)
+                get_metrics().inc('flai_fallbacks_total', kind='bank_tests')
+                return "```\n" + json.dumps(questions, ensure_ascii=False, indent=2) + "\n```"
+        
         logger.debug("Örnek test verileri oluşturuluyor.")
+        get_metrics().inc('flai_fallbacks_total', kind='sample_tests')
         return """```
 [
   {
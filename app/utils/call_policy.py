@@ -0,0 +1,323 @@
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Awaitable, Callable, Iterator, Optional, TypeVar
+from app.utils.rate_limiter import FileTokenBucket, RateLimitTimeout
+from app.utils.metrics import get_metrics
+
+# Loglama yapılandırması
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Yeniden denenebilecek HTTP durum kodları (kota, sunucu hatası, zaman aşımı)
+RETRYABLE_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+
+
+class CallTimeoutError(TimeoutError):
+    """
+    Bir çağrı kendisine ayrılan süre içinde tamamlanmadığında fırlatılır.
+    """
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Hatanın geçici olup olmadığını (yeniden denemeye değip değmediğini) belirler.
+
+    Yerel hız sınırında jeton alınamaması (RateLimitTimeout) geçici bir sunucu hatası
+    sayılmaz; yeniden denemek yalnızca aynı kovada tekrar beklemek olurdu.
+
+    Args:
+        error (Exception): Çağrıda oluşan hata.
+
+    Returns:
+        bool: Hata geçiciyse True.
+    """
+    if isinstance(error, RateLimitTimeout):
+        return False
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    # google.api_core hataları HTTP durum kodunu 'code' niteliğinde taşır
+    code = getattr(error, 'code', None)
+    return isinstance(code, int) and code in RETRYABLE_STATUS_CODES
+
+
+class CallPolicy:
+    """
+    Yapay zeka çağrılarını hız sınırı, çağrı başına süre sınırı, rastgele gecikmeli
+    üstel yeniden deneme ve isteğe bağlı yedek (hedged) istekle çalıştırır.
+
+    Yedek istek açıksa, ilk istek son çağrıların p95 gecikmesi içinde yanıt vermezse
+    aynı istek bir kez daha gönderilir ve önce gelen yanıt kullanılır.
+    """
+
+    def __init__(self, limiter: Optional[FileTokenBucket] = None, max_attempts: int = 3,
+                 base_delay: float = 0.5, max_delay: float = 8.0, deadline: float = 60.0,
+                 hedge: bool = False, hedge_delay: float = 10.0, max_workers: int = 16):
+        """
+        CallPolicy sınıfını başlatır.
+
+        Args:
+            limiter (Optional[FileTokenBucket]): Her denemeden önce jeton alınacak kova.
+            max_attempts (int): En fazla deneme sayısı.
+            base_delay (float): İlk yeniden denemeden önceki en uzun bekleme (saniye).
+            max_delay (float): Yeniden denemeler arasındaki en uzun bekleme (saniye).
+            deadline (float): Tek bir denemeye tanınan süre (saniye).
+            hedge (bool): Yavaş kalan isteğe yedek istek gönderilip gönderilmeyeceği.
+            hedge_delay (float): Yeterli gecikme ölçümü birikene kadar kullanılan yedek istek gecikmesi (saniye).
+            max_workers (int): Çağrıları çalıştıran iş parçacığı sayısı.
+        """
+        self.limiter = limiter
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+        self.max_workers = max_workers
+        self._latencies = deque(maxlen=200)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        İş parçacığı havuzunu ilk kullanımda (ve fork sonrasında yeniden) oluşturur.
+        """
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='llm-call')
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def current_hedge_delay(self) -> float:
+        """
+        Yedek isteğin gönderilmesinden önce beklenecek süreyi döndürür (son çağrıların p95 gecikmesi).
+
+        Returns:
+            float: Bekleme süresi (saniye).
+        """
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < 20:
+            return self.hedge_delay
+        return samples[int(len(samples) * 0.95) - 1]
+
+    def call(self, func: Callable[[], T]) -> T:
+        """
+        İşlevi politika kurallarıyla çalıştırır.
+
+        Args:
+            func (Callable[[], T]): Çalıştırılacak çağrı.
+
+        Returns:
+            T: Çağrının sonucu.
+
+        Raises:
+            Exception: Tüm denemeler başarısız olursa son hata.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return self._attempt(func)
+            except Exception as e:
+                if attempt == self.max_attempts or not is_retryable(e):
+                    raise
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+                get_metrics().inc('flai_llm_retries_total')
+                logger.warning("Yapay zeka çağrısı başarısız oldu (%d/%d), %.2f sn sonra yeniden denenecek: %s",
+                               attempt, self.max_attempts, delay, e)
+                time.sleep(delay)
+
+    def _attempt(self, func: Callable[[], T]) -> T:
+        """
+        Tek bir denemeyi süre sınırı ve isteğe bağlı yedek istekle çalıştırır.
+
+        Süre, jeton alındıktan sonra başlar; yedek istek gecikmesi için yalnızca yanıt veren
+        isteğin kendi süresi kaydedilir.
+        """
+        if self.limiter is not None:
+            self.limiter.acquire(timeout=self.deadline)
+        deadline = time.monotonic() + self.deadline
+
+        executor = self._get_executor()
+        futures = {executor.submit(func): time.monotonic()}
+
+        if self.hedge:
+            done, _ = wait(futures, timeout=min(self.current_hedge_delay(), max(0.0, deadline - time.monotonic())))
+            # Yedek isteği yalnızca jeton hemen alınabiliyorsa gönder
+            if not done and (self.limiter is None or self.limiter.try_acquire() == 0.0):
+                logger.debug("Yavaş istek için yedek istek gönderiliyor.")
+                futures[executor.submit(func)] = time.monotonic()
+
+        error = None
+        pending = set(futures)
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        with self._lock:
+                            self._latencies.append(time.monotonic() - futures[future])
+                        return future.result()
+                    error = future.exception()
+        finally:
+            # Süresi dolan ya da yedeği önce yanıt veren istekler iptal edilir (henüz başlamadıysa
+            # havuzda yer tutmaz; çalışan iş parçacığı yanıtı beklemeden bırakılır)
+            for future in pending:
+                future.cancel()
+
+        if error is not None and not pending:
+            raise error
+        raise CallTimeoutError(f"Yapay zeka çağrısı {self.deadline:.0f} sn içinde tamamlanmadı.")
+
+    def stream(self, func: Callable[[], Iterator[T]]) -> Iterator[T]:
+        """
+        Yanıtı parça parça döndüren çağrıyı hız sınırı ve süre sınırıyla çalıştırır.
+
+        Süre sınırı akışın tamamına uygulanır: jeton alındıktan sonra deadline içinde
+        gelmeyen her parça için CallTimeoutError fırlatılır. Parçalar havuzdaki bir iş
+        parçacığında okunduğundan yanıt vermeyen akış da süre dolunca bırakılır. Yanıtın
+        bir kısmı iletilmiş olabileceğinden akış yeniden denenmez ve yedek istek gönderilmez.
+
+        Args:
+            func (Callable[[], Iterator[T]]): Akışı başlatan işlev.
+
+        Yields:
+            T: Akışın bir sonraki parçası.
+
+        Raises:
+            CallTimeoutError: Akış süre sınırı içinde tamamlanmazsa.
+        """
+        if self.limiter is not None:
+            self.limiter.acquire(timeout=self.deadline)
+        deadline = time.monotonic() + self.deadline
+        executor = self._get_executor()
+        finished = object()
+        chunks = []
+
+        def next_chunk():
+            if not chunks:
+                chunks.append(iter(func()))
+            return next(chunks[0], finished)
+
+        while True:
+            future = executor.submit(next_chunk)
+            done, _ = wait([future], timeout=max(0.0, deadline - time.monotonic()))
+            if not done:
+                future.cancel()
+                raise CallTimeoutError(f"Yapay zeka akışı {self.deadline:.0f} sn içinde tamamlanmadı.")
+            chunk = future.result()
+            if chunk is finished:
+                return
+            yield chunk
+
+    async def call_async(self, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Eşyordam döndüren işlevi call ile aynı kurallarla çalıştırır.
+
+        Jeton, yeniden deneme ve yanıt beklenirken iş parçacığı tutulmaz; süresi dolan ve
+        yedeği önce yanıt veren istekler iptal edilir.
+
+        Args:
+            func (Callable[[], Awaitable[T]]): Her denemede çağrılan, eşyordam döndüren işlev.
+
+        Returns:
+            T: Çağrının sonucu.
+
+        Raises:
+            Exception: Tüm denemeler başarısız olursa son hata.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return await self._attempt_async(func)
+            except Exception as e:
+                if attempt == self.max_attempts or not is_retryable(e):
+                    raise
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+                get_metrics().inc('flai_llm_retries_total')
+                logger.warning("Yapay zeka çağrısı başarısız oldu (%d/%d), %.2f sn sonra yeniden denenecek: %s",
+                               attempt, self.max_attempts, delay, e)
+                await asyncio.sleep(delay)
+
+    async def _attempt_async(self, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Tek bir denemeyi süre sınırı ve isteğe bağlı yedek istekle olay döngüsünde çalıştırır.
+
+        Süre ve gecikme ölçümü _attempt'teki gibidir.
+        """
+        if self.limiter is not None:
+            await self.limiter.acquire_async(timeout=self.deadline)
+        deadline = time.monotonic() + self.deadline
+
+        tasks = {asyncio.ensure_future(func()): time.monotonic()}
+        try:
+            if self.hedge:
+                done, _ = await asyncio.wait(
+                    tasks, timeout=min(self.current_hedge_delay(), max(0.0, deadline - time.monotonic())))
+                # Yedek isteği yalnızca jeton hemen alınabiliyorsa gönder
+                if not done and (self.limiter is None or self.limiter.try_acquire() == 0.0):
+                    logger.debug("Yavaş istek için yedek istek gönderiliyor.")
+                    tasks[asyncio.ensure_future(func())] = time.monotonic()
+
+            error = None
+            pending = set(tasks)
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        with self._lock:
+                            self._latencies.append(time.monotonic() - tasks[task])
+                        return task.result()
+                    error = task.exception()
+        finally:
+            # Süresi dolan ya da yedeği önce yanıt veren istekler iptal edilir
+            for task in tasks:
+                task.cancel()
+
+        if error is not None and not pending:
+            raise error
+        raise CallTimeoutError(f"Yapay zeka çağrısı {self.deadline:.0f} sn içinde tamamlanmadı.")
+
+
+_default_policy = None
+_default_policy_lock = threading.Lock()
+
+
+def get_call_policy() -> CallPolicy:
+    """
+    Ortam değişkenlerine göre yapılandırılmış süreç genelindeki çağrı politikasını döndürür.
+
+    Returns:
+        CallPolicy: Çağrı politikası.
+    """
+    global _default_policy
+    with _default_policy_lock:
+        if _default_policy is None:
+            limiter = None
+            rate_per_minute = float(os.getenv("LLM_RATE_PER_MINUTE", "60"))
+            if rate_per_minute > 0:
+                limiter = FileTokenBucket(
+                    os.getenv("LLM_RATE_LIMIT_PATH", os.path.join('cache', 'llm_rate_limit.state')),
+                    rate_per_second=rate_per_minute / 60,
+                    capacity=float(os.getenv("LLM_BURST", "10"))
+                )
+            _default_policy = CallPolicy(
+                limiter=limiter,
+                max_attempts=int(os.getenv("LLM_MAX_ATTEMPTS", "3")),
+                deadline=float(os.getenv("LLM_DEADLINE_SECONDS", "60")),
+                hedge=os.getenv("LLM_HEDGE", "0") == "1",
+                hedge_delay=float(os.getenv("LLM_HEDGE_DELAY_SECONDS", "10"))
+            )
+        return _default_policy
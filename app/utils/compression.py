@@ -0,0 +1,144 @@
+import os
+import gzip
+import logging
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # Brotli kurulu değilse yalnızca gzip kullanılır
+    brotli = None
+
+from app.utils.metrics import get_metrics
+
+# Loglama yapılandırması
+logger = logging.getLogger(__name__)
+
+# Yanıtlar sıkıştırılsın mı
+RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "1") == "1"
+
+# Bundan küçük yanıtlar sıkıştırılmaz; kazanç başlıkların ve işlemci süresinin altında kalır
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "512"))
+
+# İstek sırasında sıkıştırma düzeyleri; önceden sıkıştırılan dosyalar en yüksek düzeyi kullanır
+GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "5"))
+
+# Sıkıştırılan içerik türleri
+COMPRESSIBLE_TYPES = frozenset([
+    'text/html', 'text/css', 'text/plain', 'text/javascript',
+    'application/javascript', 'application/json'
+])
+
+
+def available_encodings() -> tuple:
+    """
+    Bu ortamda kullanılabilen kodlamaları tercih sırasıyla döndürür.
+
+    Returns:
+        tuple: 'br' (Brotli kuruluysa) ve 'gzip'.
+    """
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Accept-Encoding başlığına göre kullanılacak kodlamayı seçer.
+
+    q=0 ile reddedilen kodlamalar kullanılmaz; kabul edilenler arasından Brotli gzip'e
+    tercih edilir.
+
+    Args:
+        accept_encoding (Optional[str]): İstemcinin Accept-Encoding başlığı.
+
+    Returns:
+        Optional[str]: 'br', 'gzip' veya sıkıştırma yapılmayacaksa None.
+    """
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        weight = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    wildcard = weights.get('*', 0.0)
+    for encoding in available_encodings():
+        if weights.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """
+    Veriyi verilen kodlamayla sıkıştırır.
+
+    gzip çıktısına zaman damgası yazılmaz; aynı veri her zaman aynı baytları üretir.
+
+    Args:
+        data (bytes): Sıkıştırılacak veri.
+        encoding (str): 'br' veya 'gzip'.
+        level (Optional[int]): Sıkıştırma düzeyi. Verilmezse istek sırasındaki düzey kullanılır.
+
+    Returns:
+        bytes: Sıkıştırılmış veri.
+
+    Raises:
+        ValueError: Kodlama desteklenmiyorsa.
+    """
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=GZIP_LEVEL if level is None else level, mtime=0)
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(data, quality=BROTLI_QUALITY if level is None else level)
+    raise ValueError(f"Desteklenmeyen kodlama: {encoding}")
+
+
+def compress_response(response, accept_encoding: Optional[str]):
+    """
+    Uygun yanıtların gövdesini istemcinin kabul ettiği kodlamayla sıkıştırır.
+
+    Akış yanıtları (olay akışı), dosya yanıtları, başarısız yanıtlar, zaten kodlanmış
+    ve küçük gövdeler olduğu gibi bırakılır. Sıkıştırılan yanıtların ETag'i zayıf hale
+    getirilir; böylece koşullu istekler kodlamadan bağımsız olarak 304 alır.
+
+    Args:
+        response (Response): Flask yanıtı.
+        accept_encoding (Optional[str]): İstemcinin Accept-Encoding başlığı.
+
+    Returns:
+        Response: Aynı yanıt nesnesi.
+    """
+    if (not RESPONSE_COMPRESSION or response.status_code != 200 or response.direct_passthrough
+            or response.is_streamed or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+
+    # Yanıt içeriğe göre değiştiğinden önbellekler kodlamayı anahtara katmalı
+    response.vary.add('Accept-Encoding')
+
+    encoding = choose_encoding(accept_encoding)
+    if encoding is None:
+        return response
+
+    data = response.get_data()
+    if len(data) < RESPONSE_COMPRESSION_MIN_BYTES:
+        return response
+
+    compressed = compress(data, encoding)
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+    metrics = get_metrics()
+    metrics.inc('flai_response_bytes_total', len(data), encoding=encoding, body='original')
+    metrics.inc('flai_response_bytes_total', len(compressed), encoding=encoding, body='compressed')
+    return response
@@ -0,0 +1,284 @@
+import os
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Iterator, Optional
+import google.generativeai as genai
+from app.utils.metrics import get_metrics
+from app.utils.llm_backend import LLMBackend
+
+# Loglama yapılandırması
+logger = logging.getLogger(__name__)
+
+
+class ModelPoolTimeout(TimeoutError):
+    """
+    Havuzda beklenen süre içinde boş model nesnesi bulunamadığında fırlatılır.
+    """
+
+
+class GeminiClientManager(LLMBackend):
+    """
+    Gemini istemcisini süreç başına bir kez yapılandırır ve model nesnelerini havuzda tutar.
+
+    genai.configure süreç genelinde tek bir istemci kurar ve tüm model nesneleri bu
+    istemciyi paylaşır; bu sınıf yapılandırmayı her işçi sürecinde yalnızca bir kez (fork
+    sonrasında) yapar. Havuz bağlantıları değil model nesnelerini tutar ve bir işçideki
+    eşzamanlı çağrı sayısını pool_size ile sınırlar.
+    """
+
+    def __init__(self, model_name: str, pool_size: int = 4,
+                 model_factory: Optional[Callable[[str], Any]] = None, pool_timeout: float = 30.0):
+        """
+        GeminiClientManager sınıfını başlatır.
+
+        Args:
+            model_name (str): Kullanılacak Gemini modeli.
+            pool_size (int): Havuzda tutulacak model nesnesi (aynı anda yapılabilecek çağrı) sayısı.
+            model_factory (Optional[Callable[[str], Any]]): Model nesnelerini oluşturan işlev.
+                Verilirse API yapılandırılmaz (örneğin ölçüm ve testlerdeki yerel modeller için).
+            pool_timeout (float): Havuzda boş model beklenecek en uzun süre (saniye).
+        """
+        self.model_name = model_name
+        self.pool_size = pool_size
+        self.pool_timeout = pool_timeout
+        self.model_factory = model_factory
+        self._pool = None
+        self._factory = None
+        self._async_model = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=200)
+        self._stats = {'calls': 0, 'errors': 0, 'last_error': None, 'warmed_up': False, 'warm_up_seconds': None}
+
+    def configure(self) -> 'queue.Queue':
+        """
+        API'yi bu süreçte ilk kullanımda yapılandırır ve model havuzunu oluşturur.
+
+        Returns:
+            queue.Queue: Model havuzu.
+
+        Raises:
+            ValueError: GEMINI_API_KEY tanımlı değilse.
+        """
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                factory = self.model_factory
+                if factory is None:
+                    api_key = os.getenv("GEMINI_API_KEY")
+                    if not api_key:
+                        logger.error("GEMINI_API_KEY bulunamadı. Lütfen .env dosyasını kontrol edin.")
+                        raise ValueError("GEMINI_API_KEY bulunamadı. Lütfen .env dosyasını kontrol edin.")
+
+                    # Gemini API'yi bu süreç için bir kez yapılandır
+                    genai.configure(api_key=api_key)
+                    factory = genai.GenerativeModel
+                pool = queue.Queue()
+                for _ in range(self.pool_size):
+                    pool.put(factory(self.model_name))
+                self._pool = pool
+                self._factory = factory
+                self._async_model = None
+                self._pid = os.getpid()
+                self._latencies.clear()
+                self._stats.update(calls=0, errors=0, last_error=None, warmed_up=False, warm_up_seconds=None)
+                logger.info("Gemini istemcisi yapılandırıldı (süreç %d, model %s, havuz %d).",
+                            self._pid, self.model_name, self.pool_size)
+            return self._pool
+
+    @contextmanager
+    def model(self):
+        """
+        Havuzdan bir model nesnesi ödünç alır ve iş bitince geri koyar.
+
+        Raises:
+            ModelPoolTimeout: pool_timeout içinde boş model bulunamazsa (geçici hata olarak
+                yeniden denenir).
+        """
+        pool = self.configure()
+        try:
+            model = pool.get(timeout=self.pool_timeout)
+        except queue.Empty:
+            raise ModelPoolTimeout(
+                f"Model havuzunda {self.pool_timeout:.0f} sn içinde boş model bulunamadı.") from None
+        try:
+            yield model
+        finally:
+            pool.put(model)
+
+    def generate(self, prompt: str, kind: str = 'default') -> str:
+        """
+        İsteği havuzdaki bir modelle gönderir ve gecikmeyi kaydeder.
+
+        Args:
+            prompt (str): Yapay zekaya gönderilecek istek.
+            kind (str): İstek türü (Gemini için kullanılmaz).
+
+        Returns:
+            str: Yapay zeka yanıtı.
+        """
+        with self.model() as model:
+            started = time.monotonic()
+            try:
+                response = model.generate_content(prompt)
+                text = response.text
+            except Exception as e:
+                self._record_error(e, 'generate')
+                raise
+            self._record_success(started, 'generate', getattr(response, 'usage_metadata', None))
+            return text
+
+    async def generate_async(self, prompt: str, kind: str = 'default') -> str:
+        """
+        İsteği Gemini'nin eşzamansız istemcisiyle gönderir; yanıt beklenirken iş parçacığı tutulmaz.
+
+        Args:
+            prompt (str): Yapay zekaya gönderilecek istek.
+            kind (str): İstek türü (Gemini için kullanılmaz).
+
+        Returns:
+            str: Yapay zeka yanıtı.
+        """
+        self.configure()
+        with self._lock:
+            # Eşzamansız çağrılar tek bir model nesnesini paylaşır; havuz yalnızca iş
+            # parçacıklarından gelen eşzamanlı çağrılar içindir
+            if self._async_model is None:
+                self._async_model = self._factory(self.model_name)
+            model = self._async_model
+        started = time.monotonic()
+        try:
+            response = await model.generate_content_async(prompt)
+            text = response.text
+        except Exception as e:
+            self._record_error(e, 'async')
+            raise
+        self._record_success(started, 'async', getattr(response, 'usage_metadata', None))
+        return text
+
+    def generate_stream(self, prompt: str, kind: str = 'default') -> Iterator[str]:
+        """
+        İsteği akış kipinde gönderir ve yanıt metnini parça parça döndürür.
+
+        Args:
+            prompt (str): Yapay zekaya gönderilecek istek.
+            kind (str): İstek türü (Gemini için kullanılmaz).
+
+        Yields:
+            str: Yanıtın bir sonraki parçası.
+        """
+        with self.model() as model:
+            started = time.monotonic()
+            usage = None
+            try:
+                for chunk in model.generate_content(prompt, stream=True):
+                    # Token sayıları son parçada tamamlanır
+                    usage = getattr(chunk, 'usage_metadata', None) or usage
+                    yield chunk.text
+            except Exception as e:
+                self._record_error(e, 'stream')
+                raise
+            self._record_success(started, 'stream', usage)
+
+    def _record_success(self, started: float, call: str, usage: Any) -> None:
+        """
+        Başarılı çağrının gecikmesini ve token sayılarını kaydeder.
+        """
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self._stats['calls'] += 1
+            self._latencies.append(elapsed)
+
+        metrics = get_metrics()
+        metrics.observe('flai_llm_request_duration_seconds', elapsed, call=call)
+        if usage is not None:
+            metrics.inc('flai_llm_tokens_total', int(getattr(usage, 'prompt_token_count', 0) or 0), type='prompt')
+            metrics.inc('flai_llm_tokens_total', int(getattr(usage, 'candidates_token_count', 0) or 0), type='completion')
+
+    def _record_error(self, error: Exception, call: str) -> None:
+        """
+        Başarısız çağrıyı kaydeder.
+        """
+        with self._lock:
+            self._stats['calls'] += 1
+            self._stats['errors'] += 1
+            self._stats['last_error'] = str(error)
+        get_metrics().inc('flai_llm_errors_total', call=call)
+
+    def warm_up(self) -> bool:
+        """
+        İstemciyi yapılandırır ve bağlantıyı kurmak için ücretsiz bir token sayma isteği gönderir.
+
+        Returns:
+            bool: Isınma başarılıysa True.
+        """
+        started = time.monotonic()
+        try:
+            with self.model() as model:
+                model.count_tokens("ping")
+        except Exception as e:
+            logger.warning("Gemini istemcisi ısındırılamadı: %s", e)
+            with self._lock:
+                self._stats['last_error'] = str(e)
+            return False
+        with self._lock:
+            self._stats['warmed_up'] = True
+            self._stats['warm_up_seconds'] = time.monotonic() - started
+        logger.info("Gemini istemcisi %.2f sn içinde ısındırıldı.", time.monotonic() - started)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        İstemcinin sağlık ve gecikme bilgilerini döndürür.
+
+        Returns:
+            Dict[str, Any]: Sağlık durumu, çağrı sayıları ve gecikme yüzdelikleri.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            samples = sorted(self._latencies)
+            configured = self._pool is not None and self._pid == os.getpid()
+            stats['available_models'] = self._pool.qsize() if configured else 0
+
+        stats.update(
+            model=self.model_name,
+            pid=os.getpid(),
+            configured=configured,
+            pool_size=self.pool_size,
+            latency_p50=samples[len(samples) // 2] if samples else None,
+            latency_p95=samples[max(0, int(len(samples) * 0.95) - 1)] if samples else None
+        )
+        # Isınma başarısızsa ya da çağrıların çoğu hatalıysa istemciyi sağlıksız say
+        if stats['calls']:
+            stats['healthy'] = stats['errors'] / stats['calls'] < 0.5
+        else:
+            stats['healthy'] = stats['last_error'] is None
+        return stats
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_gemini_client(model_name: Optional[str] = None) -> GeminiClientManager:
+    """
+    Süreç genelindeki Gemini istemci yöneticisini döndürür.
+
+    Args:
+        model_name (Optional[str]): Yönetici ilk kez oluşturulurken kullanılacak model adı.
+
+    Returns:
+        GeminiClientManager: İstemci yöneticisi.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = GeminiClientManager(
+                model_name or os.getenv("GEMINI_MODEL", "gemini-1.5-flash"),
+                pool_size=int(os.getenv("GEMINI_POOL_SIZE", "4")),
+                pool_timeout=float(os.getenv("GEMINI_POOL_TIMEOUT", "30"))
+            )
+        return _default_client
@@ -0,0 +1,464 @@
+import os
+import time
+import uuid
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Callable, Optional
+from app.utils.job_store import SQLiteJobStore
+
+# Loglama yapılandırması
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """
+    İş kuyruğu dolu olduğunda fırlatılır.
+    """
+
+
+class JobError(Exception):
+    """
+    Bir iş aşaması kullanıcıya gösterilebilecek bir hata ile sonlandığında fırlatılır.
+    """
+
+
+class Job:
+    """
+    Arka planda çalışan tek bir işin durumunu ve aşama ilerlemesini tutar.
+    """
+
+    def __init__(self, stages: List[str], store: Optional[SQLiteJobStore] = None):
+        """
+        Job sınıfını başlatır.
+
+        Args:
+            stages (List[str]): İşin sırasıyla geçeceği aşamaların adları.
+            store (Optional[SQLiteJobStore]): Durum değişikliklerinin ve olayların yazılacağı
+                paylaşılan depo. Verilmezse iş yalnızca bu sürecin belleğinde tutulur.
+        """
+        self.id = uuid.uuid4().hex
+        self.status = 'queued'
+        self.error = None
+        self.result = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.stages = {
+            name: {'status': 'pending', 'started_at': None, 'duration': None}
+            for name in stages
+        }
+        self._stage_order = list(stages)
+        self._events = []
+        self._store = store
+        self._lock = threading.Lock()
+        self._events_changed = threading.Condition(self._lock)
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Bir aşamayı çalışıyor olarak işaretler, süresini ölçer ve sonucunu kaydeder.
+
+        Args:
+            name (str): Aşama adı.
+        """
+        started = time.time()
+        with self._lock:
+            self.status = 'running'
+            self.stages[name].update(status='running', started_at=started)
+        self._save()
+        try:
+            yield
+        except Exception:
+            with self._lock:
+                self.stages[name].update(status='failed', duration=time.time() - started)
+            self._save()
+            raise
+        with self._lock:
+            self.stages[name].update(status='completed', duration=time.time() - started)
+        self._save()
+
+    def skip(self, name: str) -> None:
+        """
+        Bir aşamayı atlanmış olarak işaretler.
+
+        Args:
+            name (str): Aşama adı.
+        """
+        with self._lock:
+            self.stages[name].update(status='skipped', duration=0.0)
+        self._save()
+
+    def publish(self, event: str, data: Any) -> None:
+        """
+        İşi izleyen istemcilere iletilecek bir olay ekler (örneğin oluşturulan bir soru).
+
+        Args:
+            event (str): Olay adı.
+            data (Any): JSON'a dönüştürülebilir olay verisi.
+        """
+        with self._lock:
+            added = self._publish(event, data)
+        self._save(added)
+
+    def _publish(self, event: str, data: Any) -> Dict[str, Any]:
+        """
+        Olayı ekler ve bekleyenleri uyandırır. Kilit tutulurken çağrılmalıdır.
+
+        Returns:
+            Dict[str, Any]: Eklenen olay.
+        """
+        added = {'id': len(self._events) + 1, 'event': event, 'data': data}
+        self._events.append(added)
+        self._events_changed.notify_all()
+        return added
+
+    def _save(self, event: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Durumu ve (verilirse) yeni olayı paylaşılan depoya yazar. Kilit tutulmadan çağrılmalıdır.
+        """
+        if self._store is not None:
+            self._store.save(self.to_dict(), event)
+
+    def wait_events(self, after: int = 0, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Verilen kimlikten sonraki olayları döndürür; henüz yoksa yenisi gelene kadar bekler.
+
+        Args:
+            after (int): Son alınan olayın kimliği.
+            timeout (Optional[float]): En uzun bekleme süresi (saniye).
+
+        Returns:
+            List[Dict[str, Any]]: 'id', 'event' ve 'data' alanlı olaylar; süre dolduysa boş liste.
+        """
+        with self._lock:
+            self._events_changed.wait_for(lambda: len(self._events) > after, timeout)
+            return list(self._events[after:])
+
+    def complete(self, result: Any) -> None:
+        """
+        İşi başarıyla tamamlanmış olarak işaretler.
+
+        Args:
+            result (Any): İşin sonucu.
+        """
+        with self._lock:
+            self.result = result
+            self.status = 'completed'
+            self.finished_at = time.time()
+            added = self._publish('completed', result)
+        self._save(added)
+
+    def fail(self, error: str) -> None:
+        """
+        İşi başarısız olarak işaretler.
+
+        Args:
+            error (str): Kullanıcıya gösterilecek hata mesajı.
+        """
+        with self._lock:
+            self.error = error
+            self.status = 'failed'
+            self.finished_at = time.time()
+            added = self._publish('failed', {'error': error})
+        self._save(added)
+
+    @property
+    def finished(self) -> bool:
+        """
+        İşin tamamlanıp tamamlanmadığını döndürür.
+        """
+        return self.status in ('completed', 'failed')
+
+    @property
+    def progress(self) -> float:
+        """
+        Tamamlanan aşamaların oranını döndürür (0.0 - 1.0).
+        """
+        if not self._stage_order:
+            return 1.0
+        done = sum(1 for name in self._stage_order
+                   if self.stages[name]['status'] in ('completed', 'skipped'))
+        return done / len(self._stage_order)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        İş durumunu JSON'a dönüştürülebilir bir sözlük olarak döndürür.
+
+        Returns:
+            Dict[str, Any]: İş durumu.
+        """
+        with self._lock:
+            return {
+                'job_id': self.id,
+                'status': self.status,
+                'progress': self.progress,
+                'stages': [dict(self.stages[name], name=name) for name in self._stage_order],
+                'error': self.error,
+                'result': self.result,
+                'created_at': self.created_at,
+                'finished_at': self.finished_at
+            }
+
+
+class StoredJob:
+    """
+    Başka bir işçi sürecinde çalışan işin paylaşılan depodan okunan, salt okunur görünümü.
+
+    Job ile aynı durum alanlarını ve wait_events yöntemini sunar; olaylar depodan
+    kısa aralıklarla sorgulanır.
+    """
+
+    # Yeni olaylar için depo sorgulama aralığı (saniye)
+    POLL_INTERVAL = 0.2
+
+    def __init__(self, store: SQLiteJobStore, state: Dict[str, Any]):
+        """
+        StoredJob sınıfını başlatır.
+
+        Args:
+            store (SQLiteJobStore): İşin yazıldığı depo.
+            state (Dict[str, Any]): Depodan okunan iş durumu.
+        """
+        self._store = store
+        self._state = state
+        self.id = state['job_id']
+        self.status = state['status']
+        self.error = state['error']
+        self.result = state['result']
+        self.finished_at = state['finished_at']
+
+    @property
+    def finished(self) -> bool:
+        """
+        İşin tamamlanıp tamamlanmadığını döndürür.
+        """
+        return self.status in ('completed', 'failed')
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        İş durumunu döndürür.
+
+        Returns:
+            Dict[str, Any]: Job.to_dict() ile aynı biçimde iş durumu.
+        """
+        return dict(self._state)
+
+    def wait_events(self, after: int = 0, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Verilen kimlikten sonraki olayları döndürür; henüz yoksa yenisi yazılana kadar depoyu sorgular.
+
+        Args:
+            after (int): Son alınan olayın kimliği.
+            timeout (Optional[float]): En uzun bekleme süresi (saniye).
+
+        Returns:
+            List[Dict[str, Any]]: 'id', 'event' ve 'data' alanlı olaylar; süre dolduysa boş liste.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            events = self._store.events(self.id, after)
+            if events or (deadline is not None and time.monotonic() >= deadline):
+                return events
+            time.sleep(self.POLL_INTERVAL)
+
+
+class JobQueue:
+    """
+    İşleri sınırlı sayıda iş parçacığından oluşan yerel bir havuzda çalıştırır.
+
+    Paylaşılan bir iş deposu verilirse işlerin durumu ve olayları depoya da yazılır; başka
+    bir işçi sürecinde kabul edilen işler get() ile depodan okunur.
+    """
+
+    # Süresi dolan işlerin depodan silinme aralığı (saniye)
+    SWEEP_INTERVAL = 300
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 20, retention_seconds: int = 3600,
+                 store: Optional[SQLiteJobStore] = None):
+        """
+        JobQueue sınıfını başlatır.
+
+        Args:
+            max_workers (int): Aynı anda çalışabilecek iş sayısı.
+            max_pending (int): Kuyrukta bekleyen ve çalışan toplam iş sınırı.
+            retention_seconds (int): Biten işlerin bellekte (ve depoda) tutulacağı süre (saniye).
+            store (Optional[SQLiteJobStore]): İşçi süreçleri arasında paylaşılan iş deposu.
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+        self.store = store
+        self._last_sweep = 0.0
+        self._jobs = {}
+        self._active = 0
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        İş parçacığı havuzunu ilk kullanımda (ve fork sonrasında yeniden) oluşturur.
+
+        Returns:
+            ThreadPoolExecutor: İşleri çalıştıran havuz.
+        """
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def submit(self, func: Callable[..., Any], *args: Any, stages: Optional[List[str]] = None) -> Job:
+        """
+        Yeni bir işi kuyruğa ekler.
+
+        İşlev ilk argüman olarak Job nesnesini alır; dönüş değeri işin sonucu olur.
+
+        Args:
+            func (Callable[..., Any]): Çalıştırılacak işlev.
+            *args (Any): İşleve iletilecek ek argümanlar.
+            stages (Optional[List[str]]): İşin aşamaları.
+
+        Returns:
+            Job: Kuyruğa eklenen iş.
+
+        Raises:
+            QueueFullError: Kuyruk sınırına ulaşıldıysa.
+        """
+        job = Job(stages or [], store=self.store)
+        with self._lock:
+            self._prune()
+            if self._active >= self.max_pending:
+                raise QueueFullError("İş kuyruğu dolu.")
+            self._active += 1
+            self._jobs[job.id] = job
+        # Durum isteği başka bir işçiye düşse de iş bulunabilsin
+        job._save()
+        self._start(job, func, args)
+        logger.debug("İş kuyruğa eklendi: %s", job.id)
+        return job
+
+    def _start(self, job: Job, func: Callable[..., Any], args: tuple) -> None:
+        """
+        İşi iş parçacığı havuzunda başlatır.
+        """
+        with self._lock:
+            executor = self._get_executor()
+        executor.submit(self._run, job, func, args)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Kimliği verilen işi döndürür; iş bu süreçte değilse paylaşılan depodan okur.
+
+        Args:
+            job_id (str): İş kimliği.
+
+        Returns:
+            Optional[Job]: Bu süreçteki iş, başka bir süreçteki işin StoredJob görünümü
+                ya da iş bulunamazsa None.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None or self.store is None:
+            return job
+        state = self.store.load(job_id)
+        return StoredJob(self.store, state) if state is not None else None
+
+    def _run(self, job: Job, func: Callable[..., Any], args: tuple) -> None:
+        """
+        İşi çalıştırır ve sonucunu ya da hatasını kaydeder.
+        """
+        try:
+            job.complete(func(job, *args))
+        except JobError as e:
+            job.fail(str(e))
+        except Exception as e:
+            logger.exception("İş çalışırken hata oluştu: %s", job.id)
+            job.fail(f'İşlem sırasında bir hata oluştu: {str(e)}')
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def _prune(self) -> None:
+        """
+        Saklama süresi dolmuş işleri bellekten (ve aralıklarla depodan) siler. Kilit tutulurken çağrılmalıdır.
+        """
+        cutoff = time.time() - self.retention_seconds
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+        if self.store is not None and time.time() - self._last_sweep >= self.SWEEP_INTERVAL:
+            self._last_sweep = time.time()
+            self.store.sweep(cutoff)
+
+
+class AsyncJobQueue(JobQueue):
+    """
+    İşleri tek bir iş parçacığındaki asyncio olay döngüsünde eşyordam olarak çalıştırır.
+
+    Yapay zeka yanıtı beklenirken iş parçacığı tutulmadığından bir süreç max_pending kadar
+    işi aynı anda yürütebilir. İşlerin işlemci ağırlıklı adımları asyncio.to_thread ile
+    döngünün max_workers iş parçacıklı havuzunda çalışır. Eşyordam olmayan işlevler de
+    kabul edilir ve tamamen bu havuzda çalıştırılır.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 200, retention_seconds: int = 3600,
+                 store: Optional[SQLiteJobStore] = None):
+        """
+        AsyncJobQueue sınıfını başlatır.
+
+        Args:
+            max_workers (int): İşlerin işlemci ağırlıklı adımlarını çalıştıran iş parçacığı sayısı.
+            max_pending (int): Kuyrukta bekleyen ve çalışan toplam iş sınırı.
+            retention_seconds (int): Biten işlerin bellekte (ve depoda) tutulacağı süre (saniye).
+            store (Optional[SQLiteJobStore]): İşçi süreçleri arasında paylaşılan iş deposu.
+        """
+        super().__init__(max_workers=max_workers, max_pending=max_pending, retention_seconds=retention_seconds,
+                         store=store)
+        self._loop = None
+        self._loop_pid = None
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Olay döngüsünü ve iş parçacığını ilk kullanımda (ve fork sonrasında yeniden) oluşturur.
+        Kilit tutulurken çağrılmalıdır.
+
+        Returns:
+            asyncio.AbstractEventLoop: İşleri çalıştıran olay döngüsü.
+        """
+        if self._loop is None or self._loop_pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            loop.set_default_executor(ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job'))
+            threading.Thread(target=loop.run_forever, name='job-loop', daemon=True).start()
+            self._loop = loop
+            self._loop_pid = os.getpid()
+        return self._loop
+
+    def _start(self, job: Job, func: Callable[..., Any], args: tuple) -> None:
+        """
+        İşi olay döngüsünde başlatır.
+        """
+        with self._lock:
+            loop = self._get_loop()
+        asyncio.run_coroutine_threadsafe(self._run_async(job, func, args), loop)
+
+    async def _run_async(self, job: Job, func: Callable[..., Any], args: tuple) -> None:
+        """
+        İşi çalıştırır ve sonucunu ya da hatasını kaydeder.
+        """
+        try:
+            if asyncio.iscoroutinefunction(func):
+                result = await func(job, *args)
+            else:
+                result = await asyncio.to_thread(func, job, *args)
+            job.complete(result)
+        except JobError as e:
+            job.fail(str(e))
+        except Exception as e:
+            logger.exception("İş çalışırken hata oluştu: %s", job.id)
+            job.fail(f'İşlem sırasında bir hata oluştu: {str(e)}')
+        finally:
+            with self._lock:
+                self._active -= 1
@@ -0,0 +1,147 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Any, Optional
+from app.utils.sqlite_util import make_parent_dirs, thread_connection
+
+# Loglama yapılandırması
+logger = logging.getLogger(__name__)
+
+
+class SQLiteJobStore:
+    """
+    İşlerin durumunu, aşama ilerlemesini ve olaylarını gunicorn işçileri arasında paylaşılan
+    bir SQLite veritabanında tutar.
+
+    İşi kabul eden işçi her durum değişikliğini ve olayı hemen yazar; böylece durum, sonuç
+    ve olay akışı istekleri hangi işçiye düşerse düşsün işi görür.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        SQLiteJobStore sınıfını başlatır.
+
+        Args:
+            db_path (str): SQLite veritabanı dosyasının yolu.
+        """
+        self.db_path = db_path
+        self._local = threading.local()
+
+        make_parent_dirs(db_path)
+        with thread_connection(self._local, self.db_path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_events ("
+                "job_id TEXT NOT NULL, event_id INTEGER NOT NULL, event TEXT NOT NULL, data TEXT NOT NULL, "
+                "PRIMARY KEY (job_id, event_id))"
+            )
+
+    def save(self, state: Dict[str, Any], event: Optional[Dict[str, Any]] = None) -> None:
+        """
+        İşin durumunu ve (verilirse) yeni olayını yazar.
+
+        Args:
+            state (Dict[str, Any]): Job.to_dict() ile aynı biçimde iş durumu.
+            event (Optional[Dict[str, Any]]): 'id', 'event' ve 'data' alanlı olay.
+        """
+        try:
+            with thread_connection(self._local, self.db_path) as conn:
+                conn.execute("INSERT OR REPLACE INTO jobs (id, state, updated_at) VALUES (?, ?, ?)",
+                             (state['job_id'], json.dumps(state, ensure_ascii=False), time.time()))
+                if event is not None:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO job_events (job_id, event_id, event, data) VALUES (?, ?, ?, ?)",
+                        (state['job_id'], event['id'], event['event'], json.dumps(event['data'], ensure_ascii=False))
+                    )
+        except sqlite3.Error as e:
+            logger.error("İş durumu yazılırken hata oluştu: %s", e)
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        İşin son yazılan durumunu döndürür.
+
+        Args:
+            job_id (str): İş kimliği.
+
+        Returns:
+            Optional[Dict[str, Any]]: İş durumu; iş bulunamazsa None.
+        """
+        try:
+            conn = thread_connection(self._local, self.db_path)
+            row = conn.execute("SELECT state FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        except sqlite3.Error as e:
+            logger.error("İş durumu okunurken hata oluştu: %s", e)
+            return None
+        return json.loads(row[0]) if row else None
+
+    def events(self, job_id: str, after: int = 0) -> List[Dict[str, Any]]:
+        """
+        İşin verilen kimlikten sonraki olaylarını döndürür.
+
+        Args:
+            job_id (str): İş kimliği.
+            after (int): Son alınan olayın kimliği.
+
+        Returns:
+            List[Dict[str, Any]]: 'id', 'event' ve 'data' alanlı olaylar.
+        """
+        try:
+            rows = thread_connection(self._local, self.db_path).execute(
+                "SELECT event_id, event, data FROM job_events WHERE job_id = ? AND event_id > ? ORDER BY event_id",
+                (job_id, after)
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.error("İş olayları okunurken hata oluştu: %s", e)
+            return []
+        return [{'id': event_id, 'event': event, 'data': json.loads(data)} for event_id, event, data in rows]
+
+    def sweep(self, cutoff: float) -> int:
+        """
+        Verilen zamandan önce güncellenmiş işleri ve olaylarını siler.
+
+        Args:
+            cutoff (float): Bu zamandan önce güncellenen işler silinir (Unix zamanı).
+
+        Returns:
+            int: Silinen iş sayısı.
+        """
+        try:
+            with thread_connection(self._local, self.db_path) as conn:
+                removed = conn.execute("DELETE FROM jobs WHERE updated_at < ?", (cutoff,)).rowcount
+                conn.execute("DELETE FROM job_events WHERE job_id NOT IN (SELECT id FROM jobs)")
+        except sqlite3.Error as e:
+            logger.error("Eski işler silinirken hata oluştu: %s", e)
+            return 0
+        return removed
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_job_store() -> Optional[SQLiteJobStore]:
+    """
+    Ortam değişkenlerine göre yapılandırılmış paylaşılan iş deposunu döndürür.
+
+    JOB_STORE değişkeni 'sqlite' (varsayılan) veya 'memory' olabilir. 'memory' kipinde
+    işler yalnızca kabul eden sürecin belleğinde tutulur (tek işçili geliştirme ve testler için).
+
+    Returns:
+        Optional[SQLiteJobStore]: İş deposu; 'memory' kipinde None.
+    """
+    global _default_store
+    with _default_store_lock:
+        backend = os.getenv("JOB_STORE", "sqlite")
+        if backend == 'memory':
+            return None
+        if backend != 'sqlite':
+            raise ValueError(f"Bilinmeyen iş deposu: {backend}")
+        if _default_store is None:
+            _default_store = SQLiteJobStore(os.getenv("JOB_STORE_PATH", os.path.join('cache', 'jobs.sqlite3')))
+        return _default_store
@@ -0,0 +1,559 @@
+import os
+import time
+import uuid
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Dict, List, Any, Iterable, Iterator, Optional
+from app.utils.transcript_frame import TranscriptFrame, parse_timestamp
+from app.utils.transcript_formats import normalize_timestamp, parse_cues
+from app.utils.live_lesson_store import SQLiteLiveLessonStore, get_live_lesson_store
+
+# Loglama yapılandırması
+logger = logging.getLogger(__name__)
+
+
+def parse_segment(segment: Any) -> Dict[str, Any]:
+    """
+    İstemcinin gönderdiği JSON konuşma kaydını doğrular ve zamanlarını 'SS:DD:SS.mmm'
+    biçimine çevirir.
+
+    Args:
+        segment (Any): speaker ve text alanları zorunlu; index, start_time ve end_time alanları
+            isteğe bağlı kayıt.
+
+    Returns:
+        Dict[str, Any]: Doğrulanmış kayıt.
+
+    Raises:
+        ValueError: Kayıt sözlük değilse, speaker/text metin değilse ya da zamanlar okunamazsa.
+    """
+    if not isinstance(segment, dict):
+        raise ValueError("Konuşma kaydı bir nesne olmalıdır.")
+    speaker, text = segment.get('speaker'), segment.get('text')
+    if not isinstance(speaker, str) or not isinstance(text, str):
+        raise ValueError("Konuşmanın speaker ve text alanları metin olmalıdır.")
+    record = {'speaker': speaker, 'text': text}
+    if segment.get('index') is not None:
+        record['index'] = str(segment['index'])
+    for field in ('start_time', 'end_time'):
+        value = segment.get(field)
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise ValueError(f"Geçersiz zaman: {field}")
+        try:
+            record[field] = normalize_timestamp(value)
+            parse_timestamp(record[field])
+        except (ValueError, OverflowError):
+            raise ValueError(f"Geçersiz zaman: {field}") from None
+    return record
+
+
+class LiveTranscript(Mapping):
+    """
+    Ders sürerken büyüyen transkript.
+
+    TranscriptFrame ile aynı sözlük anahtarlarını ('speakers', 'speaker_counts',
+    'all_text', 'transcript_data') sunar; ancak her ekleme yalnızca yeni konuşmaları
+    işler: konuşmacı grupları, sayılar, konuşma süreleri ve parmak izi artımlı olarak
+    güncellenir. Birleştirilmiş metin, yeni konuşmaların metni eklenerek ilk erişimde
+    güncellenir.
+    """
+
+    KEYS = TranscriptFrame.KEYS
+
+    def __init__(self):
+        """
+        LiveTranscript sınıfını başlatır.
+        """
+        self.speakers: Dict[str, List[str]] = {}
+        self.speaker_counts: Dict[str, int] = {}
+        self.talk_time_ms: Dict[str, int] = {}
+        self._records: List[Dict[str, Any]] = []
+        self._text = ''
+        self._joined = 0
+        self._digest = hashlib.sha256()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    @property
+    def entry_count(self) -> int:
+        """
+        Konuşma sayısını döndürür.
+        """
+        return len(self._records)
+
+    @property
+    def transcript_data(self) -> List[Dict[str, Any]]:
+        """
+        Konuşmaları eklendikleri sırayla kayıt listesi olarak döndürür.
+        """
+        return self._records
+
+    @property
+    def all_text(self) -> str:
+        """
+        Tüm konuşma metinlerini birleştirilmiş olarak döndürür.
+        """
+        if self._joined < len(self._records):
+            new_text = ' '.join(record['text'] for record in self._records[self._joined:])
+            self._text = f"{self._text} {new_text}" if self._text else new_text
+            self._joined = len(self._records)
+        return self._text
+
+    def append(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Yeni konuşmaları ekler.
+
+        Kayıtların tümü önce okunur; biri geçersizse hiçbiri eklenmez, böylece konuşmalar,
+        sayılar, konuşma süreleri ve parmak izi birbiriyle tutarlı kalır.
+
+        Args:
+            records (Iterable[Dict[str, Any]]): index, start_time, end_time, speaker ve text alanlı kayıtlar.
+
+        Returns:
+            int: Eklenen konuşma sayısı.
+
+        Raises:
+            ValueError: Kayıtlardan biri geçersizse.
+        """
+        prepared = []
+        for record in records:
+            speaker, text = record['speaker'], record['text']
+            if not isinstance(speaker, str) or not isinstance(text, str):
+                raise ValueError("Konuşmanın speaker ve text alanları metin olmalıdır.")
+            start_time = record.get('start_time') or '00:00:00.000'
+            end_time = record.get('end_time') or start_time
+            duration = max(0, parse_timestamp(end_time) - parse_timestamp(start_time))
+            prepared.append(({
+                'index': str(record.get('index') or len(self._records) + len(prepared) + 1),
+                'start_time': start_time,
+                'end_time': end_time,
+                'speaker': speaker,
+                'text': text
+            }, duration))
+
+        for record, duration in prepared:
+            speaker, text = record['speaker'], record['text']
+            self._records.append(record)
+            self.speakers.setdefault(speaker, []).append(text)
+            self.speaker_counts[speaker] = self.speaker_counts.get(speaker, 0) + 1
+            self.talk_time_ms[speaker] = self.talk_time_ms.get(speaker, 0) + duration
+            # TranscriptProcessor.get_fingerprint ile aynı özet: kayıtlı ders yeniden yüklenirse sonuç kullanılır
+            self._digest.update(f"{' '.join(speaker.split())}\x1f{' '.join(text.split())}\x1e".encode('utf-8'))
+        return len(prepared)
+
+    def since(self, start: int) -> Dict[str, Any]:
+        """
+        Verilen konuşmadan sonraki bölümü işlenmiş transkript biçiminde döndürür.
+
+        Args:
+            start (int): Bölümün ilk konuşmasının sırası (0'dan başlar).
+
+        Returns:
+            Dict[str, Any]: Bölümün 'transcript_data' ve 'all_text' alanları.
+        """
+        records = self._records[start:]
+        return {
+            'transcript_data': records,
+            'all_text': ' '.join(record['text'] for record in records)
+        }
+
+    def get_fingerprint(self) -> str:
+        """
+        Şimdiye kadarki konuşmaların parmak izini döndürür (TranscriptProcessor ile aynı).
+        """
+        return self._digest.copy().hexdigest()
+
+
+class LiveLesson:
+    """
+    Zoom'dan ders sürerken gelen transkript bölümlerini biriktiren canlı ders.
+
+    Bölümler WEBVTT metin parçaları (bir konuşmanın ortasında bölünmüş olabilir) ya da
+    kayıt listesi olarak eklenir. Analiz, her seferinde yalnızca son analizden sonra
+    gelen konuşmalar ve önceki analizin kısa özeti üzerinden güncellenir; ders bitince
+    yalnızca son bölüm analiz edilip testler oluşturulur.
+
+    Paylaşılan depo verilirse her işlem önce dersi depodaki son durumla (yalnızca yeni
+    konuşmaları okuyarak) günceller ve değişiklikleri aynı yazma işleminde depoya yazar.
+    """
+
+    def __init__(self, lesson_id: Optional[str] = None, analyze_every: int = 100,
+                 store: Optional[SQLiteLiveLessonStore] = None):
+        """
+        LiveLesson sınıfını başlatır.
+
+        Args:
+            lesson_id (Optional[str]): Ders kimliği. Verilmezse yenisi üretilir.
+            analyze_every (int): Bu sayıda analiz edilmemiş konuşma birikince ara analiz yapılır.
+            store (Optional[SQLiteLiveLessonStore]): Dersin işçiler arasında paylaşıldığı depo.
+        """
+        self.id = lesson_id or uuid.uuid4().hex
+        self.analyze_every = analyze_every
+        self.transcript = LiveTranscript()
+        self.summary = None
+        self.analyzed = 0
+        self.increments = 0
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.finished = False
+        self.scheduled = False
+        self._buffer = ''
+        self._store = store
+        self._lock = threading.Lock()
+        self._analysis_lock = threading.Lock()
+
+    def _state(self) -> Dict[str, Any]:
+        """
+        Dersin konuşmalar dışındaki durumunu depoya yazılacak biçimde döndürür.
+        """
+        return {
+            'analyze_every': self.analyze_every,
+            'summary': self.summary,
+            'analyzed': self.analyzed,
+            'increments': self.increments,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'finished': self.finished,
+            'scheduled': self.scheduled,
+            'buffer': self._buffer
+        }
+
+    def _load_locked(self, conn: sqlite3.Connection) -> bool:
+        """
+        Dersin durumunu ve yeni konuşmalarını depodan okur. Kilit tutulurken çağrılmalıdır.
+
+        Returns:
+            bool: Ders depoda bulunduysa True.
+        """
+        stored = self._store.load(conn, self.id, self.transcript.entry_count)
+        if stored is None:
+            return False
+        state = stored['state']
+        self.analyze_every = state['analyze_every']
+        self.summary = state['summary']
+        self.analyzed = state['analyzed']
+        self.increments = state['increments']
+        self.created_at = state['created_at']
+        self.updated_at = state['updated_at']
+        self.finished = state['finished']
+        self.scheduled = state['scheduled']
+        self._buffer = state['buffer']
+        self.transcript.append(stored['segments'])
+        return True
+
+    @contextmanager
+    def _synced(self, write: bool = True):
+        """
+        Dersin kilidini alır; paylaşılan depo varsa dersi depodaki son durumla günceller ve
+        write verilirse değişiklikleri (durum ve yeni konuşmalar) aynı işlemde yazar.
+
+        Raises:
+            LookupError: Değiştirilmek istenen ders depoda yoksa.
+        """
+        with self._lock:
+            if self._store is None:
+                yield
+                return
+            try:
+                with self._store.transaction(write) as conn:
+                    if not self._load_locked(conn) and write:
+                        raise LookupError(f"Canlı ders bulunamadı: {self.id}")
+                    start = self.transcript.entry_count
+                    yield
+                    if write:
+                        self._store.save(conn, self.id, self._state(), start,
+                                         self.transcript.transcript_data[start:])
+            except BaseException:
+                # Yazılmayan değişiklikler bellekten de atılır; ders sonraki işlemde depodan yeniden okunur
+                self.transcript = LiveTranscript()
+                raise
+
+    def save(self) -> None:
+        """
+        Yeni dersi paylaşılan depoya yazar (depo yoksa bir şey yapmaz).
+        """
+        if self._store is None:
+            return
+        with self._lock, self._store.transaction() as conn:
+            self._store.save(conn, self.id, self._state(), 0, self.transcript.transcript_data)
+
+    def refresh(self) -> bool:
+        """
+        Dersi paylaşılan depodaki son durumla günceller.
+
+        Returns:
+            bool: Ders depoda varsa (ya da depo yoksa) True.
+        """
+        if self._store is None:
+            return True
+        with self._lock, self._store.transaction(write=False) as conn:
+            return self._load_locked(conn)
+
+    def feed(self, chunk: str) -> int:
+        """
+        WEBVTT metin parçasını ekler; tamamlanmamış son konuşma bir sonraki parçayı bekler.
+
+        Args:
+            chunk (str): Transkript metni parçası.
+
+        Returns:
+            int: Eklenen konuşma sayısı.
+        """
+        with self._synced():
+            text = (self._buffer + chunk).replace('\r\n', '\n')
+            # Konuşmalar boş satırla ayrılır; son boş satırdan sonrası henüz tamamlanmamış olabilir
+            complete, separator, buffer = text.rpartition('\n\n')
+            if not separator:
+                self._buffer = text
+                return 0
+            added = self._append_locked(parse_cues(complete.split('\n')))
+            self._buffer = buffer
+            return added
+
+    def append(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Ayrıştırılmış konuşma kayıtlarını ekler.
+
+        Args:
+            records (Iterable[Dict[str, Any]]): speaker ve text (isteğe bağlı olarak index,
+                start_time ve end_time) alanlı kayıtlar.
+
+        Returns:
+            int: Eklenen konuşma sayısı.
+        """
+        with self._synced():
+            return self._append_locked(records)
+
+    def _append_locked(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Kayıtları ekler. Kilit tutulurken çağrılmalıdır.
+
+        Raises:
+            ValueError: Ders bitmişse.
+        """
+        if self.finished:
+            raise ValueError("Ders tamamlandı, yeni konuşma eklenemez.")
+        added = self.transcript.append(records)
+        self.updated_at = time.time()
+        return added
+
+    @property
+    def pending(self) -> int:
+        """
+        Henüz analize katılmamış konuşma sayısını döndürür.
+        """
+        return self.transcript.entry_count - self.analyzed
+
+    def should_analyze(self) -> bool:
+        """
+        Ara analiz gerekiyorsa ve henüz planlanmadıysa dersi planlanmış olarak işaretler.
+
+        Returns:
+            bool: Ara analiz başlatılmalıysa True.
+        """
+        with self._synced():
+            if self.scheduled or self.finished or self.pending < self.analyze_every:
+                return False
+            self.scheduled = True
+            return True
+
+    def unschedule(self) -> None:
+        """
+        Planlanan ara analizi iptal eder (örneğin iş kuyruğu doluysa).
+        """
+        with self._synced():
+            self.scheduled = False
+
+    def analyze(self, analyzer: Any) -> Dict[str, Any]:
+        """
+        Son analizden sonra gelen konuşmaları önceki analizin özetiyle birlikte analiz eder.
+
+        Bir süreçte aynı anda yalnızca bir analiz çalışır; analiz sürerken gelen konuşmalar
+        bir sonraki analize kalır. Başka bir işçide aynı anda yapılan analiz daha fazla
+        konuşmayı kapsıyorsa onun özeti korunur.
+
+        Args:
+            analyzer (Any): analyze_increment metodu olan analizci (AIAnalyzer).
+
+        Returns:
+            Dict[str, Any]: Tüm dersi kapsayan güncel analiz sonuçları.
+        """
+        with self._analysis_lock:
+            with self._synced(write=False):
+                start, end = self.analyzed, self.transcript.entry_count
+                delta = self.transcript.since(start) if end > start else None
+                summary = self.summary
+            try:
+                if delta is None:
+                    if summary is None:
+                        return {'success': False, 'error': 'Analiz edilecek konuşma yok.'}
+                    return {'raw_analysis': summary, 'increments': self.increments, 'success': True}
+
+                result = analyzer.analyze_increment(summary, delta)
+                if not result.get('success', False):
+                    return result
+                with self._synced():
+                    if start + len(delta['transcript_data']) > self.analyzed:
+                        self.summary = result['raw_analysis']
+                        self.analyzed = start + len(delta['transcript_data'])
+                        self.increments += 1
+                logger.info("Canlı ders %s: %d yeni konuşma analize eklendi (toplam %d).",
+                            self.id[:8], len(delta['transcript_data']), self.analyzed)
+                return dict(result, increments=self.increments)
+            finally:
+                with self._synced():
+                    self.scheduled = False
+
+    def finish(self) -> bool:
+        """
+        Arabellekteki son konuşmayı ekler ve dersi yeni konuşmalara kapatır.
+
+        Returns:
+            bool: Ders bu çağrıyla kapatıldıysa True, zaten kapalıysa False.
+        """
+        with self._synced():
+            if self.finished:
+                return False
+            if self._buffer.strip():
+                self._append_locked(parse_cues(self._buffer.split('\n')))
+            self._buffer = ''
+            self.finished = True
+            return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Dersin durumunu JSON'a dönüştürülebilir biçimde döndürür.
+        """
+        with self._synced(write=False):
+            return {
+                'lesson_id': self.id,
+                'segments': self.transcript.entry_count,
+                'analyzed': self.analyzed,
+                'increments': self.increments,
+                'speaker_counts': dict(self.transcript.speaker_counts),
+                'finished': self.finished,
+                'updated_at': self.updated_at
+            }
+
+
+class LiveLessonRegistry:
+    """
+    Canlı dersleri tutar; uzun süre güncellenmeyen dersler silinir.
+
+    Paylaşılan depo verilirse dersler depoya yazılır ve her işçi dersi depodan okur; böylece
+    aynı dersin istekleri farklı gunicorn işçilerine düşebilir. Depo verilmezse dersler
+    yalnızca süreç belleğinde tutulur ve aynı dersin istekleri aynı işçiye yönlendirilmelidir.
+    """
+
+    def __init__(self, ttl_seconds: int = 4 * 3600, store: Optional[SQLiteLiveLessonStore] = None):
+        """
+        LiveLessonRegistry sınıfını başlatır.
+
+        Args:
+            ttl_seconds (int): Güncellenmeyen derslerin saklanacağı süre (saniye).
+            store (Optional[SQLiteLiveLessonStore]): İşçiler arasında paylaşılan ders deposu.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.store = store
+        self._lessons = {}
+        self._lock = threading.Lock()
+
+    def create(self, analyze_every: int = 100) -> LiveLesson:
+        """
+        Yeni bir canlı ders oluşturur.
+
+        Args:
+            analyze_every (int): Ara analizler arasındaki konuşma sayısı.
+
+        Returns:
+            LiveLesson: Oluşturulan ders.
+        """
+        lesson = LiveLesson(analyze_every=analyze_every, store=self.store)
+        lesson.save()
+        if self.store is not None:
+            self.store.sweep(time.time() - self.ttl_seconds)
+        with self._lock:
+            self._prune()
+            self._lessons[lesson.id] = lesson
+        return lesson
+
+    def get(self, lesson_id: str) -> Optional[LiveLesson]:
+        """
+        Kimliği verilen dersi döndürür.
+
+        Paylaşılan depo varsa ders depodaki son durumla güncellenir; ders başka bir işçide
+        açıldıysa depodan okunur.
+
+        Args:
+            lesson_id (str): Ders kimliği.
+
+        Returns:
+            Optional[LiveLesson]: Ders bulunamazsa None.
+        """
+        with self._lock:
+            lesson = self._lessons.get(lesson_id)
+        if self.store is None:
+            return lesson
+        if lesson is None:
+            lesson = LiveLesson(lesson_id, store=self.store)
+        if not lesson.refresh():
+            # Ders başka bir işçide silinmiş ya da süresi dolmuş
+            with self._lock:
+                self._lessons.pop(lesson_id, None)
+            return None
+        with self._lock:
+            return self._lessons.setdefault(lesson_id, lesson)
+
+    def remove(self, lesson_id: str) -> None:
+        """
+        Dersi siler.
+
+        Args:
+            lesson_id (str): Ders kimliği.
+        """
+        with self._lock:
+            self._lessons.pop(lesson_id, None)
+        if self.store is not None:
+            self.store.remove(lesson_id)
+
+    def _prune(self) -> None:
+        """
+        Süresi dolan dersleri siler. Kilit tutulurken çağrılmalıdır.
+        """
+        cutoff = time.time() - self.ttl_seconds
+        for lesson_id in [key for key, lesson in self._lessons.items() if lesson.updated_at < cutoff]:
+            del self._lessons[lesson_id]
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_live_lessons() -> LiveLessonRegistry:
+    """
+    Süreç genelindeki canlı ders kaydını döndürür.
+
+    Returns:
+        LiveLessonRegistry: Canlı ders kaydı.
+    """
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = LiveLessonRegistry(ttl_seconds=int(os.getenv("LIVE_LESSON_TTL", str(4 * 3600))),
+                                                   store=get_live_lesson_store())
+        return _default_registry
@@ -0,0 +1,172 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Iterator, Optional
+from app.utils.sqlite_util import make_parent_dirs, thread_connection
+
+# Loglama yapılandırması
+logger = logging.getLogger(__name__)
+
+
+class SQLiteLiveLessonStore:
+    """
+    Canlı derslerin durumunu ve konuşmalarını gunicorn işçileri arasında paylaşılan bir
+    SQLite veritabanında tutar.
+
+    Konuşmalar sırayla eklenir ve yeniden yazılmaz; her işçi yalnızca kendisinde olmayan
+    konuşmaları okur. Dersi değiştiren işlemler (parça ekleme, analiz planlama, analiz
+    sonucunu kaydetme, bitirme) tek bir yazma işleminde yapılır, böylece aynı dersin
+    istekleri farklı işçilere düşse de sırayla uygulanır.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        SQLiteLiveLessonStore sınıfını başlatır.
+
+        Args:
+            db_path (str): SQLite veritabanı dosyasının yolu.
+        """
+        self.db_path = db_path
+        self._local = threading.local()
+
+        make_parent_dirs(db_path)
+        conn = thread_connection(self._local, self.db_path, isolation_level=None)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS live_lessons ("
+            "id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS live_segments ("
+            "lesson_id TEXT NOT NULL, position INTEGER NOT NULL, record TEXT NOT NULL, "
+            "PRIMARY KEY (lesson_id, position))"
+        )
+
+    @contextmanager
+    def transaction(self, write: bool = True) -> Iterator[sqlite3.Connection]:
+        """
+        Okuma ya da yazma işlemi açar; yazma işlemleri veritabanında sırayla çalışır.
+
+        Args:
+            write (bool): True ise işlem başta yazma kilidi alır (BEGIN IMMEDIATE).
+
+        Yields:
+            sqlite3.Connection: İşlemin bağlantısı.
+        """
+        # Bağlantı otomatik işlem açmaz; işlem burada açıkça başlatılır
+        conn = thread_connection(self._local, self.db_path, isolation_level=None)
+        conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def load(conn: sqlite3.Connection, lesson_id: str, after: int) -> Optional[Dict[str, Any]]:
+        """
+        Dersin durumunu ve verilen sıradan sonraki konuşmalarını okur.
+
+        Args:
+            conn (sqlite3.Connection): transaction ile açılan bağlantı.
+            lesson_id (str): Ders kimliği.
+            after (int): Okuyanda bulunan konuşma sayısı.
+
+        Returns:
+            Optional[Dict[str, Any]]: 'state' ve 'segments' alanları; ders bulunamazsa None.
+        """
+        row = conn.execute("SELECT state FROM live_lessons WHERE id = ?", (lesson_id,)).fetchone()
+        if row is None:
+            return None
+        rows = conn.execute(
+            "SELECT record FROM live_segments WHERE lesson_id = ? AND position >= ? ORDER BY position",
+            (lesson_id, after)
+        ).fetchall()
+        return {'state': json.loads(row[0]), 'segments': [json.loads(record) for record, in rows]}
+
+    @staticmethod
+    def save(conn: sqlite3.Connection, lesson_id: str, state: Dict[str, Any], start: int = 0,
+             segments: Optional[List[Dict[str, Any]]] = None) -> None:
+        """
+        Dersin durumunu ve yeni konuşmalarını yazar.
+
+        Args:
+            conn (sqlite3.Connection): transaction ile açılan bağlantı.
+            lesson_id (str): Ders kimliği.
+            state (Dict[str, Any]): Dersin durumu.
+            start (int): İlk yeni konuşmanın sırası.
+            segments (Optional[List[Dict[str, Any]]]): Yeni konuşmalar.
+        """
+        conn.execute("INSERT OR REPLACE INTO live_lessons (id, state, updated_at) VALUES (?, ?, ?)",
+                     (lesson_id, json.dumps(state, ensure_ascii=False), time.time()))
+        if segments:
+            conn.executemany(
+                "INSERT INTO live_segments (lesson_id, position, record) VALUES (?, ?, ?)",
+                [(lesson_id, start + offset, json.dumps(record, ensure_ascii=False))
+                 for offset, record in enumerate(segments)]
+            )
+
+    def remove(self, lesson_id: str) -> None:
+        """
+        Dersi ve konuşmalarını siler.
+
+        Args:
+            lesson_id (str): Ders kimliği.
+        """
+        try:
+            with self.transaction() as conn:
+                conn.execute("DELETE FROM live_lessons WHERE id = ?", (lesson_id,))
+                conn.execute("DELETE FROM live_segments WHERE lesson_id = ?", (lesson_id,))
+        except sqlite3.Error as e:
+            logger.error("Canlı ders silinirken hata oluştu: %s", e)
+
+    def sweep(self, cutoff: float) -> int:
+        """
+        Verilen zamandan önce güncellenmiş dersleri ve konuşmalarını siler.
+
+        Args:
+            cutoff (float): Bu zamandan önce güncellenen dersler silinir (Unix zamanı).
+
+        Returns:
+            int: Silinen ders sayısı.
+        """
+        try:
+            with self.transaction() as conn:
+                removed = conn.execute("DELETE FROM live_lessons WHERE updated_at < ?", (cutoff,)).rowcount
+                conn.execute("DELETE FROM live_segments WHERE lesson_id NOT IN (SELECT id FROM live_lessons)")
+        except sqlite3.Error as e:
+            logger.error("Eski canlı dersler silinirken hata oluştu: %s", e)
+            return 0
+        return removed
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_live_lesson_store() -> Optional[SQLiteLiveLessonStore]:
+    """
+    Ortam değişkenlerine göre yapılandırılmış paylaşılan canlı ders deposunu döndürür.
+
+    LIVE_LESSON_STORE değişkeni 'sqlite' (varsayılan) veya 'memory' olabilir. 'memory'
+    kipinde dersler yalnızca dersi açan sürecin belleğinde tutulur (tek işçili geliştirme
+    ve testler için).
+
+    Returns:
+        Optional[SQLiteLiveLessonStore]: Canlı ders deposu; 'memory' kipinde None.
+    """
+    global _default_store
+    with _default_store_lock:
+        backend = os.getenv("LIVE_LESSON_STORE", "sqlite")
+        if backend == 'memory':
+            return None
+        if backend != 'sqlite':
+            raise ValueError(f"Bilinmeyen canlı ders deposu: {backend}")
+        if _default_store is None:
+            _default_store = SQLiteLiveLessonStore(
+                os.getenv("LIVE_LESSON_STORE_PATH", os.path.join('cache', 'live_lessons.sqlite3')))
+        return _default_store
@@ -0,0 +1,351 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Dict, List, Any, Iterator, Optional
+from app.utils.prompt_cache import PromptCache
+
+# Loglama yapılandırması
+logger = logging.getLogger(__name__)
+
+
+class LLMBackend:
+    """
+    AIAnalyzer'ın yapay zeka isteklerini gönderdiği arka uçların ortak arayüzü.
+
+    Uygulamalar: Gemini (GeminiClientManager), istek/yanıt kaydedici (RecordingBackend)
+    ve kayıtları yeniden oynatan arka uç (ReplayBackend).
+    """
+
+    model_name = ''
+
+    def configure(self) -> Any:
+        """
+        Arka ucu ilk kullanıma hazırlar.
+
+        Raises:
+            ValueError: Arka uç yapılandırılamazsa (örneğin API anahtarı ya da kayıt dosyası yoksa).
+        """
+
+    def generate(self, prompt: str, kind: str = 'default') -> str:
+        """
+        İsteği gönderir ve yanıt metnini döndürür.
+
+        Args:
+            prompt (str): Yapay zekaya gönderilecek istek.
+            kind (str): İstek türü ('analysis', 'tests', 'fused' vb.).
+
+        Returns:
+            str: Yapay zeka yanıtı.
+        """
+        raise NotImplementedError
+
+    async def generate_async(self, prompt: str, kind: str = 'default') -> str:
+        """
+        İsteği olay döngüsünü durdurmadan gönderir ve yanıt metnini döndürür.
+
+        Varsayılan olarak generate döngünün iş parçacığı havuzunda çalıştırılır; ağ
+        isteğini eşzamansız yapabilen arka uçlar bu yöntemi yeniden tanımlar ve yanıt
+        beklenirken iş parçacığı tutmaz.
+
+        Args:
+            prompt (str): Yapay zekaya gönderilecek istek.
+            kind (str): İstek türü ('analysis', 'tests', 'fused' vb.).
+
+        Returns:
+            str: Yapay zeka yanıtı.
+        """
+        return await asyncio.to_thread(self.generate, prompt, kind)
+
+    def generate_stream(self, prompt: str, kind: str = 'default') -> Iterator[str]:
+        """
+        İsteği gönderir ve yanıtı parça parça döndürür. Varsayılan olarak tek parça döndürür.
+
+        Args:
+            prompt (str): Yapay zekaya gönderilecek istek.
+            kind (str): İstek türü.
+
+        Yields:
+            str: Yanıtın bir sonraki parçası.
+        """
+        yield self.generate(prompt, kind)
+
+    def warm_up(self) -> bool:
+        """
+        Arka ucu ilk istekten önce ısındırır.
+
+        Returns:
+            bool: Isınma başarılıysa True.
+        """
+        try:
+            self.configure()
+        except ValueError as e:
+            logger.warning("Yapay zeka arka ucu hazırlanamadı: %s", e)
+            return False
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Arka ucun sağlık bilgilerini döndürür.
+
+        Returns:
+            Dict[str, Any]: En azından 'backend' ve 'healthy' alanları.
+        """
+        return {'backend': type(self).__name__, 'model': self.model_name, 'healthy': True}
+
+
+class RecordingBackend(LLMBackend):
+    """
+    İstekleri başka bir arka uca iletir ve her istek/yanıt çiftini gecikmesiyle birlikte
+    JSON satırları olarak dosyaya ekler.
+
+    İstek metni yerine yalnızca önbellek anahtarı saklanır (transkriptler kişisel veri
+    içerebilir); record_prompts verilirse istek metni de yazılır.
+    """
+
+    def __init__(self, inner: LLMBackend, path: str, record_prompts: bool = False):
+        """
+        RecordingBackend sınıfını başlatır.
+
+        Args:
+            inner (LLMBackend): İsteklerin iletileceği arka uç.
+            path (str): Kayıt dosyasının yolu (JSON satırları; tüm işçiler aynı dosyaya ekler).
+            record_prompts (bool): İstek metinlerinin de kaydedilip kaydedilmeyeceği.
+        """
+        self.inner = inner
+        self.path = path
+        self.record_prompts = record_prompts
+        self.model_name = inner.model_name
+        self._recorded = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def configure(self) -> Any:
+        return self.inner.configure()
+
+    def generate(self, prompt: str, kind: str = 'default') -> str:
+        started = time.monotonic()
+        text = self.inner.generate(prompt, kind)
+        self._write(prompt, kind, text, time.monotonic() - started)
+        return text
+
+    async def generate_async(self, prompt: str, kind: str = 'default') -> str:
+        started = time.monotonic()
+        text = await self.inner.generate_async(prompt, kind)
+        self._write(prompt, kind, text, time.monotonic() - started)
+        return text
+
+    def generate_stream(self, prompt: str, kind: str = 'default') -> Iterator[str]:
+        started = time.monotonic()
+        chunks = []
+        for chunk in self.inner.generate_stream(prompt, kind):
+            chunks.append([time.monotonic() - started, chunk])
+            yield chunk
+        self._write(prompt, kind, ''.join(chunk for _, chunk in chunks), time.monotonic() - started, chunks)
+
+    def _write(self, prompt: str, kind: str, response: str, latency: float,
+               chunks: Optional[List[List[Any]]] = None) -> None:
+        """
+        Kaydı dosyaya tek bir yazma işlemiyle ekler.
+        """
+        record = {
+            'key': PromptCache.make_key(self.model_name, prompt),
+            'kind': kind,
+            'model': self.model_name,
+            'recorded_at': time.time(),
+            'latency': latency,
+            'response': response
+        }
+        if chunks is not None:
+            record['chunks'] = chunks
+        if self.record_prompts:
+            record['prompt'] = prompt
+
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._lock:
+            # O_APPEND ile tek yazma, aynı dosyaya yazan işçilerin satırlarını karıştırmaz
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+            self._recorded += 1
+
+    def warm_up(self) -> bool:
+        return self.inner.warm_up()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.inner.stats()
+        with self._lock:
+            stats.update(recording=self.path, recorded=self._recorded)
+        return stats
+
+
+class ReplayBackend(LLMBackend):
+    """
+    Kaydedilmiş yanıtları ağ isteği yapmadan, kaydedildikleri gecikmeyle (isteğe bağlı
+    olarak ölçeklenmiş) yeniden oynatır.
+
+    Aynı istek kaydedildiyse onun yanıtı kullanılır. Kayıtta olmayan isteklerde (örneğin
+    yerel yük testlerindeki farklı transkriptler) miss_policy 'kind' ise aynı türdeki
+    kayıtlar sırayla kullanılır; böylece üretimdeki yanıt boyutları ve gecikmeler korunur.
+    """
+
+    def __init__(self, path: str, latency_scale: float = 1.0, miss_policy: str = 'kind',
+                 model_name: str = 'gemini-1.5-flash'):
+        """
+        ReplayBackend sınıfını başlatır.
+
+        Args:
+            path (str): RecordingBackend tarafından yazılan kayıt dosyası.
+            latency_scale (float): Kaydedilen gecikmelerin çarpanı (0 ise beklenmez).
+            miss_policy (str): 'kind' (aynı türdeki kayıtlardan sırayla) veya 'error'.
+            model_name (str): Kayıt anahtarları için kullanılan model adı.
+        """
+        self.path = path
+        self.latency_scale = latency_scale
+        self.miss_policy = miss_policy
+        self.model_name = model_name
+        self._by_key = None
+        self._by_kind = {}
+        self._served = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def configure(self) -> Any:
+        """
+        Kayıt dosyasını ilk kullanımda belleğe yükler.
+
+        Raises:
+            ValueError: Kayıt dosyası yoksa veya boşsa.
+        """
+        with self._lock:
+            if self._by_key is not None:
+                return
+            if not os.path.exists(self.path):
+                raise ValueError(f"Yapay zeka kayıt dosyası bulunamadı: {self.path}")
+
+            by_key = {}
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    by_key.setdefault(record['key'], deque()).append(record)
+                    self._by_kind.setdefault(record.get('kind', 'default'), deque()).append(record)
+            if not by_key:
+                raise ValueError(f"Yapay zeka kayıt dosyası boş: {self.path}")
+            self._by_key = by_key
+            logger.info("%d yapay zeka kaydı yüklendi: %s", sum(len(r) for r in by_key.values()), self.path)
+
+    def _next_record(self, prompt: str, kind: str) -> Dict[str, Any]:
+        """
+        İsteğe karşılık gelen kaydı seçer; aynı anahtarın ya da türün kayıtları sırayla döner.
+        """
+        self.configure()
+        with self._lock:
+            self._served += 1
+            records = self._by_key.get(PromptCache.make_key(self.model_name, prompt))
+            if records is None:
+                self._misses += 1
+                records = self._by_kind.get(kind) if self.miss_policy == 'kind' else None
+                if not records:
+                    raise KeyError(f"İsteğe karşılık gelen kayıt yok (tür: {kind}).")
+            record = records[0]
+            records.rotate(-1)
+            return record
+
+    def generate(self, prompt: str, kind: str = 'default') -> str:
+        record = self._next_record(prompt, kind)
+        time.sleep(record['latency'] * self.latency_scale)
+        return record['response']
+
+    async def generate_async(self, prompt: str, kind: str = 'default') -> str:
+        record = self._next_record(prompt, kind)
+        await asyncio.sleep(record['latency'] * self.latency_scale)
+        return record['response']
+
+    def generate_stream(self, prompt: str, kind: str = 'default') -> Iterator[str]:
+        record = self._next_record(prompt, kind)
+        chunks = record.get('chunks') or [[record['latency'], record['response']]]
+        started = time.monotonic()
+        for offset, chunk in chunks:
+            delay = offset * self.latency_scale - (time.monotonic() - started)
+            if delay > 0:
+                time.sleep(delay)
+            yield chunk
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'backend': 'replay',
+                'model': self.model_name,
+                'recording': self.path,
+                'loaded': self._by_key is not None,
+                'served': self._served,
+                'misses': self._misses,
+                'latency_scale': self.latency_scale,
+                'healthy': self._by_key is not None or os.path.exists(self.path)
+            }
+
+
+_default_backend = None
+_default_backend_lock = threading.Lock()
+
+
+def set_llm_backend(backend: Optional[LLMBackend]) -> None:
+    """
+    Süreç genelindeki arka ucu değiştirir (örneğin ölçümlerde yerel model kullanmak için).
+
+    Args:
+        backend (Optional[LLMBackend]): Yeni arka uç. None verilirse bir sonraki
+            get_llm_backend çağrısında ortam değişkenlerine göre yeniden oluşturulur.
+    """
+    global _default_backend
+    with _default_backend_lock:
+        _default_backend = backend
+
+
+def get_llm_backend(model_name: Optional[str] = None) -> LLMBackend:
+    """
+    Ortam değişkenlerine göre yapılandırılmış süreç genelindeki yapay zeka arka ucunu döndürür.
+
+    LLM_BACKEND 'gemini' (varsayılan) veya 'replay' olabilir; LLM_RECORD_PATH verilirse
+    arka ucun tüm istek ve yanıtları bu dosyaya kaydedilir.
+
+    Args:
+        model_name (Optional[str]): Arka uç ilk kez oluşturulurken kullanılacak model adı.
+
+    Returns:
+        LLMBackend: Yapay zeka arka ucu.
+    """
+    global _default_backend
+    with _default_backend_lock:
+        if _default_backend is None:
+            kind = os.getenv("LLM_BACKEND", "gemini")
+            if kind == 'replay':
+                backend = ReplayBackend(
+                    os.getenv("LLM_REPLAY_PATH", os.path.join('cache', 'llm_recording.jsonl')),
+                    latency_scale=float(os.getenv("LLM_REPLAY_LATENCY_SCALE", "1")),
+                    miss_policy=os.getenv("LLM_REPLAY_MISS", "kind"),
+                    model_name=model_name or os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+                )
+            elif kind == 'gemini':
+                # gemini_client bu modüldeki arayüzü kullandığı için burada içe aktarılır
+                from app.utils.gemini_client import get_gemini_client
+                backend = get_gemini_client(model_name)
+            else:
+                raise ValueError(f"Bilinmeyen yapay zeka arka ucu: {kind}")
+
+            record_path = os.getenv("LLM_RECORD_PATH")
+            if record_path:
+                backend = RecordingBackend(backend, record_path,
+                                           record_prompts=os.getenv("LLM_RECORD_PROMPTS", "0") == "1")
+            _default_backend = backend
+        return _default_backend
@@ -0,0 +1,274 @@
+import os
+import atexit
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from app.utils.sqlite_util import make_parent_dirs, thread_connection
+
+# Loglama yapılandırması
+logger = logging.getLogger(__name__)
+
+# Süre histogramlarının varsayılan üst sınırları (saniye)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Uygulamanın ürettiği ölçümler: ad -> (tür, açıklama)
+METRIC_DEFINITIONS = {
+    'flai_stage_duration_seconds': (
+        'histogram', "Yükleme işinin aşamalarının süresi (parse, compress, analyze, generate, question_bank, "
+                     "process_tests, render_html)."),
+    'flai_llm_request_duration_seconds': ('histogram', "Yapay zeka isteklerinin süresi."),
+    'flai_llm_tokens_total': ('counter', "Yapay zeka isteklerinde kullanılan token sayısı."),
+    'flai_llm_errors_total': ('counter', "Başarısız yapay zeka istekleri."),
+    'flai_llm_retries_total': ('counter', "Geçici hatalar nedeniyle yeniden denenen yapay zeka istekleri."),
+    'flai_prompt_cache_requests_total': ('counter', "Yanıt önbelleği aramaları (sonuca göre)."),
+    'flai_transcript_tokens_total': (
+        'counter', "Yapay zekaya gönderilen transkriptlerin sıkıştırma öncesi ve sonrası token sayısı."),
+    'flai_question_bank_requests_total': ('counter', "Soru bankası aramaları (sonuca göre)."),
+    'flai_result_reuse_total': ('counter', "Daha önce işlenmiş transkript için kayıtlı sonucun kullanılması."),
+    'flai_fallbacks_total': (
+        'counter', "Yedek yola geçişler (örnek testler, bankadan örnek testler, iki adımlı kip, tek seferlik istek)."),
+    'flai_response_bytes_total': ('counter', "Sıkıştırılan yanıtların sıkıştırma öncesi ve sonrası bayt sayısı."),
+}
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """
+    Etiketleri Prometheus metin biçimine çevirir (anahtar sırasıyla).
+    """
+    return ','.join(
+        '{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in sorted(labels.items())
+    )
+
+
+def _format_value(value: float) -> str:
+    """
+    Sayıyı Prometheus metin biçimine çevirir.
+    """
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsRegistry:
+    """
+    Sayaç ve histogramları tutar ve Prometheus metin biçiminde sunar.
+
+    Her süreç ölçümleri bellekte biriktirir; arka plandaki bir iş parçacığı birikenleri
+    düzenli aralıklarla paylaşılan SQLite veritabanına ekler. Böylece /metrics hangi
+    gunicorn işçisine düşerse düşsün tüm işçilerin toplamını döndürür. Veritabanı yolu
+    verilmezse ölçümler yalnızca süreç içinde tutulur.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, flush_interval: float = 1.0,
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS, enabled: bool = True):
+        """
+        MetricsRegistry sınıfını başlatır.
+
+        Args:
+            db_path (Optional[str]): Paylaşılan SQLite veritabanının yolu.
+            flush_interval (float): Biriken ölçümlerin veritabanına yazılma aralığı (saniye).
+            buckets (Tuple[float, ...]): Histogram aralıklarının üst sınırları.
+            enabled (bool): False ise ölçümler kaydedilmez.
+        """
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.buckets = tuple(sorted(buckets))
+        self.enabled = enabled
+        self._pending = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._worker = None
+        self._worker_pid = None
+
+        if db_path:
+            make_parent_dirs(db_path)
+            with thread_connection(self._local, self.db_path) as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS metrics ("
+                    "sample TEXT NOT NULL, labels TEXT NOT NULL, value REAL NOT NULL, "
+                    "PRIMARY KEY (sample, labels))"
+                )
+
+    def _ensure_worker(self) -> None:
+        """
+        Yazma iş parçacığını ilk kullanımda (ve fork sonrasında yeniden) başlatır.
+        Kilit tutulurken çağrılmalıdır.
+        """
+        if self._worker is None or self._worker_pid != os.getpid():
+            # Fork öncesinde birikmiş ölçümler üst sürece aittir
+            self._pending = {}
+            self._worker = threading.Thread(target=self._run, name='metrics-writer', daemon=True)
+            self._worker_pid = os.getpid()
+            self._worker.start()
+            # Süreç kapanırken son birikenleri de yaz
+            atexit.register(self.flush)
+
+    def _run(self) -> None:
+        """
+        Biriken ölçümleri düzenli aralıklarla veritabanına yazar.
+        """
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def _add(self, samples: List[Tuple[str, str, float]]) -> None:
+        """
+        Örnek değerlerini birikenlere ekler.
+        """
+        with self._lock:
+            if self.db_path:
+                self._ensure_worker()
+            for sample, labels, value in samples:
+                key = (sample, labels)
+                self._pending[key] = self._pending.get(key, 0.0) + value
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        """
+        Sayacı artırır.
+
+        Args:
+            name (str): Sayaç adı ('_total' ile biter).
+            value (float): Artış miktarı.
+            **labels (str): Etiketler.
+        """
+        if not self.enabled:
+            return
+        self._add([(name, _format_labels(labels), value)])
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """
+        Histograma bir gözlem ekler.
+
+        Args:
+            name (str): Histogram adı.
+            value (float): Gözlenen değer.
+            **labels (str): Etiketler.
+        """
+        if not self.enabled:
+            return
+        base = _format_labels(labels)
+        prefix = base + ',' if base else ''
+        # Tüm aralıklar yazılır ki histogram ilk gözlemden itibaren eksiksiz olsun
+        samples = [(name + '_bucket', f'{prefix}le="{_format_value(bound)}"', 1.0 if value <= bound else 0.0)
+                   for bound in self.buckets]
+        samples.append((name + '_bucket', f'{prefix}le="+Inf"', 1.0))
+        samples.append((name + '_sum', base, value))
+        samples.append((name + '_count', base, 1.0))
+        self._add(samples)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str):
+        """
+        Bloğun süresini histograma ekler.
+
+        Args:
+            name (str): Histogram adı.
+            **labels (str): Etiketler.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def flush(self) -> None:
+        """
+        Biriken ölçümleri veritabanına (veya süreç içi toplamlara) ekler.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if not self.db_path:
+                for key, value in pending.items():
+                    self._totals[key] = self._totals.get(key, 0.0) + value
+                return
+        if not pending:
+            return
+
+        try:
+            with thread_connection(self._local, self.db_path) as conn:
+                conn.executemany(
+                    "INSERT INTO metrics (sample, labels, value) VALUES (?, ?, ?) "
+                    "ON CONFLICT (sample, labels) DO UPDATE SET value = value + excluded.value",
+                    [(sample, labels, value) for (sample, labels), value in pending.items()]
+                )
+        except sqlite3.Error as e:
+            logger.warning("Ölçümler yazılırken hata oluştu: %s", e)
+            # Yazılamayan ölçümleri bir sonraki denemeye bırak
+            with self._lock:
+                for key, value in pending.items():
+                    self._pending[key] = self._pending.get(key, 0.0) + value
+
+    def collect(self) -> Dict[Tuple[str, str], float]:
+        """
+        Tüm işçilerin ölçüm toplamlarını döndürür.
+
+        Returns:
+            Dict[Tuple[str, str], float]: (örnek adı, etiketler) -> değer.
+        """
+        self.flush()
+        if not self.db_path:
+            with self._lock:
+                return dict(self._totals)
+        try:
+            conn = thread_connection(self._local, self.db_path)
+            rows = conn.execute("SELECT sample, labels, value FROM metrics").fetchall()
+        except sqlite3.Error as e:
+            logger.warning("Ölçümler okunurken hata oluştu: %s", e)
+            return {}
+        return {(sample, labels): value for sample, labels, value in rows}
+
+    def render(self) -> str:
+        """
+        Ölçümleri Prometheus metin biçiminde döndürür.
+
+        Returns:
+            str: /metrics yanıtı.
+        """
+        samples = self.collect()
+        lines = []
+        for name, (kind, description) in METRIC_DEFINITIONS.items():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            names = (name,) if kind == 'counter' else (name + '_bucket', name + '_sum', name + '_count')
+            rows = [(sample, labels, value) for (sample, labels), value in samples.items() if sample in names]
+            for sample, labels, value in sorted(rows, key=self._sort_key):
+                lines.append(f"{sample}{{{labels}}} {_format_value(value)}" if labels
+                             else f"{sample} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _sort_key(row: Tuple[str, str, float]) -> Tuple[str, int, float]:
+        """
+        Örnekleri etiketlere, ardından aralık, toplam ve sayı sırasıyla ve üst sınıra göre sıralar.
+        """
+        sample, labels, _ = row
+        base, _, bound = labels.partition('le="')
+        bound = bound.rstrip('"')
+        order = 2 if sample.endswith('_count') else 1 if sample.endswith('_sum') else 0
+        return base.rstrip(','), order, float('inf') if bound == '+Inf' else float(bound or 0)
+
+
+_default_metrics = None
+_default_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """
+    Ortam değişkenlerine göre yapılandırılmış süreç genelindeki ölçüm kaydını döndürür.
+
+    Returns:
+        MetricsRegistry: Ölçüm kaydı (METRICS_ENABLED=0 ise ölçüm kaydetmez).
+    """
+    global _default_metrics
+    with _default_metrics_lock:
+        if _default_metrics is None:
+            enabled = os.getenv("METRICS_ENABLED", "1") == "1"
+            _default_metrics = MetricsRegistry(
+                os.getenv("METRICS_PATH", os.path.join('cache', 'metrics.sqlite3')) if enabled else None,
+                flush_interval=float(os.getenv("METRICS_FLUSH_INTERVAL", "1")),
+                enabled=enabled
+            )
+        return _default_metrics
@@ -0,0 +1,610 @@
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from contextlib import contextmanager
+from typing import Dict, List, Any, Callable, IO, Optional, Tuple
+from app.utils.job_queue import Job, JobError
+from app.utils.transcript_processor import TranscriptProcessor
+from app.utils.transcript_compressor import get_transcript_compressor
+from app.utils.ai_analyzer import AIAnalyzer
+from app.utils.test_generator import TestGenerator
+from app.utils.result_store import get_result_store
+from app.utils.question_bank import QuestionBank, get_question_bank, lesson_profile
+from app.utils.live_lesson import LiveLesson, get_live_lessons
+from app.utils.metrics import get_metrics
+
+# Loglama yapılandırması
+logger = logging.getLogger(__name__)
+
+# Yükleme işinin aşamaları (sırasıyla)
+PIPELINE_STAGES = ['parse', 'analyze', 'generate']
+
+# Birleşik kipte analiz ve test oluşturma tek bir aşamadır
+FUSED_PIPELINE_STAGES = ['parse', 'analyze_generate']
+
+# Canlı ders bitince yalnızca son bölüm analiz edilip testler oluşturulur
+LIVE_PIPELINE_STAGES = ['analyze', 'generate']
+
+# Toplu işlemede ayrıştırma ayrı süreçlerde yapılır; iş yalnızca yapay zeka aşamalarını izler
+BATCH_PIPELINE_STAGES = ['analyze', 'generate']
+
+# Başarısız yapay zeka çağrılarının iş hatası mesajları
+_CALL_ERRORS = {
+    'analyze': 'Analiz başarısız oldu.',
+    'generate': 'Test oluşturma başarısız oldu.'
+}
+
+
+def pipeline_stages(mode: str) -> List[str]:
+    """
+    Çalışma kipine göre işin aşamalarını döndürür.
+
+    Args:
+        mode (str): 'two_step' veya 'fused'.
+
+    Returns:
+        List[str]: Aşama adları.
+    """
+    return FUSED_PIPELINE_STAGES if mode == 'fused' else PIPELINE_STAGES
+
+
+def run_pipeline(job: Job, upload: IO[bytes], filename: str, force_regenerate: bool = False,
+                 mode: str = 'two_step', stream: bool = False) -> Dict[str, Any]:
+    """
+    Yüklenen transkripti ayrıştırır, analiz eder ve testleri oluşturur.
+
+    Transkript yapay zekaya gönderilmeden önce (TRANSCRIPT_COMPRESSION kapalı değilse)
+    dolgu seslerinden ve dinleyici onaylarından arındırılıp sıkıştırılır; sıkıştırma
+    oranı sonuç kaydına yazılır.
+
+    Aynı içerikli bir transkript daha önce işlendiyse, force_regenerate verilmedikçe
+    yapay zekaya istek gönderilmeden önceki sonuç döndürülür.
+
+    'two_step' kipinde analiz ve test oluşturma iki ayrı istekle, 'fused' kipinde tek
+    istekle yapılır; birleşik yanıt kullanılamazsa iki adımlı kipe geri dönülür.
+
+    'two_step' kipinde soru bankasında dersin yeni kelimelerini yeterince kapsayan sorular
+    varsa (force_regenerate verilmedikçe) testler yapay zekaya sorulmadan bankadan verilir;
+    yapay zekanın oluşturduğu ve doğrulanan sorular bankaya eklenir.
+
+    stream verilirse (yalnızca 'two_step' kipinde) analiz sonucu ve oluşturulan her soru,
+    test oluşturma bitmeden işin olaylarına ('analysis', 'question') eklenir.
+
+    Args:
+        job (Job): İlerlemenin kaydedileceği iş.
+        upload (IO[bytes]): Yüklenen transkripti içeren geçici akış; iş bitince kapatılır.
+        filename (str): Yüklenen dosyanın adı (biçimi belirlemek için).
+        force_regenerate (bool): Önceki sonucu, soru bankasını ve yanıt önbelleğini yok sayıp
+            analizi ve testleri yapay zekaya yeniden oluşturtur.
+        mode (str): 'two_step' veya 'fused'.
+        stream (bool): Soruları oluşturuldukça işin olaylarına ekler.
+
+    Returns:
+        Dict[str, Any]: Sonuç deposundaki kaydın kimliği ve yapay zeka gecikmeleri.
+
+    Raises:
+        JobError: Aşamalardan biri başarısız olursa.
+    """
+    processed_data, fingerprint, compression = _parse_upload(job, upload, filename)
+    if not force_regenerate:
+        reused = _reuse_result(job, fingerprint, pipeline_stages(mode)[1:])
+        if reused is not None:
+            return reused
+    return _run_model_stages(job, processed_data, fingerprint, compression, force_regenerate, mode, stream)
+
+
+async def run_pipeline_async(job: Job, upload: IO[bytes], filename: str, force_regenerate: bool = False,
+                             mode: str = 'two_step', stream: bool = False) -> Dict[str, Any]:
+    """
+    run_pipeline'ın asyncio olay döngüsünde çalışan karşılığı (JOB_RUNNER=async).
+
+    Analiz ve test oluşturma istekleri eşzamansız gönderilir; yanıt beklenirken iş parçacığı
+    tutulmaz. Ayrıştırma, sıkıştırma, soru bankası araması ve testlerin işlenip kaydedilmesi
+    döngünün iş parçacığı havuzunda çalışır. 'fused' kipi ve akış kipi yapay zekayı eşzamanlı
+    arayüzle çağırdığından bu kiplerin yapay zeka aşamaları da havuzda çalışır.
+
+    Argümanlar, dönüş değeri ve hatalar run_pipeline ile aynıdır.
+    """
+    processed_data, fingerprint, compression = await asyncio.to_thread(_parse_upload, job, upload, filename)
+    if not force_regenerate:
+        reused = await asyncio.to_thread(_reuse_result, job, fingerprint, pipeline_stages(mode)[1:])
+        if reused is not None:
+            return reused
+    if mode == 'fused' or stream:
+        return await asyncio.to_thread(_run_model_stages, job, processed_data, fingerprint, compression,
+                                       force_regenerate, mode, stream)
+
+    analyzer, bank, latency = _model_setup(force_regenerate, mode)
+    with _stage(job, 'analyze'):
+        started = time.time()
+        analysis_result = await analyzer.analyze_transcript_async(processed_data)
+        _check_call(latency, 'analyze', started, analysis_result)
+    with _stage(job, 'generate'):
+        tests_result, profile = await asyncio.to_thread(_bank_tests, job, None if force_regenerate else bank,
+                                                        analysis_result, processed_data, False)
+        if tests_result is None:
+            started = time.time()
+            tests_result = await analyzer.generate_tests_async(analysis_result, processed_data)
+            _check_call(latency, 'generate', started, tests_result)
+
+    return await asyncio.to_thread(_store_result, analysis_result, tests_result, processed_data, fingerprint,
+                                   latency, bank, profile, compression=compression)
+
+
+def _parse_upload(job: Job, upload: IO[bytes],
+                  filename: str) -> Tuple[Dict[str, Any], str, Optional[Dict[str, Any]]]:
+    """
+    Yüklenen transkripti ayrıştırır ve sıkıştırır ('parse' aşaması).
+
+    Returns:
+        Tuple[Dict[str, Any], str, Optional[Dict[str, Any]]]: Transkript, parmak izi ve sıkıştırma istatistikleri.
+
+    Raises:
+        JobError: Transkript yüklenemezse.
+    """
+    with _stage(job, 'parse'):
+        try:
+            processor = TranscriptProcessor(filename)
+            if not processor.load_transcript(stream=upload):
+                raise JobError('Transkript yüklenemedi.')
+            processed_data = processor.process_transcript()
+            fingerprint = processor.get_fingerprint()
+        finally:
+            # Geçici akışı kapat (disk üzerindeyse silinir)
+            upload.close()
+
+        processed_data, compression = compress_transcript(processed_data)
+    return processed_data, fingerprint, compression
+
+
+def _reuse_result(job: Job, fingerprint: str, stages: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Aynı ders daha önce işlendiyse kayıtlı sonucu döndürür ve kalan aşamaları atlanmış olarak işaretler.
+
+    Returns:
+        Optional[Dict[str, Any]]: Kayıtlı sonucun kimliği; ders işlenmemişse None.
+    """
+    result_id = get_result_store().lookup(fingerprint)
+    if result_id is None:
+        return None
+    logger.info("Transkript daha önce işlenmiş, kayıtlı sonuç kullanılıyor: %s", fingerprint[:12])
+    for stage in stages:
+        job.skip(stage)
+    get_metrics().inc('flai_result_reuse_total')
+    return {'result_id': result_id, 'reused': True}
+
+
+def _model_setup(force_regenerate: bool, mode: str) -> Tuple[AIAnalyzer, Optional[QuestionBank], Dict[str, Any]]:
+    """
+    Yapay zeka aşamalarının analizcisini, soru bankasını ve gecikme kaydını hazırlar.
+
+    Returns:
+        Tuple[AIAnalyzer, Optional[QuestionBank], Dict[str, Any]]: Analizci (force_regenerate
+            verilirse yanıt önbelleğini atlar), soru bankası ve gecikmeler.
+    """
+    return AIAnalyzer(bypass_cache=force_regenerate), get_question_bank(), {'mode': mode}
+
+
+def _run_model_stages(job: Job, processed_data: Dict[str, Any], fingerprint: str,
+                      compression: Optional[Dict[str, Any]], force_regenerate: bool, mode: str,
+                      stream: bool) -> Dict[str, Any]:
+    """
+    Ayrıştırılmış transkriptin analizini ve testlerini kipe göre oluşturur ve sonucu kaydeder.
+
+    Returns:
+        Dict[str, Any]: Sonuç deposundaki kaydın kimliği ve yapay zeka gecikmeleri.
+
+    Raises:
+        JobError: Aşamalardan biri başarısız olursa.
+    """
+    analyzer, bank, latency = _model_setup(force_regenerate, mode)
+    profile = None
+    if mode == 'fused':
+        with _stage(job, 'analyze_generate'):
+            started = time.time()
+            analysis_result, tests_result = analyzer.analyze_and_generate(processed_data)
+            latency['analyze_generate'] = time.time() - started
+            if not tests_result.get('success', False):
+                # Birleşik yanıt kullanılamadı, iki adımlı kipe geri dön
+                logger.warning("Birleşik yanıt kullanılamadı, iki adımlı kipe geçiliyor.")
+                latency['mode'] = 'fused_fallback'
+                get_metrics().inc('flai_fallbacks_total', kind='fused_to_two_step')
+                analysis_result = _analyze(analyzer, processed_data, latency)
+                tests_result = _generate(analyzer, analysis_result, processed_data, latency)
+    else:
+        with _stage(job, 'analyze'):
+            analysis_result = _analyze(analyzer, processed_data, latency)
+        with _stage(job, 'generate'):
+            tests_result, profile = _generate_tests(job, analyzer, None if force_regenerate else bank,
+                                                    analysis_result, processed_data, latency, stream)
+
+    return _store_result(analysis_result, tests_result, processed_data, fingerprint, latency, bank, profile,
+                         compression=compression)
+
+
+def run_batch_lesson(job: Job, processed_data: Dict[str, Any], fingerprint: str,
+                     analysis_result: Optional[Dict[str, Any]] = None,
+                     on_analyzed: Optional[Callable[[Dict[str, Any]], None]] = None,
+                     compression: Optional[Dict[str, Any]] = None, force_regenerate: bool = False,
+                     analyzer: Optional[AIAnalyzer] = None) -> Dict[str, Any]:
+    """
+    Toplu işlemede ayrıştırılmış bir dersin analizini ve testlerini oluşturur.
+
+    Ders daha önce işlendiyse kayıtlı sonuç kullanılır. Analiz yarıda kalmış önceki bir
+    çalışmadan biliniyorsa yapay zekaya yeniden sorulmaz; yeni analiz on_analyzed ile
+    testler oluşturulmadan önce bildirilir.
+
+    Args:
+        job (Job): İlerlemenin kaydedileceği iş ('analyze' ve 'generate' aşamaları).
+        processed_data (Dict[str, Any]): İşlenmiş (ve sıkıştırılmış) transkript.
+        fingerprint (str): Transkriptin parmak izi.
+        analysis_result (Optional[Dict[str, Any]]): Önceki çalışmadan kalan analiz.
+        on_analyzed (Optional[Callable]): Yeni analiz sonucunu alan işlev.
+        compression (Optional[Dict[str, Any]]): Sonuç kaydına yazılacak sıkıştırma istatistikleri.
+        force_regenerate (bool): Kayıtlı sonucu, soru bankasını ve yanıt önbelleğini kullanmaz.
+        analyzer (Optional[AIAnalyzer]): Kullanılacak analizci. Verilmezse yenisi oluşturulur.
+
+    Returns:
+        Dict[str, Any]: Sonuç deposundaki kaydın kimliği ve yeniden kullanılıp kullanılmadığı.
+
+    Raises:
+        JobError: Aşamalardan biri başarısız olursa.
+    """
+    if not force_regenerate:
+        result_id = get_result_store().lookup(fingerprint)
+        if result_id is not None:
+            for stage in BATCH_PIPELINE_STAGES:
+                job.skip(stage)
+            get_metrics().inc('flai_result_reuse_total')
+            return {'result_id': result_id, 'reused': True}
+
+    if analyzer is None:
+        analyzer = AIAnalyzer(bypass_cache=force_regenerate)
+    elif force_regenerate:
+        analyzer.bypass_cache = True
+    bank = get_question_bank()
+    latency = {'mode': 'batch'}
+    if analysis_result is None:
+        with _stage(job, 'analyze'):
+            analysis_result = _analyze(analyzer, processed_data, latency)
+        if on_analyzed is not None:
+            on_analyzed(analysis_result)
+    else:
+        job.skip('analyze')
+    with _stage(job, 'generate'):
+        tests_result, profile = _generate_tests(job, analyzer, None if force_regenerate else bank,
+                                                analysis_result, processed_data, latency, False)
+
+    return _store_result(analysis_result, tests_result, processed_data, fingerprint, latency, bank, profile,
+                         compression=compression)
+
+
+def run_live_analysis(job: Job, lesson: LiveLesson) -> Dict[str, Any]:
+    """
+    Canlı dersin analizini son analizden sonra gelen konuşmalarla günceller.
+
+    Args:
+        job (Job): İlerlemenin kaydedileceği iş ('analyze' aşaması).
+        lesson (LiveLesson): Canlı ders.
+
+    Returns:
+        Dict[str, Any]: Dersin durumu.
+
+    Raises:
+        JobError: Analiz başarısız olursa.
+    """
+    with _stage(job, 'analyze'):
+        if not lesson.analyze(AIAnalyzer()).get('success', False):
+            raise JobError('Canlı ders analizi başarısız oldu.')
+    return lesson.to_dict()
+
+
+def run_live_pipeline(job: Job, lesson: LiveLesson, stream: bool = False) -> Dict[str, Any]:
+    """
+    Biten canlı dersin testlerini oluşturur.
+
+    Dersin büyük kısmı ders sürerken ara analizlerle işlendiği için burada yalnızca son
+    ara analizden sonra gelen konuşmalar analiz edilir; ardından testler run_pipeline'daki
+    gibi (soru bankası ve akış kipi dahil) oluşturulup sonuç deposuna yazılır. Sonuç,
+    dersin kaydı sonradan yüklenirse yeniden kullanılmak üzere transkript parmak izine bağlanır.
+
+    Args:
+        job (Job): İlerlemenin kaydedileceği iş ('analyze' ve 'generate' aşamaları).
+        lesson (LiveLesson): Canlı ders.
+        stream (bool): Soruları oluşturuldukça işin olaylarına ekler.
+
+    Returns:
+        Dict[str, Any]: Sonuç deposundaki kaydın kimliği ve yapay zeka gecikmeleri.
+
+    Raises:
+        JobError: Derste konuşma yoksa veya aşamalardan biri başarısız olursa.
+    """
+    lesson.finish()
+    transcript = lesson.transcript
+    if transcript.entry_count == 0:
+        raise JobError('Canlı derste konuşma yok.')
+
+    analyzer, bank, latency = _model_setup(False, 'live')
+    with _stage(job, 'analyze'):
+        started = time.time()
+        analysis_result = lesson.analyze(analyzer)
+        _check_call(latency, 'analyze', started, analysis_result)
+    with _stage(job, 'generate'):
+        tests_result, profile = _generate_tests(job, analyzer, bank, analysis_result, transcript, latency, stream)
+
+    result = _store_result(analysis_result, tests_result, transcript, transcript.get_fingerprint(), latency, bank,
+                           profile, live={'segments': transcript.entry_count, 'increments': lesson.increments})
+    get_live_lessons().remove(lesson.id)
+    return result
+
+
+def compress_transcript(processed_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Sıkıştırma açıksa transkripti yapay zekaya gönderilmeden önce sıkıştırır.
+
+    Returns:
+        Tuple[Dict[str, Any], Optional[Dict[str, Any]]]: Transkript ve sıkıştırma istatistikleri
+            (sıkıştırma kapalıysa None).
+    """
+    compressor = get_transcript_compressor()
+    if compressor is None:
+        return processed_data, None
+    with get_metrics().timer('flai_stage_duration_seconds', stage='compress'):
+        processed_data = compressor.compress(processed_data)
+    compression = processed_data.stats
+    logger.info("Transkript sıkıştırıldı: %d -> %d token (oran %.2f)",
+                compression['original_tokens'], compression['compressed_tokens'], compression['ratio'])
+    get_metrics().inc('flai_transcript_tokens_total', compression['original_tokens'], stage='original')
+    get_metrics().inc('flai_transcript_tokens_total', compression['compressed_tokens'], stage='compressed')
+    return processed_data, compression
+
+
+def _generate_tests(job: Job, analyzer: AIAnalyzer, bank: Optional[QuestionBank], analysis_result: Dict[str, Any],
+                    processed_data: Dict[str, Any], latency: Dict[str, Any],
+                    stream: bool) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Testleri soru bankasından ya da yapay zekadan (akış kipinde veya tek seferde) alır.
+
+    Returns:
+        Tuple[Dict[str, Any], Optional[Dict[str, Any]]]: Testler ve bankada aranan dersin bilgileri.
+
+    Raises:
+        JobError: Test oluşturma başarısız olursa.
+    """
+    tests_result, profile = _bank_tests(job, bank, analysis_result, processed_data, stream)
+    if tests_result is None and stream:
+        tests_result = _generate_stream(job, analyzer, analysis_result, processed_data, latency)
+    elif tests_result is None:
+        tests_result = _generate(analyzer, analysis_result, processed_data, latency)
+    return tests_result, profile
+
+
+def _bank_tests(job: Job, bank: Optional[QuestionBank], analysis_result: Dict[str, Any],
+                processed_data: Dict[str, Any],
+                stream: bool) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Test oluşturmanın yapay zekadan önceki adımları: akış kipinde analizi işin olaylarına
+    ekler ve testleri soru bankasından vermeye çalışır. Eşzamansız yol bu işlevi iş
+    parçacığı havuzunda çalıştırır.
+
+    Returns:
+        Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]: Bankadan gelen testler (banka
+            yoksa ya da yetersizse None) ve bankada aranan dersin bilgileri.
+    """
+    if stream:
+        job.publish('analysis', {'analysis': compact_analysis(analysis_result.get('raw_analysis', ''))})
+    if bank is None:
+        return None, None
+    profile = lesson_profile(analysis_result, processed_data)
+    return _from_bank(job, bank, profile, stream), profile
+
+
+def _store_result(analysis_result: Dict[str, Any], tests_result: Dict[str, Any], processed_data: Dict[str, Any],
+                  fingerprint: str, latency: Dict[str, Any], bank: Optional[QuestionBank],
+                  profile: Optional[Dict[str, Any]], **extra: Any) -> Dict[str, Any]:
+    """
+    Sonucu gösterime hazır sorularla birlikte depoya yazar, parmak izine bağlar ve yapay
+    zekanın oluşturduğu doğrulanmış soruları bankaya ekler.
+
+    Returns:
+        Dict[str, Any]: Sonuç kimliği, gecikmeler, testlerin kaynağı ve extra alanları.
+    """
+    latency['llm_total'] = sum(value for key, value in latency.items() if key not in ('mode', 'first_question'))
+    logger.info("Yapay zeka gecikmesi (%s): %.2f sn", latency['mode'], latency['llm_total'])
+
+    # Sonuçları sunucu tarafındaki depoya, gösterime hazır sorularla birlikte yaz
+    store = get_result_store()
+    rendered = render_result(analysis_result, tests_result)
+    result_id = store.put(dict(
+        rendered,
+        analysis_result=analysis_result,
+        tests_result=tests_result,
+        latency=latency,
+        **extra
+    ))
+    store.link(fingerprint, result_id)
+    # İş tamamlandı olarak işaretlenmeden önce sonucu kalıcı hale getir; sonuç isteği
+    # başka bir işçiye düşse de kaydı bulur
+    store.flush()
+
+    # Yapay zekanın oluşturduğu doğrulanmış soruları sonraki dersler için bankaya ekle
+    if bank is not None and tests_result.get('source') == 'model':
+        bank.add(profile or lesson_profile(analysis_result, processed_data),
+                 rendered['rendered_tests']['processed_tests'], fingerprint)
+
+    return dict({'result_id': result_id, 'reused': False, 'latency': latency,
+                 'tests_source': tests_result.get('source')}, **extra)
+
+
+@contextmanager
+def _stage(job: Job, name: str):
+    """
+    Aşamayı işte ilerleme olarak kaydeder ve süresini aşama histogramına ekler.
+    """
+    with job.stage(name), get_metrics().timer('flai_stage_duration_seconds', stage=name):
+        yield
+
+
+def _from_bank(job: Job, bank: QuestionBank, profile: Dict[str, Any], stream: bool) -> Optional[Dict[str, Any]]:
+    """
+    Dersin testlerini soru bankasından vermeye çalışır; akış kipinde sorular işin olaylarına eklenir.
+
+    Returns:
+        Optional[Dict[str, Any]]: generate_tests ile aynı biçimde testler; banka yetersizse None.
+    """
+    with get_metrics().timer('flai_stage_duration_seconds', stage='question_bank'):
+        questions = bank.find(profile)
+    if questions is None:
+        return None
+    if stream:
+        for number, question in enumerate(questions, 1):
+            job.publish('question', {'number': number, 'question': TestGenerator.to_payload(question)})
+    return {
+        'raw_tests': "```\n" + json.dumps(questions, ensure_ascii=False, indent=2) + "\n```",
+        'source': 'bank',
+        'success': True
+    }
+
+
+def render_result(analysis_result: Dict[str, Any], tests_result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Testleri bir kez ayrıştırıp gösterime hazırlar; sonuç API'si bu alanları yeniden
+    işlemeden döndürür ve 'etag' ile koşullu isteklere 304 döndürür.
+
+    Args:
+        analysis_result (Dict[str, Any]): Analiz sonuçları.
+        tests_result (Dict[str, Any]): Test oluşturma sonuçları.
+
+    Returns:
+        Dict[str, Any]: 'rendered_tests', 'etag' ve 'rendered_at' alanları.
+    """
+    rendered = TestGenerator(tests_result.get('raw_tests', '')).render()
+    digest = hashlib.sha256(analysis_result.get('raw_analysis', '').encode('utf-8'))
+    digest.update(rendered['content_hash'].encode('ascii'))
+    return {
+        'rendered_tests': rendered,
+        'etag': digest.hexdigest()[:32],
+        'rendered_at': time.time()
+    }
+
+
+def compact_analysis(raw_analysis: str) -> Any:
+    """
+    Analiz yanıtını istemciye gönderilecek yalın biçime dönüştürür.
+
+    Yapay zeka analizi genellikle kod bloğu içinde girintili bir JSON nesnesi olarak döndürür;
+    nesne ayrıştırılıp gönderilir ve istemcide başlıklar ve listeler olarak gösterilir.
+    Ayrıştırılamayan yanıtlar düz metin olarak gönderilir.
+
+    Args:
+        raw_analysis (str): Yapay zekanın analiz yanıtı.
+
+    Returns:
+        Any: Analiz nesnesi ya da düz metin.
+    """
+    start, end = raw_analysis.find('{'), raw_analysis.rfind('}')
+    if start != -1 and end > start:
+        try:
+            data = json.loads(raw_analysis[start:end + 1])
+        except json.JSONDecodeError:
+            data = None
+        if isinstance(data, dict):
+            return data
+    return raw_analysis.strip()
+
+
+def result_payload(stored_result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Kayıtlı sonuçtan sonuç sayfasının istemcide gösterdiği analiz ve soruları hazırlar.
+
+    Args:
+        stored_result (Dict[str, Any]): render_result alanlarını içeren kayıtlı sonuç.
+
+    Returns:
+        Dict[str, Any]: 'analysis', 'questions' ve 'source' alanları.
+    """
+    rendered_tests = stored_result['rendered_tests']
+    # Yalın biçimden önce kaydedilmiş sonuçlarda sorular işlenmiş testlerden hazırlanır
+    questions = rendered_tests.get('questions')
+    if questions is None:
+        questions = [TestGenerator.to_payload(test) for test in rendered_tests['processed_tests']]
+    return {
+        'analysis': compact_analysis(stored_result.get('analysis_result', {}).get('raw_analysis', '')),
+        'questions': questions,
+        'source': stored_result.get('tests_result', {}).get('source')
+    }
+
+
+def _check_call(latency: Dict[str, Any], name: str, started: float, result: Dict[str, Any]) -> None:
+    """
+    Yapay zeka çağrısının süresini kaydeder ve başarısız yanıtı iş hatasına çevirir.
+
+    Args:
+        latency (Dict[str, Any]): Gecikmelerin kaydedildiği sözlük.
+        name (str): 'analyze' veya 'generate'.
+        started (float): Çağrının başladığı zaman.
+        result (Dict[str, Any]): Çağrının sonucu.
+
+    Raises:
+        JobError: Sonuç başarısızsa.
+    """
+    latency[name] = time.time() - started
+    if not result.get('success', False):
+        raise JobError(_CALL_ERRORS[name])
+
+
+def _analyze(analyzer: AIAnalyzer, processed_data: Dict[str, Any], latency: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Transkripti analiz eder ve süresini kaydeder.
+
+    Raises:
+        JobError: Analiz başarısız olursa.
+    """
+    started = time.time()
+    analysis_result = analyzer.analyze_transcript(processed_data)
+    _check_call(latency, 'analyze', started, analysis_result)
+    return analysis_result
+
+
+def _generate(analyzer: AIAnalyzer, analysis_result: Dict[str, Any], processed_data: Dict[str, Any],
+              latency: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Testleri oluşturur ve süresini kaydeder.
+
+    Raises:
+        JobError: Test oluşturma başarısız olursa.
+    """
+    logger.debug("Testler oluşturuluyor...")
+    started = time.time()
+    tests_result = analyzer.generate_tests(analysis_result, processed_data)
+    _check_call(latency, 'generate', started, tests_result)
+    return tests_result
+
+
+def _generate_stream(job: Job, analyzer: AIAnalyzer, analysis_result: Dict[str, Any],
+                     processed_data: Dict[str, Any], latency: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Testleri akış kipinde oluşturur, her soruyu istemcide gösterilecek biçimde işin olaylarına ekler ve
+    ilk sorunun ve tüm testlerin sürelerini kaydeder.
+
+    Raises:
+        JobError: Test oluşturma başarısız olursa.
+    """
+    started = time.time()
+    count = 0
+
+    def on_question(question: Dict[str, Any]) -> None:
+        nonlocal count
+        question = TestGenerator.clean_test(question)
+        if question is None:
+            return
+        count += 1
+        if count == 1:
+            latency['first_question'] = time.time() - started
+        job.publish('question', {'number': count, 'question': TestGenerator.to_payload(question)})
+
+    tests_result = analyzer.generate_tests_stream(analysis_result, processed_data, on_question)
+    _check_call(latency, 'generate', started, tests_result)
+    return tests_result
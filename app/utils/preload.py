@@ -0,0 +1,55 @@
+import gc
+import os
+import time
+import logging
+import importlib
+from typing import Dict, Iterable
+
+# Loglama yapılandırması
+logger = logging.getLogger(__name__)
+
+# İlk kullanımda yüklenen ağır modüller: transkript tabloları için pandas ve Gemini istemcisi
+# (google.generativeai). Uygulama içe aktarılırken yüklenmezler; ön yüklemede bir kez yüklenirler.
+PRELOAD_MODULES = tuple(
+    name.strip() for name in os.getenv("PRELOAD_MODULES", "pandas,app.utils.gemini_client").split(',')
+    if name.strip()
+)
+
+
+def preload_modules(modules: Iterable[str] = PRELOAD_MODULES) -> Dict[str, float]:
+    """
+    Ağır modülleri işçi süreçleri oluşturulmadan önce ana süreçte içe aktarır.
+
+    fork ile oluşturulan işçiler bu modülleri yeniden yüklemez; modüllerin bellek sayfaları
+    yazılana kadar tüm işçiler arasında paylaşılır (copy-on-write). Yüklenemeyen modüller
+    atlanır ve ilk kullanımda işçide yüklenir.
+
+    Args:
+        modules (Iterable[str]): İçe aktarılacak modüller.
+
+    Returns:
+        Dict[str, float]: Modül adı -> yükleme süresi (saniye).
+    """
+    timings = {}
+    for name in modules:
+        started = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            logger.warning("%s ön yüklenemedi: %s", name, e)
+            continue
+        timings[name] = time.perf_counter() - started
+    logger.info("Ön yüklenen modüller: %s",
+                ", ".join(f"{name} ({seconds * 1000:.0f} ms)" for name, seconds in timings.items()) or "yok")
+    return timings
+
+
+def freeze_heap() -> None:
+    """
+    Ana süreçteki nesneleri çöp toplayıcının izlediği kuşaklardan çıkarır.
+
+    Aksi halde işçilerdeki çöp toplama, paylaşılan nesnelerin başlıklarına yazarak bellek
+    sayfalarının kopyalanmasına yol açar. fork'tan hemen önce çağrılmalıdır.
+    """
+    gc.collect()
+    gc.freeze()
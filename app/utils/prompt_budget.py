@@ -0,0 +1,333 @@
+import os
+import re
+import string
+import logging
+import operator
+from collections import Counter
+from itertools import chain
+from typing import Dict, List, Any, Iterable, Optional, Set, Tuple
+from app.utils.transcript_frame import TranscriptFrame
+
+# Loglama yapılandırması
+logger = logging.getLogger(__name__)
+
+# Token sayımı: her noktalama işareti ve kelimelerin her dört karakterlik parçası bir token
+TOKEN_PATTERN = re.compile(r"\w{1,4}|[^\w\s]")
+
+# Kelimelere ayırırken noktalama işaretlerini boşluğa çevirir
+PUNCTUATION_TABLE = str.maketrans({character: ' ' for character in string.punctuation})
+
+# Anlam taşımayan sık kelimeler (yeni kelime yoğunluğuna katılmaz)
+STOPWORDS = frozenset(
+    "about after again also because been before being between both could does doing down "
+    "each from have having here just like more most much other over same should some such "
+    "than that their them then there these they this those through very were what when "
+    "where which while will with would your yours yeah okay right well really thing things "
+    "know think going want good great said says".split()
+)
+
+# Konuşma türlerine işaret eden ifadeler (küçük harfle)
+MARKER_PHRASES = {
+    # Öğretmenin düzeltmeleri
+    'correction': (
+        "you mean", "should be", "should say", "we say", "we don't say", "correct", "correction",
+        "not quite", "almost", "try again", "say it again", "repeat after me", "actually it's",
+        "the right word", "past tense", "pronounce", "pronunciation", "mistake", "instead of"
+    ),
+    # Sık yapılan öğrenci hataları
+    'error': (
+        "goed", "buyed", "thinked", "teached", "catched", "bringed", "more better", "most best",
+        "i am agree", "didn't went", "did you went", "peoples", "informations", "advices", "childs"
+    ) + tuple(f"{subject} {verb}" for subject in ("he", "she", "it")
+              for verb in ("go", "have", "do", "want", "like")),
+    # Öğrencinin duraksaması ya da kelime araması
+    'hesitation': (
+        "um", "umm", "uh", "uhh", "erm", "hmm", "hmmm", "sorry", "how do you say",
+        "what is the word", "i don't know how"
+    ),
+    # Selamlaşma ve bağlantı kontrolü gibi sohbet konuşmaları
+    'small_talk': (
+        "hello", "hi", "hey", "good morning", "good afternoon", "good evening", "how are you",
+        "nice to meet you", "nice to see you", "can you hear me", "see you", "bye", "goodbye",
+        "thank you", "thanks"
+    )
+}
+
+TEACHER_PATTERN = re.compile(r"teacher|öğretmen|ogretmen|tutor|instructor|coach", re.IGNORECASE)
+
+# Seçilmeyen konuşmaların yerine konan işaret
+GAP_MARKER = "[...]"
+
+
+def count_tokens(text: str) -> int:
+    """
+    Metnin token sayısını ağ isteği yapmadan yaklaşık olarak hesaplar.
+
+    Gemini'nin alt kelime tokenizer'ına benzer şekilde her noktalama işareti bir token,
+    her kelime dört karakterde bir token sayılır.
+
+    Args:
+        text (str): Metin.
+
+    Returns:
+        int: Yaklaşık token sayısı.
+    """
+    return len(TOKEN_PATTERN.findall(text))
+
+
+def split_words(text: str) -> List[str]:
+    """
+    Metni noktalama işaretlerinden arındırılmış küçük harfli kelimelere ayırır.
+    """
+    return text.lower().translate(PUNCTUATION_TABLE).split()
+
+
+def _build_phrase_index(phrases: Dict[str, Iterable[str]]) -> Dict[str, List[Tuple[Tuple[str, ...], str]]]:
+    """
+    İfadeleri ilk kelimelerine göre dizinler; böylece her konuşmada kelimeler üzerinden
+    yalnızca bir kez geçilerek tüm ifadeler aranabilir.
+    """
+    index = {}
+    for category, items in phrases.items():
+        for phrase in items:
+            words = tuple(split_words(phrase))
+            index.setdefault(words[0], []).append((words, category))
+    return index
+
+
+_PHRASE_INDEX = _build_phrase_index(MARKER_PHRASES)
+_FIRST_WORDS = frozenset(_PHRASE_INDEX)
+
+
+def find_markers(words: List[str]) -> Set[str]:
+    """
+    Konuşmada geçen ifade türlerini bulur.
+
+    Args:
+        words (List[str]): Konuşmanın split_words ile ayrılmış kelimeleri.
+
+    Returns:
+        Set[str]: MARKER_PHRASES türleri; art arda tekrarlanan kelime ("I I went" gibi)
+            varsa 'hesitation' da eklenir.
+    """
+    found = set()
+    if any(map(operator.eq, words, words[1:])):
+        found.add('hesitation')
+    if _FIRST_WORDS.isdisjoint(words):
+        return found
+    for position, word in enumerate(words):
+        for phrase, category in _PHRASE_INDEX.get(word, ()):
+            if category not in found and tuple(words[position:position + len(phrase)]) == phrase:
+                found.add(category)
+    return found
+
+
+class PromptBudget:
+    """
+    Transkript konuşmalarını öğrenme açısından değerlerine göre puanlar ve en değerli
+    konuşmaları, kronolojik sırayla, belirlenen token bütçesine sığdırır.
+
+    Öğrenci konuşmaları, ders içinde nadir geçen (yeni) kelimeler ve hata ya da düzeltme
+    içeren konuşmalar öne çıkarılır; kısa selamlaşma ve sohbet konuşmaları geri planda kalır.
+    """
+
+    STUDENT_WEIGHT = 2.0
+    VOCABULARY_WEIGHT = 4.0
+    ERROR_WEIGHT = 3.0
+    HESITATION_WEIGHT = 1.5
+    SMALL_TALK_PENALTY = 2.0
+
+    def __init__(self, token_budget: Optional[int] = None, teacher: Optional[str] = None):
+        """
+        PromptBudget sınıfını başlatır.
+
+        Args:
+            token_budget (Optional[int]): İsteğe eklenecek transkript için en fazla token sayısı.
+                Varsayılan: PROMPT_TOKEN_BUDGET.
+            teacher (Optional[str]): Öğretmenin konuşmacı adı. Verilmezse adından ya da en çok
+                konuşan kişi olmasından tahmin edilir.
+        """
+        self.token_budget = token_budget or int(os.getenv("PROMPT_TOKEN_BUDGET", "2000"))
+        self.teacher = teacher
+        self._last = None
+
+    def find_teacher(self, speakers: List[str], texts: List[str]) -> Optional[str]:
+        """
+        Öğretmeni konuşmacı adından, bulunamazsa en çok kelime söyleyen kişiden tahmin eder.
+
+        Args:
+            speakers (List[str]): Konuşmaların konuşmacıları.
+            texts (List[str]): Konuşmaların metinleri.
+
+        Returns:
+            Optional[str]: Öğretmenin adı (tek konuşmacı varsa None).
+        """
+        if self.teacher is not None:
+            return self.teacher
+
+        words = Counter()
+        for speaker, text in zip(speakers, texts):
+            words[speaker] += text.count(' ') + 1
+        if len(words) < 2:
+            return None
+        for speaker in words:
+            if TEACHER_PATTERN.search(speaker):
+                return speaker
+        return words.most_common(1)[0][0]
+
+    def score_turns(self, speakers: List[str], texts: List[str],
+                    turn_words: Optional[List[List[str]]] = None, teacher: Optional[str] = None) -> List[float]:
+        """
+        Her konuşmanın test soruları açısından değerini puanlar.
+
+        Args:
+            speakers (List[str]): Konuşmaların konuşmacıları.
+            texts (List[str]): Konuşmaların metinleri.
+            turn_words (Optional[List[List[str]]]): Konuşmaların split_words ile ayrılmış
+                kelimeleri (verilmezse hesaplanır).
+            teacher (Optional[str]): Öğretmenin konuşmacı adı (verilmezse tahmin edilir).
+
+        Returns:
+            List[float]: Konuşmaların puanları (aynı sırayla).
+        """
+        if turn_words is None:
+            turn_words = [split_words(text) for text in texts]
+        teacher = teacher or self.find_teacher(speakers, texts)
+        # Konuşmalardaki farklı içerik kelimeleri ve her birinin geçtiği konuşma sayısı;
+        # derste az geçen kelimeler yeni kelime sayılır
+        turn_vocabulary = [
+            {word for word in set(words).difference(STOPWORDS) if len(word) > 3 and word.isalpha()}
+            for words in turn_words
+        ]
+        document_frequency = Counter(chain.from_iterable(turn_vocabulary))
+        rare_limit = max(2, len(texts) // 200)
+        rare_words = {word for word, count in document_frequency.items() if count <= rare_limit}
+        markers = [find_markers(words) for words in turn_words]
+
+        scores = []
+        for position, (speaker, words, vocabulary, found) in enumerate(
+                zip(speakers, turn_words, turn_vocabulary, markers)):
+            is_student = teacher is not None and speaker != teacher
+            score = 1.0
+
+            if is_student:
+                score += self.STUDENT_WEIGHT
+            if vocabulary:
+                # Çok kısa konuşmalarda tek bir nadir kelime yoğunluğu şişirmesin
+                score += self.VOCABULARY_WEIGHT * len(vocabulary & rare_words) / max(len(vocabulary), 5)
+            if 'error' in found or 'correction' in found:
+                score += self.ERROR_WEIGHT
+            elif is_student and position + 1 < len(speakers) \
+                    and speakers[position + 1] == teacher \
+                    and 'correction' in markers[position + 1]:
+                # Öğretmenin hemen ardından düzelttiği öğrenci konuşması
+                score += self.ERROR_WEIGHT
+            if is_student and 'hesitation' in found:
+                score += self.HESITATION_WEIGHT
+            if len(words) < 8 and 'small_talk' in found:
+                score -= self.SMALL_TALK_PENALTY
+            if len(words) < 3:
+                score *= 0.5
+            scores.append(score)
+        return scores
+
+    def select(self, speakers: List[str], texts: List[str], teacher: Optional[str] = None) -> List[int]:
+        """
+        Bütçeye sığan en yüksek puanlı konuşmaları seçer.
+
+        Args:
+            speakers (List[str]): Konuşmaların konuşmacıları.
+            texts (List[str]): Konuşmaların metinleri.
+            teacher (Optional[str]): Öğretmenin konuşmacı adı (verilmezse tahmin edilir).
+
+        Returns:
+            List[int]: Seçilen konuşmaların sıra numaraları (kronolojik sırayla).
+        """
+        speaker_costs = {speaker: count_tokens(f"{speaker}:") for speaker in set(speakers)}
+        costs = [speaker_costs[speaker] + count_tokens(text) for speaker, text in zip(speakers, texts)]
+        if sum(costs) <= self.token_budget:
+            return list(range(len(texts)))
+
+        # Her konuşma için olası bir boşluk işaretinin payı da ayrılır
+        gap_cost = count_tokens(GAP_MARKER)
+        scores = self.score_turns(speakers, texts, teacher=teacher)
+        remaining = self.token_budget - gap_cost
+        selected = []
+        for position in sorted(range(len(texts)), key=lambda i: (-scores[i], i)):
+            cost = costs[position] + gap_cost
+            if cost <= remaining:
+                selected.append(position)
+                remaining -= cost
+        return sorted(selected)
+
+    @staticmethod
+    def _turns(transcript_data: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+        """
+        Konuşmacı ve metin listelerini döndürür; TranscriptFrame için kayıt görünümü
+        oluşturmadan doğrudan sütunları kullanır.
+        """
+        if isinstance(transcript_data, TranscriptFrame):
+            frame = transcript_data.frame
+            return frame['speaker'].astype(str).tolist(), frame['text'].tolist()
+        entries = transcript_data.get('transcript_data') or []
+        return [entry['speaker'] for entry in entries], [entry['text'] for entry in entries]
+
+    def select_text(self, transcript_data: Dict[str, Any]) -> str:
+        """
+        İşlenmiş transkriptten bütçeye sığan metni oluşturur.
+
+        Seçilen konuşmalar kronolojik sırayla ve konuşmacı adıyla yazılır; aradaki
+        seçilmeyen konuşmaların yerine GAP_MARKER konur. Aynı transkript için analiz ve
+        test istekleri aynı seçimi kullandığından son sonuç saklanır.
+
+        Args:
+            transcript_data (Dict[str, Any]): İşlenmiş transkript verileri.
+
+        Returns:
+            str: İsteğe eklenecek transkript metni.
+        """
+        last = self._last
+        if last is not None and last[0] is transcript_data:
+            return last[1]
+
+        speakers, texts = self._turns(transcript_data)
+        # Sıkıştırılmış transkriptte öğretmenin etiketi bilinir
+        teacher = getattr(transcript_data, 'teacher', None)
+        selected = self.select(speakers, texts, teacher) if texts else []
+        if not selected:
+            # Konuşma yoksa ya da tek bir konuşma bile sığmıyorsa metnin başını kullan
+            text = self.truncate(transcript_data.get('all_text', ''))
+        else:
+            lines = []
+            previous = -1
+            for position in selected:
+                if position != previous + 1:
+                    lines.append(GAP_MARKER)
+                lines.append(f"{speakers[position]}: {texts[position]}")
+                previous = position
+            if previous != len(texts) - 1:
+                lines.append(GAP_MARKER)
+            text = "\n".join(lines)
+            logger.debug("Transkriptten %d/%d konuşma seçildi.", len(selected), len(texts))
+
+        self._last = (transcript_data, text)
+        return text
+
+    def truncate(self, text: str) -> str:
+        """
+        Metni baştan başlayarak bütçeye sığacak kadar kısaltır.
+
+        Args:
+            text (str): Metin.
+
+        Returns:
+            str: Kısaltılmış metin.
+        """
+        for used, match in enumerate(TOKEN_PATTERN.finditer(text)):
+            if used == self.token_budget:
+                head = text[:match.start()]
+                if head[-1:].isalnum() and text[match.start()].isalnum():
+                    # Kelimenin ortasından bölme
+                    head = re.sub(r"\w+$", "", head)
+                return head.rstrip()
+        return text
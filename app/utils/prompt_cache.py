@@ -0,0 +1,201 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from app.utils.metrics import get_metrics
+from app.utils.sqlite_util import make_parent_dirs, thread_connection
+
+# Loglama yapılandırması
+logger = logging.getLogger(__name__)
+
+
+class PromptCache:
+    """
+    Yapay zeka yanıtlarını istek içeriğine göre saklayan iki katmanlı önbellek.
+
+    Bellekteki LRU katmanı süreç içinde, diskteki SQLite katmanı ise aynı makinedeki
+    tüm gunicorn işçileri arasında paylaşılır.
+    """
+
+    def __init__(self, db_path: str, max_memory_entries: int = 256,
+                 max_disk_entries: int = 5000, ttl_seconds: int = 7 * 24 * 3600):
+        """
+        PromptCache sınıfını başlatır.
+
+        Args:
+            db_path (str): SQLite veritabanı dosyasının yolu.
+            max_memory_entries (int): Bellekte tutulacak en fazla kayıt sayısı.
+            max_disk_entries (int): Diskte tutulacak en fazla kayıt sayısı.
+            ttl_seconds (int): Kayıtların geçerlilik süresi (saniye).
+        """
+        self.db_path = db_path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes = 0
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+
+        make_parent_dirs(db_path)
+        with thread_connection(self._local, self.db_path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS prompt_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_prompt_cache_accessed ON prompt_cache (accessed_at)")
+
+    @staticmethod
+    def make_key(model_name: str, prompt: str) -> str:
+        """
+        Model adı ve istek metninden önbellek anahtarı üretir.
+
+        Args:
+            model_name (str): Model adı.
+            prompt (str): Yapay zekaya gönderilecek istek.
+
+        Returns:
+            str: SHA-256 özet değeri.
+        """
+        digest = hashlib.sha256()
+        digest.update(model_name.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(prompt.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Önbellekteki yanıtı döndürür.
+
+        Args:
+            key (str): Önbellek anahtarı.
+
+        Returns:
+            Optional[str]: Yanıt bulunamazsa veya süresi dolduysa None.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self._stats['memory_hits'] += 1
+                    get_metrics().inc('flai_prompt_cache_requests_total', result='memory_hit')
+                    return value
+                del self._memory[key]
+
+        try:
+            with thread_connection(self._local, self.db_path) as conn:
+                row = conn.execute(
+                    "SELECT value, created_at FROM prompt_cache WHERE key = ? AND created_at >= ?",
+                    (key, now - self.ttl_seconds)
+                ).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE prompt_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            logger.warning("Önbellek okunurken hata oluştu: %s", e)
+            row = None
+
+        with self._lock:
+            if row is None:
+                self._stats['misses'] += 1
+            else:
+                self._stats['disk_hits'] += 1
+                self._remember(key, row[0], row[1])
+        get_metrics().inc('flai_prompt_cache_requests_total', result='miss' if row is None else 'disk_hit')
+        return row[0] if row is not None else None
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Yanıtı önbelleğe yazar.
+
+        Args:
+            key (str): Önbellek anahtarı.
+            value (str): Saklanacak yanıt.
+        """
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            self._writes += 1
+            evict = self._writes % 50 == 0
+
+        try:
+            with thread_connection(self._local, self.db_path) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO prompt_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, value, now, now)
+                )
+                if evict:
+                    self._evict(conn, now)
+        except sqlite3.Error as e:
+            logger.warning("Önbelleğe yazılırken hata oluştu: %s", e)
+
+    def _remember(self, key: str, value: str, created_at: float) -> None:
+        """
+        Kaydı bellekteki LRU katmanına ekler. Kilit tutulurken çağrılmalıdır.
+        """
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """
+        Süresi dolan ve boyut sınırını aşan disk kayıtlarını siler.
+        """
+        removed = conn.execute("DELETE FROM prompt_cache WHERE created_at < ?", (now - self.ttl_seconds,)).rowcount
+        removed += conn.execute(
+            "DELETE FROM prompt_cache WHERE key IN ("
+            "SELECT key FROM prompt_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        ).rowcount
+        if removed:
+            logger.debug("Önbellekten %d kayıt silindi.", removed)
+            with self._lock:
+                self._stats['evictions'] += removed
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Önbellek isabet ve ıskalama sayaçlarını döndürür.
+
+        Returns:
+            Dict[str, Any]: Sayaçlar ve bellekteki kayıt sayısı.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_ratio'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_prompt_cache() -> Optional[PromptCache]:
+    """
+    Ortam değişkenlerine göre yapılandırılmış paylaşılan önbelleği döndürür.
+
+    Returns:
+        Optional[PromptCache]: Önbellek devre dışıysa None.
+    """
+    global _default_cache
+    if os.getenv("PROMPT_CACHE_ENABLED", "1") == "0":
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = PromptCache(
+                os.getenv("PROMPT_CACHE_PATH", os.path.join('cache', 'prompt_cache.sqlite3')),
+                max_memory_entries=int(os.getenv("PROMPT_CACHE_MEMORY_ENTRIES", "256")),
+                max_disk_entries=int(os.getenv("PROMPT_CACHE_MAX_ENTRIES", "5000")),
+                ttl_seconds=int(os.getenv("PROMPT_CACHE_TTL", str(7 * 24 * 3600)))
+            )
+        return _default_cache
@@ -0,0 +1,477 @@
+import os
+import re
+import json
+import time
+import array
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Any, Iterable, Optional, Set, Tuple
+from app.utils.prompt_budget import STOPWORDS, split_words
+from app.utils.metrics import get_metrics
+from app.utils.sqlite_util import make_parent_dirs, thread_connection
+
+# Loglama yapılandırması
+logger = logging.getLogger(__name__)
+
+# Analiz metninde CEFR seviyesi
+LEVEL_PATTERN = re.compile(r"\b([ABC][12])\b")
+
+# Soru türleri; ilk eşleşen tür kullanılır
+QUESTION_TYPES = (
+    ('idiom', re.compile(r"idiom|phrasal|expression|phrase|deyim|kalıp", re.IGNORECASE)),
+    ('grammar', re.compile(r"tense|grammar|correct form|complete|verb|plural|article|preposition|"
+                           r"dilbilgisi|fiil|boşluğ", re.IGNORECASE)),
+    ('vocabulary', re.compile(r"mean|synonym|opposite|antonym|definition|word|anlam|kelime", re.IGNORECASE)),
+    ('listening', re.compile(r"listen|hear|dinle", re.IGNORECASE)),
+    ('reading', re.compile(r"read|passage|text|okuma|metin", re.IGNORECASE)),
+)
+
+# MinHash imzasındaki boş kutuları doldururken eklenen sabit (32 bitlik asal sayı)
+DENSIFY_OFFSET = 0x9E3779B1
+HASH_MASK = 0xFFFFFFFF
+
+
+def content_words(text: str) -> Set[str]:
+    """
+    Metindeki anlam taşıyan kelimeleri (dörtten uzun, durak kelimesi olmayan) döndürür.
+    """
+    return {word for word in set(split_words(text)).difference(STOPWORDS) if len(word) > 3 and word.isalpha()}
+
+
+def normalize_term(term: str) -> str:
+    """
+    Kelime ya da deyimi küçük harfli, noktalamasız ve tek boşluklu hale getirir.
+    """
+    return ' '.join(split_words(term))
+
+
+def question_type(question: Dict[str, Any]) -> str:
+    """
+    Sorunun türünü (idiom, grammar, vocabulary, listening, reading veya other) soru metninden tahmin eder.
+    """
+    text = question.get('question', '')
+    for name, pattern in QUESTION_TYPES:
+        if pattern.search(text):
+            return name
+    return 'other'
+
+
+def parse_analysis(raw_analysis: str) -> Tuple[Optional[str], List[str]]:
+    """
+    Analiz yanıtından öğrencinin seviyesini ve dersteki yeni kelimeleri çıkarır.
+
+    Yanıt JSON ise 'level'/'seviye' ve 'vocabulary'/'kelime' içeren alanlar kullanılır;
+    değilse seviye metindeki ilk CEFR kodundan alınır.
+
+    Args:
+        raw_analysis (str): Yapay zekanın analiz yanıtı.
+
+    Returns:
+        Tuple[Optional[str], List[str]]: Seviye (bulunamazsa None) ve normalize edilmiş kelimeler.
+    """
+    level, vocabulary = None, []
+    start, end = raw_analysis.find('{'), raw_analysis.rfind('}')
+    data = None
+    if start != -1 and end > start:
+        try:
+            data = json.loads(raw_analysis[start:end + 1])
+        except json.JSONDecodeError:
+            data = None
+    if isinstance(data, dict):
+        data = data.get('analysis', data) if isinstance(data.get('analysis'), dict) else data
+        for key, value in data.items():
+            name = key.lower()
+            if level is None and ('level' in name or 'seviye' in name):
+                match = LEVEL_PATTERN.search(str(value).upper())
+                level = match.group(1) if match else None
+            elif ('vocab' in name or 'kelime' in name) and isinstance(value, list):
+                for item in value:
+                    if isinstance(item, dict):
+                        item = next((v for v in item.values() if isinstance(v, str)), '')
+                    term = normalize_term(str(item))
+                    if term:
+                        vocabulary.append(term)
+    if level is None:
+        match = LEVEL_PATTERN.search(raw_analysis)
+        level = match.group(1) if match else None
+    return level, list(dict.fromkeys(vocabulary))
+
+
+def lesson_profile(analysis_result: Dict[str, Any], transcript_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Soru bankasında arama ve kayıt için dersin seviyesini, yeni kelimelerini ve
+    transkriptteki anlamlı kelimeleri çıkarır.
+
+    Args:
+        analysis_result (Dict[str, Any]): Analiz sonuçları.
+        transcript_data (Dict[str, Any]): İşlenmiş transkript verileri.
+
+    Returns:
+        Dict[str, Any]: 'level', 'vocabulary' ve 'terms' alanları.
+    """
+    level, vocabulary = parse_analysis(analysis_result.get('raw_analysis', ''))
+    frame = getattr(transcript_data, 'frame', None)
+    if frame is not None:
+        text = ' '.join(frame['text'].tolist())
+    else:
+        text = transcript_data.get('all_text', '')
+    terms = content_words(text)
+    terms.update(vocabulary)
+    return {'level': level, 'vocabulary': vocabulary, 'terms': terms}
+
+
+def minhash_signature(terms: Iterable[str], num_perm: int = 64) -> List[int]:
+    """
+    Kelime kümesinin MinHash imzasını tek karma ile (one permutation hashing) hesaplar.
+
+    Her kelime bir kez karma değerine dönüştürülür ve değerin kalanına göre num_perm
+    kutudan birine düşer; kutudaki en küçük değer imzanın o konumudur. Boş kutular
+    sağdaki ilk dolu kutudan doldurulur. İki imzanın aynı konumlarının oranı, kümelerin
+    Jaccard benzerliğini tahmin eder.
+
+    Args:
+        terms (Iterable[str]): Kelimeler.
+        num_perm (int): İmza uzunluğu.
+
+    Returns:
+        List[int]: 32 bitlik imza değerleri (küme boşsa hepsi en büyük değer).
+    """
+    bins = [HASH_MASK] * num_perm
+    for term in terms:
+        value = int.from_bytes(hashlib.blake2b(term.encode('utf-8'), digest_size=8).digest(), 'little')
+        position, value = value % num_perm, (value // num_perm) & HASH_MASK
+        if value < bins[position]:
+            bins[position] = value
+    filled = [position for position, value in enumerate(bins) if value != HASH_MASK]
+    if not filled or len(filled) == num_perm:
+        return bins
+    signature = list(bins)
+    for position in range(num_perm):
+        if bins[position] != HASH_MASK:
+            continue
+        distance = 1
+        while bins[(position + distance) % num_perm] == HASH_MASK:
+            distance += 1
+        signature[position] = (bins[(position + distance) % num_perm] + distance * DENSIFY_OFFSET) & HASH_MASK
+    return signature
+
+
+def signature_similarity(first: List[int], second: List[int]) -> float:
+    """
+    İki MinHash imzasından Jaccard benzerliğini tahmin eder.
+    """
+    return sum(a == b for a, b in zip(first, second)) / len(first) if first else 0.0
+
+
+class QuestionBank:
+    """
+    Doğrulanmış test sorularını seviye, kelime ve soru türüne göre dizinleyen kalıcı soru bankası.
+
+    Her ders, transkriptteki kelimelerin MinHash imzasıyla LSH kovalarına yazılır. Yeni bir
+    ders geldiğinde aynı seviyedeki benzer derslerin soruları ve dersin yeni kelimelerini
+    içeren sorular aday olur; seçilen sorular dersin yeni kelimelerinin yeterli kısmını
+    kapsıyorsa testler yapay zekaya sorulmadan bankadan verilir. Veritabanı tüm gunicorn
+    işçileri arasında paylaşılır.
+    """
+
+    def __init__(self, db_path: str, num_perm: int = 64, bands: int = 16, similarity: float = 0.5,
+                 min_coverage: float = 0.6):
+        """
+        QuestionBank sınıfını başlatır.
+
+        Args:
+            db_path (str): SQLite veritabanı dosyasının yolu.
+            num_perm (int): MinHash imzasının uzunluğu.
+            bands (int): LSH bant sayısı (num_perm'i tam bölmelidir).
+            similarity (float): Derslerin benzer sayılacağı en düşük tahmini Jaccard benzerliği.
+            min_coverage (float): Bankadan test verilmesi için seçilen soruların kapsaması
+                gereken yeni kelime oranı.
+
+        Raises:
+            ValueError: num_perm bant sayısına tam bölünmüyorsa.
+        """
+        if num_perm % bands:
+            raise ValueError("İmza uzunluğu bant sayısına tam bölünmelidir.")
+        self.db_path = db_path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.similarity = similarity
+        self.min_coverage = min_coverage
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'added': 0}
+
+        make_parent_dirs(db_path)
+        with thread_connection(self._local, self.db_path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bank_questions ("
+                "id TEXT PRIMARY KEY, level TEXT NOT NULL, qtype TEXT NOT NULL, payload TEXT NOT NULL, "
+                "terms TEXT NOT NULL, created_at REAL NOT NULL, served INTEGER NOT NULL DEFAULT 0)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_bank_questions_level ON bank_questions (level, qtype)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bank_terms ("
+                "level TEXT NOT NULL, term TEXT NOT NULL, question_id TEXT NOT NULL, "
+                "PRIMARY KEY (level, term, question_id)) WITHOUT ROWID"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bank_lessons ("
+                "key TEXT PRIMARY KEY, level TEXT NOT NULL, signature BLOB NOT NULL, "
+                "question_ids TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bank_lsh ("
+                "level TEXT NOT NULL, bucket INTEGER NOT NULL, lesson_key TEXT NOT NULL, "
+                "PRIMARY KEY (level, bucket, lesson_key)) WITHOUT ROWID"
+            )
+
+    def _buckets(self, signature: List[int]) -> List[int]:
+        """
+        İmzayı bantlara bölüp her bandın kova numarasını (bant sırası dahil) döndürür.
+        """
+        rows = self.num_perm // self.bands
+        buckets = []
+        for band in range(self.bands):
+            digest = hashlib.blake2b(array.array('I', signature[band * rows:(band + 1) * rows]).tobytes(),
+                                     digest_size=8, person=band.to_bytes(2, 'little'))
+            buckets.append(int.from_bytes(digest.digest(), 'little', signed=True))
+        return buckets
+
+    @staticmethod
+    def question_id(question: Dict[str, Any]) -> str:
+        """
+        Sorunun metni ve seçeneklerinden kalıcı kimliğini üretir.
+        """
+        content = json.dumps([question.get('question', ''), question.get('options', []),
+                              question.get('correct_answer', '')], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()[:32]
+
+    @staticmethod
+    def question_terms(question: Dict[str, Any], vocabulary: Iterable[str]) -> Set[str]:
+        """
+        Sorunun dizinleneceği kelimeleri döndürür: sorunun anlamlı kelimeleri ve sorunun
+        geçtiği dersin yeni kelimelerinden soruda geçenler.
+        """
+        options = ' '.join(str(option.get('text', '')) for option in question.get('options', [])
+                           if isinstance(option, dict))
+        text = f"{question.get('question', '')} {options}"
+        normalized = f" {normalize_term(text)} "
+        terms = content_words(text)
+        terms.update(term for term in vocabulary if f" {term} " in normalized)
+        return terms
+
+    def add(self, profile: Dict[str, Any], questions: List[Dict[str, Any]], lesson_key: str) -> int:
+        """
+        Dersin doğrulanmış sorularını bankaya ekler ve dersi benzerlik dizinine yazar.
+
+        Args:
+            profile (Dict[str, Any]): lesson_profile ile çıkarılan ders bilgileri.
+            questions (List[Dict[str, Any]]): TestGenerator ile doğrulanmış sorular.
+            lesson_key (str): Dersin kalıcı anahtarı (örneğin transkript parmak izi).
+
+        Returns:
+            int: Bankaya yeni eklenen soru sayısı.
+        """
+        level = profile.get('level')
+        if not level or not questions:
+            return 0
+
+        now = time.time()
+        signature = minhash_signature(profile['terms'], self.num_perm)
+        rows, term_rows = [], []
+        for question in questions:
+            question_id = self.question_id(question)
+            terms = self.question_terms(question, profile['vocabulary'])
+            rows.append((question_id, level, question_type(question), json.dumps(question, ensure_ascii=False),
+                         json.dumps(sorted(terms), ensure_ascii=False), now))
+            term_rows.extend((level, term, question_id) for term in terms)
+
+        try:
+            with thread_connection(self._local, self.db_path) as conn:
+                added = conn.executemany(
+                    "INSERT OR IGNORE INTO bank_questions (id, level, qtype, payload, terms, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", rows
+                ).rowcount
+                conn.executemany("INSERT OR IGNORE INTO bank_terms (level, term, question_id) VALUES (?, ?, ?)",
+                                 term_rows)
+                conn.execute(
+                    "INSERT OR REPLACE INTO bank_lessons (key, level, signature, question_ids, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (lesson_key, level, array.array('I', signature).tobytes(), json.dumps([row[0] for row in rows]),
+                     now)
+                )
+                conn.executemany("INSERT OR IGNORE INTO bank_lsh (level, bucket, lesson_key) VALUES (?, ?, ?)",
+                                 [(level, bucket, lesson_key) for bucket in self._buckets(signature)])
+        except sqlite3.Error as e:
+            logger.warning("Soru bankasına yazılırken hata oluştu: %s", e)
+            return 0
+
+        with self._lock:
+            self._stats['added'] += added
+        logger.debug("Soru bankasına %d yeni soru eklendi (%s).", added, level)
+        return added
+
+    def _similar_lessons(self, conn: sqlite3.Connection, level: str, signature: List[int]) -> Dict[str, float]:
+        """
+        LSH kovalarında eşleşen ve benzerliği eşiği aşan derslerin soru kimliklerini
+        benzerlikleriyle döndürür.
+        """
+        buckets = self._buckets(signature)
+        candidates = conn.execute(
+            f"SELECT DISTINCT l.key, l.signature, l.question_ids FROM bank_lsh b "
+            f"JOIN bank_lessons l ON l.key = b.lesson_key "
+            f"WHERE b.level = ? AND b.bucket IN ({','.join('?' * len(buckets))})",
+            [level, *buckets]
+        ).fetchall()
+
+        question_similarity = {}
+        for _, blob, question_ids in candidates:
+            similarity = signature_similarity(signature, array.array('I', blob).tolist())
+            if similarity < self.similarity:
+                continue
+            for question_id in json.loads(question_ids):
+                question_similarity[question_id] = max(similarity, question_similarity.get(question_id, 0.0))
+        return question_similarity
+
+    def find(self, profile: Dict[str, Any], count: int = 5) -> Optional[List[Dict[str, Any]]]:
+        """
+        Ders için bankadan test soruları seçer.
+
+        Aynı seviyedeki benzer derslerin soruları ile dersin yeni kelimelerini içeren
+        sorular arasından, kapsanan yeni kelime sayısını artıran ve farklı türdeki sorular
+        öncelikli olarak seçilir.
+
+        Args:
+            profile (Dict[str, Any]): lesson_profile ile çıkarılan ders bilgileri.
+            count (int): Gereken soru sayısı.
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: Kapsam yetersizse veya yeterli soru yoksa None.
+        """
+        level = profile.get('level')
+        if not level:
+            return None
+
+        vocabulary = set(profile['vocabulary'])
+        try:
+            conn = thread_connection(self._local, self.db_path)
+            similar = self._similar_lessons(conn, level, minhash_signature(profile['terms'], self.num_perm))
+            candidates = set(similar)
+            if vocabulary:
+                candidates.update(row[0] for row in conn.execute(
+                    f"SELECT question_id FROM bank_terms WHERE level = ? "
+                    f"AND term IN ({','.join('?' * len(vocabulary))})",
+                    [level, *vocabulary]
+                ))
+            rows = conn.execute(
+                f"SELECT id, qtype, payload, terms, served FROM bank_questions "
+                f"WHERE id IN ({','.join('?' * len(candidates))})",
+                list(candidates)
+            ).fetchall() if candidates else []
+        except sqlite3.Error as e:
+            logger.warning("Soru bankası okunurken hata oluştu: %s", e)
+            rows = []
+
+        chosen, covered, types = [], set(), set()
+        pool = [(question_id, qtype, payload, vocabulary.intersection(json.loads(terms)), served)
+                for question_id, qtype, payload, terms, served in rows]
+        while pool and len(chosen) < count:
+            best = max(pool, key=lambda row: (len(row[3] - covered), row[1] not in types,
+                                              similar.get(row[0], 0.0), -row[4], row[0]))
+            pool.remove(best)
+            chosen.append(best)
+            covered.update(best[3])
+            types.add(best[1])
+
+        coverage = len(covered) / len(vocabulary) if vocabulary else (1.0 if similar else 0.0)
+        hit = len(chosen) == count and coverage >= self.min_coverage
+        with self._lock:
+            self._stats['hits' if hit else 'misses'] += 1
+        get_metrics().inc('flai_question_bank_requests_total', result='hit' if hit else 'miss')
+        if not hit:
+            logger.debug("Soru bankası yetersiz: %d soru, kapsam %.2f", len(chosen), coverage)
+            return None
+
+        self._mark_served([row[0] for row in chosen])
+        logger.info("Testler soru bankasından verildi (%s, kapsam %.2f).", level, coverage)
+        return [json.loads(row[2]) for row in chosen]
+
+    def sample(self, level: Optional[str], count: int = 5) -> List[Dict[str, Any]]:
+        """
+        Yapay zeka kullanılamadığında verilecek, verilen seviyedeki en az kullanılmış soruları döndürür.
+
+        Args:
+            level (Optional[str]): Öğrencinin seviyesi.
+            count (int): Soru sayısı.
+
+        Returns:
+            List[Dict[str, Any]]: Sorular (seviye bilinmiyorsa veya bankada soru yoksa boş).
+        """
+        if not level:
+            return []
+        try:
+            rows = thread_connection(self._local, self.db_path).execute(
+                "SELECT id, payload FROM bank_questions WHERE level = ? ORDER BY served, RANDOM() LIMIT ?",
+                (level, count)
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning("Soru bankası okunurken hata oluştu: %s", e)
+            return []
+        self._mark_served([row[0] for row in rows])
+        return [json.loads(row[1]) for row in rows]
+
+    def _mark_served(self, question_ids: List[str]) -> None:
+        """
+        Verilen soruların kullanım sayısını artırır; az kullanılan sorular öne geçer.
+        """
+        if not question_ids:
+            return
+        try:
+            with thread_connection(self._local, self.db_path) as conn:
+                conn.executemany("UPDATE bank_questions SET served = served + 1 WHERE id = ?",
+                                 [(question_id,) for question_id in question_ids])
+        except sqlite3.Error as e:
+            logger.warning("Soru bankası güncellenirken hata oluştu: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Bankadaki soru sayısını ve arama sayaçlarını döndürür.
+
+        Returns:
+            Dict[str, Any]: Sayaçlar ve seviyelere göre soru sayıları.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        try:
+            stats['questions'] = dict(thread_connection(self._local, self.db_path).execute(
+                "SELECT level, COUNT(*) FROM bank_questions GROUP BY level ORDER BY level"
+            ).fetchall())
+        except sqlite3.Error as e:
+            logger.warning("Soru bankası okunurken hata oluştu: %s", e)
+        return stats
+
+
+_default_bank = None
+_default_bank_lock = threading.Lock()
+
+
+def get_question_bank() -> Optional[QuestionBank]:
+    """
+    Ortam değişkenlerine göre yapılandırılmış paylaşılan soru bankasını döndürür.
+
+    Returns:
+        Optional[QuestionBank]: Soru bankası devre dışıysa None.
+    """
+    global _default_bank
+    if os.getenv("QUESTION_BANK_ENABLED", "1") == "0":
+        return None
+    with _default_bank_lock:
+        if _default_bank is None:
+            _default_bank = QuestionBank(
+                os.getenv("QUESTION_BANK_PATH", os.path.join('cache', 'question_bank.sqlite3')),
+                similarity=float(os.getenv("QUESTION_BANK_SIMILARITY", "0.5")),
+                min_coverage=float(os.getenv("QUESTION_BANK_MIN_COVERAGE", "0.6"))
+            )
+        return _default_bank
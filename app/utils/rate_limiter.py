@@ -0,0 +1,135 @@
+import os
+import time
+import asyncio
+import struct
+import logging
+import threading
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: kilit yalnızca süreç içinde geçerli olur
+    fcntl = None
+
+# Loglama yapılandırması
+logger = logging.getLogger(__name__)
+
+# Durum dosyasındaki kayıt: kalan jeton sayısı ve son dolum zamanı
+_STATE = struct.Struct('dd')
+
+
+class RateLimitTimeout(TimeoutError):
+    """
+    Jeton beklenen süre içinde alınamadığında fırlatılır.
+    """
+
+
+class FileTokenBucket:
+    """
+    Aynı makinedeki tüm gunicorn işçileri arasında paylaşılan jeton kovası.
+
+    Kovanın durumu küçük bir dosyada tutulur ve her erişimde dosya kilidiyle
+    korunur; böylece işçi sayısından bağımsız olarak toplam istek hızı sınırlanır.
+    """
+
+    def __init__(self, path: str, rate_per_second: float, capacity: float):
+        """
+        FileTokenBucket sınıfını başlatır.
+
+        Args:
+            path (str): Durum dosyasının yolu.
+            rate_per_second (float): Saniyede eklenen jeton sayısı.
+            capacity (float): Kovada birikebilecek en fazla jeton (anlık patlama sınırı).
+        """
+        self.path = path
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """
+        Jeton almayı bir kez dener.
+
+        Args:
+            tokens (float): Alınacak jeton sayısı.
+
+        Returns:
+            float: Jeton alındıysa 0, alınamadıysa yeterli jeton birikene kadar beklenecek süre (saniye).
+        """
+        with self._lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                data = os.read(fd, _STATE.size)
+                now = time.time()
+                if len(data) == _STATE.size:
+                    available, updated_at = _STATE.unpack(data)
+                else:
+                    available, updated_at = self.capacity, now
+
+                # Geçen süreye göre kovayı doldur
+                available = min(self.capacity, available + max(0.0, now - updated_at) * self.rate_per_second)
+                taken = tokens if available >= tokens else 0.0
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.write(fd, _STATE.pack(available - taken, now))
+                if taken:
+                    return 0.0
+                return (tokens - available) / self.rate_per_second
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> None:
+        """
+        Jeton alınana kadar bekler.
+
+        Args:
+            tokens (float): Alınacak jeton sayısı.
+            timeout (Optional[float]): En uzun bekleme süresi (saniye). None ise süresiz beklenir.
+
+        Raises:
+            RateLimitTimeout: Jeton süre içinde alınamazsa.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= wait:
+                    raise RateLimitTimeout("İstek hızı sınırı nedeniyle jeton alınamadı.")
+            logger.debug("İstek hızı sınırına ulaşıldı, %.2f sn bekleniyor.", wait)
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0, timeout: Optional[float] = None) -> None:
+        """
+        acquire ile aynıdır; jeton beklenirken iş parçacığını değil yalnızca eşyordamı bekletir.
+
+        Durum dosyasının kilidi başka işçiler tarafından tutulabildiğinden her deneme
+        iş parçacığı havuzunda yapılır; olay döngüsü kilit beklenirken durmaz.
+
+        Args:
+            tokens (float): Alınacak jeton sayısı.
+            timeout (Optional[float]): En uzun bekleme süresi (saniye). None ise süresiz beklenir.
+
+        Raises:
+            RateLimitTimeout: Jeton süre içinde alınamazsa.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = await asyncio.to_thread(self.try_acquire, tokens)
+            if wait == 0.0:
+                return
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= wait:
+                    raise RateLimitTimeout("İstek hızı sınırı nedeniyle jeton alınamadı.")
+            logger.debug("İstek hızı sınırına ulaşıldı, %.2f sn bekleniyor.", wait)
+            await asyncio.sleep(wait)
@@ -0,0 +1,262 @@
+import os
+import re
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Callable, Optional
+from app.utils.call_policy import CallPolicy, get_call_policy
+from app.utils.llm_backend import LLMBackend, get_llm_backend
+
+# Loglama yapılandırması
+logger = logging.getLogger(__name__)
+
+# Birleşik yanıttaki her belgenin yanıtını ayıran işaretler
+ANSWER_PATTERN = re.compile(r'<<<YANIT (\d+)>>>\s*(.*?)\s*<<<SON \1>>>', re.DOTALL)
+
+
+class _PendingRequest:
+    """
+    Birleştirilmeyi bekleyen tek bir istek.
+    """
+
+    def __init__(self, kind: str, prompt: str, validate: Optional[Callable[[str], bool]]):
+        self.kind = kind
+        self.prompt = prompt
+        self.validate = validate
+        self.future = Future()
+
+
+class RequestCoalescer:
+    """
+    Kısa bir süre içinde gelen aynı türdeki istekleri tek bir çok belgeli istekte
+    birleştirir ve yanıtı her bekleyen çağırana ayırarak dağıtır.
+
+    Yanıtı ayrıştırılamayan istekler tek başına yeniden gönderilir.
+    """
+
+    def __init__(self, generate: Callable[[str, str], str], max_batch_size: int = 4,
+                 max_wait: float = 0.3, max_parallel_batches: int = 4):
+        """
+        RequestCoalescer sınıfını başlatır.
+
+        Args:
+            generate (Callable[[str, str], str]): İsteği ve istek türünü alıp yapay zekaya gönderen ve
+                yanıt metnini döndüren işlev.
+            max_batch_size (int): Bir istekte birleştirilecek en fazla belge sayısı.
+            max_wait (float): İlk istekten sonra diğer istekler için beklenecek en uzun süre (saniye).
+            max_parallel_batches (int): Aynı anda gönderilebilecek en fazla birleşik istek sayısı.
+        """
+        self.generate = generate
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_parallel_batches = max_parallel_batches
+        self._queues = {}
+        self._deadlines = {}
+        self._condition = threading.Condition()
+        self._dispatcher = None
+        self._executor = None
+        self._pid = None
+
+    def submit(self, kind: str, prompt: str, validate: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        İsteği aynı türdeki diğer isteklerle birleştirilmek üzere sıraya koyar ve yanıtı bekler.
+
+        Args:
+            kind (str): İstek türü (yalnızca aynı türdeki istekler birleştirilir).
+            prompt (str): Yapay zekaya gönderilecek istek.
+            validate (Optional[Callable[[str], bool]]): Ayrıştırılan yanıtın kullanılabilir olup
+                olmadığını denetler; geçersiz yanıtlar için istek tek başına gönderilir.
+
+        Returns:
+            str: Bu isteğe ait yanıt.
+        """
+        return self.submit_future(kind, prompt, validate).result()
+
+    def submit_future(self, kind: str, prompt: str, validate: Optional[Callable[[str], bool]] = None) -> Future:
+        """
+        İsteği submit gibi sıraya koyar; yanıtı beklemeden yanıtı taşıyacak Future'ı döndürür.
+
+        Eşzamansız çağıranlar Future'ı asyncio.wrap_future ile bekler.
+
+        Args:
+            kind (str): İstek türü (yalnızca aynı türdeki istekler birleştirilir).
+            prompt (str): Yapay zekaya gönderilecek istek.
+            validate (Optional[Callable[[str], bool]]): Ayrıştırılan yanıtın kullanılabilir olup
+                olmadığını denetler.
+
+        Returns:
+            Future: Bu isteğe ait yanıtı taşıyan Future.
+        """
+        request = _PendingRequest(kind, prompt, validate)
+        with self._condition:
+            self._ensure_dispatcher()
+            queue = self._queues.setdefault(kind, [])
+            if not queue:
+                self._deadlines[kind] = time.monotonic() + self.max_wait
+            queue.append(request)
+            self._condition.notify()
+        return request.future
+
+    def _ensure_dispatcher(self) -> None:
+        """
+        Dağıtıcı iş parçacığını ilk kullanımda (ve fork sonrasında yeniden) başlatır.
+        Koşul kilidi tutulurken çağrılmalıdır.
+        """
+        if self._dispatcher is None or self._pid != os.getpid():
+            self._queues = {}
+            self._deadlines = {}
+            self._executor = ThreadPoolExecutor(max_workers=self.max_parallel_batches, thread_name_prefix='coalescer')
+            self._dispatcher = threading.Thread(target=self._run, name='coalescer', daemon=True)
+            self._pid = os.getpid()
+            self._dispatcher.start()
+
+    def _run(self) -> None:
+        """
+        Dolan ya da bekleme süresi biten grupları gönderir.
+        """
+        while True:
+            with self._condition:
+                batches = self._take_ready_batches()
+                if not batches:
+                    timeout = None
+                    if self._deadlines:
+                        timeout = max(0.0, min(self._deadlines.values()) - time.monotonic())
+                    self._condition.wait(timeout)
+                    continue
+            for batch in batches:
+                self._executor.submit(self._dispatch, batch)
+
+    def _take_ready_batches(self) -> List[List[_PendingRequest]]:
+        """
+        Gönderilmeye hazır grupları kuyruktan alır. Koşul kilidi tutulurken çağrılmalıdır.
+        """
+        now = time.monotonic()
+        batches = []
+        for kind in list(self._queues):
+            queue = self._queues[kind]
+            if len(queue) >= self.max_batch_size or now >= self._deadlines[kind]:
+                batches.append(queue[:self.max_batch_size])
+                rest = queue[self.max_batch_size:]
+                if rest:
+                    self._queues[kind] = rest
+                    self._deadlines[kind] = now + self.max_wait
+                else:
+                    del self._queues[kind]
+                    del self._deadlines[kind]
+        return batches
+
+    def _dispatch(self, batch: List[_PendingRequest]) -> None:
+        """
+        Grubu tek istekte gönderir ve yanıtları çağıranlara dağıtır.
+        """
+        if len(batch) == 1:
+            self._dispatch_single(batch[0])
+            return
+
+        try:
+            answers = self.split_response(self.generate(self.build_prompt([r.prompt for r in batch]), batch[0].kind))
+        except Exception as e:
+            logger.warning("Birleşik istek başarısız oldu, istekler tek tek gönderiliyor: %s", e)
+            answers = {}
+
+        logger.debug("%d istek birleştirildi, %d yanıt ayrıştırıldı.", len(batch), len(answers))
+        for number, request in enumerate(batch, 1):
+            answer = answers.get(number)
+            if answer and (request.validate is None or request.validate(answer)):
+                request.future.set_result(answer)
+            else:
+                self._dispatch_single(request)
+
+    def _dispatch_single(self, request: _PendingRequest) -> None:
+        """
+        İsteği tek başına gönderir.
+        """
+        try:
+            request.future.set_result(self.generate(request.prompt, request.kind))
+        except Exception as e:
+            request.future.set_exception(e)
+
+    @staticmethod
+    def build_prompt(prompts: List[str]) -> str:
+        """
+        Birden fazla isteği, belge ayraçlarıyla tek bir istekte birleştirir.
+
+        Args:
+            prompts (List[str]): Birleştirilecek istekler.
+
+        Returns:
+            str: Birleşik istek.
+        """
+        parts = [
+            f"Aşağıda birbirinden bağımsız {len(prompts)} görev var. Her görevi yalnızca kendi "
+            "içeriğine göre ve diğerlerinden etkilenmeden yanıtla.",
+            "Her görevin yanıtını, görev numarasıyla birlikte tam olarak şu işaretler arasına yaz:",
+            "<<<YANIT n>>>\n(yanıt)\n<<<SON n>>>"
+        ]
+        for number, prompt in enumerate(prompts, 1):
+            parts.append(f"<<<GÖREV {number}>>>\n{prompt.strip()}\n<<<GÖREV {number} SONU>>>")
+        return "\n\n".join(parts)
+
+    @staticmethod
+    def split_response(text: str) -> Dict[int, str]:
+        """
+        Birleşik yanıtı görev numaralarına göre ayırır.
+
+        Args:
+            text (str): Birleşik yanıt.
+
+        Returns:
+            Dict[int, str]: Görev numarasına göre yanıtlar.
+        """
+        return {int(match.group(1)): match.group(2) for match in ANSWER_PATTERN.finditer(text or '')}
+
+
+def call_default_model(prompt: str, kind: str = 'default') -> str:
+    """
+    İsteği süreç genelindeki yapay zeka arka ucuna süreç genelindeki çağrı politikasıyla gönderir.
+
+    Args:
+        prompt (str): Yapay zekaya gönderilecek istek.
+        kind (str): İstek türü (kayıt ve yeniden oynatma için).
+
+    Returns:
+        str: Yapay zeka yanıtı.
+    """
+    backend = get_llm_backend()
+    return get_call_policy().call(lambda: backend.generate(prompt, kind))
+
+
+def uses_default_model(backend: LLMBackend, call_policy: CallPolicy) -> bool:
+    """
+    Arka ucun ve çağrı politikasının süreç genelindekiler olup olmadığını döndürür; yalnızca
+    bunları kullananların istekleri birleştiriciden geçebilir.
+    """
+    return backend is get_llm_backend() and call_policy is get_call_policy()
+
+
+_default_coalescer = None
+_default_coalescer_lock = threading.Lock()
+
+
+def get_request_coalescer() -> Optional[RequestCoalescer]:
+    """
+    Ortam değişkenlerine göre yapılandırılmış süreç genelindeki birleştiriciyi döndürür.
+
+    Birleştirici istekleri call_default_model ile, yani süreç genelindeki arka uç ve çağrı
+    politikasıyla gönderir.
+
+    Returns:
+        Optional[RequestCoalescer]: Birleştirme devre dışıysa None.
+    """
+    global _default_coalescer
+    if os.getenv("COALESCE_ENABLED", "0") != "1":
+        return None
+    with _default_coalescer_lock:
+        if _default_coalescer is None:
+            _default_coalescer = RequestCoalescer(
+                call_default_model,
+                max_batch_size=int(os.getenv("COALESCE_MAX_BATCH", "4")),
+                max_wait=int(os.getenv("COALESCE_WAIT_MS", "300")) / 1000
+            )
+        return _default_coalescer
@@ -0,0 +1,338 @@
+import os
+import json
+import time
+import sqlite3
+import secrets
+import logging
+import threading
+from typing import Dict, Any, Optional
+from app.utils.sqlite_util import make_parent_dirs, thread_connection
+
+# Loglama yapılandırması
+logger = logging.getLogger(__name__)
+
+
+class ResultStore:
+    """
+    Analiz ve test sonuçlarını sunucu tarafında saklayan depoların ortak arayüzü.
+
+    Oturumda yalnızca put() tarafından döndürülen opak sonuç kimliği tutulur.
+    """
+
+    def __init__(self, ttl_seconds: int = 24 * 3600):
+        """
+        ResultStore sınıfını başlatır.
+
+        Args:
+            ttl_seconds (int): Sonuçların saklanacağı süre (saniye).
+        """
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def new_id() -> str:
+        """
+        Tahmin edilemeyen yeni bir sonuç kimliği üretir.
+
+        Returns:
+            str: Sonuç kimliği.
+        """
+        return secrets.token_urlsafe(16)
+
+    def put(self, result: Dict[str, Any], result_id: Optional[str] = None) -> str:
+        """
+        Sonucu saklar.
+
+        Args:
+            result (Dict[str, Any]): JSON'a dönüştürülebilir sonuç.
+            result_id (Optional[str]): Kullanılacak kimlik. Verilmezse yenisi üretilir.
+
+        Returns:
+            str: Sonuç kimliği.
+        """
+        raise NotImplementedError
+
+    def get(self, result_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Kimliği verilen sonucu döndürür.
+
+        Args:
+            result_id (str): Sonuç kimliği.
+
+        Returns:
+            Optional[Dict[str, Any]]: Sonuç bulunamazsa veya süresi dolduysa None.
+        """
+        raise NotImplementedError
+
+    def link(self, key: str, result_id: str) -> None:
+        """
+        Bir arama anahtarını (örneğin transkript parmak izini) sonuca bağlar.
+
+        Args:
+            key (str): Arama anahtarı.
+            result_id (str): Sonuç kimliği.
+        """
+        raise NotImplementedError
+
+    def lookup(self, key: str) -> Optional[str]:
+        """
+        Arama anahtarına bağlı ve süresi dolmamış sonucun kimliğini döndürür.
+
+        Args:
+            key (str): Arama anahtarı.
+
+        Returns:
+            Optional[str]: Bağlı sonuç yoksa None.
+        """
+        raise NotImplementedError
+
+    def sweep(self) -> int:
+        """
+        Süresi dolan sonuçları siler.
+
+        Returns:
+            int: Silinen sonuç sayısı.
+        """
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """
+        Bekleyen yazmaları kalıcı hale getirir.
+        """
+
+
+class MemoryResultStore(ResultStore):
+    """
+    Sonuçları süreç belleğinde tutan depo (geliştirme ve testler için).
+    """
+
+    def __init__(self, ttl_seconds: int = 24 * 3600):
+        super().__init__(ttl_seconds)
+        self._results = {}
+        self._links = {}
+        self._lock = threading.Lock()
+
+    def put(self, result: Dict[str, Any], result_id: Optional[str] = None) -> str:
+        result_id = result_id or self.new_id()
+        with self._lock:
+            self._results[result_id] = (result, time.time())
+        return result_id
+
+    def get(self, result_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._results.get(result_id)
+        if entry is None or time.time() - entry[1] > self.ttl_seconds:
+            return None
+        return entry[0]
+
+    def link(self, key: str, result_id: str) -> None:
+        with self._lock:
+            self._links[key] = result_id
+
+    def lookup(self, key: str) -> Optional[str]:
+        with self._lock:
+            result_id = self._links.get(key)
+        if result_id is None or self.get(result_id) is None:
+            return None
+        return result_id
+
+    def sweep(self) -> int:
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            expired = [key for key, (_, created_at) in self._results.items() if created_at < cutoff]
+            for key in expired:
+                del self._results[key]
+            self._links = {key: result_id for key, result_id in self._links.items()
+                           if result_id in self._results}
+        return len(expired)
+
+
+class SQLiteResultStore(ResultStore):
+    """
+    Sonuçları gunicorn işçileri arasında paylaşılan bir SQLite veritabanında saklar.
+
+    Yazmalar bellekte biriktirilip arka plandaki bir iş parçacığı tarafından toplu
+    olarak yazılır; aynı iş parçacığı süresi dolan sonuçları da düzenli olarak siler.
+    """
+
+    def __init__(self, db_path: str, ttl_seconds: int = 24 * 3600, batch_size: int = 32,
+                 flush_interval: float = 0.5, sweep_interval: float = 300):
+        """
+        SQLiteResultStore sınıfını başlatır.
+
+        Args:
+            db_path (str): SQLite veritabanı dosyasının yolu.
+            ttl_seconds (int): Sonuçların saklanacağı süre (saniye).
+            batch_size (int): Bu sayıda yazma birikince beklemeden yazılır.
+            flush_interval (float): Biriken yazmaların en fazla bekleyeceği süre (saniye).
+            sweep_interval (float): Süresi dolan sonuçların silinme aralığı (saniye).
+        """
+        super().__init__(ttl_seconds)
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sweep_interval = sweep_interval
+        self._pending = {}
+        self._pending_links = {}
+        self._condition = threading.Condition()
+        self._local = threading.local()
+        self._worker = None
+        self._worker_pid = None
+        self._last_sweep = time.time()
+
+        make_parent_dirs(db_path)
+        with thread_connection(self._local, self.db_path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "id TEXT PRIMARY KEY, payload TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_results_created ON results (created_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS result_links (key TEXT PRIMARY KEY, result_id TEXT NOT NULL)")
+
+    def _ensure_worker(self) -> None:
+        """
+        Arka plan yazıcısını ilk kullanımda (ve fork sonrasında yeniden) başlatır.
+        Koşul kilidi tutulurken çağrılmalıdır.
+        """
+        if self._worker is None or self._worker_pid != os.getpid():
+            self._pending = {}
+            self._pending_links = {}
+            self._worker = threading.Thread(target=self._run, name='result-store', daemon=True)
+            self._worker_pid = os.getpid()
+            self._worker.start()
+
+    def put(self, result: Dict[str, Any], result_id: Optional[str] = None) -> str:
+        result_id = result_id or self.new_id()
+        payload = json.dumps(result, ensure_ascii=False)
+        with self._condition:
+            self._ensure_worker()
+            self._pending[result_id] = (payload, time.time())
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify()
+        return result_id
+
+    def get(self, result_id: str) -> Optional[Dict[str, Any]]:
+        with self._condition:
+            entry = self._pending.get(result_id)
+        if entry is not None:
+            return json.loads(entry[0])
+
+        try:
+            row = thread_connection(self._local, self.db_path).execute(
+                "SELECT payload FROM results WHERE id = ? AND created_at >= ?",
+                (result_id, time.time() - self.ttl_seconds)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error("Sonuç okunurken hata oluştu: %s", e)
+            return None
+        return json.loads(row[0]) if row else None
+
+    def link(self, key: str, result_id: str) -> None:
+        with self._condition:
+            self._ensure_worker()
+            self._pending_links[key] = result_id
+
+    def lookup(self, key: str) -> Optional[str]:
+        with self._condition:
+            result_id = self._pending_links.get(key)
+        if result_id is None:
+            try:
+                row = thread_connection(self._local, self.db_path).execute(
+                    "SELECT result_id FROM result_links WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.error("Sonuç bağlantısı okunurken hata oluştu: %s", e)
+                return None
+            result_id = row[0] if row else None
+        if result_id is None or self.get(result_id) is None:
+            return None
+        return result_id
+
+    def flush(self) -> None:
+        # Kayıtlar yazma tamamlanana kadar bekleyenlerde kalır; böylece get() ve lookup()
+        # yazma sırasında da onları bulur
+        with self._condition:
+            batch, links = dict(self._pending), dict(self._pending_links)
+        if not batch and not links:
+            return
+
+        try:
+            with thread_connection(self._local, self.db_path) as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO results (id, payload, created_at) VALUES (?, ?, ?)",
+                    [(result_id, payload, created_at) for result_id, (payload, created_at) in batch.items()]
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO result_links (key, result_id) VALUES (?, ?)",
+                    list(links.items())
+                )
+            logger.debug("%d sonuç toplu olarak yazıldı.", len(batch))
+        except sqlite3.Error as e:
+            # Yazılamayan kayıtlar bekleyenlerde kalır ve bir sonraki denemede yazılır
+            logger.error("Sonuçlar yazılırken hata oluştu: %s", e)
+            return
+
+        with self._condition:
+            # Yazma sırasında güncellenen kayıtlar bir sonraki yazmaya kalır
+            for result_id, entry in batch.items():
+                if self._pending.get(result_id) is entry:
+                    del self._pending[result_id]
+            for key, result_id in links.items():
+                if self._pending_links.get(key) == result_id:
+                    del self._pending_links[key]
+
+    def sweep(self) -> int:
+        try:
+            with thread_connection(self._local, self.db_path) as conn:
+                removed = conn.execute(
+                    "DELETE FROM results WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+                ).rowcount
+                conn.execute("DELETE FROM result_links WHERE result_id NOT IN (SELECT id FROM results)")
+        except sqlite3.Error as e:
+            logger.error("Süresi dolan sonuçlar silinirken hata oluştu: %s", e)
+            return 0
+        if removed:
+            logger.info("Süresi dolan %d sonuç silindi.", removed)
+        return removed
+
+    def _run(self) -> None:
+        """
+        Biriken yazmaları düzenli aralıklarla yazar ve süresi dolan sonuçları siler.
+        """
+        while True:
+            with self._condition:
+                if len(self._pending) < self.batch_size:
+                    self._condition.wait(self.flush_interval)
+            self.flush()
+            if time.time() - self._last_sweep >= self.sweep_interval:
+                self._last_sweep = time.time()
+                self.sweep()
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_result_store() -> ResultStore:
+    """
+    Ortam değişkenlerine göre yapılandırılmış paylaşılan sonuç deposunu döndürür.
+
+    RESULT_STORE değişkeni 'sqlite' (varsayılan) veya 'memory' olabilir.
+
+    Returns:
+        ResultStore: Sonuç deposu.
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            ttl_seconds = int(os.getenv("RESULT_TTL", str(24 * 3600)))
+            backend = os.getenv("RESULT_STORE", "sqlite")
+            if backend == 'memory':
+                _default_store = MemoryResultStore(ttl_seconds=ttl_seconds)
+            elif backend == 'sqlite':
+                _default_store = SQLiteResultStore(
+                    os.getenv("RESULT_STORE_PATH", os.path.join('cache', 'results.sqlite3')),
+                    ttl_seconds=ttl_seconds
+                )
+            else:
+                raise ValueError(f"Bilinmeyen sonuç deposu: {backend}")
+        return _default_store
@@ -0,0 +1,44 @@
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+
+def make_parent_dirs(db_path: str) -> None:
+    """
+    Veritabanı dosyasının dizinini (yoksa) oluşturur.
+
+    Args:
+        db_path (str): SQLite veritabanı dosyasının yolu.
+    """
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+
+def thread_connection(local: threading.local, db_path: str,
+                      isolation_level: Optional[str] = '') -> sqlite3.Connection:
+    """
+    İş parçacığına (ve sürece) özel SQLite bağlantısını döndürür.
+
+    Bağlantı verilen threading.local nesnesinde saklanır; fork sonrasında üst süreçten
+    kalan bağlantı kullanılmaz, yenisi açılır.
+
+    Args:
+        local (threading.local): Bağlantının saklandığı iş parçacığına özel nesne.
+        db_path (str): SQLite veritabanı dosyasının yolu.
+        isolation_level (Optional[str]): sqlite3.connect'e verilir; None ise bağlantı otomatik
+            işlem açmaz.
+
+    Returns:
+        sqlite3.Connection: Veritabanı bağlantısı.
+    """
+    conn = getattr(local, 'conn', None)
+    if conn is None or getattr(local, 'pid', None) != os.getpid():
+        conn = sqlite3.connect(db_path, timeout=10, isolation_level=isolation_level)
+        # WAL kipi, birden fazla sürecin aynı anda okuyup yazmasına izin verir
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        local.conn = conn
+        local.pid = os.getpid()
+    return conn
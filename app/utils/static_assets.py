@@ -0,0 +1,158 @@
+import os
+import hashlib
+import logging
+import mimetypes
+import threading
+from typing import Dict, Optional, Tuple
+
+from app.utils.compression import available_encodings, choose_encoding, compress
+
+# Loglama yapılandırması
+logger = logging.getLogger(__name__)
+
+# Parmak izi eklenen ve önceden sıkıştırılan dosya türleri
+ASSET_EXTENSIONS = ('.css', '.js')
+
+# Parmak izi olarak kullanılan içerik özetinin uzunluğu (onaltılık karakter)
+FINGERPRINT_LENGTH = 10
+
+# Parmak izli adresler içerik değişince değiştiğinden tarayıcılar bir yıl önbellekte tutar
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Parmak izi eski ya da hiç olmayan isteklerde dosya her kullanımda doğrulanır
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+# Önceden sıkıştırmada en yüksek düzeyler kullanılır; maliyet yalnızca başlangıçta ödenir
+PRECOMPRESS_LEVELS = {'gzip': 9, 'br': 11}
+
+
+class StaticAssets:
+    """
+    CSS ve JavaScript dosyalarını içerik özetli adlarla ve önceden sıkıştırılmış olarak sunar.
+
+    Dosyalar başlangıçta bir kez okunur, özetlenir ve kullanılabilen her kodlamayla
+    sıkıştırılıp bellekte tutulur. Şablonlar `css/style.css` yerine
+    `/assets/css/style.<özet>.css` adresini kullanır; adres içerikle birlikte değiştiğinden
+    yanıtlar süresiz önbelleğe alınabilir ve istek sırasında sıkıştırma yapılmaz.
+    """
+
+    def __init__(self, root: str, prefix: str = '/assets'):
+        """
+        StaticAssets sınıfını başlatır.
+
+        Args:
+            root (str): Statik dosyaların bulunduğu dizin.
+            prefix (str): Parmak izli adreslerin ön eki.
+        """
+        self.root = root
+        self.prefix = prefix.rstrip('/')
+        self._assets = {}
+        self._lock = threading.Lock()
+        for directory, _, files in os.walk(root):
+            for name in sorted(files):
+                if name.endswith(ASSET_EXTENSIONS):
+                    path = os.path.relpath(os.path.join(directory, name), root).replace(os.sep, '/')
+                    self._load(path)
+
+    def _load(self, path: str) -> Dict[str, object]:
+        """
+        Dosyayı okur, özetler ve önceden sıkıştırır.
+
+        Args:
+            path (str): Kök dizine göre dosya yolu ('css/style.css').
+
+        Returns:
+            Dict[str, object]: Dosyanın içerik, özet ve sıkıştırılmış biçimleri.
+        """
+        full_path = os.path.join(self.root, path)
+        with open(full_path, 'rb') as f:
+            data = f.read()
+
+        fingerprint = hashlib.sha256(data).hexdigest()[:FINGERPRINT_LENGTH]
+        base, extension = os.path.splitext(path)
+        asset = {
+            'fingerprint': fingerprint,
+            'url': f"{self.prefix}/{base}.{fingerprint}{extension}",
+            'mimetype': mimetypes.guess_type(path)[0] or 'text/plain',
+            'mtime': os.path.getmtime(full_path),
+            'encoded': {None: data}
+        }
+        for encoding in available_encodings():
+            encoded = compress(data, encoding, PRECOMPRESS_LEVELS[encoding])
+            # Sıkıştırma kazanç sağlamıyorsa (çok küçük dosya) sıkıştırılmamış hali sunulur
+            if len(encoded) < len(data):
+                asset['encoded'][encoding] = encoded
+
+        with self._lock:
+            self._assets[path] = asset
+        logger.debug("Statik dosya hazırlandı: %s (%s, %d bayt)", path, fingerprint, len(data))
+        return asset
+
+    def _get(self, path: str, reload: bool = False) -> Optional[Dict[str, object]]:
+        """
+        Dosyanın kaydını döndürür; reload ise değişmiş dosyayı yeniden hazırlar.
+        """
+        asset = self._assets.get(path)
+        if asset is not None and reload:
+            try:
+                if os.path.getmtime(os.path.join(self.root, path)) != asset['mtime']:
+                    asset = self._load(path)
+            except OSError:
+                return None
+        return asset
+
+    def url(self, path: str, reload: bool = False) -> str:
+        """
+        Dosyanın parmak izli adresini döndürür.
+
+        Args:
+            path (str): Kök dizine göre dosya yolu ('css/style.css').
+            reload (bool): Geliştirme sırasında değişen dosyaların yeni özetini kullan.
+
+        Returns:
+            str: Parmak izli adres; dosya bilinmiyorsa parmak izsiz adres.
+        """
+        asset = self._get(path, reload)
+        if asset is None:
+            return f"{self.prefix}/{path}"
+        return asset['url']
+
+    def serve(self, filename: str, accept_encoding: Optional[str],
+              reload: bool = False) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        """
+        Parmak izli (veya parmak izsiz) adresteki dosyanın gövdesini ve başlıklarını döndürür.
+
+        Gövde istemcinin kabul ettiği önceden sıkıştırılmış biçimdir. Parmak izi güncel değilse
+        (sayfa yeni sürümden önce açılmışsa) güncel dosya önbelleğe alınmadan sunulur.
+
+        Args:
+            filename (str): Ön ekten sonraki yol ('css/style.3f2a1b9c0d.css').
+            accept_encoding (Optional[str]): İstemcinin Accept-Encoding başlığı.
+            reload (bool): Değişen dosyaları yeniden hazırla.
+
+        Returns:
+            Optional[Tuple[bytes, Dict[str, str]]]: Gövde ve başlıklar; dosya yoksa None.
+        """
+        base, extension = os.path.splitext(filename)
+        stem, _, fingerprint = base.rpartition('.')
+        if not stem or len(fingerprint) != FINGERPRINT_LENGTH:
+            stem, fingerprint = base, None
+
+        asset = self._get(stem + extension, reload)
+        if asset is None:
+            return None
+
+        encoding = choose_encoding(accept_encoding)
+        if encoding not in asset['encoded']:
+            encoding = None
+        headers = {
+            'Content-Type': asset['mimetype'] + '; charset=utf-8',
+            'Cache-Control': (IMMUTABLE_CACHE_CONTROL if fingerprint == asset['fingerprint']
+                              else REVALIDATE_CACHE_CONTROL),
+            # Gövde kodlamaya göre değiştiğinden özet zayıf ETag olarak verilir
+            'ETag': 'W/"{}"'.format(asset['fingerprint']),
+            'Vary': 'Accept-Encoding'
+        }
+        if encoding is not None:
+            headers['Content-Encoding'] = encoding
+        return asset['encoded'][encoding], headers
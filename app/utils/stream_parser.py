@@ -0,0 +1,106 @@
+import json
+import logging
+from typing import Dict, List, Any
+
+# Loglama yapılandırması
+logger = logging.getLogger(__name__)
+
+
+class JsonArrayStreamParser:
+    """
+    Parça parça gelen yanıttaki ilk JSON dizisinin tamamlanan nesne öğelerini çıkarır.
+
+    Yanıtın tamamını beklemeden, her soru nesnesinin kapanış parantezi geldiği anda
+    o nesne ayrıştırılıp döndürülür. Dizi öncesindeki metin (kod bloğu işaretleri,
+    açıklamalar ya da {"questions": ...} gibi bir sarmalayıcı) yok sayılır.
+
+    Her parça yalnızca bir kez taranır; tamamlanmamış nesnenin parçaları listede tutulur
+    ve nesne kapandığında bir kez birleştirilir.
+    """
+
+    def __init__(self):
+        """
+        JsonArrayStreamParser sınıfını başlatır.
+        """
+        self._pieces = None
+        self._in_array = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def finished(self) -> bool:
+        """
+        Dizinin kapanış parantezine ulaşılıp ulaşılmadığını döndürür.
+        """
+        return self._finished
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Yeni gelen metin parçasını işler.
+
+        Args:
+            chunk (str): Yanıtın yeni parçası.
+
+        Returns:
+            List[Dict[str, Any]]: Bu parçayla tamamlanan nesneler (geliş sırasıyla).
+        """
+        if self._finished or not chunk:
+            return []
+
+        completed = []
+        # Süren nesne bu parçanın başından, yeni başlayan nesne açılış parantezinden itibaren alınır
+        object_start = 0
+
+        for position, char in enumerate(chunk):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if not self._in_array:
+                # Dizi başlamadan önceki metindeki tırnaklar önemsizdir
+                if char == '[':
+                    self._in_array = True
+                    self._depth = 1
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in '[{':
+                if self._depth == 1 and char == '{':
+                    self._pieces = []
+                    object_start = position
+                self._depth += 1
+            elif char in ']}':
+                self._depth -= 1
+                if self._depth == 1 and char == '}' and self._pieces is not None:
+                    self._pieces.append(chunk[object_start:position + 1])
+                    item = self._decode(''.join(self._pieces))
+                    if item is not None:
+                        completed.append(item)
+                    self._pieces = None
+                elif self._depth == 0:
+                    self._finished = True
+                    break
+
+        if self._pieces is not None:
+            self._pieces.append(chunk[object_start:])
+        return completed
+
+    @staticmethod
+    def _decode(text: str) -> Any:
+        """
+        Tamamlanan öğeyi ayrıştırır; geçersizse None döndürür.
+        """
+        try:
+            item = json.loads(text)
+        except json.JSONDecodeError as e:
+            logger.warning("Akıştaki öğe ayrıştırılamadı: %s", e)
+            return None
+        return item if isinstance(item, dict) else None
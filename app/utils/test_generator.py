@@ -1,10 +1,16 @@
 import json
+import html
+import hashlib
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+from app.utils.metrics import get_metrics
 
 # Loglama yapılandırması
 logger = logging.getLogger(__name__)
 
+# Seçeneklerin sırasıyla gösterilen harfleri
+OPTION_LETTERS = 'ABCDEFGH'
+
 class TestGenerator:
     """
     Yapay zeka tarafından oluşturulan test verilerini işler ve kullanılabilir formata dönüştürür.
@@ -19,7 +25,7 @@ class TestGenerator:
         """
         self.raw_tests = raw_tests
         self.processed_tests = None
-        logger.debug(f"Ham test verileri: {raw_tests}")
+        logger.debug("Ham test verileri: %s", raw_tests)
     
     def process_tests(self) -> List[Dict[str, Any]]:
         """
@@ -35,9 +41,9 @@ class TestGenerator:
             try:
                 # JSON formatını temizle (yapay zeka bazen kod bloğu içinde JSON döndürebilir)
                 cleaned_json = self._clean_json_string(self.raw_tests)
-                logger.debug(f"Temizlenmiş JSON: {cleaned_json}")
+                logger.debug("Temizlenmiş JSON: %s", cleaned_json)
                 tests_data = json.loads(cleaned_json)
-                logger.debug(f"JSON yüklendi: {tests_data}")
+                logger.debug("JSON yüklendi: %s", tests_data)
                 
                 # JSON yapısına göre işleme
                 if isinstance(tests_data, list):
@@ -52,7 +58,7 @@ class TestGenerator:
                     logger.debug("Diğer JSON formatında testler işlendi.")
             except json.JSONDecodeError as e:
                 # Manuel ayrıştırma
-                logger.debug(f"JSON ayrıştırma hatası: {str(e)}. Manuel ayrıştırma yapılıyor.")
+                logger.debug("JSON ayrıştırma hatası: %s. Manuel ayrıştırma yapılıyor.", e)
                 self.processed_tests = self._manually_parse_tests()
             
             # Test verilerini doğrula ve temizle
@@ -60,7 +66,7 @@ class TestGenerator:
             
             return self.processed_tests
         except Exception as e:
-            logger.error(f"Test verileri işlenirken hata oluştu: {str(e)}")
+            logger.error("Test verileri işlenirken hata oluştu: %s", e)
             return []
     
     def _clean_json_string(self, json_str: str) -> str:
@@ -97,7 +103,7 @@ class TestGenerator:
         # Basit bir manuel ayrıştırma
         tests = []
         lines = self.raw_tests.split('\n')
-        logger.debug(f"Manuel ayrıştırma için {len(lines)} satır.")
+        logger.debug("Manuel ayrıştırma için %d satır.", len(lines))
         
         current_test = {}
         for line in lines:
@@ -107,9 +113,9 @@ class TestGenerator:
             if line.startswith("Soru ") or line.startswith("Question "):
                 if current_test and 'question' in current_test:
                     tests.append(current_test)
-                    logger.debug(f"Yeni test eklendi: {current_test}")
+                    logger.debug("Yeni test eklendi: %s", current_test)
                 current_test = {'question': line, 'options': []}
-                logger.debug(f"Yeni soru başladı: {line}")
+                logger.debug("Yeni soru başladı: %s", line)
             
             # Seçenekler
             elif line.startswith(("A)", "B)", "C)", "D)")):
@@ -119,24 +125,24 @@ class TestGenerator:
                     'letter': option_letter,
                     'text': option_text
                 })
-                logger.debug(f"Seçenek eklendi: {option_letter} - {option_text}")
+                logger.debug("Seçenek eklendi: %s - %s", option_letter, option_text)
             
             # Doğru cevap
             elif "Doğru cevap:" in line or "Correct answer:" in line:
                 current_test['correct_answer'] = line.split(":")[-1].strip()
-                logger.debug(f"Doğru cevap eklendi: {current_test['correct_answer']}")
+                logger.debug("Doğru cevap eklendi: %s", current_test['correct_answer'])
             
             # Açıklama
             elif "Açıklama:" in line or "Explanation:" in line:
                 current_test['explanation'] = line.split(":")[-1].strip()
-                logger.debug(f"Açıklama eklendi: {current_test['explanation']}")
+                logger.debug("Açıklama eklendi: %s", current_test['explanation'])
         
         # Son soruyu ekle
         if current_test and 'question' in current_test:
             tests.append(current_test)
-            logger.debug(f"Son test eklendi: {current_test}")
+            logger.debug("Son test eklendi: %s", current_test)
         
-        logger.debug(f"Manuel ayrıştırma sonucu {len(tests)} test oluşturuldu.")
+        logger.debug("Manuel ayrıştırma sonucu %d test oluşturuldu.", len(tests))
         return tests
     
     def _validate_and_clean_tests(self) -> None:
@@ -149,44 +155,59 @@ class TestGenerator:
         
         cleaned_tests = []
         for test in self.processed_tests:
-            # Gerekli alanları kontrol et
-            if not all(key in test for key in ['question']):
-                logger.warning(f"Geçersiz test: 'question' alanı eksik - {test}")
-                continue
-            
-            # Seçenekleri kontrol et
-            if 'options' not in test or not test['options']:
-                logger.debug(f"Test için seçenekler oluşturuluyor: {test['question']}")
-                # Seçenekleri A, B, C, D anahtarlarından oluştur
-                options = []
-                for letter in ['A', 'B', 'C', 'D']:
-                    if letter in test:
-                        options.append({
-                            'letter': letter,
-                            'text': test[letter]
-                        })
-                test['options'] = options
-            
-            # Doğru cevabı kontrol et
-            if 'correct_answer' not in test:
-                if 'answer' in test:
-                    test['correct_answer'] = test['answer']
-                    logger.debug(f"Doğru cevap 'answer' alanından alındı: {test['correct_answer']}")
-                else:
-                    # Varsayılan olarak A'yı seç
-                    test['correct_answer'] = 'A'
-                    logger.warning(f"Doğru cevap bulunamadı, varsayılan olarak 'A' seçildi: {test['question']}")
-            
-            # Açıklamayı kontrol et
-            if 'explanation' not in test:
-                test['explanation'] = "Açıklama bulunmuyor."
-                logger.debug(f"Açıklama bulunamadı, varsayılan açıklama eklendi: {test['question']}")
-            
-            cleaned_tests.append(test)
+            test = self.clean_test(test)
+            if test is not None:
+                cleaned_tests.append(test)
         
-        logger.debug(f"Temizleme sonrası {len(cleaned_tests)} test kaldı.")
+        logger.debug("Temizleme sonrası %d test kaldı.", len(cleaned_tests))
         self.processed_tests = cleaned_tests
     
+    @staticmethod
+    def clean_test(test: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Tek bir test sorusunu doğrular ve eksik alanlarını tamamlar.
+        
+        Args:
+            test (Dict[str, Any]): Test sorusu.
+            
+        Returns:
+            Optional[Dict[str, Any]]: Temizlenmiş soru; geçersizse None.
+        """
+        # Gerekli alanları kontrol et
+        if not all(key in test for key in ['question']):
+            logger.warning("Geçersiz test: 'question' alanı eksik - %s", test)
+            return None
+        
+        # Seçenekleri kontrol et
+        if 'options' not in test or not test['options']:
+            logger.debug("Test için seçenekler oluşturuluyor: %s", test['question'])
+            # Seçenekleri A, B, C, D anahtarlarından oluştur
+            options = []
+            for letter in ['A', 'B', 'C', 'D']:
+                if letter in test:
+                    options.append({
+                        'letter': letter,
+                        'text': test[letter]
+                    })
+            test['options'] = options
+        
+        # Doğru cevabı kontrol et
+        if 'correct_answer' not in test:
+            if 'answer' in test:
+                test['correct_answer'] = test['answer']
+                logger.debug("Doğru cevap 'answer' alanından alındı: %s", test['correct_answer'])
+            else:
+                # Varsayılan olarak A'yı seç
+                test['correct_answer'] = 'A'
+                logger.warning("Doğru cevap bulunamadı, varsayılan olarak 'A' seçildi: %s", test['question'])
+        
+        # Açıklamayı kontrol et
+        if 'explanation' not in test:
+            test['explanation'] = "Açıklama bulunmuyor."
+            logger.debug("Açıklama bulunamadı, varsayılan açıklama eklendi: %s", test['question'])
+        
+        return test
+    
     def get_tests_as_html(self) -> str:
         """
         Test verilerini HTML formatında döndürür.
@@ -198,29 +219,110 @@ class TestGenerator:
             logger.warning("HTML oluşturmak için test verisi yok.")
             return "<p>Test verileri bulunamadı.</p>"
         
-        html = "<div class='tests-container'>"
+        parts = ["<div class='tests-container'>"]
+        parts.extend(self.render_test(i, test) for i, test in enumerate(self.processed_tests, 1))
+        parts.append("</div>")
+        logger.debug("%d test için HTML oluşturuldu.", len(self.processed_tests))
+        return "".join(parts)
+    
+    @staticmethod
+    def render_test(number: int, test: Dict[str, Any]) -> str:
+        """
+        Tek bir test sorusunu HTML formatında döndürür.
+        
+        Yapay zekanın ürettiği metinler kaçış karakterleriyle yazılır; böylece soru ve
+        seçeneklerdeki '<' ve '&' karakterleri sayfanın yapısını bozmaz.
         
-        for i, test in enumerate(self.processed_tests, 1):
-            html += f"<div class='test-item' id='test-{i}'>"
-            html += f"<h3 class='question'>{i}. {test['question']}</h3>"
-            html += "<div class='options'>"
+        Args:
+            number (int): Sorunun sıra numarası (1'den başlar).
+            test (Dict[str, Any]): Temizlenmiş test sorusu.
             
-            for option in test.get('options', []):
-                letter = option.get('letter', '')
-                text = option.get('text', '')
-                html += f"""
-                <div class='option'>
-                    <input type='radio' name='test-{i}' id='test-{i}-{letter}' value='{letter}'>
-                    <label for='test-{i}-{letter}'>{letter}) {text}</label>
-                </div>
-                """
+        Returns:
+            str: Sorunun HTML kodu.
+        """
+        payload = TestGenerator.to_payload(test)
+        name = f"test-{number}"
+        parts = [
+            f"<div class='test-item' id='{name}'>",
+            f"<h3 class='question'>{number}. {html.escape(payload['question'], quote=False)}</h3>",
+            "<div class='options'>"
+        ]
+        
+        for index, text in enumerate(payload['options']):
+            letter = OPTION_LETTERS[index] if index < len(OPTION_LETTERS) else str(index + 1)
+            parts.append(f"<div class='option'><input type='radio' name='{name}' id='{name}-{letter}' value='{letter}'>"
+                         f"<label for='{name}-{letter}'>{letter}) {html.escape(text, quote=False)}</label></div>")
+        
+        answer = OPTION_LETTERS[payload['answer']] if 0 <= payload['answer'] < len(OPTION_LETTERS) else ''
+        parts.append("</div>")
+        explanation = html.escape(payload['explanation'], quote=False)
+        parts.append(f"<div class='explanation' style='display:none;'>{explanation}</div>")
+        parts.append(f"<div class='correct-answer' data-answer='{answer}'></div>")
+        parts.append("<button class='check-answer-btn'>Cevabı Kontrol Et</button>")
+        parts.append("</div>")
+        return "".join(parts)
+    
+    @staticmethod
+    def to_payload(test: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Temizlenmiş bir test sorusunu istemcide gösterilecek yalın biçime dönüştürür.
+        
+        Seçenek harfleri gönderilmez; istemci harfleri seçeneklerin sırasından üretir. Doğru
+        cevap harf, "B) metin" veya seçenek metni olarak verilmiş olabilir; her durumda
+        seçeneğin sırasına çevrilir.
+        
+        Args:
+            test (Dict[str, Any]): Temizlenmiş test sorusu.
             
-            html += "</div>"
-            html += f"<div class='explanation' style='display:none;'>{test.get('explanation', '')}</div>"
-            html += f"<div class='correct-answer' data-answer='{test.get('correct_answer', '')}'></div>"
-            html += "<button class='check-answer-btn'>Cevabı Kontrol Et</button>"
-            html += "</div>"
-        
-        html += "</div>"
-        logger.debug(f"{len(self.processed_tests)} test için HTML oluşturuldu.")
-        return html 
\ No newline at end of file
+        Returns:
+            Dict[str, Any]: 'question', 'options' (metinler), 'answer' (doğru seçeneğin sırası,
+            bulunamazsa -1) ve 'explanation' alanları.
+        """
+        letters = []
+        options = []
+        for index, option in enumerate(test.get('options') or []):
+            if isinstance(option, dict):
+                letter, text = option.get('letter', ''), option.get('text', '')
+            else:
+                letter, text = '', option
+            letters.append(str(letter).strip().upper() or
+                           (OPTION_LETTERS[index] if index < len(OPTION_LETTERS) else ''))
+            options.append(str(text))
+        
+        correct = str(test.get('correct_answer', '')).strip()
+        answer = -1
+        for index, (letter, text) in enumerate(zip(letters, options)):
+            if correct and (correct.upper() == letter or correct == text.strip()
+                            or correct.upper().startswith(letter + ')')):
+                answer = index
+                break
+        
+        return {
+            'question': str(test.get('question', '')),
+            'options': options,
+            'answer': answer,
+            'explanation': str(test.get('explanation', ''))
+        }
+    
+    def render(self) -> Dict[str, Any]:
+        """
+        Testleri bir kez işleyip HTML'e ve istemcide gösterilecek yalın biçime dönüştürür
+        ve içerik özetiyle birlikte döndürür.
+        
+        Sonuç, sonuç deposunda saklanarak sonraki gösterimlerde yeniden ayrıştırma
+        ve HTML oluşturma yapılmadan kullanılır.
+        
+        Returns:
+            Dict[str, Any]: 'processed_tests', 'questions', 'tests_html' ve 'content_hash' alanları.
+        """
+        metrics = get_metrics()
+        with metrics.timer('flai_stage_duration_seconds', stage='process_tests'):
+            processed_tests = self.process_tests()
+        with metrics.timer('flai_stage_duration_seconds', stage='render_html'):
+            tests_html = self.get_tests_as_html()
+        return {
+            'processed_tests': processed_tests,
+            'questions': [self.to_payload(test) for test in processed_tests],
+            'tests_html': tests_html,
+            'content_hash': hashlib.sha256(tests_html.encode('utf-8')).hexdigest()
+        }
@@ -0,0 +1,236 @@
+import os
+import re
+import logging
+import operator
+from typing import TYPE_CHECKING, Dict, List, Any, Optional
+from app.utils.transcript_frame import TranscriptFrame
+from app.utils.prompt_budget import PromptBudget, count_tokens, split_words
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Loglama yapılandırması
+logger = logging.getLogger(__name__)
+
+# Anlam taşımayan dolgu sesleri; çevresindeki virgülle birlikte silinir
+FILLER_WORDS = frozenset("um umm ummm uh uhh uhhh er erm ah ahh hmm hmmm mm mmm mhm".split())
+FILLER_PATTERN = re.compile(
+    r",?\s*\b(?:uh-huh|mm-hmm|" + "|".join(sorted(FILLER_WORDS, key=len, reverse=True)) + r")\b[,.]?",
+    re.IGNORECASE)
+
+# Art arda tekrarlanan bir ila dört kelimelik ifadeler ("I I went", "go to the, go to the")
+REPEAT_PATTERN = re.compile(r"\b(\w+(?:\s+\w+){0,3})(?:[\s,]+\1\b)+", re.IGNORECASE)
+MAX_REPEAT_WORDS = 4
+
+# Noktalama işaretinden önceki ya da art arda gelen boşluklar
+SPACE_PATTERN = re.compile(r"\s+(?=[,.!?])|(?<=\s)\s+")
+
+# Yalnızca bunlardan oluşan kısa konuşmalar dinleyici onayıdır ve atılır
+BACKCHANNEL_WORDS = frozenset(
+    "yeah yes yep yup ok okay right alright sure mhm uh-huh i see cool great nice good wow oh ah "
+    "fine exactly true".split()
+)
+
+# Kısaltılmış konuşmacı etiketleri
+TEACHER_LABEL = 'T'
+STUDENT_LABEL = 'S'
+
+
+class CompressedTranscript(TranscriptFrame):
+    """
+    Sıkıştırılmış transkript; TranscriptFrame görünümlerine ek olarak kısaltılmış
+    etiketlerin karşılıklarını ve sıkıştırma istatistiklerini tutar.
+    """
+
+    def __init__(self, frame: 'pd.DataFrame', labels: Dict[str, str], teacher: Optional[str],
+                 stats: Dict[str, Any]):
+        """
+        CompressedTranscript sınıfını başlatır.
+
+        Args:
+            frame (pd.DataFrame): Sıkıştırılmış konuşmalar.
+            labels (Dict[str, str]): Kısaltılmış etiket -> özgün konuşmacı adı.
+            teacher (Optional[str]): Öğretmenin (kısaltılmış) etiketi.
+            stats (Dict[str, Any]): Sıkıştırma istatistikleri.
+        """
+        super().__init__(frame)
+        self.labels = labels
+        self.teacher = teacher
+        self.stats = stats
+
+    @property
+    def legend(self) -> Optional[str]:
+        """
+        Kısaltılmış etiketlerin isteğe eklenecek açıklamasını döndürür.
+        """
+        if not self.labels or list(self.labels) == list(self.labels.values()):
+            return None
+        roles = [f"{label} = {'öğretmen' if label == self.teacher else 'öğrenci'}" for label in self.labels]
+        return "Konuşmacılar: " + ", ".join(roles)
+
+
+class TranscriptCompressor:
+    """
+    Yapay zekaya gönderilecek transkripti anlamını koruyarak kısaltır.
+
+    Sırasıyla dolgu seslerini siler, tekrarlanan ifadeleri teke indirir, yalnızca
+    dinleyici onayından ("yeah", "okay") oluşan konuşmaları atar, aynı konuşmacının
+    art arda konuşmalarını birleştirir ve konuşmacı adlarını kısaltır. Aynı girdi için
+    her zaman aynı çıktıyı üretir.
+    """
+
+    def __init__(self, drop_filler: bool = True, collapse_repeats: bool = True,
+                 drop_backchannel: bool = True, merge_turns: bool = True,
+                 abbreviate_speakers: bool = True):
+        """
+        TranscriptCompressor sınıfını başlatır.
+
+        Args:
+            drop_filler (bool): Dolgu seslerini siler.
+            collapse_repeats (bool): Art arda tekrarlanan ifadeleri teke indirir.
+            drop_backchannel (bool): Yalnızca dinleyici onayından oluşan konuşmaları atar.
+            merge_turns (bool): Aynı konuşmacının art arda konuşmalarını birleştirir.
+            abbreviate_speakers (bool): Öğretmeni 'T', öğrencileri 'S' (birden çoksa 'S1', 'S2'...)
+                olarak etiketler.
+        """
+        self.drop_filler = drop_filler
+        self.collapse_repeats = collapse_repeats
+        self.drop_backchannel = drop_backchannel
+        self.merge_turns = merge_turns
+        self.abbreviate_speakers = abbreviate_speakers
+
+    def clean_text(self, text: str) -> str:
+        """
+        Tek bir konuşmanın metninden dolgu seslerini ve tekrarları temizler.
+
+        Düzenli ifadeler yalnızca kelime listesi üzerindeki hızlı kontroller dolgu sesi
+        ya da tekrar bulduğunda çalıştırılır.
+
+        Args:
+            text (str): Konuşma metni.
+
+        Returns:
+            str: Temizlenmiş metin (boş olabilir).
+        """
+        words = split_words(text)
+        changed = False
+        if self.drop_filler and not FILLER_WORDS.isdisjoint(words):
+            text = FILLER_PATTERN.sub(' ', text)
+            words = [word for word in words if word not in FILLER_WORDS]
+            changed = True
+        if self.collapse_repeats and self._has_repeat(words):
+            text = REPEAT_PATTERN.sub(r'\1', text)
+            changed = True
+        if not changed:
+            return text
+        # Silinen dolgu sesinden kalan boşluklar ve baştaki noktalama
+        return SPACE_PATTERN.sub('', text).strip().lstrip(',. ')
+
+    @staticmethod
+    def _has_repeat(words: List[str]) -> bool:
+        """
+        Art arda tekrarlanan bir ifade olabilip olamayacağını hızlıca kontrol eder.
+
+        Tek kelimelik tekrarda komşu kelimeler, daha uzun tekrarlarda ise ifade uzunluğu
+        kadar arayla aynı kelime çifti bulunur.
+        """
+        if any(map(operator.eq, words, words[1:])):
+            return True
+        pairs = list(zip(words, words[1:]))
+        return any(any(map(operator.eq, pairs, pairs[size:])) for size in range(2, MAX_REPEAT_WORDS + 1))
+
+    def is_backchannel(self, text: str) -> bool:
+        """
+        Konuşmanın yalnızca dinleyici onayından oluşup oluşmadığını döndürür.
+        """
+        if len(text) > 32:
+            return False
+        words = re.findall(r"[\w'-]+", text.lower())
+        return len(words) <= 3 and all(word in BACKCHANNEL_WORDS for word in words)
+
+    def _labels(self, speakers: List[str], teacher: Optional[str]) -> Dict[str, str]:
+        """
+        Özgün konuşmacı adlarını kısaltılmış etiketlere eşler (ilk konuşma sırasıyla).
+        """
+        if not self.abbreviate_speakers:
+            return {speaker: speaker for speaker in dict.fromkeys(speakers)}
+        students = [speaker for speaker in dict.fromkeys(speakers) if speaker != teacher]
+        labels = {teacher: TEACHER_LABEL} if teacher is not None else {}
+        if len(students) == 1:
+            labels[students[0]] = STUDENT_LABEL
+        else:
+            labels.update((student, f"{STUDENT_LABEL}{number}") for number, student in enumerate(students, 1))
+        return labels
+
+    def compress(self, transcript: TranscriptFrame) -> CompressedTranscript:
+        """
+        Transkripti sıkıştırır.
+
+        Args:
+            transcript (TranscriptFrame): İşlenmiş transkript.
+
+        Returns:
+            CompressedTranscript: Sıkıştırılmış transkript ve istatistikleri.
+        """
+        frame = transcript.frame
+        speakers = frame['speaker'].astype(str).tolist()
+        texts = frame['text'].tolist()
+        teacher = PromptBudget().find_teacher(speakers, texts)
+        labels = self._labels(speakers, teacher)
+
+        rows: List[List[Any]] = []
+        for index, speaker, start_ms, end_ms, text in zip(
+                frame['index'].tolist(), speakers, frame['start_ms'].tolist(), frame['end_ms'].tolist(), texts):
+            text = self.clean_text(text)
+            if not text or (self.drop_backchannel and self.is_backchannel(text)):
+                continue
+            label = labels[speaker]
+            if self.merge_turns and rows and rows[-1][1] == label:
+                previous = rows[-1]
+                previous[3] = end_ms
+                previous[4] = f"{previous[4]} {text}"
+                continue
+            rows.append([index, label, start_ms, end_ms, text])
+
+        import pandas as pd
+
+        order = list(dict.fromkeys(row[1] for row in rows))
+        compressed = pd.DataFrame({
+            'index': pd.Series([row[0] for row in rows], dtype=frame['index'].dtype),
+            'speaker': pd.Categorical([row[1] for row in rows], categories=order),
+            'start_ms': pd.Series([row[2] for row in rows], dtype='int64'),
+            'end_ms': pd.Series([row[3] for row in rows], dtype='int64'),
+            'text': pd.Series([row[4] for row in rows], dtype=object)
+        })
+
+        original_tokens = self.count_tokens(speakers, texts)
+        compressed_tokens = self.count_tokens([row[1] for row in rows], [row[4] for row in rows])
+        stats = {
+            'original_turns': len(texts),
+            'compressed_turns': len(rows),
+            'original_tokens': original_tokens,
+            'compressed_tokens': compressed_tokens,
+            'ratio': round(compressed_tokens / original_tokens, 4) if original_tokens else 1.0
+        }
+        used_labels = {label: name for name, label in labels.items() if label in order}
+        return CompressedTranscript(compressed, used_labels, labels.get(teacher), stats)
+
+    @staticmethod
+    def count_tokens(speakers: List[str], texts: List[str]) -> int:
+        """
+        Konuşmaların "konuşmacı: metin" satırları olarak token sayısını döndürür.
+        """
+        label_tokens = {speaker: count_tokens(f"{speaker}:") for speaker in set(speakers)}
+        return sum(label_tokens[speaker] + count_tokens(text) for speaker, text in zip(speakers, texts))
+
+
+def get_transcript_compressor() -> Optional[TranscriptCompressor]:
+    """
+    TRANSCRIPT_COMPRESSION ortam değişkenine göre sıkıştırıcıyı döndürür.
+
+    Returns:
+        Optional[TranscriptCompressor]: Sıkıştırma kapalıysa None.
+    """
+    if os.getenv("TRANSCRIPT_COMPRESSION", "1") != "1":
+        return None
+    return TranscriptCompressor()
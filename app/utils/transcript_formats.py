@@ -0,0 +1,440 @@
+import io
+import re
+import csv
+import json
+import logging
+from typing import Dict, List, Any, IO, Iterable, Iterator, Optional, Tuple
+from app.utils.transcript_frame import format_timestamp, parse_timestamp
+
+# Loglama yapılandırması
+logger = logging.getLogger(__name__)
+
+# Biçimi belirlemek için okunan baş kısmın boyutu (bayt)
+SNIFF_BYTES = 8 * 1024
+
+# Altyazı zaman aralığı satırı; saat isteğe bağlı, milisaniye ayracı '.' (VTT) ya da ',' (SRT)
+CUE_TIME_PATTERN = re.compile(r'((?:\d+:)?\d+:\d+[.,]\d+)\s*-->\s*((?:\d+:)?\d+:\d+[.,]\d+)')
+# "Konuşmacı: metin" satırı ve WebVTT konuşmacı etiketi (<v Konuşmacı>metin</v>)
+SPEAKER_TEXT_PATTERN = re.compile(r'([^:]+): (.*)')
+VOICE_PATTERN = re.compile(r'<v(?:\.[^\s>]+)?\s+([^>]+)>(.*?)(?:</v>)?$')
+# Altyazı metnindeki biçimlendirme etiketleri (<i>, <b>, <c.renk> vb.)
+TAG_PATTERN = re.compile(r'</?[^>]*>')
+
+# Tablo sütunlarının ve JSON alanlarının kabul edilen adları (sadeleştirilmiş)
+SPEAKER_FIELDS = ('speaker', 'speaker_name', 'username', 'user_name', 'name', 'participant', 'konuşmacı')
+TEXT_FIELDS = ('text', 'content', 'transcript', 'message', 'metin')
+START_FIELDS = ('start_time', 'start', 'begin', 'ts', 'timestamp', 'başlangıç')
+END_FIELDS = ('end_time', 'end', 'end_ts', 'stop', 'bitiş')
+INDEX_FIELDS = ('index', 'id', 'number', 'sequence')
+# Zoom JSON dışa aktarımlarında konuşma listesini içerebilen alanlar
+JSON_LIST_FIELDS = ('transcript', 'segments', 'timeline', 'results', 'items', 'entries')
+
+
+def normalize_timestamp(value: Any) -> str:
+    """
+    Farklı biçimlerdeki zaman değerlerini 'SS:DD:SS.mmm' biçimine çevirir.
+
+    Sayılar saniye kabul edilir; 'DD:SS' ve milisaniye ayracı ',' olan değerler de kabul edilir.
+
+    Args:
+        value (Any): Zaman değeri.
+
+    Returns:
+        str: 'SS:DD:SS.mmm' biçimindeki zaman damgası (değer boşsa sıfır).
+
+    Raises:
+        ValueError: Değer zaman olarak okunamazsa.
+    """
+    if value is None or value == '':
+        return format_timestamp(0)
+    if isinstance(value, (int, float)):
+        return format_timestamp(round(value * 1000))
+    value = value.strip()
+    # Zoom VTT ve SRT dışa aktarımlarındaki biçim yalnızca ayraç farkıyla doğrudan kullanılır
+    if len(value) == 12 and value[2] == ':' and value[5] == ':':
+        if value[8] == '.':
+            return value
+        if value[8] == ',':
+            return f"{value[:8]}.{value[9:]}"
+    value = value.replace(',', '.')
+    if ':' not in value:
+        return format_timestamp(round(float(value) * 1000))
+    if value.count(':') == 1:
+        value = '0:' + value
+    return format_timestamp(parse_timestamp(value))
+
+
+def field_name(name: str) -> str:
+    """
+    Sütun ya da alan adını karşılaştırma için sadeleştirir ('Start Time' -> 'start_time').
+    """
+    return '_'.join(name.strip().lower().replace('-', ' ').split())
+
+
+def _field_index(names: List[str], candidates: Tuple[str, ...]) -> Optional[int]:
+    """
+    Aday adlardan ilk bulunanın sırasını döndürür.
+    """
+    for candidate in candidates:
+        if candidate in names:
+            return names.index(candidate)
+    return None
+
+
+class TranscriptParser:
+    """
+    Bir transkript biçiminin ayrıştırıcısı için ortak arayüz.
+
+    sniff biçimi dosyanın baş kısmından tanır; parse satırları tek geçişte, biçimden
+    bağımsız olarak aynı alanlara (index, start_time, end_time, speaker, text) sahip
+    konuşma kayıtlarına çevirir.
+    """
+
+    name = ''
+    extensions: Tuple[str, ...] = ()
+
+    def sniff(self, head: str) -> bool:
+        """
+        Baş kısmın bu biçimde olup olmadığını döndürür.
+
+        Args:
+            head (str): Dosyanın çözülmüş baş kısmı (en fazla SNIFF_BYTES).
+
+        Returns:
+            bool: Biçim tanındıysa True.
+        """
+        raise NotImplementedError
+
+    def parse(self, lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Satırları konuşma kayıtlarına çevirir.
+
+        Args:
+            lines (Iterable[str]): Transkript satırları.
+
+        Yields:
+            Dict[str, Any]: Ayrıştırılmış konuşma kaydı.
+        """
+        raise NotImplementedError
+
+
+class CueParser(TranscriptParser):
+    """
+    Zaman aralıklı altyazı bloklarından oluşan biçimlerin (WebVTT, SRT) ayrıştırıcısı.
+
+    Her blok isteğe bağlı bir sıra numarası, "başlangıç --> bitiş" satırı ve bir ya da
+    daha fazla metin satırından oluşur. Konuşmacı "Konuşmacı: metin" önekinden ya da
+    <v Konuşmacı> etiketinden alınır; konuşmacısı olmayan bloklar atlanır.
+    """
+
+    def __init__(self, name: str, extensions: Tuple[str, ...], separator: str, header: str = ''):
+        """
+        CueParser sınıfını başlatır.
+
+        Args:
+            name (str): Biçim adı.
+            extensions (Tuple[str, ...]): Biçimin dosya uzantıları.
+            separator (str): Zaman damgasındaki milisaniye ayracı.
+            header (str): Dosyanın başındaki biçim imzası ('WEBVTT' gibi).
+        """
+        self.name = name
+        self.extensions = extensions
+        self.separator = separator
+        self.header = header
+
+    def sniff(self, head: str) -> bool:
+        if self.header and head.lstrip().startswith(self.header):
+            return True
+        time_match = CUE_TIME_PATTERN.search(head)
+        return time_match is not None and self.separator in time_match.group(1)
+
+    def parse(self, lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        previous_line = ''
+        cue = None
+        texts: List[str] = []
+        count = 0
+
+        for line in lines:
+            line = line.strip()
+            time_match = CUE_TIME_PATTERN.search(line) if '-->' in line else None
+            if time_match:
+                # Boş satır olmadan başlayan blokta önceki satır bu bloğun sıra numarasıdır
+                index = previous_line
+                if cue is not None:
+                    index = texts.pop() if texts else ''
+                    record = self._record(cue, texts)
+                    if record is not None:
+                        yield record
+                count += 1
+                start_time, end_time = time_match.group(1, 2)
+                # Zoom VTT zaman damgaları zaten doğru biçimdedir; yalnızca diğerleri dönüştürülür
+                if len(start_time) != 12 or start_time[8] != '.':
+                    start_time = normalize_timestamp(start_time)
+                if len(end_time) != 12 or end_time[8] != '.':
+                    end_time = normalize_timestamp(end_time)
+                cue = (index or str(count), start_time, end_time)
+                texts = []
+            elif not line:
+                if cue is not None:
+                    record = self._record(cue, texts)
+                    if record is not None:
+                        yield record
+                    cue = None
+            elif cue is not None:
+                texts.append(line)
+            previous_line = line
+
+        if cue is not None:
+            record = self._record(cue, texts)
+            if record is not None:
+                yield record
+
+    @staticmethod
+    def _record(cue: Tuple[str, str, str], texts: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Bir altyazı bloğunu (sıra numarası ve dönüştürülmüş zamanlar, metin satırları) konuşma
+        kaydına çevirir; konuşmacı bulunamazsa None döndürür.
+        """
+        if not texts:
+            return None
+        text = texts[0] if len(texts) == 1 else ' '.join(texts)
+        speaker = None
+        if text.startswith('<v'):
+            voice_match = VOICE_PATTERN.match(text)
+            if voice_match:
+                speaker, text = voice_match.group(1), voice_match.group(2)
+        if speaker is None:
+            speaker_text_match = SPEAKER_TEXT_PATTERN.match(text)
+            if not speaker_text_match:
+                return None
+            speaker, text = speaker_text_match.group(1), speaker_text_match.group(2)
+        if '<' in text:
+            text = TAG_PATTERN.sub('', text)
+        index, start_time, end_time = cue
+        return {
+            'index': index,
+            'start_time': start_time,
+            'end_time': end_time,
+            'speaker': speaker.strip(),
+            'text': text.strip()
+        }
+
+
+class TableParser(TranscriptParser):
+    """
+    Başlık satırında konuşmacı ve metin sütunları olan tablo (CSV/TSV) transkriptlerinin ayrıştırıcısı.
+    """
+
+    name = 'csv'
+    extensions = ('.csv', '.tsv')
+
+    @staticmethod
+    def dialect(header: str) -> Optional[str]:
+        """
+        Başlık satırının ayracını döndürür; konuşmacı ve metin sütunları yoksa None döndürür.
+        """
+        delimiter = max(',;\t', key=header.count)
+        names = [field_name(name) for name in next(csv.reader([header], delimiter=delimiter))]
+        if _field_index(names, SPEAKER_FIELDS) is None or _field_index(names, TEXT_FIELDS) is None:
+            return None
+        return delimiter
+
+    def sniff(self, head: str) -> bool:
+        header = head.split('\n', 1)[0]
+        return self.dialect(header) is not None
+
+    def parse(self, lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        lines = iter(lines)
+        header = next(lines, '')
+        delimiter = self.dialect(header)
+        if delimiter is None:
+            return
+        names = [field_name(name) for name in next(csv.reader([header], delimiter=delimiter))]
+        speaker_at = _field_index(names, SPEAKER_FIELDS)
+        text_at = _field_index(names, TEXT_FIELDS)
+        start_at = _field_index(names, START_FIELDS)
+        end_at = _field_index(names, END_FIELDS)
+        index_at = _field_index(names, INDEX_FIELDS)
+        width = max(speaker_at, text_at) + 1
+
+        for count, row in enumerate(csv.reader(lines, delimiter=delimiter), 1):
+            if len(row) < width or not row[text_at].strip():
+                continue
+            start_time = normalize_timestamp(row[start_at] if start_at is not None and start_at < len(row) else None)
+            end_value = row[end_at] if end_at is not None and end_at < len(row) else ''
+            yield {
+                'index': row[index_at].strip() if index_at is not None and index_at < len(row) else str(count),
+                'start_time': start_time,
+                'end_time': normalize_timestamp(end_value) if end_value.strip() else start_time,
+                'speaker': row[speaker_at].strip(),
+                'text': row[text_at].strip()
+            }
+
+
+class ZoomJsonParser(TranscriptParser):
+    """
+    Zoom bulut kaydı JSON dışa aktarımlarının ayrıştırıcısı.
+
+    Konuşmalar kök dizide ya da 'transcript', 'segments', 'timeline' gibi bir alandaki
+    dizide olabilir; her konuşmanın konuşmacı ve metin alanları yaygın adlarıyla
+    aranır. Sayısal zamanlar saniye kabul edilir.
+    """
+
+    name = 'zoom_json'
+    extensions = ('.json',)
+
+    def sniff(self, head: str) -> bool:
+        return head.lstrip()[:1] in ('{', '[')
+
+    def parse(self, lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        document = json.loads(''.join(lines))
+        items = document
+        while isinstance(items, dict):
+            items = next((items[key] for key in JSON_LIST_FIELDS if key in items), None)
+        if not isinstance(items, list):
+            raise ValueError("JSON transkriptinde konuşma listesi bulunamadı.")
+
+        for count, item in enumerate(items, 1):
+            if not isinstance(item, dict):
+                continue
+            fields = {field_name(key): value for key, value in item.items()}
+            speaker = next((fields[key] for key in SPEAKER_FIELDS if fields.get(key)), None)
+            if speaker is None and isinstance(fields.get('users'), list) and fields['users']:
+                # Zoom zaman çizelgesi kayıtlarında konuşmacı 'users' listesindedir
+                speaker = fields['users'][0].get('username')
+            text = next((fields[key] for key in TEXT_FIELDS if isinstance(fields.get(key), str)), '')
+            if not speaker or not text.strip():
+                continue
+            start_time = normalize_timestamp(next((fields[key] for key in START_FIELDS if key in fields), None))
+            end_value = next((fields[key] for key in END_FIELDS if key in fields), None)
+            index = next((fields[key] for key in INDEX_FIELDS if key in fields), count)
+            yield {
+                'index': str(index),
+                'start_time': start_time,
+                'end_time': normalize_timestamp(end_value) if end_value not in (None, '') else start_time,
+                'speaker': str(speaker).strip(),
+                'text': text.strip()
+            }
+
+
+# Kayıtlı ayrıştırıcılar; biçim tespitinde bu sırayla denenir
+_PARSERS: Dict[str, TranscriptParser] = {}
+
+
+def register_parser(parser: TranscriptParser) -> TranscriptParser:
+    """
+    Bir transkript biçimi ayrıştırıcısını kaydeder (aynı adlı ayrıştırıcının yerine geçer).
+
+    Args:
+        parser (TranscriptParser): Ayrıştırıcı.
+
+    Returns:
+        TranscriptParser: Kaydedilen ayrıştırıcı.
+    """
+    _PARSERS[parser.name] = parser
+    return parser
+
+
+def get_parser(name: str) -> TranscriptParser:
+    """
+    Adı verilen biçimin ayrıştırıcısını döndürür.
+
+    Raises:
+        KeyError: Biçim kayıtlı değilse.
+    """
+    return _PARSERS[name]
+
+
+def parse_cues(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    WebVTT ya da SRT altyazı bloklarını konuşma kayıtlarına ayrıştırır.
+
+    Zaman damgasında '.' ve ',' ayraçlarının ikisi de kabul edilir; canlı ders parçaları
+    gibi başlığı olmayan satırlar da ayrıştırılabilir.
+
+    Args:
+        lines (Iterable[str]): Altyazı satırları.
+
+    Yields:
+        Dict[str, Any]: Ayrıştırılmış konuşma kaydı.
+    """
+    return get_parser('vtt').parse(lines)
+
+
+def supported_extensions() -> List[str]:
+    """
+    Kayıtlı biçimlerin dosya uzantılarını döndürür.
+    """
+    return [extension for parser in _PARSERS.values() for extension in parser.extensions]
+
+
+def detect_parser(head: str, filename: str = '') -> Optional[TranscriptParser]:
+    """
+    Dosyanın biçimini baş kısmından, tanınamazsa uzantısından belirler.
+
+    Zoom'un '.csv' uzantılı VTT dışa aktarımları gibi uzantısı içeriğiyle uyuşmayan
+    dosyalar içeriklerine göre ayrıştırılır.
+
+    Args:
+        head (str): Dosyanın çözülmüş baş kısmı.
+        filename (str): Dosya adı.
+
+    Returns:
+        Optional[TranscriptParser]: Ayrıştırıcı; biçim tanınamazsa None.
+    """
+    for parser in _PARSERS.values():
+        if parser.sniff(head):
+            return parser
+    extension = filename.lower().rpartition('.')[2]
+    for parser in _PARSERS.values():
+        if f".{extension}" in parser.extensions:
+            return parser
+    return None
+
+
+def open_transcript(stream: IO[bytes], filename: str = '') -> Tuple[Optional[TranscriptParser], Iterator[str]]:
+    """
+    İkili akışın biçimini belirler ve akışı satır satır çözen bir okuyucu döndürür.
+
+    Akışın yalnızca baş kısmı biçim tespiti için okunur; geri sarılabilen akışlar
+    (yüklenen dosyalar, diskteki dosyalar) başa sarılır, diğerleri belleğe alınır.
+
+    Args:
+        stream (IO[bytes]): Transkriptin ikili akışı.
+        filename (str): Dosya adı (içerikten biçim belirlenemezse kullanılır).
+
+    Returns:
+        Tuple[Optional[TranscriptParser], Iterator[str]]: Ayrıştırıcı (biçim tanınamazsa
+            None) ve çözülmüş satırlar.
+    """
+    seekable = stream.seekable()
+    position = stream.tell() if seekable else 0
+    head_bytes = stream.read(SNIFF_BYTES)
+    if seekable:
+        stream.seek(position)
+    else:
+        stream = io.BytesIO(head_bytes + stream.read())
+    # Baş kısım çok baytlı bir karakterin ortasında bitebilir
+    head = head_bytes.decode('utf-8-sig', errors='ignore')
+    parser = detect_parser(head, filename)
+    logger.debug("Transkript biçimi: %s (%s)", parser.name if parser else 'bilinmiyor', filename)
+    return parser, _iter_lines(stream)
+
+
+def _iter_lines(stream: IO[bytes]) -> Iterator[str]:
+    """
+    İkili akışı UTF-8 olarak satır satır çözer; satır sonları olduğu gibi bırakılır.
+
+    Okuyucu bittiğinde akıştan ayrılır, böylece akış çağıranın kapatması için açık kalır.
+    """
+    reader = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        yield from reader
+    finally:
+        reader.detach()
+
+
+register_parser(ZoomJsonParser())
+register_parser(CueParser('vtt', ('.vtt', '.txt'), '.', header='WEBVTT'))
+register_parser(CueParser('srt', ('.srt',), ','))
+register_parser(TableParser())
@@ -0,0 +1,185 @@
+from collections.abc import Mapping
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, List, Any, Iterable, Iterator
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def parse_timestamp(value: str) -> int:
+    """
+    'SS:DD:SS.mmm' biçimindeki zaman damgasını milisaniyeye çevirir.
+
+    Args:
+        value (str): Zaman damgası.
+
+    Returns:
+        int: Milisaniye cinsinden süre.
+    """
+    hours, minutes, seconds = value.split(':')
+    whole, _, fraction = seconds.partition('.')
+    return ((int(hours) * 60 + int(minutes)) * 60 + int(whole)) * 1000 + int((fraction + '000')[:3])
+
+
+def format_timestamp(milliseconds: int) -> str:
+    """
+    Milisaniyeyi 'SS:DD:SS.mmm' biçimindeki zaman damgasına çevirir.
+
+    Args:
+        milliseconds (int): Milisaniye cinsinden süre.
+
+    Returns:
+        str: Zaman damgası.
+    """
+    seconds, millis = divmod(int(milliseconds), 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{millis:03d}"
+
+
+class TranscriptFrame(Mapping):
+    """
+    Transkripti sütunlu ve kompakt biçimde tutar.
+
+    Konuşmacılar kategorik, başlangıç ve bitiş zamanları tamsayı milisaniye olarak
+    saklanır; her konuşmanın metni yalnızca bir kez tutulur. process_transcript'in
+    döndürdüğü sözlük anahtarları ('speakers', 'speaker_counts', 'all_text',
+    'transcript_data') bu veriler üzerinde hesaplanan görünümlerdir.
+
+    Konuşmacı görünümleri ve 'all_text' ilk erişimde hesaplanıp saklanır: 'all_text'
+    yapay zeka istekleri hazırlanırken (uzunluk denetimi, istek metni, bölümleme) birkaç
+    kez okunduğundan metnin birleştirilmiş kopyası bir kez tutulur. 'transcript_data'
+    kayıtları her erişimde yeniden oluşturulur ve saklanmaz; böylece tablonun yanında
+    konuşma başına bir sözlük bellekte kalmaz.
+    """
+
+    KEYS = ('speakers', 'speaker_counts', 'all_text', 'transcript_data')
+
+    def __init__(self, frame: 'pd.DataFrame'):
+        """
+        TranscriptFrame sınıfını başlatır.
+
+        Args:
+            frame (pd.DataFrame): index, speaker, start_ms, end_ms ve text sütunlarını içeren tablo.
+        """
+        self.frame = frame
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> 'TranscriptFrame':
+        """
+        Ayrıştırılmış konuşma kayıtlarından tablo oluşturur.
+
+        Args:
+            records (Iterable[Dict[str, Any]]): index, start_time, end_time, speaker ve text alanlı kayıtlar.
+
+        Returns:
+            TranscriptFrame: Oluşturulan tablo.
+        """
+        # pandas ilk tablo oluşturulurken yüklenir; gunicorn ana sürecinde önceden yüklenip
+        # işçilerle paylaşılır (bkz. app.utils.preload)
+        import pandas as pd
+
+        indexes, speakers, starts, ends, texts = [], [], [], [], []
+        for record in records:
+            indexes.append(record['index'])
+            speakers.append(record['speaker'])
+            starts.append(parse_timestamp(record['start_time']))
+            ends.append(parse_timestamp(record['end_time']))
+            texts.append(record['text'])
+
+        index_column = pd.to_numeric(pd.Series(indexes, dtype=object), errors='coerce')
+        if index_column.notna().all():
+            index_column = index_column.astype('int32')
+        else:
+            # Sayısal olmayan sıra numaralarını olduğu gibi koru
+            index_column = pd.Series(indexes, dtype=object)
+
+        frame = pd.DataFrame({
+            'index': index_column,
+            'speaker': pd.Categorical(speakers, categories=list(dict.fromkeys(speakers))),
+            'start_ms': pd.Series(starts, dtype='int64'),
+            'end_ms': pd.Series(ends, dtype='int64'),
+            'text': pd.Series(texts, dtype=object)
+        })
+        return cls(frame)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    @property
+    def entry_count(self) -> int:
+        """
+        Konuşma sayısını döndürür.
+        """
+        return len(self.frame)
+
+    @cached_property
+    def speakers(self) -> Dict[str, List[str]]:
+        """
+        Konuşmacılara göre gruplanmış metinleri döndürür (ilk konuşma sırasıyla).
+        """
+        grouped = self.frame.groupby('speaker', observed=True, sort=False)['text']
+        return {str(speaker): texts.tolist() for speaker, texts in grouped}
+
+    @cached_property
+    def speaker_counts(self) -> Dict[str, int]:
+        """
+        Her konuşmacının konuşma sayısını döndürür (ilk konuşma sırasıyla).
+        """
+        counts = self.frame.groupby('speaker', observed=True, sort=False).size()
+        return {str(speaker): int(count) for speaker, count in counts.items()}
+
+    @cached_property
+    def talk_time_ms(self) -> Dict[str, int]:
+        """
+        Her konuşmacının toplam konuşma süresini milisaniye olarak döndürür.
+        """
+        durations = (self.frame['end_ms'] - self.frame['start_ms']).clip(lower=0)
+        totals = durations.groupby(self.frame['speaker'], observed=True, sort=False).sum()
+        return {str(speaker): int(total) for speaker, total in totals.items()}
+
+    @cached_property
+    def all_text(self) -> str:
+        """
+        Tüm konuşma metinlerini birleştirilmiş olarak döndürür.
+        """
+        return ' '.join(self.frame['text'])
+
+    @property
+    def transcript_data(self) -> List[Dict[str, Any]]:
+        """
+        Konuşmaları eski kayıt biçiminde (metin zaman damgalarıyla) döndürür.
+
+        Kayıtlar her erişimde yeniden oluşturulur; sık kullanılan yollar (token bütçesi)
+        doğrudan tablo sütunlarını okur.
+        """
+        return [
+            {
+                'index': str(index),
+                'start_time': format_timestamp(start_ms),
+                'end_time': format_timestamp(end_ms),
+                'speaker': str(speaker),
+                'text': text
+            }
+            for index, speaker, start_ms, end_ms, text in zip(
+                self.frame['index'], self.frame['speaker'], self.frame['start_ms'],
+                self.frame['end_ms'], self.frame['text']
+            )
+        ]
+
+    def memory_usage(self) -> int:
+        """
+        Tablonun bellekte kapladığı toplam bayt sayısını döndürür.
+
+        Returns:
+            int: Bayt sayısı.
+        """
+        return int(self.frame.memory_usage(deep=True).sum())
@@ -1,7 +1,8 @@
-import pandas as pd
-import re
 import os
-from typing import Dict, List, Any
+import hashlib
+from typing import Dict, List, Any, IO, Iterable, Iterator, Optional
+from app.utils.transcript_frame import TranscriptFrame, format_timestamp
+from app.utils.transcript_formats import open_transcript, parse_cues
 
 class TranscriptProcessor:
     """
@@ -16,33 +17,56 @@ class TranscriptProcessor:
             file_path (str): Transkript dosyasının yolu.
         """
         self.file_path = file_path
-        self.transcript_data = None
+        self.format = None
+        self.frame = None
         self.processed_data = None
-        
-    def load_transcript(self) -> bool:
+    
+    @property
+    def transcript_data(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        Ayrıştırılmış konuşmaları kayıt listesi olarak döndürür (ilk erişimde oluşturulur).
+        """
+        return self.frame.transcript_data if self.frame is not None else None
+    
+    @transcript_data.setter
+    def transcript_data(self, records: Optional[Iterable[Dict[str, Any]]]) -> None:
+        self.frame = TranscriptFrame.from_records(records) if records is not None else None
+    
+    def load_transcript(self, stream: Optional[IO[bytes]] = None) -> bool:
         """
         Transkript dosyasını yükler.
         
+        Dosyanın biçimi (WebVTT, SRT, Zoom JSON, CSV tablosu) baş kısmından, tanınamazsa
+        uzantısından belirlenir. Dosya tek seferde belleğe okunmaz; satır satır ayrıştırılır.
+        
+        Args:
+            stream (Optional[IO[bytes]]): Okunacak ikili akış (örneğin yüklenen dosya).
+                Verilmezse file_path üzerindeki dosya okunur.
+        
         Returns:
             bool: Yükleme başarılı ise True, değilse False.
         """
         try:
-            # Dosya uzantısına göre okuma yöntemi belirleme
-            if self.file_path.endswith('.csv'):
-                # CSV dosyasını okuma
-                with open(self.file_path, 'r', encoding='utf-8') as file:
-                    content = file.read()
-                
-                # Konuşma verilerini ayıklama
-                self.transcript_data = self._parse_transcript(content)
-                return True
-            else:
-                print(f"Desteklenmeyen dosya formatı: {self.file_path}")
-                return False
+            if stream is None:
+                with open(self.file_path, 'rb') as file:
+                    return self._load_stream(file)
+            return self._load_stream(stream)
         except Exception as e:
             print(f"Transkript yüklenirken hata oluştu: {str(e)}")
             return False
     
+    def _load_stream(self, stream: IO[bytes]) -> bool:
+        """
+        İkili akışın biçimini belirler ve uygun ayrıştırıcıyla yükler.
+        """
+        parser, lines = open_transcript(stream, self.file_path)
+        if parser is None:
+            print(f"Desteklenmeyen dosya formatı: {self.file_path}")
+            return False
+        self.format = parser.name
+        self.frame = TranscriptFrame.from_records(parser.parse(lines))
+        return True
+    
     def _parse_transcript(self, content: str) -> List[Dict[str, Any]]:
         """
         Transkript içeriğini ayrıştırır.
@@ -53,77 +77,55 @@ class TranscriptProcessor:
         Returns:
             List[Dict[str, Any]]: Ayrıştırılmış transkript verileri.
         """
-        lines = content.split('\n')
-        transcript_data = []
-        
-        i = 0
-        while i < len(lines):
-            # Zaman damgası ve konuşmacı bilgisini içeren satırları bul
-            if '-->' in lines[i] and i > 0:
-                # Önceki satır konuşma numarası
-                index = lines[i-1].strip()
-                
-                # Zaman damgası
-                time_line = lines[i].strip()
-                time_match = re.search(r'(\d+:\d+:\d+\.\d+) --> (\d+:\d+:\d+\.\d+)', time_line)
-                
-                if time_match and i+1 < len(lines):
-                    start_time = time_match.group(1)
-                    end_time = time_match.group(2)
-                    
-                    # Konuşmacı ve metin
-                    speaker_text_line = lines[i+1].strip()
-                    speaker_text_match = re.search(r'([^:]+): (.*)', speaker_text_line)
-                    
-                    if speaker_text_match:
-                        speaker = speaker_text_match.group(1).strip()
-                        text = speaker_text_match.group(2).strip()
-                        
-                        transcript_data.append({
-                            'index': index,
-                            'start_time': start_time,
-                            'end_time': end_time,
-                            'speaker': speaker,
-                            'text': text
-                        })
-            i += 1
-        
-        return transcript_data
+        return list(self._iter_transcript(content.split('\n')))
+    
+    def _iter_transcript(self, lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Zoom (WebVTT) transkript satırlarını tek geçişte ayrıştırır ve her konuşmayı üretildikçe döndürür.
+        
+        Args:
+            lines (Iterable[str]): Transkript satırları.
+            
+        Yields:
+            Dict[str, Any]: Ayrıştırılmış konuşma kaydı.
+        """
+        return parse_cues(lines)
     
     def process_transcript(self) -> Dict[str, Any]:
         """
         Transkripti işler ve analiz için hazırlar.
         
         Returns:
-            Dict[str, Any]: İşlenmiş transkript verileri.
+            Dict[str, Any]: İşlenmiş transkript verileri (sözlük gibi kullanılabilen TranscriptFrame).
         """
-        if not self.transcript_data:
+        if self.frame is None or self.frame.entry_count == 0:
             print("Transkript verisi yüklenmemiş.")
             return {}
         
-        # Konuşmacıları gruplandırma
-        speakers = {}
-        for entry in self.transcript_data:
-            speaker = entry['speaker']
-            if speaker not in speakers:
-                speakers[speaker] = []
-            speakers[speaker].append(entry['text'])
-        
-        # Her konuşmacının toplam konuşma sayısı
-        speaker_counts = {speaker: len(texts) for speaker, texts in speakers.items()}
+        # Konuşmacı grupları, konuşma sayıları ve birleştirilmiş metin,
+        # sütunlu veriler üzerinde ilk erişimde hesaplanır
+        self.processed_data = self.frame
         
-        # Tüm konuşma metinlerini birleştirme
-        all_text = ' '.join([entry['text'] for entry in self.transcript_data])
+        return self.processed_data
+    
+    def get_fingerprint(self) -> str:
+        """
+        Transkriptin içeriğe dayalı parmak izini döndürür.
         
-        # Sonuçları hazırlama
-        self.processed_data = {
-            'speakers': speakers,
-            'speaker_counts': speaker_counts,
-            'all_text': all_text,
-            'transcript_data': self.transcript_data
-        }
+        Yalnızca konuşmacı ve metin dikkate alınır; sıra numaraları, zaman damgaları ve
+        boşluk farklılıkları yok sayılır. Aynı dersin farklı dışa aktarımları aynı
+        parmak izini üretir.
         
-        return self.processed_data
+        Returns:
+            str: SHA-256 özet değeri.
+        """
+        digest = hashlib.sha256()
+        if self.frame is not None:
+            for speaker, text in zip(self.frame.frame['speaker'], self.frame.frame['text']):
+                speaker = ' '.join(speaker.split())
+                text = ' '.join(text.split())
+                digest.update(f"{speaker}\x1f{text}\x1e".encode('utf-8'))
+        return digest.hexdigest()
     
     def get_conversation_summary(self) -> str:
         """
@@ -139,20 +141,19 @@ class TranscriptProcessor:
         # Konuşmacıları ve konuşma sayılarını içeren özet
         summary = "Konuşma Özeti:\n\n"
         
-        # Konuşmacılar ve konuşma sayıları
+        # Konuşmacılar, konuşma sayıları ve konuşma süreleri
         summary += "Konuşmacılar:\n"
-        for speaker, count in self.processed_data['speaker_counts'].items():
-            summary += f"- {speaker}: {count} konuşma\n"
+        talk_time_ms = self.frame.talk_time_ms
+        for speaker, count in self.frame.speaker_counts.items():
+            summary += f"- {speaker}: {count} konuşma, {talk_time_ms[speaker] / 1000:.0f} saniye\n"
         
         # Toplam konuşma sayısı
-        total_entries = len(self.transcript_data)
+        total_entries = self.frame.entry_count
         summary += f"\nToplam Konuşma Sayısı: {total_entries}\n"
         
         # Konuşma süresi (ilk ve son giriş arasındaki fark)
         if total_entries > 0:
-            first_entry = self.transcript_data[0]
-            last_entry = self.transcript_data[-1]
-            summary += f"İlk Konuşma Zamanı: {first_entry['start_time']}\n"
-            summary += f"Son Konuşma Zamanı: {last_entry['end_time']}\n"
+            summary += f"İlk Konuşma Zamanı: {format_timestamp(self.frame.frame['start_ms'].iloc[0])}\n"
+            summary += f"Son Konuşma Zamanı: {format_timestamp(self.frame.frame['end_ms'].iloc[-1])}\n"
         
-        return summary 
\ No newline at end of file
+        return summary
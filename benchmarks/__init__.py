@@ -0,0 +1,3 @@
+"""
+Performans ölçümleri: sentetik transkript üreteci, yerel model ve ölçüm betikleri.
+"""
@@ -0,0 +1,63 @@
+"""
+İki ölçüm sonucunu karşılaştırır.
+
+Kullanım:
+    python -m benchmarks.compare eski.json yeni.json
+"""
+import sys
+import json
+from typing import Dict, List, Any, Optional
+
+
+def load(path: str) -> Dict[str, Any]:
+    """
+    Ölçüm sonucu dosyasını okur.
+    """
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any],
+            fields: tuple = ('p50_ms', 'p95_ms', 'throughput_rps', 'rss_mb', 'pss_mb', 'uss_mb',
+                             'total_pss_mb', 'peak_in_flight', 'in_flight_per_gb')) -> List[Dict[str, Any]]:
+    """
+    Her iki sonuçta bulunan ölçümlerin değerlerini ve değişim oranlarını çıkarır.
+
+    Args:
+        base (Dict[str, Any]): Önceki sonuç.
+        head (Dict[str, Any]): Yeni sonuç.
+        fields (tuple): Karşılaştırılacak alanlar.
+
+    Returns:
+        List[Dict[str, Any]]: Ölçüm, alan, önceki ve yeni değer ile oran (yeni / önceki).
+    """
+    rows = []
+    for name, before in base.get('results', {}).items():
+        after = head.get('results', {}).get(name)
+        if after is None:
+            continue
+        for field in fields:
+            if field in before and field in after:
+                ratio = after[field] / before[field] if before[field] else None
+                rows.append({'benchmark': name, 'field': field, 'base': before[field],
+                             'head': after[field], 'ratio': ratio})
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Karşılaştırma tablosunu yazdırır.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        raise SystemExit("Kullanım: python -m benchmarks.compare eski.json yeni.json")
+
+    base, head = load(argv[0]), load(argv[1])
+    print(f"{base['meta'].get('revision')} -> {head['meta'].get('revision')}")
+    for row in compare(base, head):
+        ratio = f"{row['ratio']:.2f}x" if row['ratio'] is not None else "-"
+        print(f"{row['benchmark']:24s} {row['field']:15s} {row['base']:12.3f} {row['head']:12.3f} {ratio:>8s}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""
+Bir sunucu sürecinin aynı anda yürütebildiği yükleme sayısı ve bellek başına eşzamanlılık ölçümü.
+
+Kullanım:
+    python -m benchmarks.inflight [--uploads 100] [--llm-latency 2.0] [--modes thread,async]
+
+Her kip yeni bir yorumlayıcıda (tek bir gunicorn işçisi gibi) çalıştırılır: uygulama sahte
+modelle yüklenir, bir ısınma yüklemesinden sonra --uploads kadar transkript aynı anda
+yüklenir ve tümü bitene kadar aynı anda yanıt bekleyen yapay zeka çağrıları ile sürecin
+belleği izlenir. 'thread' kipi mevcut eşzamanlı dağıtımdır (JOB_RUNNER=thread, her iş bir
+iş parçacığında; --job-workers), 'async' kipi işleri olay döngüsünde çalıştırır
+(JOB_RUNNER=async). Sonuçta GB bellek başına aynı anda yürütülen yapay zeka çağrısı
+('in_flight_per_gb') ve yüklemelerin tamamlanma süreleri raporlanır; sonuçlar
+python -m benchmarks.compare ile karşılaştırılabilir.
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import threading
+import subprocess
+from typing import Dict, List, Any, Optional
+
+MODES = ('thread', 'async')
+
+
+def run_worker(mode: str, uploads: int, latency: float, turns: int) -> Dict[str, Any]:
+    """
+    Uygulamayı bu süreçte yükler, yüklemeleri aynı anda gönderir ve ölçümleri döndürür.
+
+    Ortam değişkenleri (JOB_RUNNER, JOB_WORKERS ve ölçüm ayarları) bu işlev çağrılmadan
+    önce measure_mode tarafından verilmiştir.
+    """
+    from app import app
+    from benchmarks.startup import read_memory
+    from benchmarks.stub_llm import StubModel, install_stub_llm
+    from benchmarks.synthetic import generate_transcript
+
+    install_stub_llm(latency=latency)
+    transcripts = [generate_transcript(turns, seed=seed).encode('utf-8') for seed in range(uploads + 1)]
+    client = app.test_client()
+
+    def upload(content: bytes) -> Any:
+        return client.post('/upload', data={'transcript_file': (io.BytesIO(content), 'lesson.vtt')},
+                           content_type='multipart/form-data')
+
+    def wait(status_urls: List[str], finished: Dict[str, float]) -> None:
+        while len(finished) < len(status_urls):
+            for url in status_urls:
+                if url not in finished and client.get(url).get_json()['status'] in ('completed', 'failed'):
+                    finished[url] = time.perf_counter()
+            time.sleep(0.01)
+
+    # Isınma: modüller, sahte model ve iş havuzları ölçümden önce hazırlanır
+    wait([upload(transcripts[-1]).get_json()['status_url']], {})
+    baseline = read_memory(os.getpid())
+    StubModel.peak_in_flight = StubModel.in_flight
+
+    peak = {'rss_mb': baseline.get('rss_mb', 0.0), 'uss_mb': baseline.get('uss_mb', 0.0), 'threads': 0}
+    sampling = threading.Event()
+
+    def sample() -> None:
+        while not sampling.is_set():
+            memory = read_memory(os.getpid())
+            peak['rss_mb'] = max(peak['rss_mb'], memory.get('rss_mb', 0.0))
+            peak['uss_mb'] = max(peak['uss_mb'], memory.get('uss_mb', 0.0))
+            peak['threads'] = max(peak['threads'], threading.active_count())
+            time.sleep(0.02)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    started = time.perf_counter()
+    status_urls, rejected = [], 0
+    for content in transcripts[:uploads]:
+        response = upload(content)
+        if response.status_code == 202:
+            status_urls.append(response.get_json()['status_url'])
+        else:
+            rejected += 1
+    finished = {}
+    wait(status_urls, finished)
+    wall = time.perf_counter() - started
+    sampling.set()
+    sampler.join()
+
+    failures = sum(1 for url in status_urls if client.get(url).get_json()['status'] == 'failed')
+    return {
+        'mode': mode,
+        'baseline': baseline,
+        'peak_rss_mb': peak['rss_mb'],
+        'peak_uss_mb': peak['uss_mb'],
+        'peak_threads': peak['threads'],
+        'peak_in_flight': StubModel.peak_in_flight,
+        'completed_s': [finished[url] - started for url in status_urls],
+        'wall_seconds': wall,
+        'rejected': rejected,
+        'failures': failures
+    }
+
+
+def measure_mode(mode: str, uploads: int, latency: float, turns: int, job_workers: int) -> Dict[str, Any]:
+    """
+    Kipi yeni bir yorumlayıcıda çalıştırır ve ham ölçümleri döndürür.
+    """
+    from benchmarks.run import BENCHMARK_ENVIRONMENT
+
+    env = dict(os.environ, **BENCHMARK_ENVIRONMENT)
+    env.update(JOB_RUNNER=mode, JOB_WORKERS=str(job_workers), JOB_QUEUE_LIMIT=str(uploads + 1))
+    completed = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.inflight', '--worker', mode, '--uploads', str(uploads),
+         '--llm-latency', repr(latency), '--turns', str(turns)],
+        env=env, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def summarize_mode(raw: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Ham ölçümleri eşzamanlılık/bellek ve yükleme tamamlanma süresi özetlerine dönüştürür.
+    """
+    from benchmarks.run import summarize
+
+    rss_mb = raw['peak_rss_mb']
+    completed = len(raw['completed_s']) - raw['failures']
+    return {
+        'inflight': {
+            'peak_in_flight': raw['peak_in_flight'],
+            'rss_mb': rss_mb,
+            'uss_mb': raw['peak_uss_mb'],
+            'baseline_rss_mb': raw['baseline'].get('rss_mb', 0.0),
+            'threads': raw['peak_threads'],
+            'in_flight_per_gb': raw['peak_in_flight'] / (rss_mb / 1024) if rss_mb else 0.0,
+            'throughput_rps': completed / raw['wall_seconds'] if raw['wall_seconds'] else 0.0,
+            'rejected': raw['rejected'],
+            'failures': raw['failures']
+        },
+        'upload': summarize(raw['completed_s'])
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Komut satırı argümanlarını ayrıştırır.
+    """
+    parser = argparse.ArgumentParser(description="Süreç başına eşzamanlı yükleme ve bellek ölçümü")
+    parser.add_argument('--uploads', type=int, default=100, help="Aynı anda gönderilen yükleme sayısı")
+    parser.add_argument('--llm-latency', type=float, default=2.0, help="Sahte modelin çağrı süresi (saniye)")
+    parser.add_argument('--turns', type=int, default=200, help="Her transkriptin konuşma sayısı")
+    parser.add_argument('--job-workers', type=int, default=2,
+                        help="JOB_WORKERS: 'thread' kipinde iş, 'async' kipinde işlemci iş parçacığı sayısı")
+    parser.add_argument('--modes', default=','.join(MODES), help="Ölçülecek kipler: " + ', '.join(MODES))
+    parser.add_argument('--output', help="Sonuç dosyası (varsayılan: benchmarks/results/<zaman>-inflight.json)")
+    parser.add_argument('--worker', choices=MODES, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Seçilen kiplerin ölçümlerini çalıştırır ve kaydeder.
+
+    Returns:
+        Dict[str, Any]: Ölçüm sonuçları.
+    """
+    args = parse_args(argv)
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.uploads, args.llm_latency, args.turns)))
+        return {}
+
+    from benchmarks.run import git_revision
+
+    modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        raise SystemExit(f"Bilinmeyen kip: {', '.join(sorted(unknown))}")
+
+    results = {}
+    for mode in modes:
+        raw = measure_mode(mode, args.uploads, args.llm_latency, args.turns, args.job_workers)
+        for name, summary in summarize_mode(raw).items():
+            results[f'{mode}_{name}'] = summary
+
+    revision = git_revision()
+    report = {
+        'meta': {
+            'revision': revision,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'params': vars(args)
+        },
+        'results': results
+    }
+
+    output = args.output or os.path.join(
+        'benchmarks', 'results', f"{time.strftime('%Y%m%d-%H%M%S')}-{revision or 'local'}-inflight.json")
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    for mode in modes:
+        inflight, upload = results[f'{mode}_inflight'], results[f'{mode}_upload']
+        print(f"{mode:7s} eşzamanlı çağrı={inflight['peak_in_flight']:4d}  RSS={inflight['rss_mb']:6.1f} MB  "
+              f"iş parçacığı={inflight['threads']:3d}  GB başına={inflight['in_flight_per_gb']:7.1f}")
+        print(f"{'':7s} yükleme p50={upload.get('p50_ms', 0):9.1f} ms  p95={upload.get('p95_ms', 0):9.1f} ms  "
+              f"verim={inflight['throughput_rps']:6.2f}/sn  reddedilen={inflight['rejected']}  "
+              f"başarısız={inflight['failures']}")
+    print(f"Sonuçlar kaydedildi: {output}")
+    return report
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,432 @@
+"""
+Ayrıştırma (her transkript biçimi için), test işleme ve uçtan uca yükleme akışı için performans ölçümleri.
+
+Kullanım:
+    python -m benchmarks.run [--turns 2000] [--llm-latency 0.05] [--only parse,e2e]
+    python -m benchmarks.run --only e2e --replay cache/llm_recording.jsonl [--latency-scale 0.5]
+    python -m benchmarks.run --only compress,e2e --disfluency 0.3 --llm-token-latency 0.2 [--no-compression]
+
+--replay verilirse sahte model yerine LLM_RECORD_PATH ile üretimde kaydedilen yanıtlar
+kaydedildikleri (ya da ölçeklenmiş) gecikmeyle yeniden oynatılır. --llm-token-latency
+sahte modelin gecikmesini istekteki token sayısıyla orantılı artırır; transkript
+sıkıştırmasının gecikmeye etkisi --no-compression ile alınan sonuçla karşılaştırılarak görülür.
+
+Sonuçlar (ortalama ve yüzdelik gecikmeler, verim) JSON olarak kaydedilir ve
+python -m benchmarks.compare ile iki commit arasında karşılaştırılabilir.
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Callable, Optional
+
+# Ölçümler ağa, paylaşılan önbelleğe ve önceki sonuçlara dokunmamalı; bu ayarlar
+# uygulama modülleri içe aktarılmadan önce yapılmalıdır.
+BENCHMARK_ENVIRONMENT = {
+    'RESULT_STORE': 'memory',
+    'JOB_STORE': 'memory',
+    'LIVE_LESSON_STORE': 'memory',
+    'PROMPT_CACHE_ENABLED': '0',
+    'QUESTION_BANK_ENABLED': '0',
+    'COALESCE_ENABLED': '0',
+    'LLM_RATE_PER_MINUTE': '0',
+    'METRICS_ENABLED': '0',
+    'LOG_LEVEL': 'WARNING',
+}
+
+BENCHMARKS = ('parse', 'formats', 'process', 'compress', 'select', 'bank', 'tests_process', 'tests_html', 'e2e')
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    """
+    Süre örneklerinin özetini çıkarır.
+
+    Args:
+        samples (List[float]): Saniye cinsinden süreler.
+
+    Returns:
+        Dict[str, Any]: Örnek sayısı, ortalama, en küçük/büyük ve p50/p95/p99 (milisaniye).
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return {'count': 0}
+
+    def percentile(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))] * 1000
+
+    return {
+        'count': len(ordered),
+        'mean_ms': sum(ordered) / len(ordered) * 1000,
+        'min_ms': ordered[0] * 1000,
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'max_ms': ordered[-1] * 1000
+    }
+
+
+def measure(func: Callable[[], Any], iterations: int, warmup: int = 1) -> List[float]:
+    """
+    İşlevi ısınma turlarından sonra belirtilen sayıda çalıştırıp sürelerini döndürür.
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def bench_parse(content: str, iterations: int) -> Dict[str, Any]:
+    """
+    TranscriptProcessor._parse_transcript süresini ölçer.
+    """
+    from app.utils.transcript_processor import TranscriptProcessor
+
+    processor = TranscriptProcessor('benchmark.csv')
+    return summarize(measure(lambda: processor._parse_transcript(content), iterations))
+
+
+def bench_formats(content: str, iterations: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Aynı transkriptin her dışa aktarım biçimindeki yükleme süresini (biçim tespiti ve
+    ayrıştırma dahil) ve verimini ölçer.
+    """
+    from benchmarks.synthetic import convert_transcript
+    from app.utils.transcript_processor import TranscriptProcessor
+
+    results = {}
+    for transcript_format, filename in (('vtt', 'benchmark.vtt'), ('srt', 'benchmark.srt'),
+                                        ('zoom_json', 'benchmark.json'), ('csv', 'benchmark.csv')):
+        data = convert_transcript(content, transcript_format).encode('utf-8')
+
+        def run():
+            processor = TranscriptProcessor(filename)
+            if not processor.load_transcript(stream=io.BytesIO(data)) or processor.format != transcript_format:
+                raise RuntimeError(f"{transcript_format} transkripti yüklenemedi.")
+
+        summary = summarize(measure(run, iterations))
+        summary.update(bytes=len(data), mb_per_s=len(data) / 1e6 / (summary['p50_ms'] / 1000))
+        results[f"formats_{transcript_format}"] = summary
+    return results
+
+
+def bench_process(content: str, iterations: int) -> Dict[str, Any]:
+    """
+    process_transcript süresini (konuşmacı, sayım ve metin görünümleri dahil) ölçer.
+    """
+    from app.utils.transcript_processor import TranscriptProcessor
+
+    records = TranscriptProcessor('benchmark.csv')._parse_transcript(content)
+
+    def run():
+        processor = TranscriptProcessor('benchmark.csv')
+        processor.transcript_data = records
+        processed = processor.process_transcript()
+        # Görünümler ilk erişimde hesaplandığı için hepsine eriş
+        return dict(processed)
+
+    return summarize(measure(run, iterations))
+
+
+def bench_compress(content: str, iterations: int) -> Dict[str, Any]:
+    """
+    TranscriptCompressor süresini, sıkıştırma öncesi ve sonrası transkript token sayısını
+    ve bütçeli istekteki transkript token sayısını ölçer.
+    """
+    from app.utils.transcript_processor import TranscriptProcessor
+    from app.utils.transcript_compressor import TranscriptCompressor
+    from app.utils.prompt_budget import PromptBudget, count_tokens
+
+    processor = TranscriptProcessor('benchmark.csv')
+    processor.transcript_data = processor._parse_transcript(content)
+    transcript_data = processor.process_transcript()
+
+    compressor = TranscriptCompressor()
+    summary = summarize(measure(lambda: compressor.compress(transcript_data), iterations))
+    compressed = compressor.compress(transcript_data)
+    summary.update(compressed.stats)
+    summary.update(
+        prompt_tokens=count_tokens(PromptBudget().select_text(transcript_data)),
+        compressed_prompt_tokens=count_tokens(PromptBudget().select_text(compressed))
+    )
+    return summary
+
+
+def bench_select(content: str, iterations: int) -> Dict[str, Any]:
+    """
+    PromptBudget ile konuşma seçme süresini ve istekteki transkript token sayısını ölçer.
+    """
+    from app.utils.transcript_processor import TranscriptProcessor
+    from app.utils.prompt_budget import PromptBudget, count_tokens
+
+    processor = TranscriptProcessor('benchmark.csv')
+    processor.transcript_data = processor._parse_transcript(content)
+    transcript_data = processor.process_transcript()
+
+    # Her turda yeni bir bütçe; saklanan son seçim ölçümü etkilemesin
+    summary = summarize(measure(lambda: PromptBudget().select_text(transcript_data), iterations))
+    budget = PromptBudget()
+    summary.update(
+        token_budget=budget.token_budget,
+        transcript_tokens=count_tokens('\n'.join(f"{entry['speaker']}: {entry['text']}"
+                                                  for entry in transcript_data['transcript_data'])),
+        prompt_tokens=count_tokens(budget.select_text(transcript_data))
+    )
+    return summary
+
+
+def bench_bank(iterations: int, lessons: int = 200, turns: int = 200) -> Dict[str, Any]:
+    """
+    Geçici bir soru bankasını sentetik derslerle doldurup yeni dersler için arama süresini
+    ve bankadan verilebilen ders oranını ölçer.
+
+    Her dersin yeni kelimeleri transkriptinden seçilen beş kelimedir ve her soru bunlardan
+    birini sorar.
+    """
+    import random
+    import tempfile
+    from benchmarks.synthetic import generate_transcript
+    from app.utils.transcript_processor import TranscriptProcessor
+    from app.utils.question_bank import QuestionBank, content_words
+
+    def lesson(seed: int):
+        processor = TranscriptProcessor('benchmark.csv')
+        processor.transcript_data = processor._parse_transcript(generate_transcript(turns, seed=seed))
+        terms = content_words(processor.process_transcript()['all_text'])
+        vocabulary = random.Random(seed).sample(sorted(terms), 5)
+        profile = {'level': 'B1', 'vocabulary': vocabulary, 'terms': terms}
+        questions = [{
+            'question': f"What does '{word}' mean? ({seed})",
+            'options': [{'letter': letter, 'text': f"{word} {letter}"} for letter in 'ABCD'],
+            'correct_answer': 'A',
+            'explanation': word
+        } for word in vocabulary]
+        return profile, questions
+
+    with tempfile.TemporaryDirectory() as directory:
+        bank = QuestionBank(os.path.join(directory, 'bank.sqlite3'))
+        for seed in range(lessons):
+            profile, questions = lesson(seed)
+            bank.add(profile, questions, f"lesson-{seed}")
+
+        profiles = [lesson(lessons + seed)[0] for seed in range(iterations)]
+        samples, hits = [], 0
+        for profile in profiles:
+            started = time.perf_counter()
+            hits += bank.find(profile) is not None
+            samples.append(time.perf_counter() - started)
+
+    summary = summarize(samples)
+    summary.update(lessons=lessons, hit_ratio=hits / len(profiles) if profiles else 0.0)
+    return summary
+
+
+def bench_tests(raw_tests: str, iterations: int) -> Dict[str, Dict[str, Any]]:
+    """
+    TestGenerator.process_tests ve get_tests_as_html sürelerini ölçer.
+    """
+    from app.utils.test_generator import TestGenerator
+
+    def process():
+        TestGenerator(raw_tests).process_tests()
+
+    generator = TestGenerator(raw_tests)
+    generator.process_tests()
+    return {
+        'tests_process': summarize(measure(process, iterations)),
+        'tests_html': summarize(measure(generator.get_tests_as_html, iterations))
+    }
+
+
+def bench_end_to_end(transcripts: List[str], concurrency: int, timeout: float = 120) -> Dict[str, Any]:
+    """
+    /upload, iş durumu sorgulama ve /results akışını eşzamanlı kullanıcılarla ölçer.
+
+    Her kullanıcı kendi oturumuyla bir transkript yükler, iş bitene kadar durumu sorgular
+    ve sonuç sayfasını ve sonucun JSON'unu açar; her istek için yüklemeden sonuç sayfasına kadar geçen süre
+    kaydedilir.
+    """
+    from app import app
+
+    samples = []
+    failures = []
+    lock = threading.Lock()
+
+    def run(content: str) -> None:
+        client = app.test_client()
+        started = time.perf_counter()
+        response = client.post('/upload', data={
+            'transcript_file': (io.BytesIO(content.encode('utf-8')), 'benchmark.csv')
+        }, content_type='multipart/form-data')
+        if response.status_code != 202:
+            with lock:
+                failures.append(f"upload {response.status_code}")
+            return
+
+        job = response.get_json()
+        deadline = time.monotonic() + timeout
+        while True:
+            status = client.get(job['status_url']).get_json()
+            if status['status'] in ('completed', 'failed') or time.monotonic() > deadline:
+                break
+            time.sleep(0.005)
+
+        result = client.get(job['result_url'])
+        page = client.get('/results')
+        api_url = (result.get_json() or {}).get('api_url')
+        data = client.get(api_url) if api_url else page
+        elapsed = time.perf_counter() - started
+        with lock:
+            if result.status_code == 200 and page.status_code == 200 and data.status_code == 200:
+                samples.append(elapsed)
+            else:
+                failures.append(f"result {result.status_code}/{page.status_code}/{data.status_code}")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(run, transcripts))
+    wall = time.perf_counter() - started
+
+    summary = summarize(samples)
+    summary.update(
+        concurrency=concurrency,
+        failures=len(failures),
+        wall_seconds=wall,
+        throughput_rps=len(samples) / wall if wall else 0.0
+    )
+    return summary
+
+
+def git_revision() -> Optional[str]:
+    """
+    Çalışma dizinindeki commit kimliğini döndürür (git yoksa None).
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Komut satırı argümanlarını ayrıştırır.
+    """
+    parser = argparse.ArgumentParser(description="Flalingo performans ölçümleri")
+    parser.add_argument('--turns', type=int, default=2000, help="Sentetik transkriptteki konuşma sayısı")
+    parser.add_argument('--speakers', type=int, default=2, help="Konuşmacı sayısı")
+    parser.add_argument('--words-per-turn', type=int, default=12, help="Konuşma başına ortalama kelime")
+    parser.add_argument('--disfluency', type=float, default=0.0,
+                        help="Dolgu sesi, tekrar ya da dinleyici onayı içeren konuşmaların oranı")
+    parser.add_argument('--iterations', type=int, default=20, help="Birim ölçümlerin tekrar sayısı")
+    parser.add_argument('--requests', type=int, default=20, help="Uçtan uca ölçümdeki yükleme sayısı")
+    parser.add_argument('--concurrency', type=int, default=4, help="Eşzamanlı kullanıcı sayısı")
+    parser.add_argument('--llm-latency', type=float, default=0.05, help="Sahte modelin çağrı süresi (saniye)")
+    parser.add_argument('--llm-token-latency', type=float, default=0.0,
+                        help="Sahte modelde istekteki her 1000 token için eklenen süre (saniye)")
+    parser.add_argument('--no-compression', action='store_true',
+                        help="Uçtan uca ölçümde transkript sıkıştırmasını kapatır")
+    parser.add_argument('--replay', help="Sahte model yerine yeniden oynatılacak yapay zeka kayıt dosyası")
+    parser.add_argument('--latency-scale', type=float, default=1.0,
+                        help="Yeniden oynatılan gecikmelerin çarpanı (0: beklemeden)")
+    parser.add_argument('--pipeline-mode', default='two_step', choices=('two_step', 'fused'),
+                        help="Uçtan uca ölçümdeki analiz kipi")
+    parser.add_argument('--only', default=','.join(BENCHMARKS),
+                        help="Çalıştırılacak ölçümler (virgülle ayrılmış): " + ', '.join(BENCHMARKS))
+    parser.add_argument('--output', help="Sonuç dosyası (varsayılan: benchmarks/results/<zaman>-<commit>.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Seçilen ölçümleri çalıştırır, sonuçları yazdırır ve JSON dosyasına kaydeder.
+
+    Returns:
+        Dict[str, Any]: Ölçüm sonuçları.
+    """
+    args = parse_args(argv)
+    selected = [name.strip() for name in args.only.split(',') if name.strip()]
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        raise SystemExit(f"Bilinmeyen ölçüm: {', '.join(sorted(unknown))}")
+
+    os.environ.update(BENCHMARK_ENVIRONMENT, PIPELINE_MODE=args.pipeline_mode,
+                      TRANSCRIPT_COMPRESSION='0' if args.no_compression else '1')
+    from benchmarks.synthetic import generate_transcript
+    from benchmarks.stub_llm import StubModel, install_stub_llm
+
+    if args.replay:
+        from app.utils.llm_backend import ReplayBackend, set_llm_backend
+        set_llm_backend(ReplayBackend(args.replay, latency_scale=args.latency_scale))
+    else:
+        install_stub_llm(latency=args.llm_latency, token_latency=args.llm_token_latency)
+    content = generate_transcript(args.turns, args.speakers, args.words_per_turn, disfluency=args.disfluency)
+    raw_tests = StubModel.respond("test sorusu")
+
+    results = {}
+    if 'parse' in selected:
+        results['parse'] = bench_parse(content, args.iterations)
+    if 'formats' in selected:
+        results.update(bench_formats(content, args.iterations))
+    if 'process' in selected:
+        results['process'] = bench_process(content, args.iterations)
+    if 'compress' in selected:
+        results['compress'] = bench_compress(content, args.iterations)
+    if 'select' in selected:
+        results['select'] = bench_select(content, args.iterations)
+    if 'bank' in selected:
+        results['bank'] = bench_bank(args.iterations)
+    if 'tests_process' in selected or 'tests_html' in selected:
+        tests = bench_tests(raw_tests, args.iterations)
+        results.update({name: tests[name] for name in ('tests_process', 'tests_html') if name in selected})
+    if 'e2e' in selected:
+        # Her yükleme farklı içerikte olsun ki kayıtlı sonuçlar yeniden kullanılmasın
+        transcripts = [generate_transcript(args.turns, args.speakers, args.words_per_turn, seed=seed,
+                                           disfluency=args.disfluency)
+                       for seed in range(1, args.requests + 1)]
+        results['e2e'] = bench_end_to_end(transcripts, args.concurrency)
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'transcript_bytes': len(content.encode('utf-8')),
+            'params': vars(args)
+        },
+        'results': results
+    }
+
+    output = args.output or os.path.join(
+        'benchmarks', 'results', f"{time.strftime('%Y%m%d-%H%M%S')}-{report['meta']['revision'] or 'local'}.json")
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    for name, summary in results.items():
+        line = f"{name:15s} p50={summary.get('p50_ms', 0):9.3f} ms  p95={summary.get('p95_ms', 0):9.3f} ms"
+        if 'throughput_rps' in summary:
+            line += f"  {summary['throughput_rps']:.2f} istek/sn  hata={summary['failures']}"
+        if 'mb_per_s' in summary:
+            line += f"  {summary['mb_per_s']:.1f} MB/sn"
+        if 'ratio' in summary:
+            line += f"  token {summary['original_tokens']} -> {summary['compressed_tokens']} ({summary['ratio']:.2f})"
+        print(line)
+    print(f"Sonuçlar kaydedildi: {output}")
+    return report
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,296 @@
+"""
+İşçi süreçlerinin başlangıç süresi ve bellek kullanımı ölçümleri.
+
+Kullanım:
+    python -m benchmarks.startup [--workers 4] [--modes fork,preload] [--root /başka/çalışma/ağacı]
+
+gunicorn'un ön çatallamalı (prefork) modeli taklit edilir: bir ana süreç işçileri fork ile
+oluşturur. 'fork' kipinde her işçi uygulamayı fork'tan sonra kendisi içe aktarır (gunicorn
+varsayılanı); 'preload' kipinde uygulama ve ağır modüller ana süreçte bir kez yüklenir
+(preload_app ve when_ready). Her işçi için ana sürecin başlatılmasından ilk isteğin ve sahte
+modelle ilk yüklemenin tamamlanmasına kadar geçen süre ile tüm işçiler ayaktayken RSS, PSS
+(paylaşılan sayfalar işçilere bölünmüş) ve USS (yalnızca işçiye ait) bellek ölçülür. Ayrıca
+`import app` için -X importtime profili çıkarılır.
+
+--root ile başka bir çalışma ağacındaki (örneğin `git worktree add` ile açılan önceki
+commit) uygulama ölçülebilir; sonuçlar python -m benchmarks.compare ile karşılaştırılır.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+from typing import Dict, List, Any, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = ('fork', 'preload')
+
+# smaps_rollup alanları (kB)
+MEMORY_FIELDS = ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty')
+
+
+def read_memory(pid: int) -> Dict[str, float]:
+    """
+    Sürecin RSS, PSS ve USS değerlerini /proc/<pid>/smaps_rollup dosyasından okur.
+
+    Returns:
+        Dict[str, float]: 'rss_mb', 'pss_mb' ve 'uss_mb' (Linux dışında boş sözlük).
+    """
+    values = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup', encoding='ascii') as f:
+            for line in f:
+                name, _, rest = line.partition(':')
+                if name in MEMORY_FIELDS:
+                    values[name] = int(rest.split()[0]) / 1024
+    except OSError:
+        return {}
+    return {
+        'rss_mb': values.get('Rss', 0.0),
+        'pss_mb': values.get('Pss', 0.0),
+        'uss_mb': values.get('Private_Clean', 0.0) + values.get('Private_Dirty', 0.0)
+    }
+
+
+def import_profile(root: str, repeat: int, top: int = 10) -> Dict[str, Any]:
+    """
+    `import app` süresini -X importtime ile ölçer.
+
+    Returns:
+        Dict[str, Any]: Süre özeti, yüklenen modül sayısı ve en pahalı üst düzey paketler.
+    """
+    totals = []
+    packages = {}
+    modules = 0
+    for _ in range(repeat):
+        completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=root,
+                                   env=dict(os.environ), capture_output=True, text=True, check=True)
+        packages, modules = {}, 0
+        for line in completed.stderr.splitlines():
+            if not line.startswith('import time:') or '|' not in line or 'cumulative' in line:
+                continue
+            _, cumulative, name = line.split('|')
+            modules += 1
+            depth = (len(name) - len(name.lstrip())) // 2
+            name = name.strip()
+            if name == 'app':
+                totals.append(int(cumulative) / 1e6)
+            elif depth <= 1:
+                # Yalnızca app'in doğrudan içe aktardığı ya da yorumlayıcının ilk yüklediği modüller
+                package = name.split('.')[0]
+                packages[package] = packages.get(package, 0.0) + int(cumulative) / 1000
+    ordered = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        'p50_ms': statistics.median(totals) * 1000,
+        'min_ms': min(totals) * 1000,
+        'modules': modules,
+        'top_ms': [[name, round(ms, 1)] for name, ms in ordered]
+    }
+
+
+def run_master(root: str, mode: str, workers: int, turns: int) -> Dict[str, Any]:
+    """
+    Ana süreç olarak işçileri oluşturur, ölçümlerini toplar ve JSON olarak yazdırır.
+
+    Ana sürecin kendisi bu işlev çağrılmadan hemen önce başlatılmıştır; süreler
+    STARTUP_SPAWNED_AT ortam değişkenindeki başlatma anından itibaren ölçülür.
+    """
+    sys.path.insert(0, root)
+    os.chdir(root)
+    spawned_at = float(os.environ['STARTUP_SPAWNED_AT'])
+
+    if mode == 'preload':
+        import app  # noqa: F401
+        try:
+            from app.utils.preload import preload_modules, freeze_heap
+        except ImportError:
+            # Ön yükleme desteği olmayan sürümlerde yalnızca uygulama yüklenir
+            pass
+        else:
+            preload_modules()
+            freeze_heap()
+    master_ready = time.time() - spawned_at
+
+    read_fd, write_fd = os.pipe()
+    pids = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            try:
+                report = _serve_first_requests(spawned_at, time.time(), turns)
+            except Exception as e:
+                report = {'error': repr(e)}
+            os.write(write_fd, (json.dumps(report) + '\n').encode('utf-8'))
+            # Bellek ölçülene kadar ayakta kal
+            time.sleep(600)
+            os._exit(0)
+        pids.append(pid)
+    os.close(write_fd)
+
+    reports = []
+    with os.fdopen(read_fd, encoding='utf-8') as reader:
+        for line in reader:
+            reports.append(json.loads(line))
+            if len(reports) == workers:
+                break
+    for pid, report in zip(pids, reports):
+        report.update(read_memory(pid))
+    master_memory = read_memory(os.getpid())
+
+    for pid in pids:
+        os.kill(pid, 15)
+        os.waitpid(pid, 0)
+    return {'master_ready_s': master_ready, 'master': master_memory, 'workers': reports}
+
+
+def _serve_first_requests(spawned_at: float, forked_at: float, turns: int) -> Dict[str, Any]:
+    """
+    İşçide uygulamayı (yüklenmemişse) içe aktarır, ilk isteği ve sahte modelle ilk yüklemeyi yapar.
+
+    Returns:
+        Dict[str, Any]: Ana süreç başlangıcından ilk isteğe ve ilk yüklemeye, fork'tan ilk isteğe
+        kadar geçen süreler (saniye).
+    """
+    import io
+    from app import app
+    from benchmarks.stub_llm import install_stub_llm
+    from benchmarks.synthetic import generate_transcript
+
+    client = app.test_client()
+    client.get('/')
+    ready = time.time() - spawned_at
+
+    # Sahte model Gemini istemcisini kullandığından google.generativeai burada (ön yüklenmediyse) yüklenir
+    install_stub_llm()
+
+    content = generate_transcript(turns, seed=os.getpid())
+    job = client.post('/upload', data={'transcript_file': (io.BytesIO(content.encode('utf-8')), 'lesson.vtt')},
+                      content_type='multipart/form-data').get_json()
+    while client.get(job['status_url']).get_json()['status'] not in ('completed', 'failed'):
+        time.sleep(0.005)
+    client.get(job['result_url'])
+    client.get('/results')
+    return {'ready_s': ready, 'first_upload_s': time.time() - spawned_at,
+            'fork_to_ready_s': ready + spawned_at - forked_at}
+
+
+def measure_mode(root: str, mode: str, workers: int, turns: int) -> Dict[str, Any]:
+    """
+    Ana süreci yeni bir yorumlayıcıda başlatır ve kipin ölçümlerini döndürür.
+    """
+    from benchmarks.run import BENCHMARK_ENVIRONMENT
+
+    env = dict(os.environ, **BENCHMARK_ENVIRONMENT)
+    env['STARTUP_SPAWNED_AT'] = repr(time.time())
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--master', mode, '--root', root,
+         '--workers', str(workers), '--turns', str(turns)],
+        env=env, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def summarize_mode(raw: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    İşçi ölçümlerini ilk istek (ana süreç başlangıcından ve fork'tan), ilk yükleme ve bellek
+    özetlerine dönüştürür.
+    """
+    from benchmarks.run import summarize
+
+    workers = [report for report in raw['workers'] if 'error' not in report]
+    memory = {field: statistics.mean(report.get(field, 0.0) for report in workers)
+              for field in ('rss_mb', 'pss_mb', 'uss_mb')} if workers else {}
+    return {
+        'ready': summarize([report['ready_s'] for report in workers]),
+        'worker_ready': summarize([report['fork_to_ready_s'] for report in workers]),
+        'first_upload': summarize([report['first_upload_s'] for report in workers]),
+        'worker_memory': dict(memory, count=len(workers), failures=len(raw['workers']) - len(workers),
+                              master_rss_mb=raw['master'].get('rss_mb', 0.0),
+                              total_pss_mb=sum(report.get('pss_mb', 0.0) for report in workers)
+                              + raw['master'].get('pss_mb', 0.0))
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Komut satırı argümanlarını ayrıştırır.
+    """
+    parser = argparse.ArgumentParser(description="İşçi başlangıç süresi ve bellek ölçümleri")
+    parser.add_argument('--root', default=ROOT, help="Ölçülecek uygulamanın çalışma ağacı")
+    parser.add_argument('--workers', type=int, default=4, help="İşçi sayısı")
+    parser.add_argument('--modes', default=','.join(MODES), help="Ölçülecek kipler: " + ', '.join(MODES))
+    parser.add_argument('--turns', type=int, default=200, help="İlk yüklemedeki transkriptin konuşma sayısı")
+    parser.add_argument('--repeat', type=int, default=3, help="İçe aktarma profilinin tekrar sayısı")
+    parser.add_argument('--output', help="Sonuç dosyası (varsayılan: benchmarks/results/<zaman>-startup.json)")
+    parser.add_argument('--master', choices=MODES, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    İçe aktarma profilini ve seçilen kiplerin başlangıç ölçümlerini çalıştırır ve kaydeder.
+
+    Returns:
+        Dict[str, Any]: Ölçüm sonuçları.
+    """
+    args = parse_args(argv)
+    root = os.path.abspath(args.root)
+    if args.master:
+        print(json.dumps(run_master(root, args.master, args.workers, args.turns)))
+        return {}
+
+    from benchmarks.run import git_revision
+
+    modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        raise SystemExit(f"Bilinmeyen kip: {', '.join(sorted(unknown))}")
+
+    profile = import_profile(root, args.repeat)
+    results = {'import_app': profile}
+    for mode in modes:
+        for name, summary in summarize_mode(measure_mode(root, mode, args.workers, args.turns)).items():
+            results[f'{mode}_{name}'] = summary
+
+    cwd = os.getcwd()
+    os.chdir(root)
+    revision = git_revision()
+    os.chdir(cwd)
+    report = {
+        'meta': {
+            'revision': revision,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'params': vars(args)
+        },
+        'results': results
+    }
+
+    output = args.output or os.path.join(
+        'benchmarks', 'results', f"{time.strftime('%Y%m%d-%H%M%S')}-{revision or 'local'}-startup.json")
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"import app      p50={profile['p50_ms']:9.1f} ms  modül={profile['modules']}  "
+          + ", ".join(f"{name} {ms:.0f} ms" for name, ms in profile['top_ms'][:6]))
+    for mode in modes:
+        ready, upload = results[f'{mode}_ready'], results[f'{mode}_first_upload']
+        worker_ready, memory = results[f'{mode}_worker_ready'], results[f'{mode}_worker_memory']
+        print(f"{mode:8s} ilk istek p50={ready.get('p50_ms', 0):8.1f} ms "
+              f"(fork'tan {worker_ready.get('p50_ms', 0):7.1f} ms)  ilk yükleme p50={upload.get('p50_ms', 0):8.1f} ms")
+        print(f"{'':8s} işçi RSS={memory.get('rss_mb', 0):6.1f} MB  PSS={memory.get('pss_mb', 0):6.1f} MB  "
+              f"USS={memory.get('uss_mb', 0):6.1f} MB  toplam PSS={memory.get('total_pss_mb', 0):6.1f} MB")
+    print(f"Sonuçlar kaydedildi: {output}")
+    return report
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,192 @@
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List
+
+from app.utils.gemini_client import GeminiClientManager
+from app.utils.llm_backend import set_llm_backend
+
+
+class StubModel:
+    """
+    genai.GenerativeModel yerine kullanılan, ağ isteği yapmayan belirlenimci model.
+
+    Yanıt, isteğin türüne göre (analiz, test soruları ya da birleşik yanıt) istek
+    metninin özetinden üretilir; her çağrı belirtilen süre ile istekteki token sayısıyla
+    orantılı süre kadar bekler.
+
+    Aynı anda yanıt bekleyen çağrı sayısı ve bu sayının en yüksek değeri tüm modeller
+    için sınıf düzeyinde tutulur (yük testlerinde eşzamanlı istek sayısını ölçmek için).
+    """
+
+    in_flight = 0
+    peak_in_flight = 0
+    _counter_lock = threading.Lock()
+
+    def __init__(self, model_name: str, latency: float = 0.0, chunk_chars: int = 64,
+                 token_latency: float = 0.0):
+        """
+        StubModel sınıfını başlatır.
+
+        Args:
+            model_name (str): Model adı (yalnızca bilgi amaçlı).
+            latency (float): Her çağrının süresi (saniye); akış kipinde parçalara bölünür.
+            chunk_chars (int): Akış kipinde bir parçadaki karakter sayısı.
+            token_latency (float): İstekteki her 1000 token için eklenen süre (saniye).
+        """
+        self.model_name = model_name
+        self.latency = latency
+        self.chunk_chars = chunk_chars
+        self.token_latency = token_latency
+
+    def generate_content(self, prompt: str, stream: bool = False) -> Any:
+        """
+        İsteğe karşılık gelen sabit yanıtı döndürür.
+
+        Args:
+            prompt (str): İstek metni.
+            stream (bool): True ise yanıt parçalar halinde döndürülür.
+
+        Returns:
+            Any: text ve usage_metadata alanlı yanıt ya da akış kipinde yanıt parçaları.
+        """
+        text = self.respond(prompt)
+        usage = SimpleNamespace(prompt_token_count=len(prompt) // 4, candidates_token_count=len(text) // 4)
+        latency = self.latency + self.token_latency * usage.prompt_token_count / 1000
+        if stream:
+            return self._stream(text, usage, latency)
+        self._enter()
+        try:
+            time.sleep(latency)
+        finally:
+            self._exit()
+        return SimpleNamespace(text=text, usage_metadata=usage)
+
+    async def generate_content_async(self, prompt: str) -> Any:
+        """
+        generate_content'in eşzamansız karşılığı; beklerken olay döngüsünü durdurmaz.
+
+        Args:
+            prompt (str): İstek metni.
+
+        Returns:
+            Any: text ve usage_metadata alanlı yanıt.
+        """
+        text = self.respond(prompt)
+        usage = SimpleNamespace(prompt_token_count=len(prompt) // 4, candidates_token_count=len(text) // 4)
+        self._enter()
+        try:
+            await asyncio.sleep(self.latency + self.token_latency * usage.prompt_token_count / 1000)
+        finally:
+            self._exit()
+        return SimpleNamespace(text=text, usage_metadata=usage)
+
+    @classmethod
+    def _enter(cls) -> None:
+        """
+        Yanıt bekleyen çağrı sayısını artırır.
+        """
+        with cls._counter_lock:
+            cls.in_flight += 1
+            cls.peak_in_flight = max(cls.peak_in_flight, cls.in_flight)
+
+    @classmethod
+    def _exit(cls) -> None:
+        """
+        Yanıt bekleyen çağrı sayısını azaltır.
+        """
+        with cls._counter_lock:
+            cls.in_flight -= 1
+
+    def _stream(self, text: str, usage: Any, latency: float) -> Iterator[Any]:
+        """
+        Yanıtı gecikmeyi parçalara bölerek döndürür.
+        """
+        chunks = [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)]
+        for number, chunk in enumerate(chunks, 1):
+            time.sleep(latency / len(chunks))
+            yield SimpleNamespace(text=chunk, usage_metadata=usage if number == len(chunks) else None)
+
+    def count_tokens(self, text: str) -> Any:
+        """
+        Isınma isteği için token sayısını döndürür.
+        """
+        return SimpleNamespace(total_tokens=len(text) // 4)
+
+    @staticmethod
+    def respond(prompt: str) -> str:
+        """
+        İsteğin türüne göre belirlenimci yanıt metni üretir.
+
+        Args:
+            prompt (str): İstek metni.
+
+        Returns:
+            str: Yanıt metni.
+        """
+        seed = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]
+        if '"analysis"' in prompt:
+            return json.dumps({
+                'analysis': StubModel._analysis(seed),
+                'questions': StubModel._questions(seed)
+            }, ensure_ascii=False, indent=2)
+        if 'test sorusu' in prompt:
+            return "```json\n" + json.dumps(StubModel._questions(seed), ensure_ascii=False, indent=2) + "\n```"
+        return json.dumps(StubModel._analysis(seed), ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def _analysis(seed: str) -> Dict[str, Any]:
+        """
+        Örnek analiz sonucunu döndürür.
+        """
+        return {
+            'level': 'B1',
+            'strengths': ['Akıcı konuşma', 'Geniş kelime bilgisi'],
+            'areas_to_improve': ['Geçmiş zaman', 'Telaffuz'],
+            'new_vocabulary': ['get the hang of', 'pronunciation', seed],
+            'topics': ['Hafta sonu planları', 'Seyahat']
+        }
+
+    @staticmethod
+    def _questions(seed: str, count: int = 5) -> List[Dict[str, Any]]:
+        """
+        Örnek test sorularını döndürür.
+        """
+        return [
+            {
+                'question': f"Soru {number} ({seed}): Which sentence is correct?",
+                'options': [
+                    {'letter': 'A', 'text': 'I goed to the market.'},
+                    {'letter': 'B', 'text': 'I went to the market.'},
+                    {'letter': 'C', 'text': 'I going to the market.'},
+                    {'letter': 'D', 'text': 'I gone to the market.'}
+                ],
+                'correct_answer': 'B',
+                'explanation': "'Go' fiilinin geçmiş zamanı 'went' olur."
+            }
+            for number in range(1, count + 1)
+        ]
+
+
+def install_stub_llm(latency: float = 0.0, model_name: str = 'gemini-1.5-flash',
+                     pool_size: int = 16, token_latency: float = 0.0) -> GeminiClientManager:
+    """
+    Süreç genelindeki yapay zeka arka ucunu yerel StubModel kullanan bir istemciyle değiştirir.
+
+    Args:
+        latency (float): Her yapay zeka çağrısının süresi (saniye).
+        model_name (str): Model adı (önbellek anahtarlarında kullanılır).
+        pool_size (int): Havuzdaki model sayısı.
+        token_latency (float): İstekteki her 1000 token için eklenen süre (saniye).
+
+    Returns:
+        GeminiClientManager: Kurulan istemci.
+    """
+    client = GeminiClientManager(
+        model_name, pool_size=pool_size,
+        model_factory=lambda name: StubModel(name, latency=latency, token_latency=token_latency))
+    set_llm_backend(client)
+    return client
@@ -0,0 +1,111 @@
+import random
+from typing import List
+
+from app.utils.transcript_frame import format_timestamp
+
+# Sentetik konuşmalarda kullanılan kelimeler
+WORDS = (
+    "yesterday today market school teacher lesson weather holiday family friend travel "
+    "book movie music restaurant breakfast dinner weekend morning evening office project "
+    "meeting question answer practice grammar vocabulary sentence pronunciation listening "
+    "reading writing speaking interesting difficult easy important beautiful quickly slowly "
+    "usually sometimes always never because although however therefore went go goes going "
+    "have has had make made take took think thought would could should might will can"
+).split()
+
+
+# Konuşma bozuklukları için dolgu sesleri ve dinleyici onayları
+FILLERS = ("um,", "uh,", "um", "hmm,", "erm")
+BACKCHANNELS = ("yeah", "okay", "mhm", "right", "uh-huh")
+
+
+def generate_transcript(turns: int = 200, speakers: int = 2, words_per_turn: int = 12,
+                        seed: int = 0, disfluency: float = 0.0) -> str:
+    """
+    Zoom ders transkripti biçiminde (WEBVTT) sentetik bir transkript üretir.
+
+    Aynı argümanlarla her zaman aynı metni üretir; ilk konuşmacı öğretmendir.
+
+    Args:
+        turns (int): Konuşma sayısı.
+        speakers (int): Konuşmacı sayısı (en az 1).
+        words_per_turn (int): Bir konuşmadaki ortalama kelime sayısı.
+        seed (int): Rastgele sayı üreteci tohumu.
+        disfluency (float): Bir konuşmanın dolgu sesi, tekrar içerme ya da yalnızca
+            dinleyici onayı ("Yeah.", "Mhm.") olma olasılığı.
+
+    Returns:
+        str: Transkript metni.
+    """
+    rng = random.Random(seed)
+    names = ["Teacher Anna"] + [f"Student {number}" for number in range(1, max(1, speakers))]
+    lines: List[str] = ["WEBVTT", ""]
+    start_ms = 0
+    for index in range(1, turns + 1):
+        speaker = names[0] if index % 2 else rng.choice(names[1:] or names)
+        count = max(1, int(rng.gauss(words_per_turn, words_per_turn / 3)))
+        words = [rng.choice(WORDS) for _ in range(count)]
+        if rng.random() < disfluency:
+            kind = rng.randrange(3)
+            if kind == 0:
+                words.insert(rng.randrange(len(words) + 1), rng.choice(FILLERS))
+            elif kind == 1:
+                position = rng.randrange(len(words))
+                words.insert(position, words[position])
+            else:
+                words = [rng.choice(BACKCHANNELS)]
+        text = " ".join(words).capitalize() + rng.choice(".?!")
+        end_ms = start_ms + 400 * count
+        lines.extend([
+            str(index),
+            f"{format_timestamp(start_ms)} --> {format_timestamp(end_ms)}",
+            f"{speaker}: {text}",
+            ""
+        ])
+        start_ms = end_ms + rng.randint(200, 1500)
+    return "\n".join(lines)
+
+
+def convert_transcript(content: str, transcript_format: str) -> str:
+    """
+    generate_transcript çıktısını aynı konuşmaları içeren başka bir dışa aktarım biçimine çevirir.
+
+    Args:
+        content (str): WEBVTT biçimindeki transkript.
+        transcript_format (str): 'vtt', 'srt', 'zoom_json' ya da 'csv'.
+
+    Returns:
+        str: Transkript metni.
+
+    Raises:
+        ValueError: Biçim bilinmiyorsa.
+    """
+    import io
+    import csv
+    import json
+    from app.utils.transcript_processor import TranscriptProcessor
+
+    if transcript_format == 'vtt':
+        return content
+    records = TranscriptProcessor('synthetic.vtt')._parse_transcript(content)
+    if transcript_format == 'srt':
+        return "\n".join(
+            f"{record['index']}\n{record['start_time'].replace('.', ',')} --> "
+            f"{record['end_time'].replace('.', ',')}\n{record['speaker']}: {record['text']}\n"
+            for record in records)
+    if transcript_format == 'zoom_json':
+        return json.dumps({'timeline': [{
+            'id': record['index'],
+            'ts': record['start_time'],
+            'end_ts': record['end_time'],
+            'username': record['speaker'],
+            'text': record['text']
+        } for record in records]})
+    if transcript_format == 'csv':
+        output = io.StringIO()
+        writer = csv.writer(output, lineterminator='\n')
+        writer.writerow(['Index', 'Start Time', 'End Time', 'Speaker', 'Text'])
+        writer.writerows([record['index'], record['start_time'], record['end_time'], record['speaker'],
+                          record['text']] for record in records)
+        return output.getvalue()
+    raise ValueError(f"Bilinmeyen transkript biçimi: {transcript_format}")
@@ -0,0 +1,42 @@
+# gunicorn yapılandırma dosyası
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+# İşlerin durumu ve olayları, canlı dersler ve sonuçlar tüm işçilerin okuyabildiği SQLite
+# depolarında tutulur; bir işin ya da canlı dersin istekleri herhangi bir işçiye düşebilir.
+# JOB_STORE=memory ya da LIVE_LESSON_STORE=memory ile çalışırken işler/dersler yalnızca kabul eden
+# işçide bilinir ve GUNICORN_WORKERS=1 kullanılmalıdır.
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+# Uygulama ve ağır modüller ana süreçte bir kez yüklenir; işçiler fork ile kopyalandığından
+# yeniden yüklemez ve bellek sayfalarını paylaşır (GUNICORN_PRELOAD=0 ile kapatılır)
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+
+def when_ready(server):
+    """
+    İşçiler oluşturulmadan önce ana süreçte pandas ve Gemini istemci kütüphanesini yükler ve
+    yüklenen nesneleri çöp toplayıcıdan gizler; böylece işçilerdeki çöp toplama paylaşılan
+    sayfaları kopyalamaz.
+
+    Ana süreçte yapay zeka istemcisi yapılandırılmaz ve bağlantı açılmaz; bunlar her işçide
+    post_fork'ta ya da ilk istekte kurulur.
+    """
+    if not preload_app:
+        return
+    from app.utils.preload import preload_modules, freeze_heap
+    preload_modules()
+    freeze_heap()
+
+
+def post_fork(server, worker):
+    """
+    Her işçi süreci oluşturulduktan sonra yapay zeka arka ucunu yapılandırır ve
+    LLM_WARMUP=1 ise ısındırır; böylece ilk kullanıcı isteği bağlantı kurulumunu beklemez.
+    """
+    if os.getenv("LLM_WARMUP", "0") != "1":
+        return
+    from app.utils.llm_backend import get_llm_backend
+    get_llm_backend().warm_up()
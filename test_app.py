@@ -1,7 +1,44 @@
 import unittest
+import io
+import asyncio
+import sys
+import gzip
+import json
 import os
+import time
+import tempfile
+import sqlite3
+import subprocess
 from app.utils.transcript_processor import TranscriptProcessor
 from app.utils.test_generator import TestGenerator
+from app.utils.transcript_frame import TranscriptFrame
+from app.utils.job_queue import Job, JobQueue, AsyncJobQueue, JobError, QueueFullError
+from app.utils.job_store import SQLiteJobStore
+from app.utils.prompt_cache import PromptCache
+from app.utils.result_store import SQLiteResultStore
+from app.utils.sqlite_util import thread_connection
+from app.utils.request_coalescer import RequestCoalescer
+from app.utils.rate_limiter import FileTokenBucket, RateLimitTimeout
+from app.utils.call_policy import CallPolicy, CallTimeoutError, is_retryable
+from app.utils.gemini_client import GeminiClientManager, ModelPoolTimeout
+from app.utils.stream_parser import JsonArrayStreamParser
+from app.utils.metrics import MetricsRegistry
+from app.utils.llm_backend import LLMBackend, RecordingBackend, ReplayBackend
+from app.utils.prompt_budget import PromptBudget, count_tokens
+from app.utils.transcript_compressor import TranscriptCompressor
+from app.utils.question_bank import QuestionBank, lesson_profile, minhash_signature, signature_similarity
+from app.utils.live_lesson import LiveLesson, LiveLessonRegistry
+from app.utils.live_lesson_store import SQLiteLiveLessonStore
+from app.utils.transcript_formats import detect_parser
+from app.utils.result_store import MemoryResultStore
+from app.utils.ai_analyzer import AIAnalyzer
+from app.batch import BatchCheckpoint, iter_sources, run_batch
+from app.utils.pipeline import render_result, run_pipeline, run_pipeline_async, pipeline_stages
+from app.utils.preload import preload_modules
+from benchmarks.synthetic import generate_transcript, convert_transcript
+from benchmarks.stub_llm import StubModel
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
 class TestTranscriptProcessor(unittest.TestCase):
     """
@@ -34,6 +71,79 @@ class TestTranscriptProcessor(unittest.TestCase):
         self.assertIsNotNone(processed_data, "İşlenmiş veri boş.")
         self.assertIn('speakers', processed_data, "Konuşmacılar bulunamadı.")
         self.assertIn('all_text', processed_data, "Tüm metin bulunamadı.")
+    
+    def test_load_transcript_stream(self):
+        """
+        Akıştan satır satır yüklemeyi test eder.
+        """
+        content = (
+            "WEBVTT\n\n"
+            "1\n00:00:01.000 --> 00:00:04.000\nTeacher: Hello, how are you?\n\n"
+            "2\n00:00:05.000 --> 00:00:08.000\nStudent: I'm fine, thank you.\n"
+        )
+        processor = TranscriptProcessor("upload.csv")
+        self.assertTrue(processor.load_transcript(stream=io.BytesIO(content.encode('utf-8'))), "Akıştan yükleme başarısız oldu.")
+        
+        self.assertEqual(len(processor.transcript_data), 2, "Konuşma sayısı yanlış.")
+        self.assertEqual(processor.transcript_data[1]['speaker'], 'Student', "Konuşmacı yanlış.")
+        self.assertEqual(processor.transcript_data[1]['start_time'], '00:00:05.000', "Zaman damgası yanlış.")
+        self.assertEqual(processor.transcript_data, processor._parse_transcript(content), "Akış ve metin ayrıştırması farklı.")
+    
+    def test_fingerprint(self):
+        """
+        Parmak izinin sıra numarası ve boşluk farklılıklarını yok saydığını test eder.
+        """
+        first = TranscriptProcessor(self.test_file_path)
+        first.transcript_data = [
+            {'index': '1', 'start_time': '00:00:01.000', 'end_time': '00:00:02.000', 'speaker': 'Teacher', 'text': 'Hello  there'}
+        ]
+        second = TranscriptProcessor(self.test_file_path)
+        second.transcript_data = [
+            {'index': '7', 'start_time': '00:10:01.000', 'end_time': '00:10:02.000', 'speaker': ' Teacher', 'text': 'Hello there '}
+        ]
+        third = TranscriptProcessor(self.test_file_path)
+        third.transcript_data = [
+            {'index': '1', 'start_time': '00:00:01.000', 'end_time': '00:00:02.000', 'speaker': 'Student', 'text': 'Hello there'}
+        ]
+        
+        self.assertEqual(first.get_fingerprint(), second.get_fingerprint(), "Eşdeğer transkriptlerin parmak izi farklı.")
+        self.assertNotEqual(first.get_fingerprint(), third.get_fingerprint(), "Farklı konuşmacılar aynı parmak izini üretti.")
+
+class TestTranscriptFrame(unittest.TestCase):
+    """
+    TranscriptFrame sınıfını test eden birim testleri.
+    """
+    
+    def setUp(self):
+        """
+        Test öncesi hazırlık.
+        """
+        self.records = [
+            {'index': '1', 'start_time': '00:00:01.000', 'end_time': '00:00:04.500', 'speaker': 'Teacher', 'text': 'Hello.'},
+            {'index': '2', 'start_time': '00:00:05.000', 'end_time': '00:00:06.000', 'speaker': 'Student', 'text': 'Hi.'},
+            {'index': '3', 'start_time': '01:00:07.000', 'end_time': '01:00:09.000', 'speaker': 'Teacher', 'text': 'Bye.'}
+        ]
+        self.frame = TranscriptFrame.from_records(self.records)
+    
+    def test_views(self):
+        """
+        Sözlük görünümlerinin eski process_transcript çıktısıyla aynı olduğunu test eder.
+        """
+        self.assertEqual(self.frame['speakers'], {'Teacher': ['Hello.', 'Bye.'], 'Student': ['Hi.']}, "Konuşmacı grupları yanlış.")
+        self.assertEqual(self.frame['speaker_counts'], {'Teacher': 2, 'Student': 1}, "Konuşma sayıları yanlış.")
+        self.assertEqual(self.frame.get('all_text'), 'Hello. Hi. Bye.', "Birleştirilmiş metin yanlış.")
+        self.assertEqual(self.frame['transcript_data'], self.records, "Kayıtlar yanlış.")
+        
+        # Kayıtlar saklanmaz; birleştirilmiş metin bir kez oluşturulur
+        self.assertIsNot(self.frame['transcript_data'], self.frame['transcript_data'], "Kayıtlar bellekte saklandı.")
+        self.assertNotIn('transcript_data', vars(self.frame), "Kayıtlar bellekte saklandı.")
+        self.assertIs(self.frame['all_text'], self.frame['all_text'], "Birleştirilmiş metin yeniden oluşturuldu.")
+    
+    def test_talk_time(self):
+        """
+        Konuşma sürelerinin milisaniye olarak hesaplandığını test eder.
+        """
+        self.assertEqual(self.frame.talk_time_ms, {'Teacher': 5500, 'Student': 1000}, "Konuşma süreleri yanlış.")
 
 class TestTestGenerator(unittest.TestCase):
     """
@@ -84,6 +194,1540 @@ class TestTestGenerator(unittest.TestCase):
         self.assertIsNotNone(html, "HTML çıktısı boş.")
         self.assertIn("What is the meaning of 'nettle' in Greek?", html, "Soru metni HTML'de bulunamadı.")
         self.assertIn("Water", html, "Seçenek metni HTML'de bulunamadı.")
+    
+    def test_render(self):
+        """
+        Testlerin bir kez işlenip HTML ve içerik özetiyle döndürüldüğünü test eder.
+        """
+        rendered = TestGenerator(self.sample_tests).render()
+        
+        self.assertEqual(len(rendered['processed_tests']), 1, "Test sayısı yanlış.")
+        self.assertIn("Water", rendered['tests_html'], "Seçenek metni HTML'de bulunamadı.")
+        self.assertEqual(rendered['content_hash'], TestGenerator(self.sample_tests).render()['content_hash'],
+                         "Aynı testler için içerik özeti değişti.")
+
+class TestJobQueue(unittest.TestCase):
+    """
+    JobQueue sınıfını test eden birim testleri.
+    """
+    
+    def _wait(self, job):
+        """
+        İş bitene kadar bekler.
+        """
+        deadline = time.time() + 5
+        while not job.finished and time.time() < deadline:
+            time.sleep(0.01)
+    
+    def test_job_stages(self):
+        """
+        İşin aşamalarının sırasıyla tamamlandığını test eder.
+        """
+        def work(job, value):
+            with job.stage('first'):
+                pass
+            with job.stage('second'):
+                return value * 2
+        
+        queue = JobQueue(max_workers=1)
+        job = queue.submit(work, 21, stages=['first', 'second'])
+        self._wait(job)
+        
+        self.assertEqual(job.status, 'completed', "İş tamamlanmadı.")
+        self.assertEqual(job.result, 42, "İş sonucu yanlış.")
+        self.assertEqual(job.progress, 1.0, "İlerleme yanlış.")
+        self.assertIs(queue.get(job.id), job, "İş kuyrukta bulunamadı.")
+    
+    def test_job_events(self):
+        """
+        İşin yayınladığı olayların sırasıyla alındığını ve bitişin olay olarak eklendiğini test eder.
+        """
+        def work(job):
+            for number in (1, 2):
+                job.publish('question', {'number': number})
+                time.sleep(0.02)
+            return 'tamam'
+        
+        queue = JobQueue(max_workers=1)
+        job = queue.submit(work)
+        received = []
+        while not received or received[-1]['event'] != 'completed':
+            events = job.wait_events(len(received), timeout=5)
+            self.assertTrue(events, "Olay beklenirken süre doldu.")
+            received.extend(events)
+        
+        self.assertEqual([event['event'] for event in received], ['question', 'question', 'completed'],
+                         "Olay sırası yanlış.")
+        self.assertEqual([event['id'] for event in received], [1, 2, 3], "Olay kimlikleri yanlış.")
+        self.assertEqual(job.wait_events(3, timeout=0.01), [], "Yeni olay yokken olay döndürüldü.")
+    
+    def test_job_failure(self):
+        """
+        Aşama hatasının işe kaydedildiğini test eder.
+        """
+        def work(job):
+            with job.stage('only'):
+                raise JobError('Analiz başarısız oldu.')
+        
+        queue = JobQueue(max_workers=1)
+        job = queue.submit(work, stages=['only'])
+        self._wait(job)
+        
+        self.assertEqual(job.status, 'failed', "İş başarısız olarak işaretlenmedi.")
+        self.assertEqual(job.error, 'Analiz başarısız oldu.', "Hata mesajı yanlış.")
+        self.assertEqual(job.to_dict()['stages'][0]['status'], 'failed', "Aşama durumu yanlış.")
+    
+    def test_queue_limit(self):
+        """
+        Kuyruk sınırının aşılamadığını test eder.
+        """
+        def work(job):
+            time.sleep(0.2)
+        
+        queue = JobQueue(max_workers=1, max_pending=1)
+        job = queue.submit(work)
+        with self.assertRaises(QueueFullError):
+            queue.submit(work)
+        self._wait(job)
+    
+    def test_job_visible_to_other_workers(self):
+        """
+        Bir işçide çalışan işin durumunun, aşamalarının ve olaylarının aynı depoyu kullanan
+        başka bir işçiden okunabildiğini test eder.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'jobs.sqlite3')
+            accepting = JobQueue(max_workers=1, store=SQLiteJobStore(path))
+            other = JobQueue(max_workers=1, store=SQLiteJobStore(path))
+            
+            def work(job):
+                with job.stage('analyze'):
+                    job.publish('question', {'number': 1})
+                    time.sleep(0.2)
+                return {'result_id': 'abc'}
+            
+            job = accepting.submit(work, stages=['analyze'])
+            remote = other.get(job.id)
+            self.assertIsNotNone(remote, "İş diğer işçide bulunamadı.")
+            self.assertFalse(remote.finished, "Süren iş bitmiş görünüyor.")
+            events = remote.wait_events(0, timeout=5)
+            self.assertEqual(events[0], {'id': 1, 'event': 'question', 'data': {'number': 1}}, "Olay okunamadı.")
+            
+            self._wait(job)
+            remote = other.get(job.id)
+            self.assertEqual((remote.status, remote.result), ('completed', {'result_id': 'abc'}), "Sonuç okunamadı.")
+            self.assertEqual(remote.to_dict()['stages'][0]['status'], 'completed', "Aşama durumu okunamadı.")
+            self.assertEqual([event['event'] for event in remote.wait_events(1, timeout=1)], ['completed'],
+                             "Bitiş olayı okunamadı.")
+            self.assertIsNone(other.get('yok'), "Olmayan iş bulundu.")
+
+class TestPromptCache(unittest.TestCase):
+    """
+    PromptCache sınıfını test eden birim testleri.
+    """
+    
+    def setUp(self):
+        """
+        Test öncesi hazırlık.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'cache.sqlite3')
+    
+    def tearDown(self):
+        """
+        Test sonrası temizlik.
+        """
+        self.temp_dir.cleanup()
+    
+    def test_shared_disk_tier(self):
+        """
+        Diske yazılan yanıtın başka bir önbellek örneğinden okunabildiğini test eder.
+        """
+        key = PromptCache.make_key('model', 'prompt')
+        writer = PromptCache(self.db_path)
+        writer.set(key, 'yanıt')
+        
+        reader = PromptCache(self.db_path)
+        self.assertEqual(reader.get(key), 'yanıt', "Disk katmanından okunamadı.")
+        self.assertEqual(reader.get(key), 'yanıt', "Bellek katmanından okunamadı.")
+        self.assertIsNone(reader.get(PromptCache.make_key('other-model', 'prompt')), "Farklı model için isabet oldu.")
+        
+        stats = reader.stats()
+        self.assertEqual((stats['disk_hits'], stats['memory_hits'], stats['misses']), (1, 1, 1), "Sayaçlar yanlış.")
+    
+    def test_ttl_expiry(self):
+        """
+        Süresi dolan kayıtların döndürülmediğini test eder.
+        """
+        cache = PromptCache(self.db_path, ttl_seconds=0)
+        key = PromptCache.make_key('model', 'prompt')
+        cache.set(key, 'yanıt')
+        time.sleep(0.01)
+        self.assertIsNone(cache.get(key), "Süresi dolan kayıt döndürüldü.")
+    
+    def test_memory_lru_limit(self):
+        """
+        Bellek katmanının boyut sınırını test eder.
+        """
+        cache = PromptCache(self.db_path, max_memory_entries=2)
+        for i in range(3):
+            cache.set(str(i), str(i))
+        self.assertEqual(cache.stats()['memory_entries'], 2, "LRU sınırı uygulanmadı.")
+        self.assertEqual(cache.get('0'), '0', "Bellekten çıkarılan kayıt diskte bulunamadı.")
+
+class TestResultStore(unittest.TestCase):
+    """
+    SQLiteResultStore sınıfını test eden birim testleri.
+    """
+    
+    def setUp(self):
+        """
+        Test öncesi hazırlık.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'results.sqlite3')
+    
+    def tearDown(self):
+        """
+        Test sonrası temizlik.
+        """
+        self.temp_dir.cleanup()
+    
+    def test_put_and_get(self):
+        """
+        Yazılan sonucun yazma işlemi bitmeden ve bittikten sonra okunabildiğini test eder.
+        """
+        store = SQLiteResultStore(self.db_path, flush_interval=60)
+        result_id = store.put({'analysis_result': {'raw_analysis': 'B2'}})
+        self.assertEqual(store.get(result_id)['analysis_result']['raw_analysis'], 'B2', "Bekleyen sonuç okunamadı.")
+        
+        store.flush()
+        other = SQLiteResultStore(self.db_path)
+        self.assertEqual(other.get(result_id)['analysis_result']['raw_analysis'], 'B2', "Yazılan sonuç okunamadı.")
+        self.assertIsNone(other.get('bilinmeyen'), "Olmayan sonuç döndürüldü.")
+    
+    def test_sweep(self):
+        """
+        Süresi dolan sonuçların silindiğini test eder.
+        """
+        store = SQLiteResultStore(self.db_path, ttl_seconds=0, flush_interval=60)
+        result_id = store.put({'tests_result': {}})
+        store.flush()
+        time.sleep(0.01)
+        self.assertEqual(store.sweep(), 1, "Süresi dolan sonuç silinmedi.")
+        self.assertIsNone(store.get(result_id), "Silinen sonuç döndürüldü.")
+    
+    def test_link_and_lookup(self):
+        """
+        Parmak izi bağlantısının sonucu bulduğunu test eder.
+        """
+        store = SQLiteResultStore(self.db_path, flush_interval=60)
+        result_id = store.put({'tests_result': {}})
+        store.link('parmak-izi', result_id)
+        self.assertEqual(store.lookup('parmak-izi'), result_id, "Bekleyen bağlantı bulunamadı.")
+        
+        store.flush()
+        other = SQLiteResultStore(self.db_path)
+        self.assertEqual(other.lookup('parmak-izi'), result_id, "Yazılan bağlantı bulunamadı.")
+        self.assertIsNone(other.lookup('baska'), "Olmayan bağlantı bulundu.")
+    
+    def test_visible_while_flushing(self):
+        """
+        Yazma sürerken ve başarısız olduğunda bekleyen sonucun okunabildiğini test eder.
+        """
+        store = SQLiteResultStore(self.db_path, flush_interval=60)
+        result_id = store.put({'tests_result': {'source': 'model'}})
+        store.link('parmak-izi', result_id)
+        seen = []
+        
+        class Connection:
+            def __init__(self, conn, fail):
+                self.conn, self.fail = conn, fail
+            
+            def __enter__(self):
+                return self
+            
+            def __exit__(self, *exc):
+                return self.conn.__exit__(*exc)
+            
+            def execute(self, *args):
+                return self.conn.execute(*args)
+            
+            def executemany(self, *args):
+                seen.append((store.get(result_id), store.lookup('parmak-izi')))
+                if self.fail:
+                    raise sqlite3.OperationalError('database is locked')
+                return self.conn.executemany(*args)
+        
+        with mock.patch('app.utils.result_store.thread_connection',
+                        lambda *args: Connection(thread_connection(*args), fail=True)):
+            store.flush()
+        self.assertEqual(store.lookup('parmak-izi'), result_id, "Yazılamayan sonuç kayboldu.")
+        
+        with mock.patch('app.utils.result_store.thread_connection',
+                        lambda *args: Connection(thread_connection(*args), fail=False)):
+            store.flush()
+        self.assertTrue(all(result is not None and found == result_id for result, found in seen),
+                        "Yazma sırasında sonuç bulunamadı.")
+        self.assertEqual(store._pending, {}, "Yazılan sonuç bekleyenlerde kaldı.")
+        self.assertEqual(SQLiteResultStore(self.db_path).lookup('parmak-izi'), result_id, "Sonuç yazılmadı.")
+
+class TestRequestCoalescer(unittest.TestCase):
+    """
+    RequestCoalescer sınıfını test eden birim testleri.
+    """
+    
+    def test_batch_and_fallback(self):
+        """
+        Eşzamanlı isteklerin birleştirildiğini ve ayrıştırılamayan yanıtın tek başına gönderildiğini test eder.
+        """
+        calls = []
+        
+        def generate(prompt, kind):
+            calls.append(kind)
+            if '<<<GÖREV' in prompt:
+                # Üçüncü görevin yanıtı eksik
+                return "<<<YANIT 1>>>\nbir\n<<<SON 1>>>\n<<<YANIT 2>>>\niki\n<<<SON 2>>>"
+            return "tek:" + prompt
+        
+        coalescer = RequestCoalescer(generate, max_batch_size=3, max_wait=1)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = []
+            for prompt in ['a', 'b', 'c']:
+                futures.append(executor.submit(coalescer.submit, 'analysis', prompt))
+                time.sleep(0.02)
+            answers = [future.result(timeout=5) for future in futures]
+        
+        self.assertEqual(answers, ['bir', 'iki', 'tek:c'], "Yanıtlar yanlış dağıtıldı.")
+        self.assertEqual(calls, ['analysis', 'analysis'], "İstekler türleriyle birleştirilmedi.")
+    
+    def test_only_default_model_coalesced(self):
+        """
+        Birleştiricinin süreç genelindeki arka ucu istek türüyle çağırdığını ve başka bir
+        arka uç verilen analizcinin isteklerini birleştirmeden kendi arka ucuna gönderdiğini test eder.
+        """
+        class Backend(LLMBackend):
+            model_name = 'stub'
+            
+            def __init__(self):
+                self.calls = []
+            
+            def generate(self, prompt, kind='default'):
+                self.calls.append(kind)
+                return f"yanıt:{kind}"
+        
+        shared, injected, policy = Backend(), Backend(), CallPolicy(max_attempts=1)
+        with mock.patch.dict(os.environ, {'COALESCE_ENABLED': '1', 'COALESCE_WAIT_MS': '10'}), \
+                mock.patch('app.utils.request_coalescer._default_coalescer', None), \
+                mock.patch('app.utils.request_coalescer.get_llm_backend', return_value=shared), \
+                mock.patch('app.utils.request_coalescer.get_call_policy', return_value=policy), \
+                mock.patch('app.utils.ai_analyzer.get_call_policy', return_value=policy), \
+                mock.patch('app.utils.ai_analyzer.get_question_bank', return_value=None):
+            with mock.patch('app.utils.ai_analyzer.get_llm_backend', return_value=shared), \
+                    mock.patch('app.utils.ai_analyzer.get_prompt_cache', return_value=None):
+                analyzer = AIAnalyzer()
+            self.assertEqual(analyzer._generate('a', kind='tests'), 'yanıt:tests', "Birleşik yanıt yanlış.")
+            self.assertEqual(shared.calls, ['tests'], "İstek türü birleştiriciden geçmedi.")
+            
+            analyzer.backend = injected
+            self.assertIsNone(analyzer._active_coalescer(), "Başka arka uçlu analizci birleştiriciyi kullandı.")
+            self.assertEqual(analyzer._generate('b', kind='analysis'), 'yanıt:analysis', "Yanıt yanlış.")
+            self.assertEqual((shared.calls, injected.calls), (['tests'], ['analysis']),
+                             "İstek verilen arka uca gönderilmedi.")
+    
+    def test_split_response(self):
+        """
+        Birleşik yanıtın görev numaralarına göre ayrıldığını test eder.
+        """
+        text = "<<<YANIT 2>>>\n```[1]```\n<<<SON 2>>>\n<<<YANIT 1>>> x <<<SON 1>>>"
+        self.assertEqual(RequestCoalescer.split_response(text), {1: 'x', 2: '```[1]```'}, "Yanıtlar ayrılamadı.")
+
+class TestCallPolicy(unittest.TestCase):
+    """
+    FileTokenBucket ve CallPolicy sınıflarını test eden birim testleri.
+    """
+    
+    def setUp(self):
+        """
+        Test öncesi hazırlık.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.temp_dir.name, 'bucket.state')
+    
+    def tearDown(self):
+        """
+        Test sonrası temizlik.
+        """
+        self.temp_dir.cleanup()
+    
+    def test_shared_bucket(self):
+        """
+        Aynı durum dosyasını kullanan kovaların jetonları paylaştığını test eder.
+        """
+        first = FileTokenBucket(self.state_path, rate_per_second=0.001, capacity=2)
+        second = FileTokenBucket(self.state_path, rate_per_second=0.001, capacity=2)
+        self.assertEqual(first.try_acquire(), 0.0, "İlk jeton alınamadı.")
+        self.assertEqual(second.try_acquire(), 0.0, "İkinci jeton alınamadı.")
+        self.assertGreater(first.try_acquire(), 0.0, "Kova boşken jeton verildi.")
+        with self.assertRaises(RateLimitTimeout):
+            second.acquire(timeout=0.01)
+    
+    def test_acquire_async_off_loop(self):
+        """
+        Eşzamansız jeton alımında dosya kilidinin olay döngüsünün dışında alındığını test eder.
+        """
+        on_loop = []
+        
+        class Bucket(FileTokenBucket):
+            def try_acquire(self, tokens=1.0):
+                try:
+                    asyncio.get_running_loop()
+                    on_loop.append(True)
+                except RuntimeError:
+                    on_loop.append(False)
+                return super().try_acquire(tokens)
+        
+        bucket = Bucket(self.state_path, rate_per_second=0.001, capacity=1)
+        asyncio.run(bucket.acquire_async(timeout=1))
+        with self.assertRaises(RateLimitTimeout):
+            asyncio.run(bucket.acquire_async(timeout=0.01))
+        self.assertEqual(on_loop, [False, False], "Dosya kilidi olay döngüsünde alındı.")
+    
+    def test_rate_limit_timeout_not_retried(self):
+        """
+        Hız sınırında jeton alınamayan çağrının yeniden denenmeden hemen başarısız olduğunu test eder.
+        """
+        bucket = FileTokenBucket(self.state_path, rate_per_second=0.001, capacity=1)
+        bucket.try_acquire()
+        policy = CallPolicy(limiter=bucket, max_attempts=3, base_delay=0.2, deadline=0.05)
+        calls = []
+        started = time.monotonic()
+        with self.assertRaises(RateLimitTimeout):
+            policy.call(lambda: calls.append(1))
+        self.assertEqual(calls, [], "Jeton alınmadan çağrı yapıldı.")
+        self.assertLess(time.monotonic() - started, 0.15, "Hız sınırı zaman aşımı yeniden denendi.")
+        self.assertFalse(is_retryable(RateLimitTimeout()), "Hız sınırı zaman aşımı geçici sayıldı.")
+    
+    def test_retry_transient_error(self):
+        """
+        Geçici hataların yeniden denendiğini, kalıcı hataların denenmediğini test eder.
+        """
+        class QuotaError(Exception):
+            code = 429
+        
+        attempts = []
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise QuotaError("kota aşıldı")
+            return "tamam"
+        
+        policy = CallPolicy(max_attempts=3, base_delay=0.01)
+        self.assertEqual(policy.call(flaky), "tamam", "Yeniden deneme başarısız oldu.")
+        self.assertEqual(len(attempts), 3, "Deneme sayısı yanlış.")
+        
+        def broken():
+            raise ValueError("geçersiz istek")
+        with self.assertRaises(ValueError):
+            policy.call(broken)
+    
+    def test_deadline_and_hedge(self):
+        """
+        Süre sınırının uygulandığını ve yavaş isteğe yedek istek gönderildiğini test eder.
+        """
+        policy = CallPolicy(max_attempts=1, deadline=0.05)
+        with self.assertRaises(CallTimeoutError):
+            policy.call(lambda: time.sleep(0.5))
+        
+        calls = []
+        def slow_first():
+            calls.append(1)
+            time.sleep(0.5 if len(calls) == 1 else 0.0)
+            return len(calls)
+        
+        hedged = CallPolicy(max_attempts=1, deadline=2, hedge=True, hedge_delay=0.05)
+        started = time.time()
+        self.assertEqual(hedged.call(slow_first), 2, "Yedek isteğin yanıtı kullanılmadı.")
+        self.assertLess(time.time() - started, 0.4, "Yedek istek beklenmeden sonuç döndürülmedi.")
+    
+    def test_deadline_excludes_token_wait(self):
+        """
+        Jeton beklemesinin süre sınırına ve gecikme ölçümüne katılmadığını, süresi dolan
+        denemede başlamamış yedek isteğin iptal edildiğini test eder.
+        """
+        class SlowLimiter:
+            def acquire(self, timeout=None):
+                time.sleep(0.2)
+        
+        policy = CallPolicy(limiter=SlowLimiter(), max_attempts=1, deadline=0.15)
+        self.assertEqual(policy.call(lambda: time.sleep(0.05) or "tamam"), "tamam", "Jeton beklemesi süreye sayıldı.")
+        self.assertLess(policy._latencies[-1], 0.15, "Gecikme ölçümüne jeton beklemesi katıldı.")
+        
+        calls = []
+        def slow():
+            calls.append(1)
+            time.sleep(0.3)
+        
+        hedged = CallPolicy(max_attempts=1, deadline=0.1, hedge=True, hedge_delay=0.02, max_workers=1)
+        with self.assertRaises(CallTimeoutError):
+            hedged.call(slow)
+        time.sleep(0.4)
+        self.assertEqual(len(calls), 1, "Süresi dolan denemenin yedek isteği iptal edilmedi.")
+
+class TestGeminiClientManager(unittest.TestCase):
+    """
+    GeminiClientManager sınıfını test eden birim testleri.
+    """
+    
+    def test_configure_once_and_reuse_models(self):
+        """
+        API'nin süreçte bir kez yapılandırıldığını ve model nesnelerinin yeniden kullanıldığını test eder.
+        """
+        with mock.patch.dict(os.environ, {'GEMINI_API_KEY': 'test-key'}), \
+                mock.patch('app.utils.gemini_client.genai') as genai:
+            genai.GenerativeModel.return_value.generate_content.return_value.text = "yanıt"
+            manager = GeminiClientManager('test-model', pool_size=2)
+            
+            self.assertTrue(manager.warm_up(), "Isınma başarısız oldu.")
+            for _ in range(5):
+                self.assertEqual(manager.generate("istek"), "yanıt", "Yanıt yanlış.")
+            
+            genai.configure.assert_called_once_with(api_key='test-key')
+            self.assertEqual(genai.GenerativeModel.call_count, 2, "Model nesneleri yeniden kullanılmadı.")
+            
+            stats = manager.stats()
+            self.assertTrue(stats['healthy'], "İstemci sağlıksız görünüyor.")
+            self.assertEqual(stats['calls'], 5, "Çağrı sayısı yanlış.")
+            self.assertEqual(stats['available_models'], 2, "Ödünç alınan model havuza geri konmadı.")
+            self.assertIsNotNone(stats['latency_p95'], "Gecikme ölçülmedi.")
+    
+    def test_missing_api_key(self):
+        """
+        API anahtarı yoksa hata fırlatıldığını test eder.
+        """
+        with mock.patch.dict(os.environ, {'GEMINI_API_KEY': ''}):
+            manager = GeminiClientManager('test-model')
+            with self.assertRaises(ValueError):
+                manager.configure()
+            self.assertFalse(manager.warm_up(), "Anahtar yokken ısınma başarılı sayıldı.")
+            self.assertFalse(manager.stats()['healthy'], "Isınamayan istemci sağlıklı görünüyor.")
+    
+    def test_pool_timeout(self):
+        """
+        Havuzda boş model kalmadığında çağrının süresiz beklemek yerine yeniden denenebilir
+        bir hatayla bittiğini test eder.
+        """
+        manager = GeminiClientManager('test-model', pool_size=1, model_factory=lambda name: object(),
+                                      pool_timeout=0.05)
+        with manager.model():
+            started = time.monotonic()
+            with self.assertRaises(ModelPoolTimeout) as context:
+                with manager.model():
+                    pass
+            self.assertLess(time.monotonic() - started, 1.0, "Boş model süresiz beklendi.")
+        self.assertTrue(is_retryable(context.exception), "Havuz zaman aşımı yeniden denenmiyor.")
+        with manager.model() as model:
+            self.assertIsNotNone(model, "Geri konan model alınamadı.")
+
+class TestJsonArrayStreamParser(unittest.TestCase):
+    """
+    JsonArrayStreamParser sınıfını test eden birim testleri.
+    """
+    
+    def test_partial_chunks(self):
+        """
+        Parça parça gelen yanıttan soruların tamamlandıkça çıkarıldığını test eder.
+        """
+        questions = [
+            {"question": "Parantez } ve \\\" içeren [soru]", "options": [{"letter": "A", "text": "{x}"}]},
+            {"question": "İkinci soru", "correct_answer": "B"}
+        ]
+        text = "```json\n" + json.dumps(questions, ensure_ascii=False) + "\n```"
+        parser = JsonArrayStreamParser()
+        
+        received = []
+        first_complete_at = None
+        for position in range(0, len(text), 7):
+            received.extend(parser.feed(text[position:position + 7]))
+            if received and first_complete_at is None:
+                first_complete_at = position
+        
+        self.assertEqual(received, questions, "Sorular doğru ayrıştırılmadı.")
+        self.assertTrue(parser.finished, "Dizinin sonu algılanmadı.")
+        self.assertLess(first_complete_at, text.index("İkinci"), "İlk soru yanıt bitmeden çıkarılmadı.")
+    
+    def test_wrapped_array(self):
+        """
+        Sarmalayıcı nesne içindeki dizinin de ayrıştırıldığını test eder.
+        """
+        parser = JsonArrayStreamParser()
+        self.assertEqual(parser.feed('{"questions": [{"a": 1}, {"b"'), [{"a": 1}], "İlk öğe çıkarılmadı.")
+        self.assertEqual(parser.feed(': 2}]}'), [{"b": 2}], "İkinci öğe çıkarılmadı.")
+    
+    def test_single_character_chunks(self):
+        """
+        Karakter karakter gelen uzun yanıtın doğru ayrıştırıldığını ve tamamlanan
+        nesnelerin metninin tutulmadığını test eder.
+        """
+        questions = [{"question": "x" * 2000, "options": ["{", "}", "\\\""]} for _ in range(3)]
+        parser = JsonArrayStreamParser()
+        received = []
+        for char in "Sorular: " + json.dumps(questions):
+            completed = parser.feed(char)
+            received.extend(completed)
+            if completed:
+                self.assertIsNone(parser._pieces, "Tamamlanan nesnenin metni tutuldu.")
+        self.assertEqual(received, questions, "Sorular doğru ayrıştırılmadı.")
+        self.assertTrue(parser.finished, "Dizinin sonu algılanmadı.")
+
+class TestMetrics(unittest.TestCase):
+    """
+    MetricsRegistry sınıfını test eden birim testleri.
+    """
+    
+    def setUp(self):
+        """
+        Test öncesi hazırlık.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'metrics.sqlite3')
+    
+    def tearDown(self):
+        """
+        Test sonrası temizlik.
+        """
+        self.temp_dir.cleanup()
+    
+    def test_histogram(self):
+        """
+        Histogram aralıklarının, toplamın ve sayının doğru yazıldığını test eder.
+        """
+        registry = MetricsRegistry(buckets=(0.1, 1.0))
+        registry.observe('flai_stage_duration_seconds', 0.05, stage='parse')
+        registry.observe('flai_stage_duration_seconds', 0.5, stage='parse')
+        text = registry.render()
+        
+        self.assertIn('# TYPE flai_stage_duration_seconds histogram', text, "Tür satırı bulunamadı.")
+        self.assertIn('flai_stage_duration_seconds_bucket{stage="parse",le="0.1"} 1', text, "Aralık değeri yanlış.")
+        self.assertIn('flai_stage_duration_seconds_bucket{stage="parse",le="1"} 2', text, "Aralık değeri yanlış.")
+        self.assertIn('flai_stage_duration_seconds_bucket{stage="parse",le="+Inf"} 2', text, "Sonsuz aralık yanlış.")
+        self.assertIn('flai_stage_duration_seconds_count{stage="parse"} 2', text, "Gözlem sayısı yanlış.")
+    
+    def test_shared_between_workers(self):
+        """
+        Aynı veritabanını kullanan kayıtların (işçilerin) ölçümlerinin toplandığını test eder.
+        """
+        first = MetricsRegistry(self.db_path)
+        second = MetricsRegistry(self.db_path)
+        first.inc('flai_prompt_cache_requests_total', result='miss')
+        second.inc('flai_prompt_cache_requests_total', 2, result='miss')
+        first.flush()
+        
+        self.assertIn('flai_prompt_cache_requests_total{result="miss"} 3', second.render(),
+                      "İşçilerin sayaçları toplanmadı.")
+
+class TestBenchmarkFixtures(unittest.TestCase):
+    """
+    Ölçümlerde kullanılan sentetik transkript üreteci ve sahte modeli test eden birim testleri.
+    """
+    
+    def test_synthetic_transcript(self):
+        """
+        Sentetik transkriptin ayrıştırılabildiğini ve belirlenimci olduğunu test eder.
+        """
+        content = generate_transcript(turns=50, speakers=3, seed=7)
+        self.assertEqual(content, generate_transcript(turns=50, speakers=3, seed=7), "Üreteç belirlenimci değil.")
+        
+        processor = TranscriptProcessor('synthetic.csv')
+        self.assertTrue(processor.load_transcript(stream=io.BytesIO(content.encode('utf-8'))),
+                        "Sentetik transkript yüklenemedi.")
+        processed = processor.process_transcript()
+        self.assertEqual(sum(processed['speaker_counts'].values()), 50, "Konuşma sayısı yanlış.")
+        self.assertLessEqual(len(processed['speakers']), 3, "Konuşmacı sayısı yanlış.")
+    
+    def test_stub_model_tests(self):
+        """
+        Sahte modelin test isteğine işlenebilir sorular döndürdüğünü test eder.
+        """
+        response = StubModel('stub').generate_content("5 adet test sorusu oluştur")
+        tests = TestGenerator(response.text).process_tests()
+        self.assertEqual(len(tests), 5, "Soru sayısı yanlış.")
+        self.assertGreater(response.usage_metadata.prompt_token_count, 0, "Token sayısı döndürülmedi.")
+
+class TestLLMBackend(unittest.TestCase):
+    """
+    Yapay zeka yanıtlarını kaydeden ve yeniden oynatan arka uçları test eden birim testleri.
+    """
+    
+    class EchoBackend(LLMBackend):
+        model_name = 'echo'
+        
+        def generate(self, prompt, kind='default'):
+            time.sleep(0.05)
+            return f"{kind}: {prompt}"
+    
+    def setUp(self):
+        """
+        Test için geçici bir kayıt dosyası yolu oluşturur.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'recording.jsonl')
+    
+    def tearDown(self):
+        """
+        Geçici dizini siler.
+        """
+        self.temp_dir.cleanup()
+    
+    def test_record_and_replay(self):
+        """
+        Kaydedilen yanıtların aynı istek için gecikmesiyle yeniden oynatıldığını test eder.
+        """
+        recorder = RecordingBackend(self.EchoBackend(), self.path)
+        self.assertEqual(recorder.generate("soru", 'tests'), "tests: soru", "Yanıt iletilmedi.")
+        self.assertEqual(list(recorder.generate_stream("analiz", 'analysis')), ["analysis: analiz"],
+                         "Akış yanıtı iletilmedi.")
+        
+        with open(self.path, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r['kind'] for r in records], ['tests', 'analysis'], "Kayıtlar yazılmadı.")
+        self.assertNotIn('prompt', records[0], "İstek metni izinsiz kaydedildi.")
+        
+        replay = ReplayBackend(self.path, model_name='echo')
+        started = time.monotonic()
+        self.assertEqual(replay.generate("soru"), "tests: soru", "Kaydedilen yanıt oynatılmadı.")
+        self.assertGreaterEqual(time.monotonic() - started, 0.04, "Kaydedilen gecikme uygulanmadı.")
+        self.assertEqual(''.join(replay.generate_stream("analiz")), "analysis: analiz", "Akış oynatılmadı.")
+        self.assertEqual(replay.stats()['misses'], 0, "Kayıtlı istekler eşleşmedi.")
+    
+    def test_replay_miss_and_latency_scale(self):
+        """
+        Kayıtta olmayan isteklere aynı türdeki yanıtların döndüğünü ve gecikmenin ölçeklendiğini test eder.
+        """
+        recorder = RecordingBackend(self.EchoBackend(), self.path)
+        recorder.generate("birinci", 'tests')
+        recorder.generate("ikinci", 'tests')
+        
+        replay = ReplayBackend(self.path, latency_scale=0, model_name='echo')
+        started = time.monotonic()
+        answers = [replay.generate(f"yeni {n}", 'tests') for n in range(3)]
+        self.assertLess(time.monotonic() - started, 0.04, "Gecikme ölçeklenmedi.")
+        self.assertEqual(answers, ["tests: birinci", "tests: ikinci", "tests: birinci"],
+                         "Aynı türdeki kayıtlar sırayla kullanılmadı.")
+        self.assertEqual(replay.stats()['misses'], 3, "Eşleşmeyen istekler sayılmadı.")
+        
+        with self.assertRaises(KeyError):
+            ReplayBackend(self.path, miss_policy='error', model_name='echo').generate("yeni", 'tests')
+        with self.assertRaises(KeyError):
+            replay.generate("yeni", 'analysis')
+
+class TestPromptBudget(unittest.TestCase):
+    """
+    Transkript konuşmalarını token bütçesine göre seçen PromptBudget sınıfını test eden birim testleri.
+    """
+    
+    def test_short_transcript_kept(self):
+        """
+        Bütçeye sığan transkriptin tüm konuşmalarıyla korunduğunu test eder.
+        """
+        transcript_data = {'transcript_data': [
+            {'speaker': 'Teacher Anna', 'text': 'Hello, how are you?'},
+            {'speaker': 'Ali', 'text': 'I am fine, thanks.'}
+        ]}
+        text = PromptBudget(token_budget=100).select_text(transcript_data)
+        self.assertEqual(text, "Teacher Anna: Hello, how are you?\nAli: I am fine, thanks.",
+                         "Kısa transkript değiştirildi.")
+        self.assertGreater(count_tokens(text), 10, "Token sayısı yanlış.")
+    
+    def test_valuable_turns_selected(self):
+        """
+        Bütçe dolduğunda hatalı öğrenci konuşmalarının selamlaşmaya tercih edildiğini ve
+        seçilen konuşmaların kronolojik sırada kaldığını test eder.
+        """
+        filler = "we will talk about the weekend and what you did with your family today"
+        entries = [
+            {'speaker': 'Teacher Anna', 'text': 'Hello! Good morning, how are you?'},
+            {'speaker': 'Ali', 'text': 'Hi, thank you.'}
+        ]
+        entries += [{'speaker': 'Teacher Anna', 'text': filler} for _ in range(20)]
+        entries += [
+            {'speaker': 'Ali', 'text': 'Yesterday I goed to the museum with my cousin.'},
+            {'speaker': 'Teacher Anna', 'text': 'Not quite, we say went. Try again.'},
+            {'speaker': 'Ali', 'text': 'Yesterday I went to the museum and saw dinosaurs.'}
+        ]
+        budget = PromptBudget(token_budget=70)
+        text = budget.select_text({'transcript_data': entries})
+        
+        self.assertLessEqual(count_tokens(text), 70, "Bütçe aşıldı.")
+        self.assertIn("I goed to the museum", text, "Hatalı öğrenci konuşması seçilmedi.")
+        self.assertNotIn("Good morning", text, "Selamlaşma hatalı konuşmaya tercih edildi.")
+        self.assertLess(text.index("goed"), text.index("dinosaurs"), "Konuşmaların sırası bozuldu.")
+        self.assertEqual(budget.find_teacher([e['speaker'] for e in entries], [e['text'] for e in entries]),
+                         'Teacher Anna', "Öğretmen bulunamadı.")
+
+class TestTranscriptCompressor(unittest.TestCase):
+    """
+    Transkripti yapay zekaya gönderilmeden önce kısaltan TranscriptCompressor sınıfını test eden birim testleri.
+    """
+    
+    def test_clean_text(self):
+        """
+        Dolgu seslerinin ve tekrarlanan ifadelerin silindiğini, dinleyici onaylarının tanındığını test eder.
+        """
+        compressor = TranscriptCompressor()
+        self.assertEqual(compressor.clean_text("Um, I I went to the, um, market yesterday."),
+                         "I went to the market yesterday.", "Dolgu sesleri veya tekrar silinmedi.")
+        self.assertEqual(compressor.clean_text("We go to the, go to the park."), "We go to the park.",
+                         "Tekrarlanan ifade teke indirilmedi.")
+        self.assertEqual(compressor.clean_text("the cat and the dog"), "the cat and the dog",
+                         "Tekrar olmayan metin değiştirildi.")
+        self.assertEqual(compressor.clean_text("Uh-huh"), "", "Dolgu sesi silinmedi.")
+        self.assertTrue(compressor.is_backchannel("Okay, yeah."), "Dinleyici onayı tanınmadı.")
+        self.assertFalse(compressor.is_backchannel("Okay, I understand the rule."),
+                         "Anlamlı konuşma dinleyici onayı sayıldı.")
+    
+    def test_compress(self):
+        """
+        Dinleyici onaylarının atıldığını, aynı konuşmacının konuşmalarının birleştirildiğini,
+        etiketlerin kısaltıldığını ve sıkıştırma oranının raporlandığını test eder.
+        """
+        turns = [
+            ('Teacher Anna', 'What did you do on the weekend?'),
+            ('Ali', 'Um, well.'),
+            ('Teacher Anna', 'Mhm.'),
+            ('Ali', 'I I goed to the museum.'),
+            ('Teacher Anna', 'Okay.'),
+            ('Teacher Anna', 'We say went, not goed.')
+        ]
+        transcript = TranscriptFrame.from_records(
+            {'index': number, 'start_time': f"00:00:{number:02d}.000", 'end_time': f"00:00:{number + 1:02d}.000",
+             'speaker': speaker, 'text': text}
+            for number, (speaker, text) in enumerate(turns, 1)
+        )
+        compressed = TranscriptCompressor().compress(transcript)
+        
+        self.assertEqual(compressed.transcript_data[1]['text'], 'well. I goed to the museum.',
+                         "Aynı konuşmacının konuşmaları birleştirilmedi.")
+        self.assertEqual([entry['speaker'] for entry in compressed.transcript_data], ['T', 'S', 'T'],
+                         "Konuşmacı etiketleri kısaltılmadı.")
+        self.assertEqual(compressed.labels, {'T': 'Teacher Anna', 'S': 'Ali'}, "Etiket karşılıkları yanlış.")
+        self.assertEqual(compressed.legend, "Konuşmacılar: T = öğretmen, S = öğrenci", "Açıklama yanlış.")
+        self.assertEqual(compressed.stats['original_turns'], 6, "Özgün konuşma sayısı yanlış.")
+        self.assertEqual(compressed.stats['compressed_turns'], 3, "Sıkıştırılmış konuşma sayısı yanlış.")
+        self.assertLess(compressed.stats['ratio'], 1.0, "Sıkıştırma oranı raporlanmadı.")
+        self.assertIn('T:', PromptBudget().select_text(compressed), "Kısaltılmış etiketler isteğe yansımadı.")
+
+class TestQuestionBank(unittest.TestCase):
+    """
+    Doğrulanmış soruları saklayıp benzer dersler için yeniden kullanan QuestionBank sınıfını test eden birim testleri.
+    """
+    
+    def setUp(self):
+        """
+        Test için geçici bir soru bankası oluşturur.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.bank = QuestionBank(os.path.join(self.temp_dir.name, 'bank.sqlite3'))
+        self.analysis = {'raw_analysis': json.dumps({
+            'level': 'B1',
+            'new_vocabulary': ['get the hang of', 'museum', 'dinosaur'],
+            'topics': ['Weekend']
+        })}
+        self.questions = [
+            {'question': "What does 'to get the hang of something' mean?",
+             'options': [{'letter': 'A', 'text': 'To understand how to do something'}],
+             'correct_answer': 'A', 'explanation': '...'},
+            {'question': "Complete the sentence: 'Yesterday we ___ to the museum.'",
+             'options': [{'letter': 'A', 'text': 'went'}], 'correct_answer': 'A', 'explanation': '...'},
+            {'question': "Which animal lived millions of years ago?",
+             'options': [{'letter': 'A', 'text': 'A dinosaur'}], 'correct_answer': 'A', 'explanation': '...'}
+        ]
+    
+    def tearDown(self):
+        """
+        Geçici dosyaları temizler.
+        """
+        self.temp_dir.cleanup()
+    
+    def test_minhash_similarity(self):
+        """
+        MinHash imzalarının benzer kümeler için yüksek, farklı kümeler için düşük benzerlik verdiğini test eder.
+        """
+        words = [f"word{number}" for number in range(200)]
+        first = minhash_signature(words[:100])
+        self.assertEqual(signature_similarity(first, minhash_signature(words[:100])), 1.0,
+                         "Aynı kümenin imzası farklı.")
+        self.assertGreater(signature_similarity(first, minhash_signature(words[5:105])), 0.7,
+                           "Benzer kümeler benzer bulunmadı.")
+        self.assertLess(signature_similarity(first, minhash_signature(words[100:])), 0.2,
+                        "Farklı kümeler benzer bulundu.")
+    
+    def test_add_and_find(self):
+        """
+        Eklenen soruların aynı seviyedeki benzer bir ders için bulunduğunu, farklı seviyede
+        veya kapsam yetersizken bulunmadığını test eder.
+        """
+        transcript_data = {'all_text': "We visited the museum and saw a dinosaur skeleton during the weekend."}
+        profile = lesson_profile(self.analysis, transcript_data)
+        self.assertEqual(profile['level'], 'B1', "Seviye analizden alınamadı.")
+        self.assertIn('get the hang of', profile['vocabulary'], "Yeni kelimeler analizden alınamadı.")
+        self.assertEqual(self.bank.add(profile, self.questions, 'lesson-1'), 3, "Sorular eklenmedi.")
+        self.assertEqual(self.bank.add(profile, self.questions, 'lesson-1'), 0, "Aynı sorular yeniden eklendi.")
+        
+        found = self.bank.find(profile, count=3)
+        self.assertIsNotNone(found, "Benzer ders için sorular bulunamadı.")
+        self.assertEqual(sorted(q['question'] for q in found), sorted(q['question'] for q in self.questions),
+                         "Bulunan sorular yanlış.")
+        self.assertIsNone(self.bank.find(dict(profile, level='C1'), count=3), "Farklı seviyede soru bulundu.")
+        self.assertIsNone(self.bank.find(dict(profile, vocabulary=['photosynthesis']), count=3),
+                          "Kapsam yetersizken sorular verildi.")
+        self.assertEqual(len(self.bank.sample('B1', count=2)), 2, "Seviyeye göre örnek soru alınamadı.")
+        self.assertEqual(self.bank.stats()['questions'], {'B1': 3}, "Soru sayıları yanlış.")
+
+class TestLiveLesson(unittest.TestCase):
+    """
+    Canlı derslerin transkriptini parça parça biriktirip artımlı analiz eden LiveLesson sınıfını test eden birim testleri.
+    """
+    
+    def test_feed_matches_full_transcript(self):
+        """
+        Bloğun ortasından bölünmüş parçalarla beslenen dersin, transkriptin tamamının
+        işlenmesiyle aynı konuşmacı sayılarını, metni ve parmak izini verdiğini test eder.
+        """
+        content = generate_transcript(120, seed=5)
+        lesson = LiveLesson(analyze_every=50)
+        for start in range(0, len(content), 997):
+            lesson.feed(content[start:start + 997])
+        self.assertTrue(lesson.finish(), "Ders bitirilemedi.")
+        self.assertFalse(lesson.finish(), "Bitmiş ders yeniden bitirildi.")
+        with self.assertRaises(ValueError):
+            lesson.feed(content)
+        
+        processor = TranscriptProcessor('full.csv')
+        processor.transcript_data = processor._parse_transcript(content)
+        expected = processor.process_transcript()
+        self.assertEqual(lesson.transcript.entry_count, expected.entry_count, "Konuşma sayısı farklı.")
+        self.assertEqual(lesson.transcript['speaker_counts'], expected['speaker_counts'],
+                         "Konuşmacı sayıları farklı.")
+        self.assertEqual(lesson.transcript['all_text'], expected['all_text'], "Birleştirilmiş metin farklı.")
+        self.assertEqual(lesson.transcript.get_fingerprint(), processor.get_fingerprint(),
+                         "Parmak izi farklı.")
+    
+    def test_analyze_only_new_segments(self):
+        """
+        Her analizin yalnızca yeni konuşmaları ve önceki analizin özetini aldığını test eder.
+        """
+        calls = []
+        
+        class FakeAnalyzer:
+            def analyze_increment(self, summary, delta_data):
+                calls.append((summary, [entry['text'] for entry in delta_data['transcript_data']]))
+                return {'raw_analysis': f"analysis-{len(calls)}", 'success': True}
+        
+        lesson = LiveLesson(analyze_every=2)
+        lesson.append([{'speaker': 'Teacher', 'text': 'one'}, {'speaker': 'Ali', 'text': 'two'}])
+        self.assertTrue(lesson.should_analyze(), "Yeterli konuşma varken analiz planlanmadı.")
+        self.assertFalse(lesson.should_analyze(), "Planlanmış analiz yeniden planlandı.")
+        lesson.analyze(FakeAnalyzer())
+        lesson.append([{'speaker': 'Teacher', 'text': 'three'}])
+        self.assertFalse(lesson.should_analyze(), "Yetersiz konuşmayla analiz planlandı.")
+        result = lesson.analyze(FakeAnalyzer())
+        
+        self.assertEqual(calls, [(None, ['one', 'two']), ('analysis-1', ['three'])],
+                         "Analize yalnızca yeni konuşmalar gönderilmedi.")
+        self.assertEqual(result['raw_analysis'], 'analysis-2', "Güncel analiz döndürülmedi.")
+        self.assertEqual((lesson.analyzed, lesson.increments), (3, 2), "Analiz durumu güncellenmedi.")
+    
+    def test_lesson_shared_between_workers(self):
+        """
+        Aynı depoyu kullanan iki işçiye dağıtılan isteklerin tek bir dersi birlikte
+        güncellediğini ve silinen dersin diğer işçide bulunamadığını test eder.
+        """
+        class FakeAnalyzer:
+            def analyze_increment(self, summary, delta_data):
+                return {'raw_analysis': f"analysis-{len(delta_data['transcript_data'])}", 'success': True}
+        
+        content = generate_transcript(30, seed=7)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'live.sqlite3')
+            workers = [LiveLessonRegistry(store=SQLiteLiveLessonStore(path)) for _ in range(2)]
+            lesson_id = workers[0].create(analyze_every=10).id
+            
+            # Parçalar bloğun ortasından bölünür ve işçilere sırayla dağıtılır
+            scheduled = 0
+            for number, start in enumerate(range(0, len(content), 301)):
+                lesson = workers[number % 2].get(lesson_id)
+                self.assertIsNotNone(lesson, "Ders diğer işçide bulunamadı.")
+                lesson.feed(content[start:start + 301])
+                if lesson.should_analyze():
+                    scheduled += 1
+                    workers[(number + 1) % 2].get(lesson_id).analyze(FakeAnalyzer())
+            
+            self.assertTrue(workers[1].get(lesson_id).finish(), "Ders bitirilemedi.")
+            self.assertFalse(workers[0].get(lesson_id).finish(), "Bitmiş ders yeniden bitirildi.")
+            lesson = workers[0].get(lesson_id)
+            processor = TranscriptProcessor('full.csv')
+            self.assertEqual(lesson.transcript.transcript_data, processor._parse_transcript(content),
+                             "Konuşmalar işçiler arasında eksik ya da farklı birleşti.")
+            self.assertEqual((lesson.increments, lesson.scheduled), (scheduled, False),
+                             "Ara analizler diğer işçiye yansımadı.")
+            
+            workers[1].remove(lesson_id)
+            self.assertIsNone(workers[0].get(lesson_id), "Silinen ders diğer işçide bulundu.")
+    
+    def test_invalid_segments_rejected(self):
+        """
+        Türü yanlış JSON konuşmalarının 400 ile reddedildiğini ve dersi değiştirmediğini,
+        sayı olarak verilen zamanların ise dönüştürüldüğünü test eder.
+        """
+        from app import app
+        
+        client = app.test_client()
+        with mock.patch('app.get_live_lessons', return_value=LiveLessonRegistry()) as registry:
+            lesson_id = client.post('/live').get_json()['lesson_id']
+            url = f'/live/{lesson_id}/segments'
+            for segments in ([{'speaker': 5, 'text': 'a'}], [{'speaker': 'Ali', 'text': 'a', 'start_time': 'bad'}],
+                             [{'speaker': 'Ali', 'text': 'a'}, {'speaker': 'Ali', 'text': ['b']}], ['x']):
+                response = client.post(url, json={'segments': segments})
+                self.assertEqual(response.status_code, 400, f"Geçersiz konuşma kabul edildi: {segments}")
+            self.assertEqual(client.post(url, json=[]).status_code, 400, "Geçersiz gövde kabul edildi.")
+            
+            lesson = registry.return_value.get(lesson_id)
+            self.assertEqual((lesson.transcript.entry_count, lesson.transcript.speaker_counts), (0, {}),
+                             "Reddedilen konuşmalar derse eklendi.")
+            response = client.post(url, json={'segments': [{'speaker': 'Ali', 'text': 'a', 'start_time': 1.5,
+                                                            'end_time': '00:03,250'}]})
+            self.assertEqual(response.status_code, 200, "Geçerli konuşma reddedildi.")
+            self.assertEqual(lesson.transcript.transcript_data[0]['start_time'], '00:00:01.500', "Zaman dönüştürülmedi.")
+            self.assertEqual(lesson.transcript.talk_time_ms, {'Ali': 1750}, "Konuşma süresi yanlış.")
+        
+        transcript = LiveLesson().transcript
+        with self.assertRaises(ValueError):
+            transcript.append([{'speaker': 'Ali', 'text': 'a'}, {'speaker': 'Ali', 'text': 'b', 'start_time': 'x'}])
+        self.assertEqual((transcript.entry_count, transcript.speakers, transcript.get_fingerprint()),
+                         (0, {}, LiveLesson().transcript.get_fingerprint()), "Yarım ekleme yapıldı.")
+
+class TestTranscriptFormats(unittest.TestCase):
+    """
+    Transkript biçimlerini tanıyıp ayrıştıran ayrıştırıcı kayıt defterini test eden birim testleri.
+    """
+    
+    def test_detect_format(self):
+        """
+        Biçimin uzantıdan önce içerikten, içerikten tanınamazsa uzantıdan belirlendiğini test eder.
+        """
+        vtt = "WEBVTT\n\n1\n00:00:01.000 --> 00:00:02.000\nTeacher: Hi\n"
+        srt = "1\n00:00:01,000 --> 00:00:02,000\nTeacher: Hi\n"
+        self.assertEqual(detect_parser(vtt, 'lesson.csv').name, 'vtt', "VTT içerik tanınmadı.")
+        self.assertEqual(detect_parser(srt, 'lesson.txt').name, 'srt', "SRT içerik tanınmadı.")
+        self.assertEqual(detect_parser('{"timeline": []}', 'lesson').name, 'zoom_json', "JSON içerik tanınmadı.")
+        self.assertEqual(detect_parser("Start Time;Speaker;Text\n", 'export').name, 'csv', "Tablo tanınmadı.")
+        self.assertEqual(detect_parser("", 'lesson.srt').name, 'srt', "Uzantıya göre biçim belirlenmedi.")
+        self.assertIsNone(detect_parser("hello world", 'lesson.doc'), "Bilinmeyen biçim tanındı.")
+    
+    def test_formats_produce_same_records(self):
+        """
+        Aynı dersin VTT, SRT, Zoom JSON ve CSV dışa aktarımlarının aynı konuşma kayıtlarını
+        ve parmak izini verdiğini test eder.
+        """
+        content = generate_transcript(40, seed=7)
+        expected = TranscriptProcessor('lesson.vtt')
+        expected.transcript_data = expected._parse_transcript(content)
+        for transcript_format in ('vtt', 'srt', 'zoom_json', 'csv'):
+            data = convert_transcript(content, transcript_format).replace('\n', '\r\n').encode('utf-8')
+            processor = TranscriptProcessor('upload')
+            self.assertTrue(processor.load_transcript(stream=io.BytesIO(b'\xef\xbb\xbf' + data)),
+                            f"{transcript_format} yüklenemedi.")
+            self.assertEqual(processor.format, transcript_format, "Biçim yanlış belirlendi.")
+            self.assertEqual(processor.transcript_data, expected.transcript_data,
+                             f"{transcript_format} kayıtları farklı.")
+            self.assertEqual(processor.get_fingerprint(), expected.get_fingerprint(),
+                             f"{transcript_format} parmak izi farklı.")
+
+class TestBatch(unittest.TestCase):
+    """
+    Geçmiş dersleri toplu işleyen komut satırı aracını test eden birim testleri.
+    """
+    
+    def setUp(self):
+        """
+        Test için geçici bir dizin oluşturur.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.export_path = os.path.join(self.temp_dir.name, 'reports.csv')
+        with open(self.export_path, 'w', encoding='utf-8') as f:
+            f.write("Lesson ID,Speaker,Text\n")
+            for lesson in ('L1', 'L2'):
+                for turn in range(4):
+                    f.write(f"{lesson},{'Teacher' if turn % 2 == 0 else 'Ali'},Sentence {turn} of {lesson}\n")
+    
+    def tearDown(self):
+        """
+        Geçici dosyaları temizler.
+        """
+        self.temp_dir.cleanup()
+    
+    def test_sources_and_checkpoint(self):
+        """
+        Çok dersli dışa aktarımın derslere ayrıldığını ve kontrol noktasının yeniden
+        okunduğunda (yarım kalan son satır dahil) son durumları verdiğini test eder.
+        """
+        sources = list(iter_sources([self.export_path]))
+        self.assertEqual([key.rsplit('#', 1)[1] for key, _, _ in sources], ['L1', 'L2'], "Dersler ayrılmadı.")
+        processor = TranscriptProcessor(sources[1][1])
+        self.assertTrue(processor.load_transcript(stream=io.BytesIO(sources[1][2])), "Ayrılan ders yüklenemedi.")
+        self.assertEqual(processor.transcript_data[0]['text'], 'Sentence 0 of L2', "Ders satırları yanlış.")
+        
+        path = os.path.join(self.temp_dir.name, 'checkpoint.jsonl')
+        checkpoint = BatchCheckpoint(path)
+        checkpoint.record('a', 'analyzed', analysis_result={'raw_analysis': '{}'})
+        checkpoint.record('a', 'done', result_id='r1')
+        checkpoint.record('b', 'failed', error='boom')
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('{"key": "c", "sta')
+        reloaded = BatchCheckpoint(path)
+        self.assertTrue(reloaded.is_done('a'), "Tamamlanan ders okunamadı.")
+        self.assertEqual(reloaded.counts(), {'done': 1, 'failed': 1}, "Durum sayıları yanlış.")
+    
+    def test_run_resumes_without_repeating_analysis(self):
+        """
+        Test oluşturmada başarısız olan dersin yeniden çalıştırmada analizi tekrar
+        istenmeden tamamlandığını ve tamamlanan derslerin atlandığını test eder.
+        """
+        calls = {'analysis': 0, 'tests': 0}
+        failures = [RuntimeError('geçici hata')]
+        raw_tests = StubModel.respond("test sorusu")
+        
+        class FakeAnalyzer:
+            def analyze_transcript(self, transcript_data):
+                calls['analysis'] += 1
+                return {'raw_analysis': '{"level": "B1"}', 'success': True}
+            
+            def generate_tests(self, analysis_result, transcript_data):
+                calls['tests'] += 1
+                if failures:
+                    raise failures.pop()
+                return {'raw_tests': raw_tests, 'success': True, 'source': 'model'}
+        
+        store = MemoryResultStore()
+        path = os.path.join(self.temp_dir.name, 'checkpoint.jsonl')
+        with mock.patch('app.utils.pipeline.get_result_store', return_value=store), \
+                mock.patch('app.batch.get_result_store', return_value=store), \
+                mock.patch('app.utils.pipeline.get_question_bank', return_value=None):
+            first = run_batch(iter_sources([self.export_path]), BatchCheckpoint(path), workers=1,
+                              concurrency=1, analyzer_factory=FakeAnalyzer)
+            second = run_batch(iter_sources([self.export_path]), BatchCheckpoint(path), workers=1,
+                               concurrency=1, analyzer_factory=FakeAnalyzer)
+        
+        self.assertEqual((first['processed'], first['failed']), (1, 1), "İlk çalışmanın sonucu yanlış.")
+        self.assertEqual((second['resumed'], second['skipped'], second['failed']), (1, 1, 0),
+                         "Yeniden çalıştırma kaldığı yerden devam etmedi.")
+        self.assertEqual(calls, {'analysis': 2, 'tests': 3}, "Analiz yeniden istendi.")
+        for key, _, _ in iter_sources([self.export_path]):
+            self.assertIsNotNone(store.get(BatchCheckpoint(path).get(key)['result_id']), "Sonuç depoya yazılmadı.")
+
+class TestResultsApi(unittest.TestCase):
+    """
+    Sonuç API'sini, yanıt sıkıştırmayı ve parmak izli statik dosyaları test eden birim testleri.
+    """
+    
+    def test_payload_is_compact_and_escaped(self):
+        """
+        Soruların yalın biçime doğru cevabın sırasıyla dönüştürüldüğünü ve HTML'de
+        yapay zeka metinlerinin kaçış karakterleriyle yazıldığını test eder.
+        """
+        test = TestGenerator.clean_test({
+            'question': "What does <b>nettle</b> mean?",
+            'options': [{'letter': 'A', 'text': 'Plant & herb'}, {'letter': 'B', 'text': 'Water'}],
+            'correct_answer': 'B) Water'
+        })
+        payload = TestGenerator.to_payload(test)
+        
+        self.assertEqual(payload['options'], ['Plant & herb', 'Water'], "Seçenek metinleri yanlış.")
+        self.assertEqual(payload['answer'], 1, "Doğru cevabın sırası yanlış.")
+        html = TestGenerator.render_test(1, test)
+        self.assertNotIn("<b>", html, "Soru metni kaçış karakterleriyle yazılmadı.")
+        self.assertIn("Plant &amp; herb", html, "Seçenek metni kaçış karakterleriyle yazılmadı.")
+    
+    def test_api_result_compressed_and_assets_cached(self):
+        """
+        Sonuç API'sinin sıkıştırılmış yalın JSON ve koşullu isteklere 304 döndürdüğünü,
+        parmak izli statik dosyaların uzun süreli önbellek başlıklarıyla sunulduğunu test eder.
+        """
+        from app import app, static_assets
+        
+        store = MemoryResultStore()
+        analysis_result = {'raw_analysis': '```json\n{"level": "B1"}\n```', 'success': True}
+        tests_result = {'raw_tests': StubModel.respond("test sorusu"), 'success': True, 'source': 'model'}
+        result_id = store.put(dict(render_result(analysis_result, tests_result),
+                                   analysis_result=analysis_result, tests_result=tests_result))
+        client = app.test_client()
+        
+        with mock.patch('app.get_result_store', return_value=store):
+            response = client.get(f'/api/results/{result_id}', headers={'Accept-Encoding': 'gzip'})
+            data = json.loads(gzip.decompress(response.data))
+            cached = client.get(f'/api/results/{result_id}', headers={
+                'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']})
+            missing = client.get('/api/results/yok')
+        
+        self.assertEqual(response.headers.get('Content-Encoding'), 'gzip', "Yanıt sıkıştırılmadı.")
+        self.assertEqual(data['analysis'], {'level': 'B1'}, "Analiz nesneye dönüştürülmedi.")
+        self.assertTrue(data['questions'] and 'answer' in data['questions'][0], "Sorular yalın biçimde değil.")
+        self.assertEqual(cached.status_code, 304, "Değişmeyen sonuç için 304 döndürülmedi.")
+        self.assertEqual(missing.status_code, 404, "Olmayan sonuç için 404 döndürülmedi.")
+        
+        asset = client.get(static_assets.url('css/style.css'), headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(asset.headers.get('Content-Encoding'), 'gzip',
+                         "Statik dosya önceden sıkıştırılmış sunulmadı.")
+        self.assertIn('immutable', asset.headers.get('Cache-Control', ''), "Uzun süreli önbellek başlığı yok.")
+
+class TestStartup(unittest.TestCase):
+    """
+    Uygulamanın ağır modülleri ilk kullanımda ya da ön yüklemede yüklediğini test eden birim testleri.
+    """
+    
+    def test_import_app_defers_heavy_modules(self):
+        """
+        Uygulama içe aktarılırken pandas ve google.generativeai'ın yüklenmediğini test eder.
+        """
+        completed = subprocess.run(
+            [sys.executable, '-c', "import sys, app; print('pandas' in sys.modules, "
+                                   "'google.generativeai' in sys.modules)"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True)
+        
+        self.assertEqual(completed.stdout.split(), ['False', 'False'], "Ağır modüller başlangıçta yüklendi.")
+    
+    def test_preload_modules(self):
+        """
+        Ön yüklemenin modülleri yükleyip sürelerini döndürdüğünü ve yüklenemeyenleri atladığını test eder.
+        """
+        timings = preload_modules(['app.utils.transcript_frame', 'olmayan_modul'])
+        
+        self.assertEqual(list(timings), ['app.utils.transcript_frame'], "Yüklenen modüller yanlış.")
+        self.assertIn('app.utils.transcript_frame', sys.modules, "Modül yüklenmedi.")
+
+class TestPipeline(unittest.TestCase):
+    """
+    Yükleme işini ve AIAnalyzer'ın yapay zeka çağrılarını sahte arka uçla test eden birim testleri.
+    """
+    
+    class StubBackend(LLMBackend):
+        model_name = 'stub'
+        
+        def __init__(self):
+            self.calls = []
+            self.prompts = []
+        
+        def generate(self, prompt, kind='default'):
+            self.calls.append(kind)
+            self.prompts.append(prompt)
+            text = StubModel.respond(prompt)
+            # Analiz yanıtları her çağrıda farklıdır (önbellekten gelip gelmediğini anlamak için)
+            return f"{text}\n#{len(self.calls)}" if kind == 'analysis' else text
+    
+    def setUp(self):
+        """
+        Sahte arka ucu, geçici önbelleği ve bellekteki sonuç deposunu kurar.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.backend = self.StubBackend()
+        self.cache = PromptCache(os.path.join(self.temp_dir.name, 'prompts.sqlite3'))
+        self.store = MemoryResultStore()
+        for patcher in (
+            mock.patch('app.utils.ai_analyzer.get_llm_backend', return_value=self.backend),
+            mock.patch('app.utils.ai_analyzer.get_prompt_cache', return_value=self.cache),
+            mock.patch('app.utils.ai_analyzer.get_call_policy', return_value=CallPolicy(max_attempts=1)),
+            mock.patch('app.utils.ai_analyzer.get_request_coalescer', return_value=None),
+            mock.patch('app.utils.ai_analyzer.get_question_bank', return_value=None),
+            mock.patch('app.utils.pipeline.get_question_bank', return_value=None),
+            mock.patch('app.utils.pipeline.get_result_store', side_effect=lambda: self.store)
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+    
+    def upload(self, force_regenerate=False, mode='two_step', stream=False):
+        """
+        Aynı transkripti yükleme işinde işler ve kaydedilen sonucu döndürür.
+        """
+        content = generate_transcript(30, seed=1).encode('utf-8')
+        result = run_pipeline(Job(pipeline_stages(mode)), io.BytesIO(content), 'lesson.vtt', force_regenerate, mode,
+                              stream)
+        return self.store.get(result['result_id'])
+    
+    def test_force_regenerate_bypasses_cache(self):
+        """
+        Yeniden oluşturma istendiğinde önbellekteki yanıtların kullanılmadığını ve yeni
+        yanıtların önbellektekilerin yerine yazıldığını test eder.
+        """
+        self.upload()
+        first = self.upload(force_regenerate=True)
+        second = self.upload(force_regenerate=True)
+        self.assertEqual(self.backend.calls, ['analysis', 'tests'] * 3, "Yeniden oluşturma önbelleği kullandı.")
+        self.assertNotEqual(first['analysis_result'], second['analysis_result'], "Yanıt önbellekten alındı.")
+        
+        self.store = MemoryResultStore()
+        cached = self.upload()
+        self.assertEqual(len(self.backend.calls), 6, "Önbellekteki yanıt kullanılmadı.")
+        self.assertEqual(cached['analysis_result'], second['analysis_result'], "Önbellekteki yanıt güncellenmedi.")
+    
+    def test_stream_deadline_falls_back(self):
+        """
+        Süre sınırı içinde soru üretmeyen akışın akış hatası sayıldığını ve testlerin çağrı
+        politikasından geçen tek seferlik istekle oluşturulduğunu test eder.
+        """
+        def stalled_stream(prompt, kind='default'):
+            time.sleep(0.5)
+            yield ""
+        
+        self.backend.generate_stream = stalled_stream
+        policy = CallPolicy(max_attempts=1, deadline=0.1)
+        with mock.patch('app.utils.ai_analyzer.get_call_policy', return_value=policy), \
+                mock.patch.object(policy, 'call', wraps=policy.call) as call:
+            started = time.monotonic()
+            result = self.upload(stream=True)
+        
+        self.assertLess(time.monotonic() - started, 0.45, "Akışın süre sınırı uygulanmadı.")
+        self.assertEqual(result['tests_result']['source'], 'model', "Tek seferlik isteğe geri dönülmedi.")
+        self.assertEqual(len(result['rendered_tests']['processed_tests']), 5, "Sorular oluşturulmadı.")
+        self.assertEqual(self.backend.calls, ['analysis', 'tests'], "Yapay zeka çağrıları yanlış.")
+        self.assertEqual(call.call_count, 2, "Geri dönüş isteği çağrı politikasından geçmedi.")
+    
+    def test_map_reduce_chunks(self):
+        """
+        Uzun transkriptin konuşma sınırlarından bölündüğünü, bölümlerin en fazla
+        max_parallel_chunks kadarının aynı anda analiz edildiğini ve birleştirme isteğinin
+        bölüm analizlerini sırasıyla içerdiğini test eder.
+        """
+        transcript = {'transcript_data': [{'text': f"{n}" * 30} for n in range(10)] + [{'text': 'x' * 250}]}
+        transcript['all_text'] = ' '.join(entry['text'] for entry in transcript['transcript_data'])
+        analyzer = AIAnalyzer(analysis_mode='map_reduce', chunk_chars=100, max_parallel_chunks=2)
+        
+        chunks = analyzer._split_chunks(transcript)
+        self.assertEqual([chunk.count(' ') + 1 for chunk in chunks], [3, 3, 3, 1, 1], "Bölüm sınırları yanlış.")
+        self.assertTrue(all(len(chunk) <= 100 for chunk in chunks), "Bölüm chunk_chars sınırını aştı.")
+        self.assertEqual(chunks[3], '9' * 30, "Konuşma bölündü.")
+        
+        active, peak = [], []
+        generate = self.backend.generate
+        def slow_generate(prompt, kind='default'):
+            active.append(1)
+            peak.append(len(active))
+            time.sleep(0.05)
+            active.pop()
+            return generate(prompt, kind)
+        
+        with mock.patch.object(self.backend, 'generate', slow_generate):
+            result = analyzer.analyze_transcript(transcript)
+        self.assertTrue(result['success'], "Bölümlü analiz başarısız oldu.")
+        self.assertEqual(self.backend.calls, ['chunk_analysis'] * 5 + ['analysis'], "Çağrılar yanlış.")
+        self.assertEqual(max(peak), 2, "Aynı anda analiz edilen bölüm sayısı sınırlanmadı.")
+        self.assertEqual(result['chunk_count'], 5, "Bölüm sayısı yanlış.")
+        
+        reduce_prompt = self.backend.prompts[-1]
+        positions = [reduce_prompt.index(f"Bölüm {n}:\n{partial}")
+                     for n, partial in enumerate(result['partial_analyses'], 1)]
+        self.assertEqual(positions, sorted(positions), "Bölüm analizleri sırasıyla birleştirilmedi.")
+        self.assertNotIn('9' * 30, reduce_prompt, "Birleştirme isteğine transkript eklendi.")
+    
+    def test_map_reduce_short_and_failed_chunk(self):
+        """
+        Kısa transkriptin bölünmeden tek istekle analiz edildiğini ve bir bölümün analizi
+        başarısız olursa birleştirme yapılmadan analizin başarısız sayıldığını test eder.
+        """
+        analyzer = AIAnalyzer(analysis_mode='map_reduce', chunk_chars=100, max_parallel_chunks=2)
+        short = {'transcript_data': [{'text': 'Hello there'}], 'all_text': 'Hello there'}
+        result = analyzer.analyze_transcript(short)
+        self.assertTrue(result['success'], "Kısa transkript analiz edilemedi.")
+        self.assertNotIn('partial_analyses', result, "Kısa transkript bölündü.")
+        self.assertEqual(self.backend.calls, ['analysis'], "Kısa transkript için fazladan istek gönderildi.")
+        
+        generate = self.backend.generate
+        def failing_generate(prompt, kind='default'):
+            if '2/3 numaralı' in prompt:
+                raise RuntimeError("bölüm hatası")
+            return generate(prompt, kind)
+        
+        transcript = {'transcript_data': [{'text': f"{n}" * 60} for n in range(3)]}
+        transcript['all_text'] = ' '.join(entry['text'] for entry in transcript['transcript_data'])
+        with mock.patch.object(self.backend, 'generate', failing_generate):
+            result = analyzer.analyze_transcript(transcript)
+        self.assertFalse(result['success'], "Başarısız bölüm yok sayıldı.")
+        self.assertIn('bölüm hatası', result['error'], "Bölüm hatası iletilmedi.")
+        self.assertEqual(self.backend.calls, ['analysis', 'chunk_analysis', 'chunk_analysis'],
+                         "Başarısız bölümden sonra birleştirme isteği gönderildi.")
+    
+    def test_fused_response_split(self):
+        """
+        Birleşik yanıtın analiz ve sorulara ayrıldığını, biçimi bozuk yanıtların reddedildiğini test eder.
+        """
+        analyzer = AIAnalyzer()
+        reply = StubModel.respond('"analysis"')
+        analysis, questions = analyzer._parse_fused_response(f"İşte sonuç:\n```json\n{reply}\n```")
+        self.assertEqual(analysis['level'], 'B1', "Analiz ayrılamadı.")
+        self.assertEqual(len(questions), 5, "Sorular ayrılamadı.")
+        for malformed in ('', 'analiz yok', '{"analysis": {"level": "B1"}, "questions": [',
+                          '{"analysis": {"level": "B1"}, "questions": []}', '{"questions": [{"question": "?"}]}'):
+            self.assertIsNone(analyzer._parse_fused_response(malformed), f"Bozuk yanıt kabul edildi: {malformed!r}")
+        
+        content = generate_transcript(30, seed=1).encode('utf-8')
+        processor = TranscriptProcessor('lesson.vtt')
+        processor.load_transcript(stream=io.BytesIO(content))
+        analysis_result, tests_result = analyzer.analyze_and_generate(processor.process_transcript())
+        self.assertEqual(self.backend.calls, ['fused'], "Birleşik kip tek istek göndermedi.")
+        self.assertEqual(json.loads(analysis_result['raw_analysis'])['level'], 'B1', "Analiz sonucu yanlış.")
+        self.assertEqual((tests_result['source'], tests_result['raw_tests'].count('"question"')), ('model', 5),
+                         "Test sonucu yanlış.")
+    
+    def test_fused_fallback_to_two_step(self):
+        """
+        Birleşik yanıt ayrıştırılamazsa iki adımlı kipe geçildiğini ve geri dönüşün ölçüldüğünü test eder.
+        """
+        generate = self.backend.generate
+        def malformed_fused(prompt, kind='default'):
+            return '{"analysis": "eksik"' if kind == 'fused' else generate(prompt, kind)
+        
+        metrics = MetricsRegistry()
+        with mock.patch.object(self.backend, 'generate', malformed_fused), \
+                mock.patch('app.utils.pipeline.get_metrics', return_value=metrics):
+            result = self.upload(mode='fused')
+        
+        self.assertEqual(result['latency']['mode'], 'fused_fallback', "İki adımlı kipe geçilmedi.")
+        self.assertEqual(self.backend.calls, ['analysis', 'tests'], "İki adımlı istekler gönderilmedi.")
+        self.assertEqual(len(result['rendered_tests']['processed_tests']), 5, "Sorular oluşturulmadı.")
+        self.assertIn('flai_fallbacks_total{kind="fused_to_two_step"} 1', metrics.render(),
+                      "Geri dönüş ölçülmedi.")
+    
+    def test_fused_mode_end_to_end(self):
+        """
+        PIPELINE_MODE=fused ile yüklenen transkriptin tek yapay zeka isteğiyle işlenip
+        sonucun API'den alınabildiğini test eder.
+        """
+        from app import app
+        
+        client = app.test_client()
+        content = generate_transcript(30, seed=2).encode('utf-8')
+        with mock.patch('app.PIPELINE_MODE', 'fused'), mock.patch('app.STREAM_TESTS', False), \
+                mock.patch('app.get_result_store', side_effect=lambda: self.store):
+            response = client.post('/upload', data={'transcript_file': (io.BytesIO(content), 'lesson.vtt')},
+                                   content_type='multipart/form-data')
+            self.assertEqual(response.status_code, 202, "Yükleme kabul edilmedi.")
+            status_url = response.get_json()['status_url']
+            deadline = time.time() + 5
+            while client.get(status_url).get_json()['status'] not in ('completed', 'failed') and time.time() < deadline:
+                time.sleep(0.01)
+            status = client.get(status_url).get_json()
+            result = client.get(response.get_json()['result_url']).get_json()
+            payload = client.get(result['api_url']).get_json()
+        
+        self.assertEqual([stage['name'] for stage in status['stages']], ['parse', 'analyze_generate'],
+                         "Birleşik kip aşamaları kullanılmadı.")
+        self.assertEqual(status['status'], 'completed', "İş tamamlanmadı.")
+        self.assertEqual(self.backend.calls, ['fused'], "Birleşik kip tek istek göndermedi.")
+        self.assertEqual((len(payload['questions']), payload['source']), (5, 'model'), "Sorular API'den alınamadı.")
+    
+    def test_async_bank_steps_off_loop(self):
+        """
+        Eşzamansız yolun soru bankası adımlarını olay döngüsünün dışında yaptığını ve
+        yeniden oluşturma istendiğinde bankaya bakmadığını test eder.
+        """
+        on_loop = []
+        
+        def profile(analysis_result, processed_data):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            return {'keywords': []}
+        
+        bank = mock.Mock()
+        bank.find.return_value = None
+        content = generate_transcript(30, seed=1).encode('utf-8')
+        with mock.patch('app.utils.pipeline.get_question_bank', return_value=bank), \
+                mock.patch('app.utils.pipeline.lesson_profile', side_effect=profile):
+            result = asyncio.run(run_pipeline_async(Job(pipeline_stages('two_step')), io.BytesIO(content), 'lesson.vtt'))
+            self.assertEqual(on_loop, [False], "Ders bilgisi olay döngüsünde hesaplandı.")
+            self.assertEqual((bank.find.call_count, bank.add.call_count), (1, 1), "Banka adımları çalışmadı.")
+            self.assertEqual(result['tests_source'], 'model', "Testler yapay zekadan alınmadı.")
+            
+            asyncio.run(run_pipeline_async(Job(pipeline_stages('two_step')), io.BytesIO(content), 'lesson.vtt', True))
+            self.assertEqual(bank.find.call_count, 1, "Yeniden oluşturmada bankaya bakıldı.")
+
+class TestAsyncJobs(unittest.TestCase):
+    """
+    İşleri olay döngüsünde çalıştıran AsyncJobQueue'yu ve eşzamansız çağrı politikasını test eden birim testleri.
+    """
+    
+    def wait_for(self, job, timeout=5.0):
+        """
+        İşin bitmesini bekler.
+        """
+        deadline = time.time() + timeout
+        while not job.finished and time.time() < deadline:
+            time.sleep(0.01)
+    
+    def test_jobs_share_event_loop(self):
+        """
+        Yanıt bekleyen işlerin iş parçacığı sayısından bağımsız olarak aynı anda yürüdüğünü,
+        eşzamanlı işlevlerin havuzda çalıştığını ve hataların kaydedildiğini test eder.
+        """
+        async def wait_job(job, number):
+            await asyncio.sleep(0.3)
+            return number
+        
+        async def failing_job(job):
+            raise JobError("geçersiz transkript")
+        
+        queue = AsyncJobQueue(max_workers=1, max_pending=30)
+        started = time.time()
+        jobs = [queue.submit(wait_job, number) for number in range(20)]
+        blocking = queue.submit(lambda job: sum(range(10)))
+        failed = queue.submit(failing_job)
+        for job in jobs + [blocking, failed]:
+            self.wait_for(job)
+        
+        self.assertEqual([job.result for job in jobs], list(range(20)), "İş sonuçları yanlış.")
+        self.assertLess(time.time() - started, 2.0, "Bekleyen işler aynı anda yürütülmedi.")
+        self.assertEqual(blocking.result, 45, "Eşzamanlı işlev çalıştırılmadı.")
+        self.assertEqual((failed.status, failed.error), ('failed', 'geçersiz transkript'), "Hata kaydedilmedi.")
+    
+    def test_call_policy_async(self):
+        """
+        Eşzamansız çağrılarda geçici hataların yeniden denendiğini, süre sınırının uygulandığını
+        ve yedek istek kazandığında yavaş isteğin iptal edildiğini test eder.
+        """
+        class QuotaError(Exception):
+            code = 429
+        
+        attempts = []
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise QuotaError("kota aşıldı")
+            return "tamam"
+        
+        cancelled = []
+        async def slow_first():
+            attempts.append(1)
+            try:
+                await asyncio.sleep(0.5 if len(attempts) == 4 else 0.0)
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+            return len(attempts)
+        
+        async def scenario():
+            policy = CallPolicy(max_attempts=3, base_delay=0.01)
+            self.assertEqual(await policy.call_async(flaky), "tamam", "Yeniden deneme başarısız oldu.")
+            with self.assertRaises(CallTimeoutError):
+                await CallPolicy(max_attempts=1, deadline=0.05).call_async(lambda: asyncio.sleep(0.5))
+            hedged = CallPolicy(max_attempts=1, deadline=2, hedge=True, hedge_delay=0.05)
+            self.assertEqual(await hedged.call_async(slow_first), 5, "Yedek isteğin yanıtı kullanılmadı.")
+            await asyncio.sleep(0)
+        
+        asyncio.run(scenario())
+        self.assertEqual(cancelled, [1], "Yavaş istek iptal edilmedi.")
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file